@@ -0,0 +1,97 @@
+"""Per-chunk object cost on the agent -> synthesis path.
+
+For every sentence (or, with input streaming synthesizers, every word) an agent yields, the
+conversation creates a message, a GeneratedResponse, an AgentResponseMessage and an
+InterruptibleAgentResponseEvent. Compares the CPU time and memory allocated per chunk with the
+previous pydantic GeneratedResponse / AgentResponseMessage (validated on construction, which also
+copied the message) against the slotted dataclasses.
+
+    poetry run python playground/benchmarks/agent_response_objects.py
+    poetry run python playground/benchmarks/agent_response_objects.py --num-chunks 200000
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Callable, Union
+
+from pydantic.v1 import BaseModel
+
+from vocode.streaming.agent.base_agent import AgentResponseMessage, StreamedResponse
+from vocode.streaming.models.actions import EndOfTurn, FunctionCall
+from vocode.streaming.models.message import BaseMessage, LLMToken
+from vocode.streaming.utils.worker import InterruptibleAgentResponseEvent
+
+
+class LegacyGeneratedResponse(BaseModel):
+    message: Union[BaseMessage, FunctionCall, EndOfTurn]
+    is_interruptible: bool
+    streamed: bool = False
+
+
+class LegacyStreamedResponse(LegacyGeneratedResponse):
+    streamed: bool = True
+
+
+class LegacyAgentResponseMessage(BaseModel):
+    message: Union[BaseMessage, EndOfTurn]
+    is_interruptible: bool = True
+    is_first: bool = False
+    is_sole_text_chunk: bool = False
+
+
+def legacy_chunk(agent_response_tracker: asyncio.Event):
+    generated_response = LegacyStreamedResponse(
+        message=LLMToken(text="hello "), is_interruptible=True
+    )
+    # like the conversation, which handles function calls separately
+    assert isinstance(generated_response.message, BaseMessage)
+    return InterruptibleAgentResponseEvent(
+        LegacyAgentResponseMessage(message=generated_response.message, is_first=False),
+        agent_response_tracker=agent_response_tracker,
+    )
+
+
+def chunk(agent_response_tracker: asyncio.Event):
+    generated_response = StreamedResponse(
+        message=LLMToken.construct(text="hello "), is_interruptible=True
+    )
+    # like the conversation, which handles function calls separately
+    assert isinstance(generated_response.message, BaseMessage)
+    return InterruptibleAgentResponseEvent(
+        AgentResponseMessage(message=generated_response.message, is_first=False),
+        agent_response_tracker=agent_response_tracker,
+    )
+
+
+def measure(create_chunk: Callable, num_chunks: int):
+    agent_response_tracker = asyncio.Event()
+    start = time.perf_counter()
+    for _ in range(num_chunks):
+        create_chunk(agent_response_tracker)
+    seconds = time.perf_counter() - start
+
+    # keep the chunks alive (as a queue would) to measure what they hold on to
+    tracemalloc.start()
+    chunks = [create_chunk(agent_response_tracker) for _ in range(1000)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del chunks
+    return seconds / num_chunks, allocated / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-chunks", type=int, default=50000)
+    args = parser.parse_args()
+
+    legacy_seconds, legacy_bytes = measure(legacy_chunk, args.num_chunks)
+    seconds, allocated_bytes = measure(chunk, args.num_chunks)
+    print(f"{args.num_chunks} chunks")
+    print(f"  pydantic: {legacy_seconds * 1e6:6.1f}us, {legacy_bytes:6.0f} bytes per chunk")
+    print(f"  slotted:  {seconds * 1e6:6.1f}us, {allocated_bytes:6.0f} bytes per chunk")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Streams-per-core benchmark for LocalTranscriptionService.
+
+Simulates N concurrent calls, each submitting a `--window-seconds` window every
+`--hop-seconds` in real time, and reports the largest N whose p95 submit-to-result latency
+stays under the hop (i.e. the service keeps up with real time), per worker process.
+
+By default each worker runs a synthetic model that burns `--model-rtf` seconds of CPU per
+second of audio, which isolates the service's scheduling and IPC overhead. Pass --libname
+and --fname-model to run whisper.cpp on windows cut from playground/streaming/test.wav.
+
+With the synthetic model (2 workers, RTF 0.05, 2s windows every 0.5s) both modes sustain 8
+streams (4 per core): whisper.cpp decodes one window per call, so batching saves IPC round
+trips rather than compute. The main saving over WhisperCPPTranscriber is loading the model
+once per worker instead of once per call.
+
+    poetry run python playground/benchmarks/local_transcription_concurrency.py
+    poetry run python playground/benchmarks/local_transcription_concurrency.py --libname libwhisper.so --fname-model ggml-tiny.bin
+"""
+
+import argparse
+import asyncio
+import functools
+import pathlib
+import time
+import wave
+from typing import Callable, List
+
+import numpy as np
+
+from vocode.streaming.transcriber.local_transcription_service import (
+    LocalTranscriptionModel,
+    LocalTranscriptionService,
+    TranscriptionResult,
+    WhisperCPPModel,
+)
+from vocode.utils.whisper_cpp.helpers import WHISPER_CPP_SAMPLING_RATE
+
+SAMPLE_CLIP = pathlib.Path(__file__).parent.parent / "streaming" / "test.wav"
+
+
+class SyntheticModel(LocalTranscriptionModel):
+    def __init__(self, model_rtf: float):
+        self.model_rtf = model_rtf
+
+    def transcribe_batch(self, windows: List[np.ndarray]) -> List[TranscriptionResult]:
+        results = []
+        for window in windows:
+            deadline = (
+                time.perf_counter() + len(window) / WHISPER_CPP_SAMPLING_RATE * self.model_rtf
+            )
+            while time.perf_counter() < deadline:
+                pass
+            results.append(("", 1.0))
+        return results
+
+
+def load_window(window_seconds: float) -> np.ndarray:
+    with wave.open(str(SAMPLE_CLIP), "rb") as wav:
+        sampling_rate = wav.getframerate()
+        audio = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    # nearest-neighbour resampling is good enough to give whisper.cpp realistic input
+    indices = np.arange(0, len(audio), sampling_rate / WHISPER_CPP_SAMPLING_RATE).astype(int)
+    samples = audio[indices].astype(np.float32) / 32768.0
+    return np.ascontiguousarray(samples[: int(WHISPER_CPP_SAMPLING_RATE * window_seconds)])
+
+
+async def run_stream(
+    service: LocalTranscriptionService,
+    stream_id: str,
+    window: np.ndarray,
+    hop_seconds: float,
+    duration_seconds: float,
+    latencies: List[float],
+):
+    async def transcribe_and_time():
+        start = time.perf_counter()
+        await service.transcribe(stream_id, window, is_final=True)
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    end = time.perf_counter() + duration_seconds
+    while time.perf_counter() < end:
+        tasks.append(asyncio.create_task(transcribe_and_time()))
+        await asyncio.sleep(hop_seconds)
+    await asyncio.gather(*tasks)
+
+
+async def p95_latency(
+    service: LocalTranscriptionService, num_streams: int, window: np.ndarray, args
+) -> float:
+    latencies: List[float] = []
+    await asyncio.gather(
+        *[
+            run_stream(
+                service, f"stream-{i}", window, args.hop_seconds, args.duration_seconds, latencies
+            )
+            for i in range(num_streams)
+        ]
+    )
+    return float(np.percentile(latencies, 95))
+
+
+async def max_streams(max_batch_size: int, window: np.ndarray, args) -> int:
+    model_factory: Callable[[], LocalTranscriptionModel]
+    if args.libname and args.fname_model:
+        model_factory = functools.partial(
+            WhisperCPPModel, libname=args.libname, fname_model=args.fname_model
+        )
+    else:
+        model_factory = functools.partial(SyntheticModel, model_rtf=args.model_rtf)
+    service = LocalTranscriptionService(
+        model_factory=model_factory,
+        num_workers=args.num_workers,
+        max_batch_size=max_batch_size,
+        max_batch_delay_seconds=args.max_batch_delay_seconds if max_batch_size > 1 else 0,
+    )
+    service.start()
+    # load the model in every worker before measuring
+    await asyncio.gather(
+        *[service.transcribe(f"warmup-{i}", window[:1], is_final=True) for i in range(4)]
+    )
+
+    supported = 0
+    num_streams = 1
+    while True:
+        latency = await p95_latency(service, num_streams, window, args)
+        print(f"    {num_streams:4d} streams: p95 latency {latency * 1000:8.1f}ms")
+        if latency > args.hop_seconds:
+            break
+        supported = num_streams
+        num_streams *= 2
+    print(f"    mean batch size {service.stats.mean_batch_size:.2f}")
+    await service.terminate()
+    return supported
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--libname")
+    parser.add_argument("--fname-model")
+    parser.add_argument("--num-workers", type=int, default=2)
+    parser.add_argument("--model-rtf", type=float, default=0.05)
+    parser.add_argument("--window-seconds", type=float, default=2.0)
+    parser.add_argument("--hop-seconds", type=float, default=0.5)
+    parser.add_argument("--duration-seconds", type=float, default=3.0)
+    parser.add_argument("--max-batch-size", type=int, default=8)
+    parser.add_argument("--max-batch-delay-seconds", type=float, default=0.01)
+    args = parser.parse_args()
+
+    window = load_window(args.window_seconds)
+    for label, max_batch_size in [("unbatched", 1), ("batched", args.max_batch_size)]:
+        print(f"{label} (max_batch_size={max_batch_size}):")
+        supported = await max_streams(max_batch_size, window, args)
+        print(
+            f"  {supported} streams on {args.num_workers} workers "
+            f"({supported / args.num_workers:.1f} streams per core)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""Query latency of the in-process vector index behind LocalVectorDB.
+
+For each index size, builds a flat and an IVF index over synthetic clustered embeddings and
+reports the p50/p99 search latency of each (and of the flat index memory-mapped from disk),
+along with the IVF index's recall@k against the exact flat search. For scale, a hosted vector DB
+query is a network round trip, typically 20-100ms from the same region.
+
+The default 256 dimensions keep the 1M vector index at 1GB; pass --dimensions 1536 for OpenAI's
+ada-002 embeddings (6GB at 1M vectors).
+
+    poetry run python playground/benchmarks/local_vector_index.py
+    poetry run python playground/benchmarks/local_vector_index.py --sizes 10000 100000 --dimensions 1536
+"""
+
+import argparse
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from vocode.streaming.vector_db.vector_index import VectorIndex
+
+NUM_CLUSTERS = 1000
+CHUNK_SIZE = 100_000
+
+
+def clustered_vectors(num_vectors: int, dimensions: int, seed: int) -> np.ndarray:
+    # the same clusters for every seed, so that queries are drawn from the indexed clusters
+    centers = np.random.default_rng(0).normal(size=(NUM_CLUSTERS, dimensions)).astype(np.float32)
+    random = np.random.default_rng(seed)
+    vectors = np.empty((num_vectors, dimensions), dtype=np.float32)
+    for start in range(0, num_vectors, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, num_vectors - start)
+        vectors[start : start + size] = centers[random.integers(NUM_CLUSTERS, size=size)]
+        vectors[start : start + size] += random.normal(scale=0.3, size=(size, dimensions))
+    return vectors
+
+
+def latencies_ms(search: Callable[[np.ndarray], object], queries: np.ndarray) -> List[float]:
+    search(queries[0])  # warm up
+    latencies = []
+    for query in queries:
+        started_at = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: List[float], extra: str = ""):
+    print(
+        f"  {name:<16} p50 {np.percentile(latencies, 50):8.3f}ms"
+        f"  p99 {np.percentile(latencies, 99):8.3f}ms  {extra}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dimensions", type=int, default=256)
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--num-probes", type=int, default=16)
+    args = parser.parse_args()
+
+    queries = clustered_vectors(args.num_queries, args.dimensions, seed=1)
+    for size in args.sizes:
+        vectors = clustered_vectors(size, args.dimensions, seed=0)
+        print(f"{size} vectors x {args.dimensions} dimensions ({vectors.nbytes / 1e6:.0f}MB)")
+
+        flat = VectorIndex(args.dimensions)
+        flat.add(vectors)
+        report("flat", latencies_ms(lambda query: flat.search(query, args.top_k), queries))
+
+        with tempfile.TemporaryDirectory() as directory:
+            flat.save(directory)
+            memory_mapped = VectorIndex.load(directory, memory_map=True)
+            report(
+                "flat, mmap",
+                latencies_ms(lambda query: memory_mapped.search(query, args.top_k), queries),
+            )
+            del memory_mapped
+
+        ivf = VectorIndex(args.dimensions, index_type="ivf", num_probes=args.num_probes)
+        ivf.add(vectors)
+        started_at = time.perf_counter()
+        ivf.train()
+        training_seconds = time.perf_counter() - started_at
+        num_found = sum(
+            len(
+                {row for row, _ in ivf.search(query, args.top_k)}
+                & {row for row, _ in flat.search(query, args.top_k)}
+            )
+            for query in queries
+        )
+        report(
+            f"ivf ({ivf.num_lists} lists)",
+            latencies_ms(lambda query: ivf.search(query, args.top_k), queries),
+            f"recall@{args.top_k} {num_found / (args.top_k * len(queries)):.3f},"
+            f" trained in {training_seconds:.1f}s",
+        )
+        del flat, ivf, vectors
+
+
+if __name__ == "__main__":
+    main()
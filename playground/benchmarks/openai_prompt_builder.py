@@ -0,0 +1,134 @@
+"""Prompt building benchmark for a 200-turn conversation.
+
+Replays a conversation turn by turn and, at each turn, builds the OpenAI chat messages the way
+ChatGPTAgent does: with the previous format_openai_chat_messages_from_transcript (deepcopy when
+merging bot messages, full re-tokenization, pop(1) + recount when trimming) and with a
+per-conversation OpenAIChatPromptBuilder. Checks that both produce the same prompts.
+
+    poetry run python playground/benchmarks/openai_prompt_builder.py
+    poetry run python playground/benchmarks/openai_prompt_builder.py --num-turns 200 --model gpt-3.5-turbo-0613
+"""
+
+import argparse
+import random
+import time
+from copy import deepcopy
+from typing import Any, Dict, List, Optional
+
+from vocode.streaming.agent.openai_utils import (
+    OpenAIChatPromptBuilder,
+    get_openai_chat_messages_from_transcript,
+)
+from vocode.streaming.agent.token_utils import (
+    get_chat_gpt_max_tokens,
+    num_tokens_from_functions,
+    num_tokens_from_messages,
+)
+from vocode.streaming.models.agent import LLM_AGENT_DEFAULT_MAX_TOKENS
+from vocode.streaming.models.events import Sender
+from vocode.streaming.models.transcript import EventLog, Message, Transcript
+
+WORDS = "the a to book table for two people tomorrow evening at seven please thanks".split()
+
+
+def legacy_merge_event_logs(event_logs: List[EventLog]) -> List[EventLog]:
+    new_event_logs: List[EventLog] = []
+    idx = 0
+    while idx < len(event_logs):
+        bot_messages_buffer: List[Message] = []
+        current_log = event_logs[idx]
+        while isinstance(current_log, Message) and current_log.sender == Sender.BOT:
+            bot_messages_buffer.append(current_log)
+            idx += 1
+            try:
+                current_log = event_logs[idx]
+            except IndexError:
+                break
+        if bot_messages_buffer:
+            merged_bot_message = deepcopy(bot_messages_buffer[-1])
+            merged_bot_message.text = " ".join(event_log.text for event_log in bot_messages_buffer)
+            new_event_logs.append(merged_bot_message)
+        else:
+            new_event_logs.append(current_log)
+            idx += 1
+    return new_event_logs
+
+
+def legacy_format(
+    transcript: Transcript, model_name: str, functions: Optional[List[Dict]], prompt_preamble: str
+) -> List[dict]:
+    chat_messages: List[Dict[str, Optional[Any]]] = get_openai_chat_messages_from_transcript(
+        merged_event_logs=legacy_merge_event_logs(transcript.event_logs),
+        prompt_preamble=prompt_preamble,
+    )
+    context_size = num_tokens_from_messages(
+        messages=chat_messages, model=model_name
+    ) + num_tokens_from_functions(functions=functions, model=model_name)
+    while context_size > get_chat_gpt_max_tokens(model_name) - LLM_AGENT_DEFAULT_MAX_TOKENS - 50:
+        if len(chat_messages) <= 1:
+            break
+        chat_messages.pop(1)
+        context_size = num_tokens_from_messages(
+            messages=chat_messages, model=model_name
+        ) + num_tokens_from_functions(functions=functions, model=model_name)
+    return chat_messages
+
+
+def make_turns(num_turns: int) -> List[List[Message]]:
+    rng = random.Random(0)
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))) + "."
+
+    turns = []
+    for _ in range(num_turns):
+        turn = [Message(sender=Sender.HUMAN, text=sentence(), is_final=True)]
+        # bot turns are synthesized sentence by sentence, so they're merged in the prompt
+        turn += [
+            Message(sender=Sender.BOT, text=sentence(), is_final=True)
+            for _ in range(rng.randint(1, 3))
+        ]
+        turns.append(turn)
+    return turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-turns", type=int, default=200)
+    parser.add_argument("--model", default="gpt-3.5-turbo-0613")
+    args = parser.parse_args()
+
+    preamble = "You are a helpful assistant that books restaurant tables."
+    turns = make_turns(args.num_turns)
+
+    legacy_transcript = Transcript()
+    legacy_seconds = 0.0
+    legacy_prompts = []
+    for turn in turns:
+        legacy_transcript.event_logs.extend(turn)
+        start = time.perf_counter()
+        legacy_prompts.append(legacy_format(legacy_transcript, args.model, None, preamble))
+        legacy_seconds += time.perf_counter() - start
+
+    builder = OpenAIChatPromptBuilder()
+    transcript = Transcript()
+    builder_seconds = 0.0
+    for turn, legacy_prompt in zip(turns, legacy_prompts):
+        transcript.event_logs.extend(turn)
+        start = time.perf_counter()
+        prompt = builder.build(transcript, args.model, None, preamble)
+        builder_seconds += time.perf_counter() - start
+        assert prompt == legacy_prompt, "prompt builder output differs from the previous prompts"
+
+    print(
+        f"{args.num_turns} turns, {args.model} "
+        f"(context limit {get_chat_gpt_max_tokens(args.model)} tokens, "
+        f"final prompt {len(legacy_prompts[-1])} messages)"
+    )
+    print(f"  previous:       {legacy_seconds * 1000:8.1f}ms total")
+    print(f"  prompt builder: {builder_seconds * 1000:8.1f}ms total")
+    print(f"  speedup:        {legacy_seconds / builder_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Sentence segmentation benchmark for streamed LLM responses.
+
+Feeds synthetic token streams through collate_response_async and through the previous
+implementation, which rescanned its whole buffer (split, regex search, split_sentences) on every
+token, and checks that both yield the same chunks. The "run-on" stream has long stretches
+without a sentence boundary (e.g. prices like $3.50), where the buffer grows the longest.
+
+    poetry run python playground/benchmarks/sentence_segmenter.py
+    poetry run python playground/benchmarks/sentence_segmenter.py --num-tokens 20000
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import time
+from typing import AsyncGenerator, List
+
+from vocode.streaming.agent.streaming_utils import (
+    SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN,
+    SHORT_SENTENCE_CUTOFF,
+    TOKENS_TO_GENERATE_PAST_PERIOD,
+    collate_response_async,
+    split_sentences,
+)
+
+WORDS = [" the", " table", " is", " booked", " for", " two", " people", " at", " seven"]
+
+
+async def legacy_collate_response_async(gen: AsyncGenerator[str, None]):
+    buffer = ""
+    is_post_period = False
+    tokens_since_period = 0
+    async for token in gen:
+        buffer += token
+        if len(buffer.strip().split()) < SHORT_SENTENCE_CUTOFF:
+            continue
+        if re.search(SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN, token):
+            matches = [
+                match for match in re.finditer(SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN, buffer)
+            ]
+            split_point = matches[-1].start() + 1
+            to_keep, to_return = buffer[split_point:], buffer[:split_point]
+            if to_return.strip():
+                yield to_return.strip()
+            buffer = to_keep
+        elif "." in token:
+            is_post_period = True
+            tokens_since_period = 0
+
+        if is_post_period and tokens_since_period > TOKENS_TO_GENERATE_PAST_PERIOD:
+            sentences = split_sentences(buffer)
+            if len(sentences) > 1:
+                yield " ".join(sentences[:-1])
+                buffer = sentences[-1]
+            is_post_period = False
+            tokens_since_period = 0
+        else:
+            tokens_since_period += 1
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def make_tokens(num_tokens: int, run_on: bool) -> List[str]:
+    rng = random.Random(0)
+    tokens: List[str] = []
+    while len(tokens) < num_tokens:
+        tokens += [rng.choice(WORDS) for _ in range(rng.randint(5, 20))]
+        if run_on:
+            tokens += [" $", str(rng.randint(1, 9)), ".", "50"]
+        else:
+            tokens.append(rng.choice([".", "?", "!", ".\n"]))
+    return tokens[:num_tokens]
+
+
+async def agen(tokens: List[str]) -> AsyncGenerator[str, None]:
+    for token in tokens:
+        yield token
+
+
+async def run(tokens: List[str], legacy: bool) -> List[str]:
+    if legacy:
+        return [chunk async for chunk in legacy_collate_response_async(agen(tokens))]
+    return [
+        chunk  # type: ignore[misc]
+        async for chunk in collate_response_async(conversation_id="benchmark", gen=agen(tokens))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-tokens", type=int, default=5000)
+    args = parser.parse_args()
+
+    for name, run_on in [("sentences", False), ("run-on", True)]:
+        tokens = make_tokens(args.num_tokens, run_on)
+        timings = {}
+        outputs = {}
+        for legacy in (True, False):
+            start = time.perf_counter()
+            outputs[legacy] = asyncio.run(run(tokens, legacy))
+            timings[legacy] = time.perf_counter() - start
+        assert outputs[True] == outputs[False], "segmenter output differs from the previous chunks"
+        print(f"{name}: {args.num_tokens} tokens, {len(outputs[False])} chunks")
+        print(f"  previous:  {timings[True] * 1000:8.1f}ms")
+        print(f"  segmenter: {timings[False] * 1000:8.1f}ms")
+        print(f"  speedup:   {timings[True] / timings[False]:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Streamed token batching benchmark for input streaming synthesizers.
+
+Replays a synthetic LLM token stream in real time through stream_response_async, with and (at
+the same time) without max_batch_delay_seconds. Reports how many chunks a turn produces (each one
+a StreamedResponse, an AgentResponseMessage, an InterruptibleAgentResponseEvent and an
+AgentResponsesWorker hop) and how long batching held words back.
+
+    poetry run python playground/benchmarks/streamed_token_batching.py
+    poetry run python playground/benchmarks/streamed_token_batching.py --tokens-per-second 100 --max-batch-delay-ms 50
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import AsyncGenerator, List, Optional, Tuple
+
+from vocode.streaming.agent.streaming_utils import stream_response_async
+
+WORDS = "sure I can book a table for two people tomorrow evening at seven".split()
+
+
+def make_tokens(num_tokens: int) -> List[str]:
+    rng = random.Random(0)
+    tokens: List[str] = []
+    while len(tokens) < num_tokens:
+        tokens += [f" {rng.choice(WORDS)}" for _ in range(rng.randint(6, 20))]
+        tokens.append(rng.choice([".", ",", "?"]))
+    return tokens[:num_tokens]
+
+
+async def replay(tokens: List[str], tokens_per_second: float, queues: List[asyncio.Queue]):
+    rng = random.Random(1)
+    for token in tokens:
+        await asyncio.sleep(rng.expovariate(tokens_per_second))
+        for queue in queues:
+            queue.put_nowait(token)
+    for queue in queues:
+        queue.put_nowait(None)
+
+
+async def from_queue(queue: asyncio.Queue) -> AsyncGenerator[str, None]:
+    while True:
+        token = await queue.get()
+        if token is None:
+            return
+        yield token
+
+
+async def consume(
+    queue: asyncio.Queue, max_batch_delay_seconds: Optional[float]
+) -> Tuple[List[str], List[float]]:
+    chunks = []
+    word_emitted_at = []
+    async for chunk in stream_response_async(
+        conversation_id="benchmark",
+        gen=from_queue(queue),
+        max_batch_delay_seconds=max_batch_delay_seconds,
+    ):
+        assert isinstance(chunk, str)
+        chunks.append(chunk)
+        word_emitted_at += [time.perf_counter()] * len(chunk.split())
+    return chunks, word_emitted_at
+
+
+async def run(tokens: List[str], tokens_per_second: float, max_batch_delay_seconds: float):
+    """Streams the same tokens, at the same time, unbatched and batched."""
+    queues: List[asyncio.Queue] = [asyncio.Queue(), asyncio.Queue()]
+    _, unbatched, batched = await asyncio.gather(
+        replay(tokens, tokens_per_second, queues),
+        consume(queues[0], None),
+        consume(queues[1], max_batch_delay_seconds),
+    )
+    return unbatched, batched
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-tokens", type=int, default=300)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--max-batch-delay-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    tokens = make_tokens(args.num_tokens)
+    (unbatched, unbatched_at), (batched, batched_at) = asyncio.run(
+        run(tokens, args.tokens_per_second, args.max_batch_delay_ms / 1000)
+    )
+    assert "".join(batched) == "".join(unbatched), "batching changed the streamed text"
+    delays = [
+        batched_time - unbatched_time
+        for batched_time, unbatched_time in zip(batched_at, unbatched_at)
+    ]
+    print(
+        f"{args.num_tokens} tokens at {args.tokens_per_second:.0f} tokens/s, "
+        f"max batch delay {args.max_batch_delay_ms:.0f}ms"
+    )
+    print(f"  chunks per turn: {len(unbatched)} unbatched, {len(batched)} batched")
+    print(f"  first word delay: {delays[0] * 1000:.1f}ms")
+    print(
+        f"  word delay: mean {sum(delays) / len(delays) * 1000:.1f}ms, "
+        f"max {max(delays) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
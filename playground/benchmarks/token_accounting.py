@@ -0,0 +1,101 @@
+"""Per-turn token accounting cost with and without the token_utils caches.
+
+Each turn, ChatGPTAgent counts the tokens of the turn's new messages and of the agent's function
+definitions. This replays that accounting for a number of turns: first the way it was done
+before (tiktoken's model lookup and the model-name branches on every call, functions formatted
+and tokenized on every turn), then with the memoized tokenizer info and function token counts.
+Checks that both produce the same counts.
+
+    poetry run python playground/benchmarks/token_accounting.py
+    poetry run python playground/benchmarks/token_accounting.py --num-turns 500 --num-functions 20
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import tiktoken
+
+from vocode.streaming.agent import token_utils
+from vocode.streaming.agent.token_utils import (
+    _FUNCTION_OVERHEAD_STR,
+    _format_func_into_prompt_str,
+    get_tokenizer_info,
+    num_tokens_from_functions,
+    num_tokens_from_messages,
+)
+
+
+def legacy_num_tokens_from_messages(messages: List[dict], model: str) -> int:
+    tiktoken.encoding_for_model(model)
+    get_tokenizer_info.__wrapped__(model)  # the model-name branches, uncached
+    return num_tokens_from_messages(messages, model)
+
+
+def legacy_num_tokens_from_functions(functions: List[dict], model: str) -> int:
+    encoding = tiktoken.encoding_for_model(model)
+    function_overhead = 3 + len(encoding.encode(_FUNCTION_OVERHEAD_STR))
+    return function_overhead + sum(
+        len(encoding.encode(_format_func_into_prompt_str(func=f))) for f in functions
+    )
+
+
+def make_functions(num_functions: int) -> List[Dict]:
+    return [
+        {
+            "name": f"action_{i}",
+            "description": f"Performs action number {i} for the caller, if they ask for it",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "reason": {"type": "string", "description": "Why the action is taken"},
+                    "priority": {"type": "integer", "description": "From 1 to 5"},
+                    "channel": {"type": "string", "enum": ["phone", "email", "sms"]},
+                },
+                "required": ["reason"],
+            },
+        }
+        for i in range(num_functions)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-turns", type=int, default=200)
+    parser.add_argument("--num-functions", type=int, default=5)
+    parser.add_argument("--model", default="gpt-3.5-turbo-0613")
+    args = parser.parse_args()
+
+    messages = [
+        {"role": "user", "content": "Can I book a table for two tomorrow evening?"},
+        {"role": "assistant", "content": "Sure, what time would you like to come in?"},
+    ]
+    tiktoken.encoding_for_model(args.model)  # downloads the encoding, if needed
+
+    def run(count_messages, count_functions) -> float:
+        total_seconds = 0.0
+        for _ in range(args.num_turns):
+            # the functions are rebuilt from the action configs
+            functions = make_functions(args.num_functions)
+            start = time.perf_counter()
+            num_tokens = count_messages(messages, args.model) + count_functions(
+                functions, args.model
+            )
+            total_seconds += time.perf_counter() - start
+        counts.append(num_tokens)
+        return total_seconds
+
+    counts: List[int] = []
+    legacy_seconds = run(legacy_num_tokens_from_messages, legacy_num_tokens_from_functions)
+    token_utils._num_tokens_from_function.cache_clear()
+    cached_seconds = run(num_tokens_from_messages, num_tokens_from_functions)
+    assert counts[0] == counts[1], "cached token counts differ from the previous counts"
+
+    print(f"{args.num_turns} turns, {args.num_functions} functions, {args.model}")
+    print(f"  previous: {legacy_seconds / args.num_turns * 1e6:8.1f}us per turn")
+    print(f"  cached:   {cached_seconds / args.num_turns * 1e6:8.1f}us per turn")
+    print(f"  speedup:  {legacy_seconds / cached_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Memory per conversation of a long call's transcript, with and without event log compaction.
+
+Replays a call turn by turn: a human message, one to three bot messages (responses are logged
+sentence by sentence) and, every few turns, an action's start and finish logs. Each transcript is
+built the way a StreamingConversation builds it, with and without
+Transcript.enable_event_log_compaction, and its memory is measured with tracemalloc (the message
+texts themselves are shared between both). Also times reading every event log back, which
+compaction makes the agent do on each turn, and checks that both transcripts serialize the same.
+
+    poetry run python playground/benchmarks/transcript_memory.py
+    poetry run python playground/benchmarks/transcript_memory.py --num-turns 100 1000 --num-conversations 100
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from pydantic.v1 import BaseModel
+
+from vocode.streaming.action.end_conversation import EndConversationVocodeActionConfig
+from vocode.streaming.models.actions import ActionInput, ActionOutput
+from vocode.streaming.models.transcript import Transcript
+
+WORDS = "the a to book table for two people tomorrow evening at seven please thanks".split()
+ACTION_EVERY_NUM_TURNS = 5
+
+
+class LookupParameters(BaseModel):
+    query: str
+
+
+class LookupResponse(BaseModel):
+    result: str
+
+
+def make_turns(num_turns: int) -> List[Tuple[str, List[str]]]:
+    rng = random.Random(0)
+
+    def sentence() -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))) + "."
+
+    return [(sentence(), [sentence() for _ in range(rng.randint(1, 3))]) for _ in range(num_turns)]
+
+
+def build_transcript(turns: List[Tuple[str, List[str]]], compact: bool) -> Transcript:
+    transcript = Transcript()
+    if compact:
+        transcript.enable_event_log_compaction()
+    action_config = EndConversationVocodeActionConfig()
+    for turn, (human_text, bot_texts) in enumerate(turns):
+        transcript.add_human_message(human_text, "conversation_id")
+        if turn % ACTION_EVERY_NUM_TURNS == 0:
+            action_input = ActionInput(
+                action_config=action_config,
+                conversation_id="conversation_id",
+                params=LookupParameters(query=human_text),
+            )
+            transcript.add_action_start_log(action_input, "conversation_id")
+            # the action result comes back through an agent input, as a copy
+            transcript.add_action_finish_log(
+                action_input.copy(),
+                ActionOutput(action_type=action_config.type, response=LookupResponse(result="ok")),
+                "conversation_id",
+            )
+        for bot_text in bot_texts:
+            transcript.add_bot_message(bot_text, "conversation_id", is_final=True)
+    return transcript
+
+
+def measure_bytes(turns: List[Tuple[str, List[str]]], compact: bool, num_conversations: int):
+    gc.collect()
+    tracemalloc.start()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    transcripts = [build_transcript(turns, compact) for _ in range(num_conversations)]
+    gc.collect()
+    num_bytes = tracemalloc.get_traced_memory()[0] - start_bytes
+    tracemalloc.stop()
+    return num_bytes / num_conversations, transcripts[0]
+
+
+def read_ms(transcript: Transcript) -> float:
+    start = time.perf_counter()
+    for _ in transcript.event_logs:
+        pass
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-turns", type=int, nargs="+", default=[60, 300, 1000])
+    parser.add_argument("--num-conversations", type=int, default=20)
+    args = parser.parse_args()
+
+    for num_turns in args.num_turns:
+        turns = make_turns(num_turns)
+        plain_bytes, plain = measure_bytes(turns, False, args.num_conversations)
+        compact_bytes, compact = measure_bytes(turns, True, args.num_conversations)
+        assert [event_log.dict(exclude={"timestamp"}) for event_log in plain.event_logs] == [
+            event_log.dict(exclude={"timestamp"}) for event_log in compact.event_logs
+        ], "compacted event logs differ"
+        print(f"{num_turns} turns ({len(plain.event_logs)} event logs)")
+        print(
+            f"  models:    {plain_bytes / 1024:9.1f}KB per conversation,"
+            f" {read_ms(plain):7.3f}ms to read the event logs"
+        )
+        print(
+            f"  compacted: {compact_bytes / 1024:9.1f}KB per conversation,"
+            f" {read_ms(compact):7.3f}ms to read the event logs"
+            f"  ({plain_bytes / compact_bytes:.1f}x smaller)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Per-turn transcript query cost on long transcripts, before and after the transcript index.
+
+Times the queries made on every turn (and, for is_bot_still_speaking, on every interim
+transcription): the previous implementations, which scan or copy the event logs, against
+Transcript's maintained index. Each query is timed right after a message is appended, so the
+indexed timings include keeping the index up to date (it's built by a first, untimed query).
+Checks that both give the same answers.
+
+    poetry run python playground/benchmarks/transcript_queries.py
+    poetry run python playground/benchmarks/transcript_queries.py --sizes 1000 100000 --num-queries 200
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from vocode.streaming.models.events import Sender
+from vocode.streaming.models.transcript import Message, Transcript
+
+
+def legacy_num_bot_messages(transcript: Transcript) -> int:
+    return sum(
+        1
+        for event_log in transcript.event_logs
+        if isinstance(event_log, Message) and event_log.sender == Sender.BOT
+    )
+
+
+def legacy_get_last_user_message(transcript: Transcript):
+    for idx, message in enumerate(transcript.event_logs[::-1]):
+        if message.sender == Sender.HUMAN:
+            return -1 * (idx + 1), message.to_string()
+
+
+def legacy_was_last_message_interrupted(transcript: Transcript) -> bool:
+    bot_messages = [
+        message
+        for message in transcript.event_logs
+        if isinstance(message, Message) and message.sender == Sender.BOT
+    ]
+    if len(bot_messages) > 0:
+        last_bot_message = bot_messages[-1]
+        return not last_bot_message.is_final or not last_bot_message.is_end_of_turn
+    return False
+
+
+def legacy_last_two_messages(transcript: Transcript) -> Tuple[Optional[Message], ...]:
+    messages = (
+        event_log for event_log in reversed(transcript.event_logs) if isinstance(event_log, Message)
+    )
+    return next(messages, None), next(messages, None)
+
+
+QUERIES: Dict[str, Tuple[Callable[[Transcript], object], Callable[[Transcript], object]]] = {
+    "is_first_response": (
+        legacy_num_bot_messages,
+        lambda transcript: transcript.get_num_messages(Sender.BOT),
+    ),
+    "get_last_user_message": (
+        legacy_get_last_user_message,
+        lambda transcript: transcript.get_last_user_message(),
+    ),
+    "was_last_message_interrupted": (
+        legacy_was_last_message_interrupted,
+        lambda transcript: transcript.was_last_message_interrupted(),
+    ),
+    "is_bot_still_speaking": (
+        legacy_last_two_messages,
+        lambda transcript: (
+            transcript.get_last_message(),
+            transcript.get_second_to_last_message(),
+        ),
+    ),
+}
+
+
+def make_transcript(size: int) -> Transcript:
+    rng = random.Random(0)
+    transcript = Transcript()
+    for i in range(size):
+        transcript.event_logs.append(
+            Message(
+                sender=Sender.HUMAN if i % 2 == 0 else Sender.BOT,
+                text=f"message {i}",
+                is_final=True,
+                is_end_of_turn=rng.random() < 0.9,
+            )
+        )
+    return transcript
+
+
+def describe(answer: object) -> object:
+    if isinstance(answer, tuple):
+        return tuple(describe(item) for item in answer)
+    if isinstance(answer, Message):
+        return answer.to_string()
+    return answer
+
+
+def time_query_us(
+    transcript: Transcript, query: Callable[[Transcript], object], num_queries: int
+) -> Tuple[float, List[object]]:
+    query(transcript)  # builds the index, which is then kept up to date as logs are appended
+    total_seconds = 0.0
+    answers = []
+    for i in range(num_queries):
+        transcript.event_logs.append(
+            Message(sender=Sender.HUMAN if i % 2 == 0 else Sender.BOT, text="new", is_final=True)
+        )
+        start = time.perf_counter()
+        answer = query(transcript)
+        total_seconds += time.perf_counter() - start
+        answers.append(describe(answer))
+    del transcript.event_logs[-num_queries:]
+    return total_seconds / num_queries * 1e6, answers
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--num-queries", type=int, default=100)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        print(f"{size} event logs")
+        for name, (legacy_query, indexed_query) in QUERIES.items():
+            legacy_us, legacy_answers = time_query_us(
+                make_transcript(size), legacy_query, args.num_queries
+            )
+            indexed_us, indexed_answers = time_query_us(
+                make_transcript(size), indexed_query, args.num_queries
+            )
+            assert legacy_answers == indexed_answers, f"{name} answers differ"
+            print(
+                f"  {name:<30} previous {legacy_us:10.1f}us  indexed {indexed_us:8.1f}us"
+                f"  ({legacy_us / indexed_us:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Real-time factor benchmark for WhisperCPPTranscriber on playground/streaming/test.wav.
+
+Always measures the audio preparation overhead of the previous WAV + pydub path against the
+ring buffer path. Pass --libname and --fname-model to also measure the end-to-end real-time
+factor (processing time / audio duration) with whisper.cpp. The preparation overhead is small
+for both paths; the ring buffer's gains are in latency (interim results every
+buffer_size_seconds, finals on VAD pauses) rather than in preparation time.
+
+    poetry run python playground/benchmarks/whisper_cpp_rtf.py
+    poetry run python playground/benchmarks/whisper_cpp_rtf.py --libname libwhisper.so --fname-model ggml-tiny.bin
+"""
+
+import argparse
+import io
+import pathlib
+import time
+import wave
+from typing import List
+
+import numpy as np
+from pydub import AudioSegment
+
+from vocode.streaming.models.audio import AudioEncoding
+from vocode.streaming.models.transcriber import WhisperCPPTranscriberConfig
+from vocode.streaming.transcriber.utterance_window import UtteranceWindow
+from vocode.streaming.transcriber.whisper_cpp_transcriber import WhisperCPPTranscriber
+from vocode.streaming.utils.audio_ring_buffer import AudioRingBuffer
+from vocode.utils.whisper_cpp.helpers import WHISPER_CPP_SAMPLING_RATE
+
+SAMPLE_CLIP = pathlib.Path(__file__).parent.parent / "streaming" / "test.wav"
+CHUNK_SECONDS = 0.02
+BUFFER_SIZE_SECONDS = 1
+
+
+def load_chunks():
+    with wave.open(str(SAMPLE_CLIP), "rb") as wav:
+        sampling_rate = wav.getframerate()
+        audio = wav.readframes(wav.getnframes())
+    chunk_size = int(sampling_rate * CHUNK_SECONDS) * 2
+    chunks = [audio[i : i + chunk_size] for i in range(0, len(audio), chunk_size)]
+    return chunks, sampling_rate, len(audio) / 2 / sampling_rate
+
+
+def legacy_prepare(chunks: List[bytes], sampling_rate: int) -> int:
+    """The previous buffering: write into an in-memory WAV, re-read it with pydub when full."""
+    num_windows = 0
+
+    def new_buffer():
+        buffer = io.BytesIO()
+        in_memory_wav = wave.open(buffer, "wb")
+        in_memory_wav.setnchannels(1)
+        in_memory_wav.setsampwidth(2)
+        in_memory_wav.setframerate(sampling_rate)
+        return in_memory_wav, buffer
+
+    in_memory_wav, audio_buffer = new_buffer()
+    for chunk in chunks:
+        in_memory_wav.writeframes(chunk)
+        if audio_buffer.tell() >= sampling_rate * BUFFER_SIZE_SECONDS * 2:
+            audio_buffer.seek(0)
+            audio_segment = AudioSegment.from_wav(audio_buffer)
+            np.frombuffer(
+                audio_segment.set_frame_rate(WHISPER_CPP_SAMPLING_RATE).raw_data, dtype=np.int16
+            ).astype("float32") / 32768.0
+            in_memory_wav, audio_buffer = new_buffer()
+            num_windows += 1
+    return num_windows
+
+
+def ring_buffer_prepare(chunks: List[bytes], sampling_rate: int) -> int:
+    """The ring buffer path, without the VAD so that both paths produce the same windows."""
+    utterance_window = UtteranceWindow(make_config(sampling_rate, "", ""))
+    ring_buffer = AudioRingBuffer(WHISPER_CPP_SAMPLING_RATE * 15)
+    num_windows = 0
+    samples_since_window = 0
+    for chunk in chunks:
+        samples = utterance_window.decode_chunk(chunk)
+        ring_buffer.write(samples)
+        samples_since_window += len(samples)
+        if samples_since_window >= WHISPER_CPP_SAMPLING_RATE * BUFFER_SIZE_SECONDS:
+            ring_buffer.window()
+            samples_since_window = 0
+            num_windows += 1
+    return num_windows
+
+
+def make_config(sampling_rate: int, libname: str, fname_model: str):
+    return WhisperCPPTranscriberConfig(
+        sampling_rate=sampling_rate,
+        audio_encoding=AudioEncoding.LINEAR16,
+        chunk_size=int(sampling_rate * CHUNK_SECONDS) * 2,
+        buffer_size_seconds=BUFFER_SIZE_SECONDS,
+        libname=libname,
+        fname_model=fname_model,
+    )
+
+
+def time_it(fn, *args, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--libname")
+    parser.add_argument("--fname-model")
+    args = parser.parse_args()
+
+    chunks, sampling_rate, audio_seconds = load_chunks()
+    print(f"Sample clip: {SAMPLE_CLIP.name}, {audio_seconds:.1f}s at {sampling_rate}Hz")
+
+    legacy = time_it(legacy_prepare, chunks, sampling_rate)
+    ring = time_it(ring_buffer_prepare, chunks, sampling_rate)
+    print("Audio preparation overhead (excluding inference):")
+    print(f"  wav + pydub: {legacy * 1000:.2f}ms (RTF {legacy / audio_seconds:.5f})")
+    print(f"  ring buffer: {ring * 1000:.2f}ms (RTF {ring / audio_seconds:.5f})")
+
+    if not (args.libname and args.fname_model):
+        print("Pass --libname and --fname-model to measure end-to-end RTF with whisper.cpp")
+        return
+
+    transcriber = WhisperCPPTranscriber(make_config(sampling_rate, args.libname, args.fname_model))
+    start = time.perf_counter()
+    for chunk in chunks:
+        transcription = transcriber.process_chunk(chunk)
+        if transcription is not None:
+            print(f"  {'final' if transcription.is_final else 'interim'}: {transcription.message}")
+    elapsed = time.perf_counter() - start
+    print(
+        f"End-to-end: {elapsed:.2f}s for {audio_seconds:.1f}s of audio (RTF {elapsed / audio_seconds:.3f})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import asyncio
+import time
+from typing import Type
+
+import pytest
+from pydantic.v1 import BaseModel
+from pytest_mock import MockerFixture
+
+from vocode.streaming.action.base_action import BaseAction
+from vocode.streaming.action.default_factory import DefaultActionFactory
+from vocode.streaming.action.worker import ActionsWorker
+from vocode.streaming.agent.base_agent import ActionResultAgentInput
+from vocode.streaming.models.actions import (
+    ActionConfig,
+    ActionInput,
+    ActionInputBatch,
+    ActionOutput,
+)
+from vocode.streaming.utils.worker import InterruptibleEvent, QueueConsumer
+
+ACTION_SECONDS = 0.05
+
+
+class LookupActionConfig(ActionConfig, type="action_lookup"):  # type: ignore
+    pass
+
+
+class LookupParameters(BaseModel):
+    query: str
+
+
+class LookupResponse(BaseModel):
+    result: str
+
+
+class Lookup(BaseAction[LookupActionConfig, LookupParameters, LookupResponse]):
+    description: str = "Looks something up"
+    parameters_type: Type[LookupParameters] = LookupParameters
+    response_type: Type[LookupResponse] = LookupResponse
+    num_running = 0
+    max_num_running = 0
+
+    async def run(self, action_input: ActionInput[LookupParameters]) -> ActionOutput:
+        Lookup.num_running += 1
+        Lookup.max_num_running = max(Lookup.max_num_running, Lookup.num_running)
+        await asyncio.sleep(ACTION_SECONDS)
+        Lookup.num_running -= 1
+        if action_input.params.query == "fail":
+            raise RuntimeError("lookup failed")
+        return ActionOutput(
+            action_type=action_input.action_config.type,
+            response=LookupResponse(result=action_input.params.query.upper()),
+        )
+
+
+class LookupActionFactory(DefaultActionFactory):
+    def create_action(self, action_config: ActionConfig) -> BaseAction:
+        return Lookup(action_config=LookupActionConfig())
+
+
+def _action_input(query: str) -> ActionInput:
+    return ActionInput(
+        action_config=LookupActionConfig(),
+        conversation_id="conversation_id",
+        params=LookupParameters(query=query),
+    )
+
+
+async def _run_batch(
+    mocker: MockerFixture, queries, max_concurrent_actions: int
+) -> ActionResultAgentInput:
+    Lookup.max_num_running = 0
+    actions_worker = ActionsWorker(
+        action_factory=LookupActionFactory(), max_concurrent_actions=max_concurrent_actions
+    )
+    actions_worker.attach_conversation_state_manager(mocker.MagicMock())
+    agent_consumer: QueueConsumer = QueueConsumer()
+    actions_worker.consumer = agent_consumer
+    actions_worker.start()
+    actions_worker.consume_nonblocking(
+        InterruptibleEvent(
+            payload=ActionInputBatch(action_inputs=[_action_input(query) for query in queries])
+        )
+    )
+    agent_input = (await asyncio.wait_for(agent_consumer.input_queue.get(), timeout=1)).payload
+    await actions_worker.terminate()
+    return agent_input
+
+
+@pytest.mark.asyncio
+async def test_actions_worker_runs_a_batch_concurrently(mocker: MockerFixture):
+    start = time.monotonic()
+    agent_input = await _run_batch(mocker, ["crm", "calendar", "fail"], max_concurrent_actions=4)
+    assert time.monotonic() - start < ACTION_SECONDS * 2
+    assert Lookup.max_num_running == 3
+    assert [
+        action_result.action_output.response.result
+        for action_result in agent_input.get_action_results()
+    ] == ["CRM", "CALENDAR"]
+
+
+@pytest.mark.asyncio
+async def test_actions_worker_limits_concurrent_actions(mocker: MockerFixture):
+    agent_input = await _run_batch(mocker, ["a", "b", "c"], max_concurrent_actions=2)
+    assert Lookup.max_num_running == 2
+    assert len(agent_input.get_action_results()) == 3
+
+
+@pytest.mark.asyncio
+async def test_actions_worker_drops_the_result_of_an_interrupted_action(mocker: MockerFixture):
+    actions_worker = ActionsWorker(action_factory=LookupActionFactory())
+    actions_worker.attach_conversation_state_manager(mocker.MagicMock())
+    agent_consumer: QueueConsumer = QueueConsumer()
+    actions_worker.consumer = agent_consumer
+    actions_worker.start()
+    event = InterruptibleEvent(payload=_action_input("crm"))
+    actions_worker.consume_nonblocking(event)
+    await asyncio.sleep(ACTION_SECONDS / 2)  # the action is running
+    event.interrupt()
+    await asyncio.sleep(ACTION_SECONDS)
+    assert agent_consumer.input_queue.empty()
+    await actions_worker.terminate()
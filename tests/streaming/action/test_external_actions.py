@@ -3,6 +3,7 @@ import json
 import os
 
 import pytest
+from pytest_httpx import HTTPXMock
 
 from tests.fakedata.id import generate_uuid
 from vocode.streaming.action.execute_external_action import (
@@ -10,12 +11,16 @@ from vocode.streaming.action.execute_external_action import (
     ExecuteExternalActionParameters,
     ExecuteExternalActionVocodeActionConfig,
 )
-from vocode.streaming.action.external_actions_requester import ExternalActionResponse
+from vocode.streaming.action.external_actions_requester import (
+    ExternalActionResponse,
+    ExternalActionResponseCache,
+)
 from vocode.streaming.models.actions import (
     TwilioPhoneConversationActionInput,
     VonagePhoneConversationActionInput,
 )
 from vocode.streaming.utils import create_conversation_id
+from vocode.streaming.utils.singleton import Singleton
 from vocode.streaming.utils.state_manager import (
     TwilioPhoneConversationStateManager,
     VonagePhoneConversationStateManager,
@@ -120,3 +125,35 @@ async def test_twilio_execute_external_action_success(
 
     assert response.response.success
     assert response.response.result == {"test": "test"}
+
+
+@pytest.mark.asyncio
+async def test_idempotent_external_actions_reuse_cached_responses(
+    httpx_mock: HTTPXMock,
+    action_config: dict,
+    mock_twilio_conversation_state_manager: TwilioPhoneConversationStateManager,
+):
+    if ExternalActionResponseCache in Singleton._instances:
+        del Singleton._instances[ExternalActionResponseCache]
+    httpx_mock.add_response(json={"result": {"slots": 2}}, method="POST", url="https://example.com")
+    action = ExecuteExternalAction(
+        action_config=ExecuteExternalActionVocodeActionConfig(
+            **action_config, idempotent=True, response_cache_ttl_seconds=60
+        ),
+    )
+    action.attach_conversation_state_manager(mock_twilio_conversation_state_manager)
+
+    responses = [
+        await action.run(
+            action_input=TwilioPhoneConversationActionInput(
+                action_config=action.action_config,
+                conversation_id=create_conversation_id(),
+                params=ExecuteExternalActionParameters(payload={"day": "friday"}),
+                twilio_sid="twilio_sid",
+            ),
+        )
+        for _ in range(2)
+    ]
+
+    assert [response.response.result for response in responses] == [{"slots": 2}] * 2
+    assert len(httpx_mock.get_requests()) == 1  # the second run didn't reach the network
@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import hashlib
 import hmac
@@ -10,7 +11,13 @@ import pytest
 from httpx import Request, Response
 from pytest_httpx import HTTPXMock
 
-from vocode.streaming.action.external_actions_requester import ExternalActionsRequester
+from vocode.streaming.action.external_actions_requester import (
+    ExternalActionResponseCache,
+    ExternalActionsBatcher,
+    ExternalActionsRequester,
+)
+from vocode.streaming.utils.client_registry import ClientRegistry
+from vocode.streaming.utils.singleton import Singleton
 
 JSON_SCHEMA = {
     "type": "object",
@@ -27,6 +34,14 @@ JSON_SCHEMA = {
 }
 
 
+@pytest.fixture(autouse=True)
+def cleanup_singletons():
+    for singleton in (ClientRegistry, ExternalActionResponseCache, ExternalActionsBatcher):
+        if singleton in Singleton._instances:
+            del Singleton._instances[singleton]
+    yield
+
+
 @pytest.fixture
 def mock_async_client_post(status_code: int, json_response: Dict[str, Any]) -> Callable:
     async def mock_post(self, url: str, content: str, headers: Dict[str, str] = None) -> Response:
@@ -86,3 +101,133 @@ async def test_requester_encodes_signature_correctly(requester: ExternalActionsR
     decoded_digest = base64.b64decode(encoded_payload)
     calculated_digest = hmac.new(signature_as_bytes, payload, hashlib.sha256).digest()
     assert hmac.compare_digest(decoded_digest, calculated_digest)
+
+
+def _signature_secret() -> str:
+    return base64.b64encode(os.urandom(32)).decode()
+
+
+@pytest.mark.asyncio
+async def test_requests_share_a_pooled_client(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"result": {"key": "value"}}, method="POST", url="http://test.com")
+    requester = ExternalActionsRequester("http://test.com")
+    for _ in range(2):
+        response = await requester.send_request({"key": "value"}, _signature_secret())
+        assert response.success
+
+    stats = ClientRegistry().stats
+    assert stats.clients_created["external_actions"] == 1
+    assert stats.clients_reused["external_actions"] == 1
+    assert len(httpx_mock.get_requests()) == 2
+    await ClientRegistry().close_clients()
+
+
+@pytest.mark.asyncio
+async def test_idempotent_responses_are_cached_by_signed_payload(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"result": {"slots": 2}}, method="POST", url="http://test.com")
+    requester = ExternalActionsRequester("http://test.com")
+    signature_secret = _signature_secret()
+
+    for _ in range(2):
+        response = await requester.send_request(
+            {"day": "friday"}, signature_secret, cache_ttl_seconds=60
+        )
+        assert response.result == {"slots": 2}
+    assert len(httpx_mock.get_requests()) == 1
+
+    # a different payload, or a different secret, is a different request
+    await requester.send_request({"day": "monday"}, signature_secret, cache_ttl_seconds=60)
+    await requester.send_request({"day": "friday"}, _signature_secret(), cache_ttl_seconds=60)
+    # without a TTL the action isn't idempotent, so nothing is reused
+    await requester.send_request({"day": "friday"}, signature_secret)
+    assert len(httpx_mock.get_requests()) == 4
+
+
+@pytest.mark.asyncio
+async def test_failed_responses_are_not_cached(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(status_code=500, method="POST", url="http://test.com")
+    requester = ExternalActionsRequester("http://test.com")
+    signature_secret = _signature_secret()
+    for _ in range(2):
+        response = await requester.send_request({}, signature_secret, cache_ttl_seconds=60)
+        assert not response.success
+    assert len(httpx_mock.get_requests()) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_of_a_conversation_are_batched(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        json={
+            "responses": [
+                {"result": {"customer": "Ada"}},
+                {"result": {"slots": 2}, "agent_message": "There are two slots."},
+            ]
+        },
+        method="POST",
+        url="http://test.com/batch",
+    )
+    signature_secret = _signature_secret()
+    crm = ExternalActionsRequester("http://test.com/crm", batch_url="http://test.com/batch")
+    calendar = ExternalActionsRequester(
+        "http://test.com/calendar", batch_url="http://test.com/batch"
+    )
+
+    crm_response, calendar_response = await asyncio.gather(
+        crm.send_request({"phone": "555"}, signature_secret, batch_key="conversation_id"),
+        calendar.send_request({"day": "friday"}, signature_secret, batch_key="conversation_id"),
+    )
+
+    assert crm_response.result == {"customer": "Ada"}
+    assert calendar_response.agent_message == "There are two slots."
+    request = httpx_mock.get_request()
+    assert json.loads(request.content) == {
+        "requests": [
+            {"url": "http://test.com/crm", "payload": {"phone": "555"}},
+            {"url": "http://test.com/calendar", "payload": {"day": "friday"}},
+        ]
+    }
+    signature = ExternalActionsRequester("http://test.com/batch")._encode_payload(
+        request.content, signature_secret
+    )
+    assert request.headers["x-vocode-signature"] == signature
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_fails_every_request(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(json={"responses": []}, method="POST", url="http://test.com/batch")
+    requester = ExternalActionsRequester("http://test.com", batch_url="http://test.com/batch")
+    responses = await asyncio.gather(
+        *(
+            requester.send_request({"index": index}, "c2VjcmV0", batch_key="conversation_id")
+            for index in range(2)
+        )
+    )
+    assert [response.success for response in responses] == [False, False]
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_with_different_headers_are_batched_separately(httpx_mock: HTTPXMock):
+    httpx_mock.add_response(
+        json={"responses": [{"result": {}}]}, method="POST", url="http://test.com/batch"
+    )
+    requester = ExternalActionsRequester("http://test.com", batch_url="http://test.com/batch")
+    await asyncio.gather(
+        *(
+            requester.send_request(
+                {"tenant": tenant},
+                "c2VjcmV0",
+                additional_headers={"x-tenant": tenant},
+                batch_key="conversation_id",
+            )
+            for tenant in ("a", "b")
+        )
+    )
+    requests = httpx_mock.get_requests()
+    assert sorted(request.headers["x-tenant"] for request in requests) == ["a", "b"]
+    for request in requests:
+        assert json.loads(request.content) == {
+            "requests": [
+                {"url": "http://test.com", "payload": {"tenant": request.headers["x-tenant"]}}
+            ]
+        }
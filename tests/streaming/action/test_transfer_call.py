@@ -177,7 +177,7 @@ async def test_vonage_transfer_call_inbound(
         action_config=TransferCallVocodeActionConfig(phone_number=transfer_phone_number),
     )
 
-    mocker.patch("vonage.Client._create_jwt_auth_string", return_value=b"asdf")
+    mocker.patch("vonage.Client._generate_application_jwt", return_value=b"asdf")
 
     vonage_uuid = generate_uuid()
 
@@ -6,6 +6,8 @@ from pytest_mock import MockerFixture
 
 from vocode.streaming.action.abstract_factory import AbstractActionFactory
 from vocode.streaming.agent.base_agent import (
+    ActionResult,
+    ActionResultAgentInput,
     AgentResponse,
     AgentResponseMessage,
     BaseAgent,
@@ -13,7 +15,7 @@ from vocode.streaming.agent.base_agent import (
     TranscriptionAgentInput,
 )
 from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
-from vocode.streaming.models.actions import EndOfTurn
+from vocode.streaming.models.actions import ActionInput, ActionOutput, EndOfTurn, FunctionCall
 from vocode.streaming.models.agent import ChatGPTAgentConfig
 from vocode.streaming.models.message import BaseMessage
 from vocode.streaming.models.transcriber import Transcription
@@ -174,3 +176,185 @@ def agent_config():
 def test_chat_gpt_agent_base_url(agent_config):
     agent = ChatGPTAgent(agent_config)
     assert str(agent.openai_client.base_url) == "https://api.groq.com/openai/v1/"
+
+
+@pytest.mark.asyncio
+async def test_batched_action_results_get_one_response(mocker: MockerFixture):
+    from tests.streaming.action.test_actions_worker import (
+        LookupActionConfig,
+        LookupParameters,
+        LookupResponse,
+    )
+
+    def action_result(query: str) -> ActionResult:
+        return ActionResult(
+            action_input=ActionInput(
+                action_config=LookupActionConfig(),
+                conversation_id="conversation_id",
+                params=LookupParameters(query=query),
+            ),
+            action_output=ActionOutput(
+                action_type="action_lookup", response=LookupResponse(result=query.upper())
+            ),
+        )
+
+    agent = _create_agent(mocker, ChatGPTAgentConfig(prompt_preamble="", generate_responses=True))
+    human_inputs: List[str] = []
+
+    async def mock_generate_response(human_input, **kwargs):
+        human_inputs.append(human_input)
+        yield GeneratedResponse(message=BaseMessage(text="You're all set."), is_interruptible=True)
+
+    mocker.patch.object(agent, "generate_response", mock_generate_response)
+    crm, calendar = action_result("crm"), action_result("calendar")
+    agent.consume_nonblocking(
+        InterruptibleEvent(
+            payload=ActionResultAgentInput(
+                conversation_id="conversation_id",
+                action_input=crm.action_input,
+                action_output=crm.action_output,
+                other_action_results=[calendar],
+            ),
+            is_interruptible=False,
+        )
+    )
+    agent_consumer = QueueConsumer()
+    agent.agent_responses_consumer = agent_consumer
+    agent.start()
+    agent_responses = await _consume_until_end_of_turn(agent_consumer)
+    await agent.terminate()
+
+    assert [response.message for response in agent_responses] == [
+        BaseMessage(text="You're all set."),
+        EndOfTurn(),
+    ]
+    assert human_inputs == ['[{"result": "CRM"}, {"result": "CALENDAR"}]']
+    assert [event_log.to_string() for event_log in agent.transcript.event_logs] == [
+        "BOT_ACTION_FINISH: "
+        + crm.action_input.action_config.action_result_to_string(
+            crm.action_input, crm.action_output
+        ),
+        "BOT_ACTION_FINISH: "
+        + calendar.action_input.action_config.action_result_to_string(
+            calendar.action_input, calendar.action_output
+        ),
+    ]
+
+
+def _create_lookup_agent(mocker: MockerFixture, **agent_config_kwargs) -> ChatGPTAgent:
+    from tests.streaming.action.test_actions_worker import LookupActionConfig, LookupActionFactory
+
+    agent = _create_agent(
+        mocker,
+        ChatGPTAgentConfig(
+            prompt_preamble="",
+            generate_responses=True,
+            actions=[LookupActionConfig()],
+            **agent_config_kwargs,
+        ),
+        action_factory=LookupActionFactory(),
+    )
+    agent.actions_consumer = QueueConsumer()
+    agent.agent_responses_consumer = QueueConsumer()
+    return agent
+
+
+@pytest.mark.asyncio
+async def test_function_call_is_started_before_the_response_ends(mocker: MockerFixture):
+    agent = _create_lookup_agent(mocker)
+    assert agent._can_call_function_early(
+        FunctionCall(name="action_lookup", arguments='{"query": "crm"}')
+    )
+    assert not agent._can_call_function_early(
+        FunctionCall(name="action_lookup", arguments='{"query": 1}')
+    )
+    assert not agent._can_call_function_early(FunctionCall(name="unknown", arguments="{}"))
+    # its user_message would be spoken in the middle of the response
+    assert not agent._can_call_function_early(
+        FunctionCall(
+            name="action_lookup", arguments='{"query": "crm", "user_message": "One moment."}'
+        )
+    )
+
+    rest_of_response = asyncio.Event()
+
+    async def mock_generate_response(*args, **kwargs):
+        yield GeneratedResponse(
+            message=FunctionCall(name="action_lookup", arguments='{"query": "crm"}'),
+            is_interruptible=True,
+        )
+        await rest_of_response.wait()
+        yield GeneratedResponse(message=BaseMessage(text="Let me check."), is_interruptible=True)
+
+    mocker.patch.object(agent, "generate_response", mock_generate_response)
+    actions_consumer = agent.actions_consumer
+    assert isinstance(actions_consumer, QueueConsumer)
+    _send_transcription(
+        agent, Transcription(message="Look up the CRM", confidence=1, is_final=True)
+    )
+    agent.start()
+
+    action_event = await asyncio.wait_for(actions_consumer.input_queue.get(), timeout=0.1)
+    assert action_event.payload.params.query == "crm"
+    assert not rest_of_response.is_set()
+    rest_of_response.set()
+    await _consume_until_end_of_turn(agent.agent_responses_consumer)
+    await agent.terminate()
+    assert actions_consumer.input_queue.empty()  # not called a second time
+
+
+@pytest.mark.asyncio
+async def test_early_function_call_is_dropped_when_the_response_says_goodbye(
+    mocker: MockerFixture,
+):
+    agent = _create_lookup_agent(mocker, end_conversation_on_goodbye=True)
+    _mock_generate_response(
+        mocker,
+        agent,
+        [
+            GeneratedResponse(
+                message=FunctionCall(name="action_lookup", arguments='{"query": "crm"}'),
+                is_interruptible=True,
+            ),
+            GeneratedResponse(message=BaseMessage(text="Goodbye!"), is_interruptible=True),
+        ],
+    )
+    _send_transcription(agent, Transcription(message="Bye", confidence=1, is_final=True))
+    agent.start()
+
+    assert isinstance(agent.actions_consumer, QueueConsumer)
+    action_event = await asyncio.wait_for(agent.actions_consumer.input_queue.get(), timeout=0.1)
+    await _consume_until_end_of_turn(agent.agent_responses_consumer)
+    assert action_event.is_interrupted()
+    await agent.terminate()
+
+
+@pytest.mark.asyncio
+async def test_early_function_call_is_dropped_when_the_response_is_cut_short(
+    mocker: MockerFixture,
+):
+    agent = _create_lookup_agent(mocker)
+
+    async def mock_generate_response(*args, **kwargs):
+        yield GeneratedResponse(
+            message=FunctionCall(name="action_lookup", arguments='{"query": "crm"}'),
+            is_interruptible=True,
+        )
+        await asyncio.Event().wait()  # the rest of the response never comes
+        yield GeneratedResponse(message=BaseMessage(text="Let me check."), is_interruptible=True)
+
+    mocker.patch.object(agent, "generate_response", mock_generate_response)
+    _send_transcription(
+        agent,
+        Transcription(message="Look up the CRM", confidence=1, is_final=True),
+        is_interruptible=True,
+    )
+    agent.start()
+
+    assert isinstance(agent.actions_consumer, QueueConsumer)
+    action_event = await asyncio.wait_for(agent.actions_consumer.input_queue.get(), timeout=0.1)
+    assert not action_event.is_interrupted()
+    agent.cancel_current_task()  # e.g. the human interrupted the bot
+    await asyncio.sleep(0.01)
+    assert action_event.is_interrupted()
+    await agent.terminate()
@@ -0,0 +1,232 @@
+import asyncio
+from typing import List
+
+import pytest
+from pytest_mock import MockerFixture
+
+from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
+from vocode.streaming.agent.hedged_request import RequestHedger
+from vocode.streaming.agent.response_cache import LLMResponseCache
+from vocode.streaming.models.agent import (
+    ChatGPTAgentConfig,
+    LLMFallback,
+    LLMHedgeConfig,
+    LLMResponseCacheConfig,
+)
+from vocode.streaming.utils.singleton import Singleton
+
+HEDGE_DELAY_SECONDS = 0.02
+
+
+class FakeStream:
+    def __init__(self, items: List[str], first_item_delay_seconds: float):
+        self.items = items
+        self.first_item_delay_seconds = first_item_delay_seconds
+        self.closed = False
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.first_item_delay_seconds)
+        for item in self.items:
+            yield item
+
+    async def close(self):
+        self.closed = True
+
+
+def _create(stream: FakeStream):
+    async def create():
+        return stream
+
+    return create
+
+
+def _hedger(**kwargs) -> RequestHedger:
+    return RequestHedger(
+        **{
+            "latency_percentile": 0.9,
+            "initial_delay_seconds": HEDGE_DELAY_SECONDS,
+            "min_delay_seconds": 0.0,
+            "min_samples": 3,
+            **kwargs,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    hedger = _hedger()
+    secondary = FakeStream(["fallback"], 0)
+    items = [
+        item
+        async for item in hedger.stream(
+            _create(FakeStream(["a", "b"], 0)),
+            _create(secondary),
+        )
+    ]
+    assert items == ["a", "b"]
+    assert hedger.stats.num_requests == 1
+    assert hedger.stats.num_hedged == 0
+    assert len(hedger.primary_latencies) == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_closed():
+    hedger = _hedger()
+    primary = FakeStream(["slow"], HEDGE_DELAY_SECONDS * 5)
+    secondary_won = asyncio.Event()
+    items = [
+        item
+        async for item in hedger.stream(
+            _create(primary),
+            _create(FakeStream(["fast", "er"], 0)),
+            on_secondary_win=secondary_won.set,
+        )
+    ]
+    assert items == ["fast", "er"]
+    assert secondary_won.is_set()
+    await asyncio.wait_for(asyncio.gather(*hedger.loser_tasks), timeout=1)
+    assert primary.closed
+    assert hedger.stats.num_hedged == 1
+    assert hedger.stats.num_secondary_wins == 1
+    assert hedger.stats.hedge_rate == 1.0
+    # the primary's first item came ~4 hedge delays after the secondary's
+    assert hedger.stats.mean_time_saved_seconds > HEDGE_DELAY_SECONDS * 2
+    assert hedger.primary_latencies[0] >= HEDGE_DELAY_SECONDS * 5
+
+
+@pytest.mark.asyncio
+async def test_primary_that_wins_after_hedging_cancels_secondary():
+    hedger = _hedger()
+    secondary_created = asyncio.Event()
+    secondary_won = asyncio.Event()
+
+    async def create_secondary():
+        secondary_created.set()
+        await asyncio.sleep(1)
+        return FakeStream(["fallback"], 0)
+
+    items = [
+        item
+        async for item in hedger.stream(
+            _create(FakeStream(["primary"], HEDGE_DELAY_SECONDS * 2)),
+            create_secondary,
+            on_secondary_win=secondary_won.set,
+        )
+    ]
+    assert items == ["primary"]
+    assert secondary_created.is_set()
+    assert not secondary_won.is_set()
+    await asyncio.wait_for(asyncio.gather(*hedger.loser_tasks), timeout=0.5)
+    assert hedger.stats.num_hedged == 1
+    assert hedger.stats.num_secondary_wins == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_secondary_falls_back_to_primary():
+    hedger = _hedger()
+
+    async def create_secondary():
+        raise RuntimeError("fallback is down")
+
+    items = [
+        item
+        async for item in hedger.stream(
+            _create(FakeStream(["primary"], HEDGE_DELAY_SECONDS * 2)),
+            create_secondary,
+        )
+    ]
+    assert items == ["primary"]
+
+
+def test_hedge_delay_is_a_percentile_of_primary_latencies():
+    hedger = _hedger(latency_percentile=0.5, min_delay_seconds=0.15)
+    assert hedger.get_hedge_delay() == HEDGE_DELAY_SECONDS
+    hedger.primary_latencies.extend([0.1, 0.4, 0.2, 0.3])
+    assert hedger.get_hedge_delay() == 0.3
+    hedger.primary_latencies.clear()
+    hedger.primary_latencies.extend([0.1, 0.1, 0.1])
+    assert hedger.get_hedge_delay() == 0.15
+
+
+@pytest.mark.asyncio
+async def test_chat_gpt_agent_hedges_against_llm_fallback(mocker: MockerFixture):
+    agent = ChatGPTAgent(
+        ChatGPTAgentConfig(
+            prompt_preamble="",
+            openai_api_key="openai_api_key",
+            model_name="gpt-4o",
+            llm_fallback=LLMFallback(provider="openai", model_name="gpt-4o-mini"),
+            llm_hedge=LLMHedgeConfig(initial_delay_seconds=HEDGE_DELAY_SECONDS),
+        )
+    )
+    requested_models: List[str] = []
+
+    async def create(**chat_parameters):
+        requested_models.append(chat_parameters["model"])
+        if chat_parameters["model"] == "gpt-4o":
+            return FakeStream(["slow"], HEDGE_DELAY_SECONDS * 5)
+        return FakeStream(["fast"], 0)
+
+    mocker.patch("openai.resources.chat.AsyncCompletions.create", side_effect=create)
+    stream = await agent._create_openai_stream({"model": "gpt-4o", "stream": True})
+    assert [item async for item in stream] == ["fast"]
+    assert requested_models == ["gpt-4o", "gpt-4o-mini"]
+    await agent.terminate()
+
+
+@pytest.mark.asyncio
+async def test_chat_gpt_agent_does_not_cache_responses_of_llm_fallback(mocker: MockerFixture):
+    if LLMResponseCache in Singleton._instances:
+        del Singleton._instances[LLMResponseCache]
+    agent = ChatGPTAgent(
+        ChatGPTAgentConfig(
+            prompt_preamble="",
+            openai_api_key="openai_api_key",
+            model_name="gpt-4o",
+            temperature=0,
+            llm_fallback=LLMFallback(provider="openai", model_name="gpt-4o-mini"),
+            llm_hedge=LLMHedgeConfig(initial_delay_seconds=HEDGE_DELAY_SECONDS),
+            response_cache=LLMResponseCacheConfig(),
+        )
+    )
+    primary_delays_seconds = [HEDGE_DELAY_SECONDS * 5, 0]
+
+    async def create(**chat_parameters):
+        if chat_parameters["model"] == "gpt-4o":
+            return FakeStream(["primary"], primary_delays_seconds.pop(0))
+        return FakeStream(["fallback"], 0)
+
+    mocker.patch("openai.resources.chat.AsyncCompletions.create", side_effect=create)
+    mocker.patch(
+        "vocode.streaming.agent.chat_gpt_agent.openai_get_tokens", side_effect=lambda stream: stream
+    )
+    chat_parameters = {"model": "gpt-4o", "messages": [], "temperature": 0, "stream": True}
+    # the fallback's response isn't cached under the primary's request, the primary's is
+    for expected_tokens in [["fallback"], ["primary"], ["primary"]]:
+        tokens = [token async for token in await agent._get_tokens(chat_parameters)]
+        assert tokens == expected_tokens
+    assert primary_delays_seconds == []
+    await agent.terminate()
+
+
+def test_chat_gpt_agent_llm_hedge_requires_llm_fallback():
+    with pytest.raises(ValueError):
+        ChatGPTAgent(
+            ChatGPTAgentConfig(
+                prompt_preamble="",
+                openai_api_key="openai_api_key",
+                llm_hedge=LLMHedgeConfig(),
+            )
+        )
+
+
+def test_chat_gpt_agent_llm_hedge_against_azure_requires_azure_params():
+    with pytest.raises(ValueError):
+        ChatGPTAgent(
+            ChatGPTAgentConfig(
+                prompt_preamble="",
+                openai_api_key="openai_api_key",
+                llm_fallback=LLMFallback(provider="azure", model_name="gpt-4o-mini"),
+                llm_hedge=LLMHedgeConfig(),
+            )
+        )
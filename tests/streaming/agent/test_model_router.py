@@ -0,0 +1,97 @@
+import time
+from typing import AsyncGenerator, List
+
+import pytest
+
+from vocode.streaming.action.end_conversation import EndConversationVocodeActionConfig
+from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
+from vocode.streaming.agent.model_router import ModelRoute, ModelRouter, get_function_keywords
+from vocode.streaming.models.actions import ActionInput, ActionOutput, ActionType
+from vocode.streaming.models.agent import ChatGPTAgentConfig, ModelRouterConfig
+from vocode.streaming.models.events import Sender
+from vocode.streaming.models.transcript import ActionFinish, Message, Transcript
+
+FUNCTIONS = [
+    {"name": "book_table", "description": "", "parameters": {}},
+    {"name": "getOpeningHours", "description": "", "parameters": {}},
+]
+
+
+def _router() -> ModelRouter:
+    return ModelRouter(
+        max_fast_words=4, strong_keywords=["refund", "speak to"], functions=FUNCTIONS
+    )
+
+
+def test_get_function_keywords():
+    assert get_function_keywords(FUNCTIONS) == {"book", "table", "opening", "hours"}
+
+
+@pytest.mark.parametrize(
+    "human_input, expected_route",
+    [
+        ("Yes.", ModelRoute.FAST),
+        ("That's right, thanks!", ModelRoute.FAST),
+        ("Can you tell me more about the menu?", ModelRoute.STRONG),
+        ("A table, please", ModelRoute.STRONG),
+        ("I want a refund", ModelRoute.STRONG),
+        ("Let me speak to someone", ModelRoute.STRONG),
+        ("Speaking!", ModelRoute.FAST),
+        ("", ModelRoute.STRONG),
+    ],
+)
+def test_route(human_input: str, expected_route: ModelRoute):
+    transcript = Transcript(event_logs=[Message(sender=Sender.HUMAN, text=human_input)])
+    assert _router().route(human_input, transcript) == expected_route
+
+
+def test_responses_to_action_results_go_to_the_strong_model():
+    transcript = Transcript(
+        event_logs=[
+            ActionFinish(
+                action_type=ActionType.END_CONVERSATION,
+                action_input=ActionInput(
+                    action_config=EndConversationVocodeActionConfig(),
+                    conversation_id="conversation_id",
+                    params={},
+                ),
+                action_output=ActionOutput(action_type=ActionType.END_CONVERSATION, response={}),
+            )
+        ]
+    )
+    assert _router().route("ok", transcript) == ModelRoute.STRONG
+
+
+@pytest.mark.asyncio
+async def test_track_records_the_stats_of_each_route():
+    async def tokens() -> AsyncGenerator[str, None]:
+        for token in ["Sure", ",", " thing"]:
+            yield token
+
+    router = _router()
+    tracked: List[str] = [
+        token
+        async for token in router.track(
+            ModelRoute.FAST, tokens(), started_at=time.monotonic() - 1, num_prompt_tokens=100
+        )
+    ]
+    assert tracked == ["Sure", ",", " thing"]
+    stats = router.stats[ModelRoute.FAST]
+    assert stats.num_turns == 1
+    assert stats.mean_prompt_tokens == 100
+    assert stats.mean_completion_tokens == 3
+    assert 1 <= stats.mean_time_to_first_token_seconds <= stats.mean_duration_seconds
+    assert router.stats[ModelRoute.STRONG].num_turns == 0
+
+
+def test_chat_gpt_agent_model_router():
+    agent = ChatGPTAgent(
+        ChatGPTAgentConfig(
+            prompt_preamble="",
+            openai_api_key="openai_api_key",
+            model_router=ModelRouterConfig(max_fast_words=3, strong_keywords=["refund"]),
+        )
+    )
+    assert agent.model_router is not None
+    assert agent.model_router.max_fast_words == 3
+    assert agent.model_router.strong_keywords == {"refund"}
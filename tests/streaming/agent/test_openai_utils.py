@@ -1,4 +1,11 @@
-from vocode.streaming.agent.openai_utils import format_openai_chat_messages_from_transcript
+from pydantic.v1 import BaseModel
+from pytest_mock import MockerFixture
+
+from vocode.streaming.agent import openai_utils
+from vocode.streaming.agent.openai_utils import (
+    OpenAIChatPromptBuilder,
+    format_openai_chat_messages_from_transcript,
+)
 from vocode.streaming.models.actions import (
     ACTION_FINISHED_FORMAT_STRING,
     ActionConfig,
@@ -15,6 +22,14 @@ class WeatherActionConfig(ActionConfig, type="weather"):
     pass
 
 
+class WeatherParameters(BaseModel):
+    city: str
+
+
+class WeatherResponse(BaseModel):
+    weather: str
+
+
 def create_fake_vocode_phrase_trigger():
     return PhraseBasedActionTrigger(config=PhraseBasedActionTriggerConfig(phrase_triggers=[]))
 
@@ -301,3 +316,131 @@ def test_format_openai_chat_messages_from_transcript_context_limit():
 
     for params, expected_output in test_cases:
         assert format_openai_chat_messages_from_transcript(*params) == expected_output
+
+
+def test_prompt_builder_only_tokenizes_new_messages(mocker: MockerFixture):
+    tokens_from_dict_spy = mocker.spy(openai_utils, "tokens_from_dict")
+    prompt_builder = OpenAIChatPromptBuilder()
+    transcript = Transcript(
+        event_logs=[
+            Message(sender=Sender.BOT, text="Hello!", is_final=True),
+            Message(sender=Sender.HUMAN, text="Hi, can I book a table?", is_final=True),
+        ]
+    )
+    params = (transcript, "gpt-3.5-turbo-0613", None, "prompt preamble")
+    assert prompt_builder.build(*params) == format_openai_chat_messages_from_transcript(*params)
+
+    transcript.event_logs.append(Message(sender=Sender.BOT, text="Sure,", is_final=True))
+    transcript.event_logs.append(Message(sender=Sender.BOT, text="for how many?", is_final=True))
+    tokens_from_dict_spy.reset_mock()
+    assert prompt_builder.build(*params) == format_openai_chat_messages_from_transcript(*params)
+    # the prompt builder only tokenizes the merged bot message; the one-off call tokenizes all 4
+    assert tokens_from_dict_spy.call_count == 1 + 4
+
+
+def test_prompt_builder_trims_like_format_openai_chat_messages():
+    prompt_builder = OpenAIChatPromptBuilder()
+    transcript = Transcript()
+    for turn in range(60):
+        transcript.event_logs.append(
+            Message(sender=Sender.HUMAN, text=f"question {turn} " * 20, is_final=True)
+        )
+        transcript.event_logs.append(
+            Message(sender=Sender.BOT, text=f"answer {turn} " * 20, is_final=True)
+        )
+        params = (transcript, "gpt-3.5-turbo-0613", None, "prompt preamble")
+        assert prompt_builder.build(*params) == format_openai_chat_messages_from_transcript(*params)
+    assert len(prompt_builder.build(*params)) < 1 + 2 * 60
+
+
+def test_prompt_builder_counts_tokens_of_dropped_tool_messages(mocker: MockerFixture):
+    def action_input(city: str, tool_call_id: str) -> ActionInput:
+        return ActionInput(
+            action_config=WeatherActionConfig(),
+            conversation_id="conversation_id",
+            params=WeatherParameters(city=city),
+            tool_call_id=tool_call_id,
+        )
+
+    sf, nyc = action_input("SF", "call_sf"), action_input("NYC", "call_nyc")
+    output = ActionOutput(action_type="weather", response=WeatherResponse(weather="fog"))
+    transcript = Transcript(
+        event_logs=[
+            Message(sender=Sender.HUMAN, text="What's the weather in SF and NYC?"),
+            ActionStart(action_type="weather", action_input=sf),
+            ActionStart(action_type="weather", action_input=nyc),
+            ActionFinish(action_type="weather", action_input=sf, action_output=output),
+            ActionFinish(action_type="weather", action_input=nyc, action_output=output),
+            Message(sender=Sender.BOT, text="Foggy in both.", is_final=True),
+        ]
+    )
+    prompt_builder = OpenAIChatPromptBuilder()
+    # system, user, assistant (tool calls), tool, tool, assistant: 10 tokens each
+    mocker.patch.object(
+        prompt_builder,
+        "count_message_tokens",
+        side_effect=lambda chat_messages, model_name: [10] * len(chat_messages),
+    )
+    # only room for 5 messages, so the user message and the tool calls are trimmed
+    mocker.patch.object(
+        openai_utils,
+        "get_chat_gpt_max_tokens",
+        return_value=50 + openai_utils.LLM_AGENT_DEFAULT_MAX_TOKENS + 50,
+    )
+    chat_messages = prompt_builder.build(
+        transcript, "gpt-3.5-turbo-0613", None, "preamble", use_tool_calls=True
+    )
+    assert [chat_message["role"] for chat_message in chat_messages] == ["system", "assistant"]
+    assert prompt_builder.num_prompt_tokens == 2 * 10 + 3
+
+
+def test_get_openai_chat_messages_with_tool_calls():
+    def action_input(city: str, tool_call_id: str) -> ActionInput:
+        return ActionInput(
+            action_config=WeatherActionConfig(),
+            conversation_id="conversation_id",
+            params=WeatherParameters(city=city),
+            tool_call_id=tool_call_id,
+        )
+
+    def action_output(weather: str) -> ActionOutput:
+        return ActionOutput(action_type="weather", response=WeatherResponse(weather=weather))
+
+    sf, nyc = action_input("SF", "call_sf"), action_input("NYC", "call_nyc")
+    event_logs = [
+        Message(sender=Sender.HUMAN, text="What's the weather in SF and NYC?"),
+        ActionStart(action_type="weather", action_input=sf),
+        ActionStart(action_type="weather", action_input=nyc),
+        Message(sender=Sender.BOT, text="Let me check.", is_final=True),  # spoken meanwhile
+        ActionFinish(action_type="weather", action_input=nyc, action_output=action_output("rain")),
+        ActionFinish(action_type="weather", action_input=sf, action_output=action_output("fog")),
+    ]
+    chat_messages = openai_utils.get_openai_chat_messages_from_transcript(
+        merged_event_logs=event_logs, prompt_preamble="preamble", use_tool_calls=True
+    )
+    assert [chat_message["role"] for chat_message in chat_messages] == [
+        "system",
+        "user",
+        "assistant",
+        "tool",
+        "tool",
+        "assistant",
+    ]
+    assert [tool_call["id"] for tool_call in chat_messages[2]["tool_calls"]] == [
+        "call_sf",
+        "call_nyc",
+    ]
+    assert chat_messages[2]["tool_calls"][0]["function"] == {
+        "name": "weather",
+        "arguments": '{"city": "SF"}',
+    }
+    assert chat_messages[3]["tool_call_id"] == "call_sf"
+    assert '"fog"' in chat_messages[3]["content"]
+    assert chat_messages[4]["tool_call_id"] == "call_nyc"
+    assert chat_messages[5]["content"] == "Let me check."
+
+    # while an action is still running, its call is left out
+    chat_messages = openai_utils.get_openai_chat_messages_from_transcript(
+        merged_event_logs=event_logs[:-1], prompt_preamble="preamble", use_tool_calls=True
+    )
+    assert [tool_call["id"] for tool_call in chat_messages[2]["tool_calls"]] == ["call_nyc"]
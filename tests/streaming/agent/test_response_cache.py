@@ -0,0 +1,135 @@
+from typing import AsyncGenerator, List
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+from pytest_mock import MockerFixture
+
+from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
+from vocode.streaming.agent.response_cache import (
+    CachedToken,
+    LLMResponseCache,
+    get_response_cache_key,
+    should_cache_response,
+)
+from vocode.streaming.models.actions import FunctionFragment
+from vocode.streaming.models.agent import ChatGPTAgentConfig, LLMResponseCacheConfig
+from vocode.streaming.utils.singleton import Singleton
+
+MESSAGES = [{"role": "user", "content": "What are your opening hours?"}]
+
+
+@pytest.fixture(autouse=True)
+def cleanup_singleton_response_cache():
+    if LLMResponseCache in Singleton._instances:
+        del Singleton._instances[LLMResponseCache]
+    yield
+
+
+class FakeLLM:
+    def __init__(self, tokens: List[CachedToken]):
+        self.tokens = tokens
+        self.num_calls = 0
+
+    async def __call__(self) -> AsyncGenerator[CachedToken, None]:
+        self.num_calls += 1
+        for token in self.tokens:
+            yield token
+
+
+async def _collect(tokens: AsyncGenerator[CachedToken, None]) -> List[CachedToken]:
+    return [token async for token in tokens]
+
+
+def test_response_cache_key_ignores_parameter_order_and_stream():
+    key = get_response_cache_key("openai", {"model": "gpt-4o", "messages": MESSAGES})
+    assert key == get_response_cache_key(
+        "openai", {"messages": MESSAGES, "stream": True, "model": "gpt-4o"}
+    )
+    assert key != get_response_cache_key("anthropic", {"model": "gpt-4o", "messages": MESSAGES})
+    assert key != get_response_cache_key("openai", {"model": "gpt-4o-mini", "messages": MESSAGES})
+
+
+def test_should_cache_response_only_for_deterministic_requests():
+    cache_config = LLMResponseCacheConfig()
+    assert should_cache_response(cache_config, {"temperature": 0})
+    assert not should_cache_response(cache_config, {"temperature": 0.7})
+    assert not should_cache_response(cache_config, {"temperature": 0, "functions": [{}]})
+    assert should_cache_response(
+        LLMResponseCacheConfig(cache_nonzero_temperature=True, cache_function_calls=True),
+        {"temperature": 0.7, "functions": [{}]},
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_complete_responses():
+    cache = LLMResponseCache()
+    cache_config = LLMResponseCacheConfig()
+    llm = FakeLLM(["We're open ", "9 to 5.", FunctionFragment(name="", arguments="")])
+
+    first = await _collect(cache.stream("key", cache_config, llm))
+    second = await _collect(cache.stream("key", cache_config, llm))
+    assert first == second == llm.tokens
+    assert llm.num_calls == 1
+    assert cache.stats.num_memory_hits == 1
+    assert cache.stats.hit_rate == 0.5
+
+    # a response that is cut off is not cached
+    tokens = cache.stream("other_key", cache_config, llm)
+    assert await tokens.__anext__() == "We're open "
+    await tokens.aclose()
+    assert await cache.get("other_key") is None
+
+
+@pytest.mark.asyncio
+async def test_stream_skips_responses_that_should_not_be_cached():
+    cache = LLMResponseCache()
+    llm = FakeLLM(["We're open."])
+    tokens = cache.stream("key", LLMResponseCacheConfig(), llm, should_cache=lambda: False)
+    assert await _collect(tokens) == llm.tokens
+    assert await cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_is_bounded():
+    cache = LLMResponseCache(max_entries=2)
+    for key in ["a", "b", "c"]:
+        await cache.set(key, [key])
+    assert await cache.get("a") is None
+    assert await cache.get("c") == ["c"]
+
+
+@pytest.mark.asyncio
+async def test_redis_shares_responses_across_processes(mocker: MockerFixture):
+    fake_redis = FakeAsyncRedis(server=FakeServer(), decode_responses=True)
+    mocker.patch("vocode.streaming.agent.response_cache.initialize_redis", return_value=fake_redis)
+    cache_config = LLMResponseCacheConfig(use_redis=True)
+    llm = FakeLLM(["Hello ", FunctionFragment(name="end_conversation", arguments="{}")])
+    await _collect(LLMResponseCache().stream("key", cache_config, llm))
+
+    del Singleton._instances[LLMResponseCache]  # e.g. another server process
+    cache = LLMResponseCache()
+    assert await _collect(cache.stream("key", cache_config, llm)) == llm.tokens
+    assert llm.num_calls == 1
+    assert cache.stats.num_redis_hits == 1
+    assert await fake_redis.ttl("llm_response_cache:key") > 0
+
+
+@pytest.mark.asyncio
+async def test_chat_gpt_agent_uses_response_cache(mocker: MockerFixture):
+    agent = ChatGPTAgent(
+        ChatGPTAgentConfig(
+            prompt_preamble="",
+            openai_api_key="openai_api_key",
+            temperature=0,
+            response_cache=LLMResponseCacheConfig(),
+        )
+    )
+    create_openai_stream = mocker.patch.object(agent, "_create_openai_stream")
+    mocker.patch(
+        "vocode.streaming.agent.chat_gpt_agent.openai_get_tokens",
+        side_effect=lambda stream: FakeLLM(["We're open."])(),
+    )
+    chat_parameters = {"model": "gpt-4o", "messages": MESSAGES, "temperature": 0, "stream": True}
+    for _ in range(2):
+        assert await _collect(await agent._get_tokens(chat_parameters)) == ["We're open."]
+    create_openai_stream.assert_called_once()
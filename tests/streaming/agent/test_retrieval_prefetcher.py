@@ -0,0 +1,164 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+from pytest_mock import MockerFixture
+
+from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
+from vocode.streaming.agent.retrieval_prefetcher import MAX_CACHED_RETRIEVALS, RetrievalPrefetcher
+from vocode.streaming.models.agent import ChatGPTAgentConfig, RetrievalPrefetchConfig
+from vocode.streaming.models.transcriber import Transcription
+from vocode.streaming.models.vector_db import PineconeConfig
+
+STABILITY_SECONDS = 0.02
+
+
+class FakeSearch:
+    def __init__(self, delay_seconds: float = 0.0, error: Optional[Exception] = None):
+        self.delay_seconds = delay_seconds
+        self.error = error
+        self.queries: List[str] = []
+
+    async def __call__(self, query: str) -> List[str]:
+        self.queries.append(query)
+        await asyncio.sleep(self.delay_seconds)
+        if self.error is not None:
+            raise self.error
+        return [f"document about {query}"]
+
+
+def _prefetcher(search: FakeSearch, deadline_seconds: Optional[float] = None):
+    return RetrievalPrefetcher(
+        search,
+        stability_seconds=STABILITY_SECONDS,
+        min_similarity=0.9,
+        deadline_seconds=deadline_seconds,
+    )
+
+
+@pytest.mark.asyncio
+async def test_stable_interim_is_retrieved_before_the_final_transcription():
+    search = FakeSearch()
+    prefetcher = _prefetcher(search)
+    prefetcher.observe_interim("what are your")
+    prefetcher.observe_interim("What are your opening hours")
+    await asyncio.sleep(STABILITY_SECONDS * 2)
+    assert search.queries == ["What are your opening hours"]
+
+    # similar enough after normalizing
+    assert await prefetcher.retrieve("What are your opening hours?") == [
+        "document about What are your opening hours"
+    ]
+    assert await prefetcher.retrieve("What are you're opening hours") is not None
+    assert len(search.queries) == 1
+    assert prefetcher.stats.num_prefetched == 1
+    assert prefetcher.stats.num_hits == 2
+
+
+@pytest.mark.asyncio
+async def test_dissimilar_final_transcription_is_retrieved_again():
+    search = FakeSearch()
+    prefetcher = _prefetcher(search)
+    prefetcher.observe_interim("What are your opening hours")
+    await asyncio.sleep(STABILITY_SECONDS * 2)
+    assert await prefetcher.retrieve("What are your opening hours on Sunday") == [
+        "document about What are your opening hours on Sunday"
+    ]
+    assert prefetcher.stats.num_misses == 1
+
+
+@pytest.mark.asyncio
+async def test_retrieval_is_skipped_past_the_deadline_but_kept():
+    search = FakeSearch(delay_seconds=STABILITY_SECONDS * 3)
+    prefetcher = _prefetcher(search, deadline_seconds=STABILITY_SECONDS)
+    assert await prefetcher.retrieve("Opening hours") is None
+    assert prefetcher.stats.num_timeouts == 1
+    await asyncio.sleep(STABILITY_SECONDS * 3)
+    assert await prefetcher.retrieve("Opening hours") == ["document about Opening hours"]
+    assert len(search.queries) == 1
+    prefetcher.cancel()
+
+
+@pytest.mark.asyncio
+async def test_failed_retrieval_is_not_reused():
+    search = FakeSearch(error=RuntimeError("vector db is down"))
+    prefetcher = _prefetcher(search)
+    for _ in range(2):
+        assert await prefetcher.retrieve("Opening hours") is None
+    assert len(search.queries) == 2
+
+
+QUESTIONS = [
+    "What are your opening hours",
+    "Do you deliver",
+    "Can I book a table for two",
+    "Is there parking nearby",
+    "Do you have vegan options",
+    "How much is the tasting menu",
+    "Can I bring my dog",
+    "Where are you located",
+    "Do you take reservations by email",
+]
+
+
+@pytest.mark.asyncio
+async def test_reused_retrieval_is_not_evicted_first():
+    prefetcher = _prefetcher(FakeSearch())
+    for question in QUESTIONS[:MAX_CACHED_RETRIEVALS]:
+        await prefetcher.retrieve(question)
+    await prefetcher.retrieve(QUESTIONS[0])
+    await prefetcher.retrieve(QUESTIONS[MAX_CACHED_RETRIEVALS])
+    assert prefetcher.stats.num_hits == 1
+    assert "what are your opening hours" in prefetcher.retrievals
+    assert "do you deliver" not in prefetcher.retrievals
+
+
+@pytest.mark.asyncio
+async def test_retrieval_evicted_while_waited_on_is_skipped():
+    prefetcher = _prefetcher(FakeSearch(delay_seconds=1))
+    retrieval = asyncio.create_task(prefetcher.retrieve(QUESTIONS[0]))
+    await asyncio.sleep(0)
+    # prefetching as many other utterances evicts it
+    for question in QUESTIONS[1 : MAX_CACHED_RETRIEVALS + 1]:
+        prefetcher.observe_interim(question)
+        await asyncio.sleep(STABILITY_SECONDS * 1.5)
+    assert await asyncio.wait_for(retrieval, timeout=0.5) is None
+    prefetcher.cancel()
+
+
+@pytest.mark.asyncio
+async def test_chat_gpt_agent_prefetches_vector_db_lookups(mocker: MockerFixture):
+    vector_db = mocker.MagicMock()
+    vector_db.similarity_search_with_score = mocker.AsyncMock(return_value=[])
+    vector_db.tear_down = mocker.AsyncMock()
+    vector_db_factory = mocker.MagicMock()
+    vector_db_factory.create_vector_db.return_value = vector_db
+    agent = ChatGPTAgent(
+        ChatGPTAgentConfig(
+            prompt_preamble="",
+            openai_api_key="openai_api_key",
+            vector_db_config=PineconeConfig(index="index", api_key=None, api_environment=None),
+            retrieval_prefetch=RetrievalPrefetchConfig(stability_seconds=STABILITY_SECONDS),
+        ),
+        vector_db_factory=vector_db_factory,
+    )
+
+    agent.observe_interim_transcription(
+        Transcription(message="What are your opening hours", confidence=1.0, is_final=False),
+        conversation_id="conversation_id",
+    )
+    await asyncio.sleep(STABILITY_SECONDS * 2)
+    assert await agent._retrieve_documents("What are your opening hours?") == []
+    vector_db.similarity_search_with_score.assert_awaited_once_with("What are your opening hours")
+    await agent.terminate()
+
+
+def test_chat_gpt_agent_retrieval_prefetch_requires_vector_db():
+    with pytest.raises(ValueError):
+        ChatGPTAgent(
+            ChatGPTAgentConfig(
+                prompt_preamble="",
+                openai_api_key="openai_api_key",
+                retrieval_prefetch=RetrievalPrefetchConfig(),
+            )
+        )
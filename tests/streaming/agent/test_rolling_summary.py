@@ -0,0 +1,134 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
+from vocode.streaming.agent.rolling_summary import (
+    SUMMARY_HEADER,
+    BaseConversationSummarizer,
+    RollingSummary,
+    format_chat_messages_for_summary,
+)
+from vocode.streaming.models.agent import ChatGPTAgentConfig, RollingSummaryConfig
+
+PREAMBLE = {"role": "system", "content": "You are a helpful assistant."}
+
+
+class FakeSummarizer(BaseConversationSummarizer):
+    def __init__(self, error: Optional[Exception] = None):
+        self.error = error
+        self.calls: List[List[Dict[str, Any]]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def summarize(self, summary: Optional[str], chat_messages: List[Dict[str, Any]]) -> str:
+        self.calls.append(chat_messages)
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        contents = [chat_message["content"] or "" for chat_message in chat_messages]
+        return " ".join(([summary] if summary else []) + contents)
+
+
+async def _run_background_tasks():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def _chat_messages(num_messages: int) -> List[Dict[str, Any]]:
+    return [PREAMBLE] + [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"m{i}"}
+        for i in range(num_messages)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_old_messages_are_summarized_in_the_background():
+    summarizer = FakeSummarizer()
+    summarizer.release.clear()
+    rolling_summary = RollingSummary(summarizer, window_size=4, min_messages_to_summarize=3)
+
+    assert rolling_summary.apply(_chat_messages(6)) == _chat_messages(6)
+    assert summarizer.calls == []
+
+    # summarized without waiting for it
+    assert rolling_summary.apply(_chat_messages(7)) == _chat_messages(7)
+    await _run_background_tasks()
+    assert rolling_summary.apply(_chat_messages(7)) == _chat_messages(7)
+    assert summarizer.calls == [_chat_messages(7)[1:4]]
+    summarizer.release.set()
+    await _run_background_tasks()
+
+    assert (
+        rolling_summary.apply(_chat_messages(8))
+        == [{"role": "system", "content": f"{PREAMBLE['content']}\n\n{SUMMARY_HEADER}\nm0 m1 m2"}]
+        + _chat_messages(8)[4:]
+    )
+    assert len(summarizer.calls) == 1
+
+    rolling_summary.apply(_chat_messages(10))
+    await _run_background_tasks()
+    # only the messages after the previous summary
+    assert summarizer.calls[1] == _chat_messages(10)[4:7]
+    assert rolling_summary.apply(_chat_messages(10))[0]["content"].endswith("m0 m1 m2 m3 m4 m5")
+    assert rolling_summary.stats.num_summaries == 2
+    assert rolling_summary.stats.num_summarized_messages == 6
+
+
+@pytest.mark.asyncio
+async def test_tool_results_are_summarized_with_their_calls():
+    summarizer = FakeSummarizer()
+    rolling_summary = RollingSummary(summarizer, window_size=2, min_messages_to_summarize=1)
+    chat_messages = [
+        PREAMBLE,
+        {"role": "user", "content": "Book a table"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": "call_1",
+                    "type": "function",
+                    "function": {"name": "book_table", "arguments": "{}"},
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": "call_1", "content": "booked"},
+        {"role": "assistant", "content": "Done!"},
+    ]
+    rolling_summary.apply(chat_messages)
+    await _run_background_tasks()
+    assert summarizer.calls == [chat_messages[1:4]]
+    assert rolling_summary.apply(chat_messages)[1:] == chat_messages[4:]
+    assert format_chat_messages_for_summary(chat_messages[1:4]) == (
+        "User: Book a table\nAssistant called book_table({})\nResult: booked"
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_keeps_the_messages():
+    summarizer = FakeSummarizer(error=RuntimeError("rate limited"))
+    rolling_summary = RollingSummary(summarizer, window_size=2, min_messages_to_summarize=2)
+    rolling_summary.apply(_chat_messages(5))
+    await _run_background_tasks()
+    assert rolling_summary.apply(_chat_messages(5)) == _chat_messages(5)
+    assert rolling_summary.stats.num_failures == 1
+    await _run_background_tasks()
+    assert len(summarizer.calls) == 2  # retried on the next turn
+    rolling_summary.cancel()
+
+
+def test_chat_gpt_agent_uses_the_conversation_summarizer():
+    summarizer = FakeSummarizer()
+    agent = ChatGPTAgent(
+        ChatGPTAgentConfig(
+            prompt_preamble="",
+            openai_api_key="openai_api_key",
+            rolling_summary=RollingSummaryConfig(window_size=6),
+        ),
+        conversation_summarizer=summarizer,
+    )
+    assert agent.rolling_summary is not None
+    assert agent.rolling_summary.summarizer is summarizer
+    assert agent.rolling_summary.window_size == 6
@@ -0,0 +1,141 @@
+import asyncio
+from typing import List
+
+import pytest
+from pytest_mock import MockerFixture
+
+from vocode.streaming.agent.base_agent import (
+    AgentResponseMessage,
+    GeneratedResponse,
+    TranscriptionAgentInput,
+)
+from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
+from vocode.streaming.agent.speculative_response import ResponseSpeculator, normalize_utterance
+from vocode.streaming.models.agent import ChatGPTAgentConfig
+from vocode.streaming.models.events import Sender
+from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.models.transcriber import Transcription
+from vocode.streaming.models.transcript import Message, Transcript
+from vocode.streaming.utils.worker import InterruptibleEvent, QueueConsumer
+
+STABILITY_SECONDS = 0.01
+
+
+class FakeGenerator:
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.calls: List[str] = []
+
+    async def __call__(self, human_input: str, conversation_id: str, bot_was_in_medias_res: bool):
+        self.calls.append(human_input)
+        for text in self.texts:
+            yield GeneratedResponse(message=BaseMessage(text=text), is_interruptible=True)
+
+
+async def _collect(responses) -> List[str]:
+    return [response.message.text async for response in responses]
+
+
+def test_normalize_utterance():
+    assert normalize_utterance("Yes, please!  I'd like that.") == "yes please i'd like that"
+
+
+@pytest.mark.asyncio
+async def test_claim_uses_speculated_responses_on_match():
+    generate = FakeGenerator(["Sure.", "For how many people?"])
+    speculator = ResponseSpeculator(generate, stability_seconds=STABILITY_SECONDS)
+    speculator.observe_interim("book a table", "conversation_id", context=1)
+    speculator.observe_interim("Book a table", "conversation_id", context=1)  # still stable
+    await asyncio.sleep(STABILITY_SECONDS * 5)
+
+    responses = speculator.claim("Book a table.", context=1)
+    assert responses is not None
+    assert await _collect(responses) == ["Sure.", "For how many people?"]
+    assert generate.calls == ["book a table"]
+    assert speculator.stats.num_started == 1
+    assert speculator.stats.num_hits == 1
+    assert speculator.stats.hit_rate == 1.0
+    assert speculator.stats.mean_latency_saved_seconds >= 0.0
+
+
+@pytest.mark.asyncio
+async def test_claim_cancels_mismatched_or_unstable_speculation():
+    generate = FakeGenerator(["Sure."])
+    speculator = ResponseSpeculator(generate, stability_seconds=STABILITY_SECONDS)
+
+    speculator.observe_interim("book a table", "conversation_id", context=1)
+    await asyncio.sleep(STABILITY_SECONDS * 5)
+    speculation = speculator.current
+    assert speculation is not None
+    assert speculator.claim("book a table for two", context=1) is None
+    await asyncio.sleep(0)
+    assert speculation.task is not None and speculation.task.done()
+
+    speculator.observe_interim("cancel", "conversation_id", context=2)
+    await asyncio.sleep(STABILITY_SECONDS * 5)
+    assert speculator.claim("cancel", context=3) is None  # e.g. a bot message was cut off
+
+    # the final arrives before the interim was stable, so generation never started
+    speculator.observe_interim("thanks", "conversation_id", context=4)
+    assert speculator.claim("thanks", context=4) is None
+
+    assert generate.calls == ["book a table", "cancel"]
+    assert speculator.stats.num_misses == 2
+    assert speculator.stats.num_not_ready == 1
+    assert speculator.stats.num_hits == 0
+
+
+@pytest.mark.asyncio
+async def test_chat_gpt_agent_responds_with_speculative_response(mocker: MockerFixture):
+    mocker.patch.dict("os.environ", {"OPENAI_API_KEY": "openai_api_key"})
+    agent = ChatGPTAgent(
+        ChatGPTAgentConfig(
+            prompt_preamble="Book tables",
+            speculative_response_stability_seconds=STABILITY_SECONDS,
+        )
+    )
+    agent.attach_transcript(
+        Transcript(event_logs=[Message(sender=Sender.BOT, text="How can I help?", is_final=True)])
+    )
+    agent.attach_conversation_state_manager(mocker.MagicMock())
+    agent_consumer: QueueConsumer = QueueConsumer()
+    agent.agent_responses_consumer = agent_consumer
+
+    prompted_transcripts: List[List[str]] = []
+
+    async def generate_response_to_transcript(transcript: Transcript, *args, **kwargs):
+        prompted_transcripts.append([event_log.to_string() for event_log in transcript.event_logs])
+        yield GeneratedResponse(message=BaseMessage(text="Sure."), is_interruptible=True)
+
+    mocker.patch.object(agent, "_generate_response_to_transcript", generate_response_to_transcript)
+    generate_response = mocker.patch.object(agent, "generate_response")
+
+    agent.observe_interim_transcription(
+        Transcription(message="book a table", confidence=1.0, is_final=False),
+        conversation_id="conversation_id",
+    )
+    await asyncio.sleep(STABILITY_SECONDS * 5)
+    agent.start()
+    agent.consume_nonblocking(
+        InterruptibleEvent(
+            payload=TranscriptionAgentInput(
+                conversation_id="conversation_id",
+                transcription=Transcription(message="Book a table.", confidence=1.0, is_final=True),
+            ),
+            is_interruptible=False,
+        )
+    )
+    agent_response = await asyncio.wait_for(agent_consumer.input_queue.get(), timeout=1)
+    await agent.terminate()
+
+    assert isinstance(agent_response.payload, AgentResponseMessage)
+    assert agent_response.payload.message == BaseMessage(text="Sure.")
+    generate_response.assert_not_called()
+    assert prompted_transcripts == [["BOT: How can I help?", "HUMAN: book a table"]]
+    # the speculative human message never made it into the transcript, the final one did
+    assert [event_log.to_string() for event_log in agent.transcript.event_logs] == [
+        "BOT: How can I help?",
+        "HUMAN: Book a table.",
+    ]
+    assert agent.response_speculator is not None
+    assert agent.response_speculator.stats.num_hits == 1
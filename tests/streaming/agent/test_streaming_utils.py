@@ -1,3 +1,7 @@
+import asyncio
+import json
+import random
+import re
 from typing import Any, AsyncGenerator, Dict, List, Optional, Union
 
 import pytest
@@ -5,8 +9,17 @@ from openai.types.chat.chat_completion_chunk import ChatCompletionChunk
 from pydantic.v1 import BaseModel
 
 from vocode.streaming.agent.openai_utils import openai_get_tokens
-from vocode.streaming.agent.streaming_utils import collate_response_async
-from vocode.streaming.models.actions import FunctionCall
+from vocode.streaming.agent.streaming_utils import (
+    SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN,
+    SHORT_SENTENCE_CUTOFF,
+    TOKENS_TO_GENERATE_PAST_PERIOD,
+    JSONObjectScanner,
+    SentenceSegmenter,
+    collate_response_async,
+    split_sentences,
+    stream_response_async,
+)
+from vocode.streaming.models.actions import FunctionCall, FunctionFragment
 
 
 async def _agen_from_chunk_list(
@@ -373,3 +386,206 @@ async def test_collate_response_async(mocker):
         ):
             actual_sentences.append(sentence)
         assert actual_sentences == test_case.expected_sentences
+
+
+def _rescanning_segment(tokens: List[str]) -> List[str]:
+    """The chunks collate_response_async yielded when it rescanned its buffer on every token."""
+    chunks = []
+    buffer = ""
+    is_post_period = False
+    tokens_since_period = 0
+    for token in tokens:
+        buffer += token
+        if len(buffer.strip().split()) < SHORT_SENTENCE_CUTOFF:
+            continue
+        if re.search(SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN, token):
+            matches = [
+                match for match in re.finditer(SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN, buffer)
+            ]
+            split_point = matches[-1].start() + 1
+            to_keep, to_return = buffer[split_point:], buffer[:split_point]
+            if to_return.strip():
+                chunks.append(to_return.strip())
+            buffer = to_keep
+        elif "." in token:
+            is_post_period = True
+            tokens_since_period = 0
+
+        if is_post_period and tokens_since_period > TOKENS_TO_GENERATE_PAST_PERIOD:
+            sentences = split_sentences(buffer)
+            if len(sentences) > 1:
+                chunks.append(" ".join(sentences[:-1]))
+                buffer = sentences[-1]
+            is_post_period = False
+            tokens_since_period = 0
+        else:
+            tokens_since_period += 1
+    if buffer.strip():
+        chunks.append(buffer.strip())
+    return chunks
+
+
+def _segment(tokens: List[str], segmenter: SentenceSegmenter) -> List[str]:
+    chunks = [chunk for token in tokens for chunk in segmenter.push(token)]
+    last_chunk = segmenter.flush()
+    return chunks + [last_chunk] if last_chunk else chunks
+
+
+def test_sentence_segmenter_matches_rescanning_segmentation():
+    rng = random.Random(0)
+    vocabulary = [
+        " the", " table", " is", " booked", "Dr", ".", ". ", " 1", "2", ". ", "3.5", " $4",
+        "?", "!", "\n", " \n", ".\n\n", "\t", " ", "  ", "a", " e.g.", "ok", " Mr.", "\r",
+    ]  # fmt: skip
+    for _ in range(500):
+        tokens = [rng.choice(vocabulary) for _ in range(rng.randint(1, 80))]
+        assert _segment(tokens, SentenceSegmenter()) == _rescanning_segment(tokens), tokens
+
+    for openai_objects, expected_sentences in zip(OPENAI_OBJECTS, EXPECTED_SENTENCES):
+        tokens = [
+            obj["delta"]["content"] for obj in openai_objects if obj.get("delta", {}).get("content")
+        ]
+        assert _segment(tokens, SentenceSegmenter()) == _rescanning_segment(tokens)
+
+
+def test_sentence_segmenter_abbreviations():
+    tokens = "I booked you with Dr. Smith for Tuesday at noon. See you then, bye".split(" ")
+    tokens = [tokens[0]] + [f" {token}" for token in tokens[1:]]
+    assert _segment(tokens, SentenceSegmenter()) == [
+        "I booked you with Dr.",
+        "Smith for Tuesday at noon.",
+        "See you then, bye",
+    ]
+    assert _segment(tokens, SentenceSegmenter(abbreviations=["dr"])) == [
+        "I booked you with Dr. Smith for Tuesday at noon.",
+        "See you then, bye",
+    ]
+
+
+def _tokenize(text: str) -> List[str]:
+    words = text.split(" ")
+    return [words[0]] + [f" {word}" for word in words[1:]]
+
+
+def test_sentence_segmenter_cuts_first_clause_early():
+    tokens = _tokenize(
+        "Sure thing, I can book a table for the two of you at seven, and I'll text you"
+        " the confirmation. Anything else, or are we all set for tonight then?"
+    )
+    assert _segment(tokens, SentenceSegmenter(first_chunk_min_words=2)) == [
+        "Sure thing,",
+        "I can book a table for the two of you at seven, and I'll text you the confirmation.",
+        "Anything else, or are we all set for tonight then?",
+    ]
+    # "Sure thing," is too short, so the first chunk ends at the next clause
+    assert _segment(tokens, SentenceSegmenter(first_chunk_min_words=5))[:2] == [
+        "Sure thing, I can book a table for the two of you at seven,",
+        "and I'll text you the confirmation.",
+    ]
+
+
+def test_sentence_segmenter_does_not_cut_first_clause_inside_numbers():
+    tokens = ["It", " costs", " $1", ",", "000", " per", " night", ",", " plus", " tax."]
+    assert _segment(tokens, SentenceSegmenter(first_chunk_min_words=3)) == [
+        "It costs $1,000 per night,",
+        "plus tax.",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_response_async_batches_words():
+    async def tokens():
+        for token in ["Sure", " thing", " I", " can", " book", " that", ",", " for", " two"]:
+            yield token
+        await asyncio.sleep(0.1)  # the deadline passes while the LLM stalls
+        for token in [" at", " seven", "."]:
+            yield token
+        yield FunctionFragment(name="book", arguments="{}")
+
+    batches = [
+        batch
+        async for batch in stream_response_async(
+            conversation_id="test",
+            gen=tokens(),
+            get_functions=True,
+            max_batch_delay_seconds=0.02,
+        )
+    ]
+    assert batches == [
+        "Sure ",
+        "thing I can book that, ",
+        " for ",  # "two" is held by stream_response_async until the next token
+        "two at seven. ",
+        FunctionCall(name="book", arguments="{}"),
+    ]
+
+
+def _tool_call_delta(index: int, id: Optional[str] = None, name: str = "", arguments: str = ""):
+    function = {"name": name, "arguments": arguments} if name else {"arguments": arguments}
+    return {"tool_calls": [{"index": index, "id": id, "type": "function", "function": function}]}
+
+
+@pytest.mark.asyncio
+async def test_collate_response_async_parallel_tool_calls():
+    openai_objects = [
+        create_chatgpt_openai_object(delta=delta)
+        for delta in [
+            {"role": "assistant"},
+            _tool_call_delta(0, id="call_crm", name="lookup_customer"),
+            _tool_call_delta(0, arguments='{"phone": '),
+            _tool_call_delta(1, id="call_calendar", name="check_calendar"),
+            _tool_call_delta(0, arguments='"555"}'),
+            _tool_call_delta(1, arguments='{"day": "friday"}'),
+        ]
+    ] + [create_chatgpt_openai_object(delta={}, finish_reason="tool_calls")]
+    responses = [
+        response
+        async for response in collate_response_async(
+            conversation_id="test",
+            gen=openai_get_tokens(_agen_from_chunk_list(openai_objects)),
+            get_functions=True,
+        )
+    ]
+    assert responses == [
+        FunctionCall(name="lookup_customer", arguments='{"phone": "555"}', tool_call_id="call_crm"),
+        FunctionCall(
+            name="check_calendar", arguments='{"day": "friday"}', tool_call_id="call_calendar"
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "fragments,expected_end",
+    [
+        (['{"query": ', '"crm"', "}"], 16),
+        (['  {"a": [1, {"b": "}"}]', "}"], 24),
+        (['{"quote": "say \\', '"hi\\"', '"}'], 23),
+        (['{"unfinished": "', "}"], None),
+        (["", "null"], None),
+    ],
+)
+def test_json_object_scanner(fragments: List[str], expected_end: Optional[int]):
+    scanner = JSONObjectScanner()
+    for fragment in fragments:
+        scanner.push(fragment)
+    assert scanner.end == expected_end
+    if expected_end is not None:
+        json.loads("".join(fragments)[:expected_end])
+
+
+@pytest.mark.asyncio
+async def test_collate_response_async_yields_function_call_once_its_arguments_are_complete():
+    rest_of_response = asyncio.Event()
+
+    async def tokens():
+        yield "One moment"
+        yield FunctionFragment(name="lookup", arguments='{"query": ')
+        yield FunctionFragment(name="", arguments='"crm"}')
+        await rest_of_response.wait()
+
+    responses = collate_response_async(conversation_id="test", gen=tokens(), get_functions=True)
+    assert await responses.__anext__() == "One moment"
+    assert await responses.__anext__() == FunctionCall(name="lookup", arguments='{"query": "crm"}')
+    assert not rest_of_response.is_set()
+    rest_of_response.set()
+    assert [response async for response in responses] == []
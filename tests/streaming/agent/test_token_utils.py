@@ -0,0 +1,90 @@
+from typing import List
+
+import pytest
+from pytest_mock import MockerFixture
+
+from vocode.streaming.agent import token_utils
+from vocode.streaming.agent.token_utils import (
+    _format_func_into_prompt_str,
+    get_tokenizer_info,
+    num_tokens_from_functions,
+)
+
+FUNCTIONS = [
+    {
+        "name": "book_table",
+        "description": "Books a table at the restaurant",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "num_people": {"type": "integer", "description": "How many people are coming"},
+                "time": {"type": "string"},
+            },
+            "required": ["num_people"],
+        },
+    },
+    {
+        "name": "end_conversation",
+        "description": "Ends the conversation",
+        "parameters": {"type": "object", "properties": {}},
+    },
+]
+
+
+class FakeEncoding:
+    """Counts whitespace-separated words, since tiktoken downloads its encodings."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.num_encoded = 0
+
+    def encode(self, text: str) -> List[str]:
+        self.num_encoded += 1
+        return text.split()
+
+
+def _clear_caches():
+    for cached in (
+        token_utils.get_encoding_for_model,
+        token_utils.get_tokenizer_info,
+        token_utils._num_function_overhead_tokens,
+        token_utils._num_tokens_from_function,
+    ):
+        cached.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def encoding(mocker: MockerFixture):
+    _clear_caches()
+    encoding = FakeEncoding()
+    yield mocker.patch("tiktoken.encoding_for_model", return_value=encoding).return_value
+    _clear_caches()
+
+
+def test_tokenizer_info_is_memoized_per_model(mocker: MockerFixture):
+    encoding_for_model = mocker.patch("tiktoken.encoding_for_model", return_value=FakeEncoding())
+    tokenizer_info = get_tokenizer_info("gpt-3.5-turbo-0613")
+    assert tokenizer_info is not None
+    assert get_tokenizer_info("gpt-3.5-turbo-0613") is tokenizer_info
+    assert get_tokenizer_info("gpt-4-0613") is not tokenizer_info
+    assert encoding_for_model.call_count == 2
+
+
+def test_function_token_counts_are_cached(encoding: FakeEncoding):
+    expected = (
+        3
+        + len(token_utils._FUNCTION_OVERHEAD_STR.split())
+        + sum(len(_format_func_into_prompt_str(func=function).split()) for function in FUNCTIONS)
+    )
+    assert num_tokens_from_functions(FUNCTIONS) == expected
+    num_encoded = encoding.num_encoded
+    assert num_encoded == 1 + len(FUNCTIONS)
+
+    # e.g. the next turn, with the functions rebuilt from the same action configs
+    assert num_tokens_from_functions([dict(function) for function in FUNCTIONS]) == expected
+    assert encoding.num_encoded == num_encoded
+
+    changed_function = dict(FUNCTIONS[1], description="Ends the call, after saying goodbye")
+    assert num_tokens_from_functions([FUNCTIONS[0], changed_function]) == expected + 3
+    assert encoding.num_encoded == num_encoded + 1
@@ -0,0 +1,158 @@
+import random
+from typing import List, Optional
+
+from vocode.streaming.action.end_conversation import (
+    EndConversationResponse,
+    EndConversationVocodeActionConfig,
+)
+from vocode.streaming.models.actions import ActionInput, ActionOutput
+from vocode.streaming.models.events import Sender
+from vocode.streaming.models.transcript import (
+    ActionStart,
+    CompactEventLog,
+    EventLog,
+    Message,
+    Transcript,
+    TranscriptCompleteEvent,
+)
+
+
+def _action_start() -> ActionStart:
+    return ActionStart(
+        action_type="action_end_conversation",
+        action_input=ActionInput(
+            action_config=EndConversationVocodeActionConfig(),
+            conversation_id="conversation_id",
+            params={},
+        ),
+    )
+
+
+def _messages(event_logs: List[EventLog], sender: Optional[Sender] = None) -> List[Message]:
+    return [
+        event_log
+        for event_log in event_logs
+        if isinstance(event_log, Message) and (sender is None or event_log.sender == sender)
+    ]
+
+
+def test_indexed_queries_match_scanning_the_event_logs():
+    rng = random.Random(0)
+    transcript = Transcript()
+    for i in range(200):
+        choice = rng.random()
+        if choice < 0.1:
+            transcript.event_logs.append(_action_start())
+        else:
+            transcript.add_message(
+                Message(
+                    sender=Sender.HUMAN if choice < 0.5 else Sender.BOT,
+                    text=f"message {i}",
+                    is_backchannel=rng.random() < 0.2,
+                ),
+                conversation_id="conversation_id",
+                publish_to_events_manager=False,
+            )
+        messages = _messages(transcript.event_logs)
+        for sender in (None, Sender.HUMAN, Sender.BOT):
+            sender_messages = _messages(transcript.event_logs, sender)
+            assert transcript.get_last_message(sender) is (
+                sender_messages[-1] if sender_messages else None
+            )
+            non_backchannels = [
+                message for message in sender_messages if not message.is_backchannel
+            ]
+            assert transcript.get_last_message(sender, include_backchannels=False) is (
+                non_backchannels[-1] if non_backchannels else None
+            )
+            if sender is not None:
+                assert transcript.get_num_messages(sender) == len(sender_messages)
+        assert transcript.get_second_to_last_message() is (
+            messages[-2] if len(messages) > 1 else None
+        )
+        human_positions = [
+            position
+            for position, event_log in enumerate(transcript.event_logs)
+            if event_log.sender == Sender.HUMAN
+        ]
+        if human_positions:
+            assert transcript.get_last_user_message() == (
+                human_positions[-1] - len(transcript.event_logs),
+                transcript.event_logs[human_positions[-1]].to_string(),
+            )
+
+
+def test_index_follows_replaced_and_truncated_event_logs():
+    transcript = Transcript(
+        event_logs=[
+            Message(sender=Sender.HUMAN, text="hi"),
+            Message(sender=Sender.BOT, text="hello"),
+        ]
+    )
+    assert transcript.get_num_messages(Sender.BOT) == 1
+
+    # e.g. a speculative response's transcript
+    copy = transcript.copy(
+        update={"event_logs": [*transcript.event_logs, Message(sender=Sender.HUMAN, text="yo")]}
+    )
+    assert copy.get_last_message().text == "yo"
+    assert transcript.get_last_message().text == "hello"
+
+    del transcript.event_logs[1:]
+    assert transcript.get_num_messages(Sender.BOT) == 0
+    assert transcript.get_last_message(Sender.BOT) is None
+    assert not transcript.was_last_message_interrupted()
+
+
+def test_update_last_bot_message_on_cut_off():
+    transcript = Transcript()
+    transcript.add_bot_message("Hello, how can I help you today?", "conversation_id")
+    transcript.add_human_message("Hi", "conversation_id")
+    transcript.update_last_bot_message_on_cut_off("Hello, how")
+    assert transcript.event_logs[0].text == "Hello, how"
+    assert transcript.was_last_message_interrupted()
+
+
+def _conversation(compact: bool) -> Transcript:
+    transcript = Transcript(start_time=0)
+    if compact:
+        transcript.enable_event_log_compaction()
+    for i in range(5):
+        transcript.add_human_message(f"human {i}", "conversation_id")
+        action_input = _action_start().action_input
+        transcript.add_action_start_log(action_input, "conversation_id")
+        transcript.add_action_finish_log(
+            action_input.copy(),
+            ActionOutput(
+                action_type="action_end_conversation",
+                response=EndConversationResponse(success=True),
+            ),
+            "conversation_id",
+        )
+        transcript.add_bot_message(f"bot {i}", "conversation_id", is_final=True)
+    return transcript
+
+
+def test_compacted_event_logs_read_like_the_event_logs():
+    transcript, compact_transcript = _conversation(compact=False), _conversation(compact=True)
+    stored = list.__iter__(compact_transcript.event_logs)
+    # all but the latest bot message, which may still be cut off
+    assert [isinstance(event_log, CompactEventLog) for event_log in stored] == [True] * 19 + [False]
+    assert len(compact_transcript.event_logs.action_inputs) == 5
+
+    def without_timestamps(transcript: Transcript):
+        return [event_log.dict(exclude={"timestamp"}) for event_log in transcript.event_logs]
+
+    assert without_timestamps(compact_transcript) == without_timestamps(transcript)
+    assert [type(event_log) for event_log in compact_transcript.event_logs[::-1]] == [
+        type(event_log) for event_log in reversed(transcript.event_logs)
+    ]
+    assert compact_transcript.get_last_user_message() == transcript.get_last_user_message()
+    assert compact_transcript.get_num_messages(Sender.BOT) == 5
+
+    compact_transcript.update_last_bot_message_on_cut_off("bo")
+    assert compact_transcript.event_logs[-1].text == "bo"
+    assert compact_transcript.was_last_message_interrupted()
+    assert TranscriptCompleteEvent(
+        transcript=compact_transcript, conversation_id="conversation_id"
+    ).json()
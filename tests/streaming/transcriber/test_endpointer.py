@@ -0,0 +1,177 @@
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from vocode.streaming.models.audio import AudioEncoding
+from vocode.streaming.models.transcriber import (
+    DeepgramEndpointingConfig,
+    DeepgramTranscriberConfig,
+    InternalPunctuationEndpointingConfig,
+    TimeEndpointingConfig,
+    WhisperCPPTranscriberConfig,
+)
+from vocode.streaming.transcriber.deepgram_transcriber import (
+    DeepgramTranscriber,
+    DeepgramTranscriptionResult,
+)
+from vocode.streaming.transcriber.endpointer import (
+    Endpointer,
+    EndpointingSignal,
+    replay_endpointing,
+)
+from vocode.streaming.transcriber.utterance_window import UtteranceWindow
+from vocode.streaming.transcriber.whisper_cpp_transcriber import WhisperCPPTranscriber
+
+
+def _final(transcript: str, trailing_silence_seconds: float = 0.0) -> EndpointingSignal:
+    return EndpointingSignal(
+        transcript=transcript,
+        is_final=True,
+        duration=1.0,
+        trailing_silence_seconds=trailing_silence_seconds,
+    )
+
+
+def _silence(duration: float) -> EndpointingSignal:
+    return EndpointingSignal(duration=duration)
+
+
+def test_replay_internal_punctuation_endpointing():
+    signals = [
+        _final("I'd like to book a table."),
+        _silence(0.3),
+        _silence(0.3),  # 0.6s after a terminator
+        _final("for two people"),
+        _silence(0.5),
+        _silence(0.4),
+        _silence(0.2),  # 1.1s without a terminator
+    ]
+    endpointer = Endpointer(InternalPunctuationEndpointingConfig())
+    endpoints = replay_endpointing(endpointer, signals)
+
+    assert [
+        (endpoint.message, endpoint.source, endpoint.signal_index) for endpoint in endpoints
+    ] == [
+        ("I'd like to book a table.", "punctuation", 2),
+        ("for two people", "time_cutoff", 6),
+    ]
+    assert endpointer.stats.num_decisions == len(signals)
+    assert endpointer.stats.endpoints_by_source == {"punctuation": 1, "time_cutoff": 1}
+    assert endpointer.stats.mean_silence_at_endpoint_seconds == pytest.approx((0.6 + 1.1) / 2)
+
+
+def test_replay_uses_trailing_silence_from_word_timings():
+    # the final transcript already ends with 0.4s of silence, so 0.2s more ends the turn
+    signals = [_final("Yes.", trailing_silence_seconds=0.4), _silence(0.2)]
+    endpoints = replay_endpointing(Endpointer(InternalPunctuationEndpointingConfig()), signals)
+    assert [endpoint.signal_index for endpoint in endpoints] == [1]
+
+
+def test_replay_deepgram_endpointing_signals():
+    signals = [
+        _final("hello"),
+        EndpointingSignal(utterance_end=True),
+        EndpointingSignal(transcript="goodbye", is_final=True, speech_final=True, duration=1.0),
+    ]
+    endpoints = replay_endpointing(
+        Endpointer(DeepgramEndpointingConfig(time_silent_config=None)), signals
+    )
+    assert [(endpoint.message, endpoint.source) for endpoint in endpoints] == [
+        ("hello", "utterance_end"),
+        ("goodbye", "speech_final"),
+    ]
+
+
+def test_time_endpointing_ignores_utterance_end():
+    endpointer = Endpointer(TimeEndpointingConfig(time_cutoff_seconds=0.4))
+    assert not endpointer.is_endpoint("hello", EndpointingSignal(utterance_end=True))
+    assert endpointer.is_endpoint("hello", _silence(0.5))
+
+
+def test_deepgram_results_are_converted_to_signals():
+    transcriber = DeepgramTranscriber(
+        DeepgramTranscriberConfig(
+            sampling_rate=16000,
+            audio_encoding=AudioEncoding.LINEAR16,
+            chunk_size=2048,
+            endpointing_config=DeepgramEndpointingConfig(),
+            api_key="test",
+        )
+    )
+    result = DeepgramTranscriptionResult(
+        is_final=True,
+        speech_final=False,
+        top_choice=DeepgramTranscriptionResult.TranscriptionChoice(
+            transcript="hi there",
+            confidence=0.9,
+            words=[{"start": 2.0, "end": 2.3}, {"start": 2.4, "end": 2.6}],
+        ),
+        start=2.0,
+        duration=1.0,
+    )
+    signal = transcriber.get_endpointing_signal(result)
+    assert signal.trailing_silence_seconds == pytest.approx(0.4)
+    assert signal.is_final and not signal.speech_final
+
+    assert transcriber.is_first_transcription
+    transcriber.is_first_transcription = False
+    assert transcriber.endpointer is not None
+    assert not transcriber.endpointer.is_first_utterance
+
+
+def test_whisper_cpp_transcriber_ends_turn_sooner_after_punctuation(mocker: MockerFixture):
+    mocker.patch(
+        "vocode.streaming.transcriber.whisper_cpp_transcriber.load_whisper",
+        return_value=(None, None, None),
+    )
+    mocker.patch(
+        "vocode.streaming.transcriber.whisper_cpp_transcriber.transcribe_samples",
+        return_value=("Book a table.", 1.0),
+    )
+    transcriber = WhisperCPPTranscriber(
+        WhisperCPPTranscriberConfig(
+            sampling_rate=16000,
+            audio_encoding=AudioEncoding.LINEAR16,
+            chunk_size=3200,
+            buffer_size_seconds=0.2,
+            vad_pause_seconds=5,
+            endpointing_config=InternalPunctuationEndpointingConfig(),
+            libname="libwhisper.so",
+            fname_model="model.bin",
+        )
+    )
+    speech = np.full(1600, 0.5 * 32767).astype(np.int16).tobytes()
+    silence = bytes(3200)
+
+    transcriptions = [transcriber.process_chunk(chunk) for chunk in [speech] * 2 + [silence] * 6]
+    finals = [
+        (index, transcription)
+        for index, transcription in enumerate(transcriptions)
+        if transcription is not None and transcription.is_final
+    ]
+    # 0.6s of silence after "Book a table." rather than the 5s VAD pause
+    assert [index for index, _ in finals] == [7]
+    assert transcriber.endpointer is not None
+    assert transcriber.endpointer.stats.endpoints_by_source == {"punctuation": 1}
+
+
+def test_utterance_window_falls_back_to_the_vad_pause_without_a_transcript():
+    utterance_window = UtteranceWindow(
+        WhisperCPPTranscriberConfig(
+            sampling_rate=16000,
+            audio_encoding=AudioEncoding.LINEAR16,
+            chunk_size=3200,
+            buffer_size_seconds=0.2,
+            vad_pause_seconds=0.3,
+            endpointing_config=InternalPunctuationEndpointingConfig(),
+            libname="libwhisper.so",
+            fname_model="model.bin",
+        ),
+        endpointer=Endpointer(InternalPunctuationEndpointingConfig()),
+    )
+    speech = np.full(1600, 0.5 * 32767).astype(np.int16).tobytes()
+    silence = bytes(3200)
+
+    # whisper returned empty interims, so the endpointer has no words to end the turn on
+    results = [utterance_window.push(chunk, "") for chunk in [speech] * 2 + [silence] * 4]
+    assert results.index(True) == 4  # after the 0.3s VAD pause, not the 15s window limit
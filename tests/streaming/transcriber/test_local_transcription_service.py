@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+import pytest
+
+from vocode.streaming.models.audio import AudioEncoding
+from vocode.streaming.models.transcriber import WhisperCPPTranscriberConfig
+from vocode.streaming.transcriber.local_transcription_service import (
+    LocalTranscriptionModel,
+    LocalTranscriptionService,
+    TranscriptionResult,
+    _initialize_worker,
+)
+from vocode.streaming.transcriber.whisper_cpp_transcriber import BatchedWhisperCPPTranscriber
+from vocode.streaming.utils.worker import QueueConsumer
+
+CHUNK_SAMPLES = 1600  # 100ms at 16kHz
+
+
+class LengthModel(LocalTranscriptionModel):
+    def __init__(self):
+        self.batch_sizes: List[int] = []
+        self.windows: List[np.ndarray] = []
+        self.release = threading.Event()
+        self.release.set()
+        self.fail_next_batch = False
+
+    def transcribe_batch(self, windows: List[np.ndarray]) -> List[TranscriptionResult]:
+        self.release.wait()
+        if self.fail_next_batch:
+            self.fail_next_batch = False
+            raise RuntimeError("model failed")
+        self.batch_sizes.append(len(windows))
+        self.windows.extend(windows)
+        return [(f"samples {len(window)}", 1.0) for window in windows]
+
+
+class InProcessTranscriptionService(LocalTranscriptionService):
+    def create_executor(self) -> Executor:
+        return ThreadPoolExecutor(
+            max_workers=self.num_workers,
+            initializer=_initialize_worker,
+            initargs=(self.model_factory,),
+        )
+
+
+@pytest.fixture
+def model():
+    return LengthModel()
+
+
+@pytest.fixture
+def service(model: LengthModel):
+    return InProcessTranscriptionService(
+        model_factory=lambda: model, num_workers=1, max_batch_delay_seconds=0.01
+    )
+
+
+def _samples(length: int) -> np.ndarray:
+    return np.zeros(length, dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_windows_from_many_streams_are_batched(
+    service: LocalTranscriptionService, model: LengthModel
+):
+    service.start()
+    results = await asyncio.gather(
+        *[service.transcribe(f"stream-{i}", _samples(100 + i), is_final=True) for i in range(5)]
+    )
+    assert results == [(f"samples {100 + i}", 1.0) for i in range(5)]
+    assert model.batch_sizes == [5]
+    assert service.stats.num_batches == 1
+    assert service.stats.mean_batch_size == 5
+    await service.terminate()
+
+
+@pytest.mark.asyncio
+async def test_pending_interim_is_superseded_but_finals_are_kept(
+    service: LocalTranscriptionService, model: LengthModel
+):
+    service.start()
+    first_interim = service.submit("stream", _samples(100), is_final=False)
+    second_interim = service.submit("stream", _samples(200), is_final=False)
+    final = service.submit("stream", _samples(300), is_final=True)
+    other_stream = service.submit("other", _samples(400), is_final=False)
+
+    assert await first_interim is None
+    assert await second_interim is None
+    assert await final == ("samples 300", 1.0)
+    assert await other_stream == ("samples 400", 1.0)
+    assert service.stats.num_superseded_interims == 2
+    await service.terminate()
+
+
+@pytest.mark.asyncio
+async def test_samples_are_copied_on_submit(service: LocalTranscriptionService, model: LengthModel):
+    service.start()
+    samples = _samples(100)
+    future = service.submit("stream", samples[:50], is_final=True)
+    samples[:] = 1  # e.g. the ring buffer receiving more audio
+    await future
+    assert not model.windows[0].any()
+    await service.terminate()
+
+
+SPEECH = np.full(CHUNK_SAMPLES, 0.5 * 32767).astype(np.int16).tobytes()
+SILENCE = bytes(CHUNK_SAMPLES * 2)
+
+
+def _start_batched_transcriber(
+    service: LocalTranscriptionService,
+) -> Tuple[BatchedWhisperCPPTranscriber, QueueConsumer]:
+    transcriber = BatchedWhisperCPPTranscriber(
+        WhisperCPPTranscriberConfig(
+            sampling_rate=16000,
+            audio_encoding=AudioEncoding.LINEAR16,
+            chunk_size=CHUNK_SAMPLES * 2,
+            buffer_size_seconds=0.3,
+            vad_pause_seconds=0.2,
+            libname="libwhisper.so",
+            fname_model="model.bin",
+        ),
+        transcription_service=service,
+    )
+    service.start()
+    consumer = QueueConsumer()
+    transcriber.consumer = consumer
+    transcriber.start()
+    return transcriber, consumer
+
+
+@pytest.mark.asyncio
+async def test_batched_transcriber_forwards_results_in_order(
+    service: LocalTranscriptionService, model: LengthModel
+):
+    transcriber, consumer = _start_batched_transcriber(service)
+    model.release.clear()  # hold the worker so that audio keeps arriving while it is busy
+    for chunk in [SPEECH] * 3:
+        transcriber.send_audio(chunk)
+    await asyncio.sleep(0.05)  # the interim window is dispatched
+    for chunk in [SILENCE] * 2:
+        transcriber.send_audio(chunk)
+    await asyncio.sleep(0.05)
+    model.release.set()
+
+    transcriptions = [
+        await asyncio.wait_for(consumer.input_queue.get(), timeout=1) for _ in range(2)
+    ]
+    assert [transcription.is_final for transcription in transcriptions] == [False, True]
+    assert transcriptions[1].message == f"samples {5 * CHUNK_SAMPLES}"
+    await transcriber.terminate()
+    await service.terminate()
+
+
+@pytest.mark.asyncio
+async def test_batched_transcriber_keeps_forwarding_after_a_failed_batch(
+    service: LocalTranscriptionService, model: LengthModel
+):
+    transcriber, consumer = _start_batched_transcriber(service)
+    model.fail_next_batch = True
+    for chunk in [SPEECH] * 3:
+        transcriber.send_audio(chunk)
+    await asyncio.sleep(0.05)  # the interim window's batch fails
+    for chunk in [SILENCE] * 2:
+        transcriber.send_audio(chunk)
+
+    transcription = await asyncio.wait_for(consumer.input_queue.get(), timeout=1)
+    assert transcription.is_final
+    assert transcription.message == f"samples {5 * CHUNK_SAMPLES}"
+    assert transcriber.results_task is not None and not transcriber.results_task.done()
+    await transcriber.terminate()
+    await service.terminate()
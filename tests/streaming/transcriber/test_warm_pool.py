@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from tests.fixtures.transcriber import TestAsyncTranscriber, TestTranscriberConfig
+from vocode.streaming.models.audio import AudioEncoding
+from vocode.streaming.transcriber.abstract_factory import AbstractTranscriberFactory
+from vocode.streaming.transcriber.warm_pool import TranscriberWarmPool
+
+TRANSCRIBER_CONFIG = TestTranscriberConfig(
+    sampling_rate=8000,
+    audio_encoding=AudioEncoding.LINEAR16,
+    chunk_size=160,
+)
+
+
+class TestTranscriberFactory(AbstractTranscriberFactory):
+    __test__ = False
+
+    def create_transcriber(self, transcriber_config):
+        return TestAsyncTranscriber(transcriber_config)
+
+
+@pytest.mark.asyncio
+async def test_prewarm_and_adopt():
+    pool = TranscriberWarmPool(transcriber_factory=TestTranscriberFactory())
+    transcriber = pool.prewarm("conversation_id", TRANSCRIBER_CONFIG)
+    assert transcriber.worker_task is not None
+
+    assert pool.prewarm("conversation_id", TRANSCRIBER_CONFIG) is transcriber
+    assert pool.adopt("conversation_id", TRANSCRIBER_CONFIG) is transcriber
+    assert pool.adopt("conversation_id", TRANSCRIBER_CONFIG) is None
+    assert not transcriber.worker_task.done()
+    await transcriber.terminate()
+
+
+@pytest.mark.asyncio
+async def test_adopt_with_mismatched_config_discards():
+    pool = TranscriberWarmPool(transcriber_factory=TestTranscriberFactory())
+    transcriber = pool.prewarm("conversation_id", TRANSCRIBER_CONFIG)
+    other_config = TRANSCRIBER_CONFIG.copy(update={"sampling_rate": 16000})
+
+    assert pool.adopt("conversation_id", other_config) is None
+    await asyncio.sleep(0.01)
+    assert transcriber.worker_task.done()
+
+
+@pytest.mark.asyncio
+async def test_idle_transcriber_expires():
+    pool = TranscriberWarmPool(
+        transcriber_factory=TestTranscriberFactory(),
+        idle_timeout_seconds=0.05,
+        keepalive_interval_seconds=0.01,
+    )
+    transcriber = pool.prewarm("conversation_id", TRANSCRIBER_CONFIG)
+    await asyncio.sleep(0.1)
+
+    assert "conversation_id" not in pool.warm_transcribers
+    assert transcriber.worker_task.done()
+    assert pool.adopt("conversation_id", TRANSCRIBER_CONFIG) is None
+
+
+@pytest.mark.asyncio
+async def test_terminate_releases_all():
+    pool = TranscriberWarmPool(transcriber_factory=TestTranscriberFactory())
+    transcribers = [
+        pool.prewarm(conversation_id, TRANSCRIBER_CONFIG) for conversation_id in ("a", "b")
+    ]
+    await pool.terminate()
+    await asyncio.sleep(0)
+
+    assert pool.warm_transcribers == {}
+    assert all(transcriber.worker_task.done() for transcriber in transcribers)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+from vocode.streaming.models.audio import AudioEncoding
+from vocode.streaming.models.transcriber import WhisperCPPTranscriberConfig
+from vocode.streaming.transcriber.whisper_cpp_transcriber import WhisperCPPTranscriber
+
+SAMPLING_RATE = 16000
+CHUNK_SAMPLES = 1600  # 100ms
+
+
+def _chunk(amplitude: float) -> bytes:
+    return (np.full(CHUNK_SAMPLES, amplitude * 32767)).astype(np.int16).tobytes()
+
+
+@pytest.fixture
+def transcriber(mocker: MockerFixture):
+    mocker.patch(
+        "vocode.streaming.transcriber.whisper_cpp_transcriber.load_whisper",
+        return_value=(None, None, None),
+    )
+    return WhisperCPPTranscriber(
+        WhisperCPPTranscriberConfig(
+            sampling_rate=SAMPLING_RATE,
+            audio_encoding=AudioEncoding.LINEAR16,
+            chunk_size=CHUNK_SAMPLES * 2,
+            buffer_size_seconds=0.3,
+            vad_pause_seconds=0.2,
+            libname="libwhisper.so",
+            fname_model="model.bin",
+        )
+    )
+
+
+def test_interim_results_then_final_on_pause(transcriber: WhisperCPPTranscriber, mocker):
+    window_lengths = []
+
+    def fake_transcribe_samples(whisper, params, ctx, samples):
+        window_lengths.append(len(samples))
+        return f" words {len(window_lengths)}", 1.0
+
+    mocker.patch(
+        "vocode.streaming.transcriber.whisper_cpp_transcriber.transcribe_samples",
+        side_effect=fake_transcribe_samples,
+    )
+
+    assert transcriber.process_chunk(_chunk(0)) is None  # leading silence is never transcribed
+
+    transcriptions = [transcriber.process_chunk(_chunk(0.5)) for _ in range(6)]
+    interims = [transcription for transcription in transcriptions if transcription is not None]
+    assert [transcription.is_final for transcription in interims] == [False, False]
+    assert interims[0].message == "words 1"
+
+    assert transcriber.process_chunk(_chunk(0)) is None
+    final = transcriber.process_chunk(_chunk(0))
+    assert final is not None and final.is_final
+    # the final window covers the pre-roll, the speech and the trailing pause
+    assert window_lengths[-1] == 9 * CHUNK_SAMPLES
+    assert len(transcriber.utterance_window.ring_buffer.window()) == 0
+
+
+def test_identical_interims_are_not_repeated(transcriber: WhisperCPPTranscriber, mocker):
+    mocker.patch(
+        "vocode.streaming.transcriber.whisper_cpp_transcriber.transcribe_samples",
+        return_value=("hello", 1.0),
+    )
+    transcriptions = [transcriber.process_chunk(_chunk(0.5)) for _ in range(9)]
+    assert len([transcription for transcription in transcriptions if transcription]) == 1
@@ -0,0 +1,52 @@
+import numpy as np
+
+from vocode.streaming.utils.audio_ring_buffer import AudioRingBuffer
+from vocode.streaming.utils.vad import EnergyVAD
+
+
+def test_window_is_contiguous_across_wraparound():
+    ring_buffer = AudioRingBuffer(capacity=5)
+    ring_buffer.write(np.arange(3, dtype=np.float32))
+    assert ring_buffer.window().tolist() == [0, 1, 2]
+
+    ring_buffer.write(np.arange(3, 7, dtype=np.float32))
+    window = ring_buffer.window()
+    assert window.tolist() == [2, 3, 4, 5, 6]
+    assert window.flags["C_CONTIGUOUS"]
+    assert np.shares_memory(window, ring_buffer._data)
+    assert ring_buffer.is_full()
+
+
+def test_write_larger_than_capacity_keeps_newest_samples():
+    ring_buffer = AudioRingBuffer(capacity=4)
+    ring_buffer.write(np.arange(10, dtype=np.float32))
+    assert ring_buffer.window().tolist() == [6, 7, 8, 9]
+    ring_buffer.write(np.array([10], dtype=np.float32))
+    assert ring_buffer.window().tolist() == [7, 8, 9, 10]
+
+
+def test_keep_last_and_clear():
+    ring_buffer = AudioRingBuffer(capacity=8)
+    ring_buffer.write(np.arange(6, dtype=np.float32))
+    ring_buffer.keep_last(2)
+    assert ring_buffer.window().tolist() == [4, 5]
+    ring_buffer.clear()
+    assert len(ring_buffer.window()) == 0
+    ring_buffer.write(np.array([1, 2], dtype=np.float32))
+    assert ring_buffer.window().tolist() == [1, 2]
+
+
+def test_energy_vad_detects_pause_after_speech():
+    vad = EnergyVAD(sampling_rate=100, energy_threshold=0.1, pause_seconds=0.2)
+    silence = np.zeros(10, dtype=np.float32)
+    speech = np.full(10, 0.5, dtype=np.float32)
+
+    assert not vad.process(silence)
+    assert not vad.is_pause()  # silence before any speech is not a pause
+    assert vad.process(speech)
+    vad.process(silence)
+    assert not vad.is_pause()
+    vad.process(silence)
+    assert vad.is_pause()
+    vad.reset()
+    assert not vad.is_pause()
@@ -0,0 +1,49 @@
+from vocode.streaming.models.transcriber import Transcription
+from vocode.streaming.utils.interim_coalescing_queue import InterimCoalescingQueue
+
+
+def _transcription(message: str, is_final: bool = False) -> Transcription:
+    return Transcription(message=message, confidence=1.0, is_final=is_final)
+
+
+def _drain(queue: InterimCoalescingQueue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return [(item.message, item.is_final) for item in items]
+
+
+def test_only_newest_waiting_interim_is_kept():
+    queue = InterimCoalescingQueue()
+    for message in ["hi", "hi there", "hi there how"]:
+        queue.put_nowait(_transcription(message))
+    assert _drain(queue) == [("hi there how", False)]
+    assert queue.num_interims == 3
+    assert queue.num_coalesced == 2
+
+
+def test_finals_are_never_dropped_or_merged_across():
+    queue = InterimCoalescingQueue()
+    queue.put_nowait(_transcription("hi"))
+    queue.put_nowait(_transcription("hi there", is_final=True))
+    queue.put_nowait(_transcription("how"))
+    queue.put_nowait(_transcription("how are", is_final=True))
+    queue.put_nowait(_transcription("you", is_final=True))
+    assert _drain(queue) == [
+        ("hi", False),
+        ("hi there", True),
+        ("how", False),
+        ("how are", True),
+        ("you", True),
+    ]
+    assert queue.num_coalesced == 0
+    assert queue.num_finals == 3
+
+
+def test_interim_after_get_is_enqueued():
+    queue = InterimCoalescingQueue()
+    queue.put_nowait(_transcription("hi"))
+    queue.get_nowait()  # being processed by the TranscriptionsWorker
+    queue.put_nowait(_transcription("hi there"))
+    assert _drain(queue) == [("hi there", False)]
+    assert queue.num_coalesced == 0
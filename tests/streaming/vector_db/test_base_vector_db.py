@@ -0,0 +1,111 @@
+import asyncio
+from typing import List
+
+import pytest
+from openai.types import CreateEmbeddingResponse, Embedding
+from pytest_mock import MockerFixture
+
+from vocode.streaming.utils.client_registry import ClientRegistry
+from vocode.streaming.utils.singleton import Singleton
+from vocode.streaming.vector_db.base_vector_db import VectorDB
+from vocode.streaming.vector_db.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture(autouse=True)
+def cleanup_singletons(mocker: MockerFixture):
+    mocker.patch.dict("os.environ", {"OPENAI_API_KEY": "openai_api_key"})
+    for singleton in (ClientRegistry, EmbeddingCache):
+        if singleton in Singleton._instances:
+            del Singleton._instances[singleton]
+    yield
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.requests: List[List[str]] = []
+        self.num_in_flight = 0
+        self.max_num_in_flight = 0
+
+    async def create(self, input: List[str], model: str) -> CreateEmbeddingResponse:
+        self.requests.append(input)
+        self.num_in_flight += 1
+        self.max_num_in_flight = max(self.max_num_in_flight, self.num_in_flight)
+        await asyncio.sleep(0.01)
+        self.num_in_flight -= 1
+        return CreateEmbeddingResponse(
+            # out of order, like the API is allowed to respond
+            data=[
+                Embedding(embedding=[float(len(text))], index=index, object="embedding")
+                for index, text in reversed(list(enumerate(input)))
+            ],
+            model=model,
+            object="list",
+            usage={"prompt_tokens": 0, "total_tokens": 0},
+        )
+
+
+def _vector_db(mocker: MockerFixture) -> VectorDB:
+    vector_db = VectorDB(aiohttp_session=mocker.MagicMock())
+    fake_embeddings = FakeEmbeddings()
+    mocker.patch.object(vector_db.openai_client, "embeddings", fake_embeddings)
+    return vector_db
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_batched_and_deduplicated(mocker: MockerFixture):
+    vector_db = _vector_db(mocker)
+    texts = ["a", "bb", "ccc", "bb", "dddd", "eeeee"]
+    embeddings = await vector_db.create_openai_embeddings(
+        texts, batch_size=2, max_concurrent_requests=2
+    )
+
+    assert embeddings == [[float(len(text))] for text in texts]
+    fake_embeddings = vector_db.openai_client.embeddings
+    assert fake_embeddings.requests == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+    assert fake_embeddings.max_num_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_cached_by_model_and_normalized_text(mocker: MockerFixture):
+    vector_db = _vector_db(mocker)
+    assert await vector_db.create_openai_embedding("What are your hours?") == [20.0]
+    assert await vector_db.create_openai_embedding(" What are  your hours?\n") == [20.0]
+    assert len(vector_db.openai_client.embeddings.requests) == 1
+    assert EmbeddingCache().num_hits == 1
+
+    await vector_db.create_openai_embedding("What are your hours?", model="other-model")
+    assert len(vector_db.openai_client.embeddings.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_texts_are_embedded_as_given(mocker: MockerFixture):
+    vector_db = _vector_db(mocker)
+    chunk = "Opening hours:\n  Mon-Fri 9-5"
+    await vector_db.create_openai_embeddings([chunk, " ".join(chunk.split())])
+    # normalization only decides what shares a cache entry
+    assert vector_db.openai_client.embeddings.requests == [[chunk]]
+
+
+@pytest.mark.asyncio
+async def test_embeddings_can_bypass_the_cache(mocker: MockerFixture):
+    vector_db = _vector_db(mocker)
+    await vector_db.create_openai_embedding("What are your hours?")
+    documents = [
+        "Opening hours:\n  Mon-Fri 9-5",
+        "Opening hours: Mon-Fri 9-5",
+        "What are your hours?",
+    ]
+    embeddings = await vector_db.create_openai_embeddings(documents, use_cache=False)
+
+    assert embeddings == [[float(len(document))] for document in documents]
+    assert vector_db.openai_client.embeddings.requests[1] == documents
+    assert len(EmbeddingCache().entries) == 1
+    assert EmbeddingCache().num_hits == 0
+
+
+def test_embedding_cache_is_bounded():
+    cache = EmbeddingCache(max_entries=2)
+    for text in ["a", "b", "c"]:
+        cache.set("model", text, [1.0])
+    assert cache.get("model", "a") is None
+    assert cache.get("model", "c") == [1.0]
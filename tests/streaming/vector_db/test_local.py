@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import List
+
+import numpy as np
+import pytest
+from pytest_mock import MockerFixture
+
+pytest.importorskip("langchain")
+
+from vocode.streaming.models.vector_db import LocalVectorDBConfig, LocalVectorIndexType
+from vocode.streaming.utils.client_registry import ClientRegistry
+from vocode.streaming.utils.singleton import Singleton
+from vocode.streaming.vector_db.local import LocalVectorDB
+from vocode.streaming.vector_db.vector_index import VectorIndex
+
+DIMENSIONS = 8
+TEXTS = [f"document {i}" for i in range(20)]
+
+
+@pytest.fixture(autouse=True)
+def cleanup_singletons(mocker: MockerFixture):
+    mocker.patch.dict("os.environ", {"OPENAI_API_KEY": "openai_api_key"})
+    if ClientRegistry in Singleton._instances:
+        del Singleton._instances[ClientRegistry]
+    yield
+
+
+def _embed(text: str) -> List[float]:
+    return np.random.default_rng(TEXTS.index(text)).normal(size=DIMENSIONS).tolist()
+
+
+def _local_vector_db(mocker: MockerFixture, config: LocalVectorDBConfig) -> LocalVectorDB:
+    vector_db = LocalVectorDB(config, aiohttp_session=mocker.MagicMock())
+
+    async def create_openai_embeddings(texts: List[str], **kwargs) -> List[List[float]]:
+        return [_embed(text) for text in texts]
+
+    mocker.patch.object(vector_db, "create_openai_embeddings", side_effect=create_openai_embeddings)
+    return vector_db
+
+
+@pytest.mark.asyncio
+async def test_search_filters_by_metadata(mocker: MockerFixture):
+    vector_db = _local_vector_db(mocker, LocalVectorDBConfig(top_k=2))
+    await vector_db.add_texts(
+        TEXTS, metadatas=[{"source": "faq" if i % 2 else "docs"} for i in range(len(TEXTS))]
+    )
+
+    results = await vector_db.similarity_search_with_score(TEXTS[3])
+    assert results[0][0].page_content == TEXTS[3]
+    assert results[0][1] == pytest.approx(1.0)
+
+    results = await vector_db.similarity_search_with_score(TEXTS[3], filter={"source": "docs"})
+    assert len(results) == 2
+    assert all(document.metadata == {"source": "docs"} for document, _ in results)
+    assert await vector_db.similarity_search_with_score(TEXTS[3], namespace="other") == []
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+@pytest.mark.asyncio
+async def test_save_and_load(mocker: MockerFixture, tmp_path, memory_map: bool):
+    config = LocalVectorDBConfig(
+        path=str(tmp_path),
+        index_type=LocalVectorIndexType.IVF,
+        num_lists=2,
+        min_vectors_to_train=10,
+        memory_map=memory_map,
+    )
+    vector_db = _local_vector_db(mocker, config)
+    await vector_db.add_texts(TEXTS[:10], namespace="a")
+    await vector_db.add_texts(TEXTS[10:], namespace="b")
+    vector_db.save()
+
+    loaded = _local_vector_db(mocker, config)
+    assert loaded.namespaces.keys() == {"a", "b"}
+    assert loaded.namespaces["b"].index.is_trained
+    assert isinstance(loaded.namespaces["b"].index.vectors, np.memmap) is memory_map
+
+    # saved back over the store it was loaded from
+    loaded.save()
+    reloaded = _local_vector_db(mocker, config)
+    for local_vector_db in (loaded, reloaded):
+        (document, _), *_ = await local_vector_db.similarity_search_with_score(
+            TEXTS[12], namespace="b"
+        )
+        assert document.page_content == TEXTS[12]
+
+
+@pytest.mark.asyncio
+async def test_adds_wait_for_training(mocker: MockerFixture):
+    vector_db = _local_vector_db(
+        mocker,
+        LocalVectorDBConfig(
+            index_type=LocalVectorIndexType.IVF, num_lists=2, min_vectors_to_train=10
+        ),
+    )
+    events: List[str] = []
+    add, train = VectorIndex.add, VectorIndex.train
+
+    def slow_train(index: VectorIndex, *args):
+        events.append("train started")
+        time.sleep(0.05)
+        train(index, *args)
+        events.append("train finished")
+
+    def record_add(index: VectorIndex, vectors: np.ndarray) -> np.ndarray:
+        events.append("add")
+        return add(index, vectors)
+
+    mocker.patch.object(VectorIndex, "train", autospec=True, side_effect=slow_train)
+    mocker.patch.object(VectorIndex, "add", autospec=True, side_effect=record_add)
+
+    # the second add's embeddings come back while the first add trains the index
+    await asyncio.gather(vector_db.add_texts(TEXTS[:10]), vector_db.add_texts(TEXTS[10:12]))
+
+    assert events == ["add", "train started", "train finished", "add"]
+    index = vector_db.namespaces[""].index
+    assert sorted(np.concatenate(index.lists)) == list(range(12))
@@ -0,0 +1,92 @@
+import os
+
+import numpy as np
+import pytest
+
+from vocode.streaming.vector_db.vector_index import VectorIndex
+
+DIMENSIONS = 16
+
+
+def _clustered_vectors(num_vectors: int, num_clusters: int = 20, seed: int = 0) -> np.ndarray:
+    random = np.random.default_rng(seed)
+    centers = random.normal(size=(num_clusters, DIMENSIONS))
+    return (
+        centers[random.integers(num_clusters, size=num_vectors)]
+        + random.normal(scale=0.1, size=(num_vectors, DIMENSIONS))
+    ).astype(np.float32)
+
+
+def test_flat_search_is_exact():
+    vectors = _clustered_vectors(1000)
+    index = VectorIndex(DIMENSIONS)
+    for start in range(0, len(vectors), 300):  # grows past its capacity
+        index.add(vectors[start : start + 300])
+    query = vectors[42] + 0.01
+
+    results = index.search(query, top_k=5)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    scores = normalized @ (query / np.linalg.norm(query))
+    assert [row for row, _ in results] == list(np.argsort(-scores)[:5])
+    assert [score for _, score in results] == pytest.approx(sorted(scores, reverse=True)[:5])
+
+
+def test_ivf_search_finds_the_nearest_neighbors():
+    vectors = _clustered_vectors(5000)
+    flat = VectorIndex(DIMENSIONS)
+    flat.add(vectors)
+    ivf = VectorIndex(DIMENSIONS, index_type="ivf", num_probes=4)
+    ivf.add(vectors)
+    ivf.train()
+    assert ivf.num_lists == 70
+    assert sum(len(list_rows) for list_rows in ivf.lists) == len(vectors)
+
+    queries = _clustered_vectors(50, seed=1)
+    num_found = sum(
+        len(
+            {row for row, _ in ivf.search(query, top_k=10)}
+            & {row for row, _ in flat.search(query, top_k=10)}
+        )
+        for query in queries
+    )
+    assert num_found / (10 * len(queries)) > 0.9
+
+    # vectors added after training go to their nearest list
+    (row,) = ivf.add(vectors[:1])
+    assert ivf.search(vectors[0], top_k=2)[1][0] in (0, row)
+
+
+def test_search_restricted_to_rows():
+    vectors = _clustered_vectors(100)
+    index = VectorIndex(DIMENSIONS)
+    index.add(vectors)
+    rows = np.array([3, 50, 70])
+    results = index.search(vectors[50], top_k=5, rows=rows)
+    assert [row for row, _ in results][0] == 50
+    assert {row for row, _ in results} == {3, 50, 70}
+    assert index.search(vectors[50], top_k=5, rows=np.array([], dtype=np.int64)) == []
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_save_and_load(tmp_path, memory_map: bool):
+    vectors = _clustered_vectors(500)
+    index = VectorIndex(DIMENSIONS, index_type="ivf", num_lists=10)
+    index.add(vectors)
+    index.train()
+    index.save(str(tmp_path))
+
+    loaded = VectorIndex.load(str(tmp_path), memory_map=memory_map)
+    assert isinstance(loaded.vectors, np.memmap) is memory_map
+    assert loaded.search(vectors[7], top_k=3) == index.search(vectors[7], top_k=3)
+
+    # saved back over the files it was loaded from
+    loaded.save(str(tmp_path))
+    assert isinstance(loaded.vectors, np.memmap) is memory_map
+    assert loaded.search(vectors[7], top_k=3) == index.search(vectors[7], top_k=3)
+    reloaded = VectorIndex.load(str(tmp_path), memory_map=memory_map)
+    assert reloaded.search(vectors[7], top_k=3) == index.search(vectors[7], top_k=3)
+    assert not [file_name for file_name in os.listdir(tmp_path) if file_name.endswith(".tmp")]
+
+    loaded.add(vectors[:2])  # copied into memory first, if memory-mapped
+    assert len(loaded) == 502
@@ -24,6 +24,11 @@ class ExecuteExternalActionVocodeActionConfig(
     speak_on_send: bool
     speak_on_receive: bool
     signature_secret: str
+    # responses of idempotent actions are reused for identical payloads for this long
+    idempotent: bool = False
+    response_cache_ttl_seconds: int = 300
+    # if set, requests made at the same time in a conversation are sent here together
+    batch_url: Optional[str] = None
 
 
 class ExecuteExternalActionParameters(BaseModel):
@@ -56,7 +61,9 @@ class ExecuteExternalAction(
             should_respond="always" if action_config.speak_on_send else "never",
             is_interruptible=False,
         )
-        self.external_actions_requester = ExternalActionsRequester(url=action_config.url)
+        self.external_actions_requester = ExternalActionsRequester(
+            url=action_config.url, batch_url=action_config.batch_url
+        )
 
     def _user_message_param_info(self):
         return {
@@ -83,6 +90,12 @@ class ExecuteExternalAction(
         return await self.external_actions_requester.send_request(
             payload=action_input.params.payload,
             signature_secret=self.action_config.signature_secret,
+            cache_ttl_seconds=(
+                self.action_config.response_cache_ttl_seconds
+                if self.action_config.idempotent
+                else None
+            ),
+            batch_key=action_input.conversation_id,
         )
 
     async def run(
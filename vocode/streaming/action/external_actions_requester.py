@@ -1,13 +1,30 @@
+import asyncio
 import base64
 import hashlib
 import hmac
 import json
-from typing import Any, Dict, Optional
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar, Union
 
 import httpx
 from loguru import logger
 from pydantic.v1 import BaseModel
 
+from vocode.streaming.utils.client_registry import HTTP2_AVAILABLE, POOL_LIMITS, ClientRegistry
+from vocode.streaming.utils.create_task import asyncio_create_task
+from vocode.streaming.utils.singleton import Singleton
+
+MAX_CACHED_RESPONSES = 1000
+# how long a request is held for other requests of the same conversation to join its batch
+BATCH_WINDOW_SECONDS = 0.01
+MAX_BATCH_SIZE = 10
+
+ValidatedResponseType = TypeVar("ValidatedResponseType")
+# (batch URL, batch key, signature secret, additional headers)
+PendingBatchKey = Tuple[str, Hashable, str, Tuple[Tuple[str, str], ...]]
+
 
 class ExternalActionValueError(ValueError):
     pass
@@ -43,9 +60,143 @@ class ExternalActionResponse(BaseModel):
     agent_message: Optional[str] = None
 
 
+class CachedExternalActionResponse:
+    def __init__(self, response: ExternalActionResponse, expires_at: float):
+        self.response = response
+        self.expires_at = expires_at
+
+
+class ExternalActionResponseCache(Singleton):
+    """Process-wide LRU cache of the successful responses of idempotent external actions, keyed
+    by the action's URL and the signature of the request payload."""
+
+    def __init__(self, max_entries: int = MAX_CACHED_RESPONSES):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str], CachedExternalActionResponse]" = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> Optional[ExternalActionResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry.response
+
+    def set(self, key: Tuple[str, str], response: ExternalActionResponse, ttl_seconds: float):
+        self.entries[key] = CachedExternalActionResponse(
+            response=response, expires_at=time.monotonic() + ttl_seconds
+        )
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class ExternalActionsBatch:
+    def __init__(self, signature_secret: str, additional_headers: Dict[str, str]):
+        self.signature_secret = signature_secret
+        self.additional_headers = additional_headers
+        self.requests: List[Dict[str, Any]] = []
+        self.responses: List[asyncio.Future] = []
+
+
+class ExternalActionsBatcher(Singleton):
+    """Joins the external action requests that a conversation makes together (e.g. for the tool
+    calls of one LLM response, which the actions worker runs concurrently) into a single request
+    to a batch endpoint.
+
+    Requests are held for at most BATCH_WINDOW_SECONDS, or until MAX_BATCH_SIZE have queued up.
+    Only requests sent with the same additional headers are batched together, since the batch
+    request carries them. The batch endpoint receives
+    {"requests": [{"url": ..., "payload": ...}, ...]}, signed like a single request, and must
+    respond with {"responses": [...]}: one single request response
+    (with "result" and optionally "agent_message") per request, in the same order.
+    """
+
+    def __init__(self):
+        # requests are only batched with requests sent with the same secret and headers
+        self.pending_batches: Dict[PendingBatchKey, ExternalActionsBatch] = {}
+
+    async def send_request(
+        self,
+        batch_url: str,
+        batch_key: Hashable,
+        request: Dict[str, Any],
+        signature_secret: str,
+        additional_headers: Dict[str, str] = {},
+    ) -> ExternalActionResponse:
+        pending_key = (
+            batch_url,
+            batch_key,
+            signature_secret,
+            tuple(sorted(additional_headers.items())),
+        )
+        batch = self.pending_batches.get(pending_key)
+        if batch is None:
+            batch = self.pending_batches[pending_key] = ExternalActionsBatch(
+                signature_secret=signature_secret, additional_headers=additional_headers
+            )
+            asyncio_create_task(self._send_batch_after_window(batch_url, pending_key, batch))
+        response: asyncio.Future = asyncio.get_running_loop().create_future()
+        batch.requests.append(request)
+        batch.responses.append(response)
+        if len(batch.requests) >= MAX_BATCH_SIZE:
+            self._send_batch(batch_url, pending_key, batch)
+        return await response
+
+    async def _send_batch_after_window(
+        self,
+        batch_url: str,
+        pending_key: PendingBatchKey,
+        batch: ExternalActionsBatch,
+    ):
+        await asyncio.sleep(BATCH_WINDOW_SECONDS)
+        if self.pending_batches.get(pending_key) is batch:
+            self._send_batch(batch_url, pending_key, batch)
+
+    def _send_batch(
+        self,
+        batch_url: str,
+        pending_key: PendingBatchKey,
+        batch: ExternalActionsBatch,
+    ):
+        del self.pending_batches[pending_key]
+        asyncio_create_task(self._resolve_batch(batch_url, batch))
+
+    async def _resolve_batch(self, batch_url: str, batch: ExternalActionsBatch):
+        try:
+            responses = await ExternalActionsRequester(batch_url).send_batch_request(
+                batch.requests,
+                signature_secret=batch.signature_secret,
+                additional_headers=batch.additional_headers,
+            )
+        except Exception as e:
+            for future in batch.responses:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, response in zip(batch.responses, responses):
+            if not future.done():
+                future.set_result(response)
+
+
 class ExternalActionsRequester:
-    def __init__(self, url: str) -> None:
+    def __init__(self, url: str, batch_url: Optional[str] = None) -> None:
         self.url = url
+        self.batch_url = batch_url
+
+    def _get_client(self) -> httpx.AsyncClient:
+        return ClientRegistry().get_client(
+            "external_actions",
+            self.url,
+            lambda: httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(
+                    retries=2, http2=HTTP2_AVAILABLE, limits=POOL_LIMITS
+                ),
+                timeout=10,
+            ),
+        )
 
     async def send_request(
         self,
@@ -53,32 +204,97 @@ class ExternalActionsRequester:
         signature_secret: str,
         additional_payload_values: Dict[str, Any] = {},
         additional_headers: Dict[str, str] = {},
-        transport: httpx.AsyncHTTPTransport = httpx.AsyncHTTPTransport(retries=2),
+        transport: Optional[httpx.AsyncHTTPTransport] = None,
+        cache_ttl_seconds: Optional[float] = None,
+        batch_key: Optional[Hashable] = None,
     ) -> ExternalActionResponse:
+        """Sends the request over a pooled connection to the URL, unless a transport is given.
+
+        If cache_ttl_seconds is set (for idempotent actions), a successful response is reused for
+        identical requests for that long. If the requester has a batch_url and a batch_key (e.g.
+        the conversation ID) is given, the request is sent along with the other requests made
+        with the same batch_key at the same time, see ExternalActionsBatcher.
+        """
         encoded_payload = json.dumps({"payload": payload} | additional_payload_values).encode(
             "utf-8"
         )
+        signature = self._encode_payload(encoded_payload, signature_secret)
+        cache_key = (self.url, signature)
+        if cache_ttl_seconds is not None:
+            cached_response = ExternalActionResponseCache().get(cache_key)
+            if cached_response is not None:
+                return cached_response
+
+        if self.batch_url is not None and batch_key is not None:
+            response = await ExternalActionsBatcher().send_request(
+                self.batch_url,
+                batch_key,
+                {"url": self.url, "payload": payload} | additional_payload_values,
+                signature_secret=signature_secret,
+                additional_headers=additional_headers,
+            )
+        else:
+            response = await self._send(
+                encoded_payload,
+                signature,
+                additional_headers,
+                transport,
+                self._validate_response,
+            )
+
+        if cache_ttl_seconds is not None and response.success:
+            ExternalActionResponseCache().set(cache_key, response, cache_ttl_seconds)
+        return response
+
+    async def send_batch_request(
+        self,
+        requests: List[Dict[str, Any]],
+        signature_secret: str,
+        additional_headers: Dict[str, str] = {},
+    ) -> List[ExternalActionResponse]:
+        encoded_payload = json.dumps({"requests": requests}).encode("utf-8")
+        response = await self._send(
+            encoded_payload,
+            self._encode_payload(encoded_payload, signature_secret),
+            additional_headers,
+            None,
+            lambda data: self._validate_batch_response(data, len(requests)),
+        )
+        if isinstance(response, ExternalActionResponse):  # the whole batch failed
+            return [response] * len(requests)
+        return response
 
+    async def _send(
+        self,
+        encoded_payload: bytes,
+        signature: str,
+        additional_headers: Dict[str, str],
+        transport: Optional[httpx.AsyncHTTPTransport],
+        validate_response: Callable[[Any], ValidatedResponseType],
+    ) -> Union[ValidatedResponseType, ExternalActionResponse]:
         headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
-            "x-vocode-signature": self._encode_payload(encoded_payload, signature_secret),
+            "x-vocode-signature": signature,
             **additional_headers,
         }
 
-        async with httpx.AsyncClient(
-            headers=headers,
-            transport=transport,
-            timeout=10,
-        ) as client:
+        async with AsyncExitStack() as exit_stack:
+            if transport is None:
+                client = self._get_client()
+            else:
+                client = await exit_stack.enter_async_context(
+                    httpx.AsyncClient(transport=transport, timeout=10)
+                )
             try:
                 response = await client.post(
                     self.url,
                     content=encoded_payload,
+                    headers=headers,
                 )
                 response.raise_for_status()
                 data = response.json()
-                return self._validate_response(data)
+                return validate_response(data)
             except httpx.HTTPStatusError as e:
                 logger.error(f"[External Actions] Request failed: {e}")
                 if e.response.status_code == 401:
@@ -134,3 +350,14 @@ class ExternalActionsRequester:
             agent_message=response.get("agent_message"),
             success=True,
         )
+
+    def _validate_batch_response(
+        self, response: Dict[str, Any], num_requests: int
+    ) -> List[ExternalActionResponse]:
+        if not isinstance(response.get("responses"), list):
+            raise ExternalActionValueError("Invalid batch response format: missing 'responses'")
+        if len(response["responses"]) != num_requests:
+            raise ExternalActionValueError(
+                "Invalid batch response format: expected one response per request"
+            )
+        return [self._validate_response(response) for response in response["responses"]]
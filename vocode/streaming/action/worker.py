@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+from typing import List, Union
+
+from loguru import logger
 
 from vocode.streaming.action.abstract_factory import AbstractActionFactory
 from vocode.streaming.action.default_factory import DefaultActionFactory
-from vocode.streaming.agent.base_agent import ActionResultAgentInput, AgentInput
-from vocode.streaming.models.actions import ActionInput
+from vocode.streaming.agent.base_agent import ActionResult, ActionResultAgentInput, AgentInput
+from vocode.streaming.models.actions import ActionInput, ActionInputBatch
 from vocode.streaming.utils.state_manager import (
     AbstractConversationStateManager,
     TwilioPhoneConversationStateManager,
@@ -18,6 +21,8 @@ from vocode.streaming.utils.worker import (
     InterruptibleWorker,
 )
 
+DEFAULT_MAX_CONCURRENT_ACTIONS = 4
+
 
 class ActionsWorker(InterruptibleWorker):
     consumer: AbstractWorker[InterruptibleEvent[ActionResultAgentInput]]
@@ -26,28 +31,51 @@ class ActionsWorker(InterruptibleWorker):
         self,
         action_factory: AbstractActionFactory,
         interruptible_event_factory: InterruptibleEventFactory = InterruptibleEventFactory(),
+        max_concurrent_actions: int = DEFAULT_MAX_CONCURRENT_ACTIONS,
     ):
         super().__init__(
             interruptible_event_factory=interruptible_event_factory,
         )
         self.action_factory = action_factory
+        # one worker per conversation, so this limits the conversation's concurrent actions
+        self.action_semaphore = asyncio.Semaphore(max_concurrent_actions)
 
     def attach_conversation_state_manager(
         self, conversation_state_manager: AbstractConversationStateManager
     ):
         self.conversation_state_manager = conversation_state_manager
 
-    async def process(self, item: InterruptibleEvent[ActionInput]):
-        action_input = item.payload
-        action = self.action_factory.create_action(action_input.action_config)
-        action.attach_conversation_state_manager(self.conversation_state_manager)
-        action_output = await action.run(action_input)
+    async def process(self, item: InterruptibleEvent[Union[ActionInput, ActionInputBatch]]):
+        if isinstance(item.payload, ActionInputBatch):
+            action_inputs = item.payload.action_inputs
+            maybe_action_results = await asyncio.gather(
+                *(self.run_action(action_input) for action_input in action_inputs),
+                return_exceptions=True,
+            )
+            action_results: List[ActionResult] = []
+            for action_input, maybe_action_result in zip(action_inputs, maybe_action_results):
+                if isinstance(maybe_action_result, ActionResult):
+                    action_results.append(maybe_action_result)
+                else:
+                    logger.error(
+                        f"Action {action_input.action_config.type} failed",
+                        exc_info=maybe_action_result,
+                    )
+            if not action_results:
+                return
+        else:
+            action_results = [await self.run_action(item.payload)]
+        if item.is_interrupted():
+            # e.g. started before the end of a response that was then cut short
+            logger.debug("Dropping the result of an interrupted action")
+            return
+        first_action_result, *other_action_results = action_results
         self.consumer.consume_nonblocking(
             self.interruptible_event_factory.create_interruptible_event(
                 ActionResultAgentInput(
-                    conversation_id=action_input.conversation_id,
-                    action_input=action_input,
-                    action_output=action_output,
+                    conversation_id=first_action_result.action_input.conversation_id,
+                    action_input=first_action_result.action_input,
+                    action_output=first_action_result.action_output,
                     vonage_uuid=(
                         self.conversation_state_manager.get_vonage_uuid()
                         if isinstance(
@@ -62,8 +90,20 @@ class ActionsWorker(InterruptibleWorker):
                         )
                         else None
                     ),
-                    is_quiet=action.quiet,
+                    is_quiet=first_action_result.is_quiet,
+                    other_action_results=other_action_results,
                 ),
                 is_interruptible=False,
             )
         )
+
+    async def run_action(self, action_input: ActionInput) -> ActionResult:
+        action = self.action_factory.create_action(action_input.action_config)
+        action.attach_conversation_state_manager(self.conversation_state_manager)
+        async with self.action_semaphore:
+            action_output = await action.run(action_input)
+        return ActionResult(
+            action_input=action_input,
+            action_output=action_output,
+            is_quiet=action.quiet,
+        )
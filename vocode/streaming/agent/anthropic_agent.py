@@ -1,3 +1,4 @@
+import functools
 import os
 from typing import Any, AsyncGenerator, Dict
 
@@ -10,10 +11,16 @@ from vocode.streaming.action.abstract_factory import AbstractActionFactory
 from vocode.streaming.action.default_factory import DefaultActionFactory
 from vocode.streaming.agent.anthropic_utils import format_anthropic_chat_messages_from_transcript
 from vocode.streaming.agent.base_agent import GeneratedResponse, RespondAgent, StreamedResponse
+from vocode.streaming.agent.response_cache import (
+    LLMResponseCache,
+    get_response_cache_key,
+    should_cache_response,
+)
 from vocode.streaming.agent.streaming_utils import collate_response_async, stream_response_async
 from vocode.streaming.models.actions import FunctionFragment
 from vocode.streaming.models.agent import AnthropicAgentConfig
 from vocode.streaming.models.message import BaseMessage, LLMToken
+from vocode.streaming.utils.client_registry import ClientRegistry
 from vocode.streaming.vector_db.factory import VectorDBFactory
 from vocode.utils.sentry_utils import CustomSentrySpans, sentry_create_span
 
@@ -33,7 +40,10 @@ class AnthropicAgent(RespondAgent[AnthropicAgentConfig]):
             action_factory=action_factory,
             **kwargs,
         )
-        self.anthropic_client = AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        api_key = os.environ.get("ANTHROPIC_API_KEY")
+        self.anthropic_client = ClientRegistry().get_client(
+            "anthropic", api_key, lambda: AsyncAnthropic(api_key=api_key)
+        )
 
     def get_chat_parameters(self, messages: list = [], use_functions: bool = True):
         assert self.transcript is not None
@@ -61,6 +71,12 @@ class AnthropicAgent(RespondAgent[AnthropicAgentConfig]):
     async def _get_anthropic_stream(self, chat_parameters: Dict[str, Any]):
         return await self.anthropic_client.messages.create(**chat_parameters)
 
+    async def _stream_tokens(
+        self, chat_parameters: Dict[str, Any]
+    ) -> AsyncGenerator[str | FunctionFragment, None]:
+        async for token in self.token_generator(await self._get_anthropic_stream(chat_parameters)):
+            yield token
+
     async def generate_response(
         self,
         human_input,
@@ -80,7 +96,15 @@ class AnthropicAgent(RespondAgent[AnthropicAgentConfig]):
             ttft_span = sentry_create_span(
                 sentry_callable=sentry_sdk.start_span, op=CustomSentrySpans.TIME_TO_FIRST_TOKEN
             )
-            stream = await self._get_anthropic_stream(chat_parameters)
+            cache_config = self.agent_config.response_cache
+            if cache_config is not None and should_cache_response(cache_config, chat_parameters):
+                tokens = LLMResponseCache().stream(
+                    get_response_cache_key("anthropic", chat_parameters),
+                    cache_config,
+                    lambda: self._stream_tokens(chat_parameters),
+                )
+            else:
+                tokens = self.token_generator(await self._get_anthropic_stream(chat_parameters))
         except Exception as e:
             logger.error(
                 f"Error while hitting Anthropic with chat_parameters: {chat_parameters}",
@@ -88,18 +112,22 @@ class AnthropicAgent(RespondAgent[AnthropicAgentConfig]):
             )
             raise e
 
-        response_generator = collate_response_async
-
         using_input_streaming_synthesizer = (
             self.conversation_state_manager.using_input_streaming_synthesizer()
         )
         if using_input_streaming_synthesizer:
-            response_generator = stream_response_async
+            response_generator = functools.partial(
+                stream_response_async,
+                max_batch_delay_seconds=self.agent_config.streamed_token_batch_delay_seconds,
+            )
+        else:
+            response_generator = functools.partial(
+                collate_response_async,
+                first_chunk_min_words=self.agent_config.first_chunk_min_words,
+            )
         async for message in response_generator(
             conversation_id=conversation_id,
-            gen=self.token_generator(
-                stream,
-            ),
+            gen=tokens,
             sentry_span=ttft_span,
         ):
             if first_sentence_total_span:
@@ -112,7 +140,7 @@ class AnthropicAgent(RespondAgent[AnthropicAgentConfig]):
 
             if isinstance(message, str):
                 yield ResponseClass(
-                    message=MessageType(text=message),
+                    message=MessageType.construct(text=message),  # a str, no need to validate
                     is_interruptible=True,
                 )
             else:
@@ -4,10 +4,24 @@ import asyncio
 import json
 import random
 import typing
+from dataclasses import dataclass
 from enum import Enum
-from typing import TYPE_CHECKING, AsyncGenerator, Dict, Generic, Optional, Tuple, TypeVar, Union
+from typing import (
+    TYPE_CHECKING,
+    AsyncGenerator,
+    ClassVar,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import sentry_sdk
+from jsonschema import Draft202012Validator as SchemaValidator
 from loguru import logger
 from pydantic.v1 import BaseModel
 
@@ -22,9 +36,11 @@ from vocode.streaming.action.phone_call_action import (
 )
 from vocode.streaming.agent.goodbye import is_goodbye_simple
 from vocode.streaming.agent.phrase_trigger import matches_phrase_trigger
+from vocode.streaming.agent.speculative_response import ResponseSpeculator
 from vocode.streaming.models.actions import (
     ActionConfig,
     ActionInput,
+    ActionInputBatch,
     ActionOutput,
     EndOfTurn,
     FunctionCall,
@@ -34,7 +50,7 @@ from vocode.streaming.models.events import Sender
 from vocode.streaming.models.message import BaseMessage, BotBackchannel, SilenceMessage
 from vocode.streaming.models.model import TypedModel
 from vocode.streaming.models.transcriber import Transcription
-from vocode.streaming.models.transcript import Message, Transcript
+from vocode.streaming.models.transcript import Transcript
 from vocode.streaming.utils import unrepeating_randomizer
 from vocode.streaming.utils.speed_manager import SpeedManager
 from vocode.streaming.utils.worker import (
@@ -82,10 +98,28 @@ class TranscriptionAgentInput(AgentInput, type=AgentInputType.TRANSCRIPTION.valu
     transcription: Transcription
 
 
+class ActionResult(BaseModel):
+    action_input: ActionInput
+    action_output: ActionOutput
+    is_quiet: bool = False
+
+
 class ActionResultAgentInput(AgentInput, type=AgentInputType.ACTION_RESULT.value):  # type: ignore
     action_input: ActionInput
     action_output: ActionOutput
     is_quiet: bool = False
+    # the results of the other actions run for the same response, responded to together
+    other_action_results: List[ActionResult] = []
+
+    def get_action_results(self) -> List[ActionResult]:
+        return [
+            ActionResult(
+                action_input=self.action_input,
+                action_output=self.action_output,
+                is_quiet=self.is_quiet,
+            ),
+            *self.other_action_results,
+        ]
 
 
 class AgentResponseType(str, Enum):
@@ -95,36 +129,43 @@ class AgentResponseType(str, Enum):
     FILLER_AUDIO = "agent_response_filler_audio"
 
 
-class AgentResponse(TypedModel, type=AgentResponseType.BASE.value):  # type: ignore
-    pass
+# Agent responses and generated responses are created per sentence (or per token with input
+# streaming synthesizers) and never leave the process, so they are slotted dataclasses rather
+# than validated pydantic models.
+@dataclass(slots=True)
+class AgentResponse:
+    type: ClassVar[AgentResponseType] = AgentResponseType.BASE
 
 
-class AgentResponseMessage(AgentResponse, type=AgentResponseType.MESSAGE.value):  # type: ignore
+@dataclass(slots=True)
+class AgentResponseMessage(AgentResponse):
     message: Union[BaseMessage, EndOfTurn]
     is_interruptible: bool = True
     # Whether the message is the first message in the response; has metrics implications
     is_first: bool = False
     # If the response is not being chunked up into multiple sentences, this is set to True
     is_sole_text_chunk: bool = False
+    type: ClassVar[AgentResponseType] = AgentResponseType.MESSAGE
 
 
-class AgentResponseStop(AgentResponse, type=AgentResponseType.STOP.value):  # type: ignore
-    pass
+@dataclass(slots=True)
+class AgentResponseStop(AgentResponse):
+    type: ClassVar[AgentResponseType] = AgentResponseType.STOP
 
 
-class AgentResponseFillerAudio(
-    AgentResponse,
-    type=AgentResponseType.FILLER_AUDIO.value,  # type: ignore
-):
-    pass
+@dataclass(slots=True)
+class AgentResponseFillerAudio(AgentResponse):
+    type: ClassVar[AgentResponseType] = AgentResponseType.FILLER_AUDIO
 
 
-class GeneratedResponse(BaseModel):
+@dataclass(slots=True)
+class GeneratedResponse:
     message: Union[BaseMessage, FunctionCall, EndOfTurn]
     is_interruptible: bool
     streamed: bool = False
 
 
+@dataclass(slots=True)
 class StreamedResponse(GeneratedResponse):
     streamed: bool = True
 
@@ -156,7 +197,9 @@ class AbstractAgent(Generic[AgentConfigType]):
 
 class BaseAgent(AbstractAgent[AgentConfigType], InterruptibleWorker):
     agent_responses_consumer: AbstractWorker[InterruptibleAgentResponseEvent[AgentResponse]]
-    actions_consumer: Optional[AbstractWorker[InterruptibleEvent[ActionInput]]]
+    actions_consumer: Optional[
+        AbstractWorker[InterruptibleEvent[Union[ActionInput, ActionInputBatch]]]
+    ]
 
     def __init__(
         self,
@@ -174,6 +217,7 @@ class BaseAgent(AbstractAgent[AgentConfigType], InterruptibleWorker):
         self.transcript: Optional[Transcript] = None
 
         self.functions = self.get_functions() if self.agent_config.actions else None
+        self.function_parameters_validators: Dict[str, Optional[SchemaValidator]] = {}
         self.is_muted = False
 
         self.post_question_bot_backchannel_randomizer = unrepeating_randomizer(
@@ -209,19 +253,52 @@ class BaseAgent(AbstractAgent[AgentConfigType], InterruptibleWorker):
     ) -> asyncio.Queue[InterruptibleEvent[AgentInput]]:
         return self.input_queue
 
+    def observe_interim_transcription(self, transcription: Transcription, conversation_id: str):
+        """Called with each interim transcription that the agent will respond to once final."""
+        pass
+
     def is_first_response(self):
         assert self.transcript is not None
 
-        num_bot_messages = sum(
-            1
-            for event_log in self.transcript.event_logs
-            if isinstance(event_log, Message) and event_log.sender == Sender.BOT
-        )
-
+        num_bot_messages = self.transcript.get_num_messages(Sender.BOT)
         return num_bot_messages <= (1 if self.agent_config.initial_message is not None else 0)
 
 
 class RespondAgent(BaseAgent[AgentConfigType]):
+    response_speculator: Optional[ResponseSpeculator] = None
+
+    def get_speculation_context(self) -> Hashable:
+        """What a response depends on besides the human's utterance: a speculative response is
+        only used if this is unchanged when the final transcription arrives. Earlier event logs
+        are append-only, so the number of logs and the latest one (e.g. a bot message that gets
+        cut off) are enough."""
+        assert self.transcript is not None
+        event_logs = self.transcript.event_logs
+        return (len(event_logs), event_logs[-1].to_string() if event_logs else None)
+
+    def observe_interim_transcription(self, transcription: Transcription, conversation_id: str):
+        if (
+            self.response_speculator is None
+            or not self.agent_config.generate_responses
+            or self.is_muted
+        ):
+            return
+        self.response_speculator.observe_interim(
+            transcription.message,
+            conversation_id=conversation_id,
+            context=self.get_speculation_context(),
+            bot_was_in_medias_res=transcription.bot_was_in_medias_res,
+        )
+
+    def generate_speculative_response(
+        self,
+        human_input: str,
+        conversation_id: str,
+        bot_was_in_medias_res: bool = False,
+    ) -> AsyncGenerator[GeneratedResponse, None]:
+        """Like generate_response, but for a human message that isn't in the transcript yet."""
+        raise NotImplementedError
+
     async def _maybe_prepend_interrupt_responses(
         self,
         transcription: Transcription,
@@ -248,11 +325,13 @@ class RespondAgent(BaseAgent[AgentConfigType]):
         self,
         transcription: Transcription,
         agent_input: AgentInput,
+        speculative_responses: Optional[AsyncGenerator[GeneratedResponse, None]] = None,
     ) -> bool:
         conversation_id = agent_input.conversation_id
         responses = self._maybe_prepend_interrupt_responses(
             transcription=transcription,
-            responses_stream=self.generate_response(
+            responses_stream=speculative_responses
+            or self.generate_response(
                 transcription.message,
                 is_interrupt=transcription.is_interrupt,
                 conversation_id=conversation_id,
@@ -260,65 +339,80 @@ class RespondAgent(BaseAgent[AgentConfigType]):
             ),
         )
         is_first_response_of_turn = True
-        function_call = None
+        function_calls: List[FunctionCall] = []
 
         responses_buffer = ""
         end_of_turn_agent_response_tracker = None
 
-        async for generated_response in responses:
-            if is_first_response_of_turn:
-                message_type = "UNKNOWN"
-                match generated_response.message:
-                    case SilenceMessage():  # type: ignore[misc]
-                        message_type = "silence"
-                    case BotBackchannel():  # type: ignore[misc]
-                        message_type = "backchannel"
-                    case BaseMessage():  # type: ignore[misc]
-                        message_type = "message"
-                    case FunctionCall():  # type: ignore[misc]
-                        message_type = "function_call"
-                    case _:
-                        logger.warning(
-                            "Unknown message type received for Sentry metrics "
-                            f"reporting: {type(generated_response.message)}",
+        # actions started before the response ended, to drop if the response doesn't complete
+        early_action_events: List[InterruptibleEvent] = []
+        try:
+            async for generated_response in responses:
+                if is_first_response_of_turn:
+                    message_type = "UNKNOWN"
+                    match generated_response.message:
+                        case SilenceMessage():  # type: ignore[misc]
+                            message_type = "silence"
+                        case BotBackchannel():  # type: ignore[misc]
+                            message_type = "backchannel"
+                        case BaseMessage():  # type: ignore[misc]
+                            message_type = "message"
+                        case FunctionCall():  # type: ignore[misc]
+                            message_type = "function_call"
+                        case _:
+                            logger.warning(
+                                "Unknown message type received for Sentry metrics "
+                                f"reporting: {type(generated_response.message)}",
+                            )
+                    span_tags = sentry_span_tags.value
+                    if span_tags:
+                        span_tags["message_type"] = message_type
+                        sentry_span_tags.set(span_tags)
+
+                if isinstance(generated_response.message, FunctionCall):
+                    if self._can_call_function_early(generated_response.message):
+                        # start the action while the rest of the response streams in
+                        early_action_event = self._call_function_early(
+                            generated_response.message, agent_input
                         )
-                span_tags = sentry_span_tags.value
-                if span_tags:
-                    span_tags["message_type"] = message_type
-                    sentry_span_tags.set(span_tags)
-
-            if isinstance(generated_response.message, FunctionCall):
-                function_call = generated_response.message
-                continue
+                        if early_action_event is not None:
+                            early_action_events.append(early_action_event)
+                    else:
+                        function_calls.append(generated_response.message)
+                    continue
 
-            agent_response_tracker = agent_input.agent_response_tracker or asyncio.Event()
-            self.agent_responses_consumer.consume_nonblocking(
-                self.interruptible_event_factory.create_interruptible_agent_response_event(
-                    AgentResponseMessage(
-                        message=generated_response.message,
-                        is_first=is_first_response_of_turn,
+                agent_response_tracker = agent_input.agent_response_tracker or asyncio.Event()
+                self.agent_responses_consumer.consume_nonblocking(
+                    self.interruptible_event_factory.create_interruptible_agent_response_event(
+                        AgentResponseMessage(
+                            message=generated_response.message,
+                            is_first=is_first_response_of_turn,
+                        ),
+                        is_interruptible=self.agent_config.allow_agent_to_be_cut_off
+                        and generated_response.is_interruptible,
+                        agent_response_tracker=agent_response_tracker,
                     ),
-                    is_interruptible=self.agent_config.allow_agent_to_be_cut_off
-                    and generated_response.is_interruptible,
-                    agent_response_tracker=agent_response_tracker,
-                ),
-            )
-            if isinstance(generated_response.message, BaseMessage):
-                responses_buffer = f"{responses_buffer} {generated_response.message.text}"
-            elif isinstance(generated_response.message, EndOfTurn):
-                end_of_turn_agent_response_tracker = agent_response_tracker
-
-            if self.agent_config.end_conversation_on_goodbye and isinstance(
-                generated_response.message,
-                BaseMessage,
-            ):
-                if is_goodbye_simple(
-                    message=generated_response.message.text,
-                    phrases=self.agent_config.goodbye_phrases,
+                )
+                if isinstance(generated_response.message, BaseMessage):
+                    responses_buffer = f"{responses_buffer} {generated_response.message.text}"
+                elif isinstance(generated_response.message, EndOfTurn):
+                    end_of_turn_agent_response_tracker = agent_response_tracker
+
+                if self.agent_config.end_conversation_on_goodbye and isinstance(
+                    generated_response.message,
+                    BaseMessage,
                 ):
-                    logger.debug("Simple goodbye detected, ending conversation")
-                    return True
-            is_first_response_of_turn = False
+                    if is_goodbye_simple(
+                        message=generated_response.message.text,
+                        phrases=self.agent_config.goodbye_phrases,
+                    ):
+                        logger.debug("Simple goodbye detected, ending conversation")
+                        self._interrupt_early_function_calls(early_action_events)
+                        return True
+                is_first_response_of_turn = False
+        except asyncio.CancelledError:
+            self._interrupt_early_function_calls(early_action_events)
+            raise
 
         # if the client (the implemented agent) doesn't create an EndOfTurn, then we need to create one
         if not end_of_turn_agent_response_tracker:
@@ -352,8 +446,8 @@ class RespondAgent(BaseAgent[AgentConfigType]):
             self.enqueue_action_input(action, action_input, agent_input.conversation_id)
 
         # TODO: implement should_stop for generate_responses
-        if function_call and self.agent_config.actions is not None:
-            await self.call_function(function_call, agent_input)
+        if function_calls and self.agent_config.actions is not None:
+            await self.call_functions(function_calls, agent_input)
         return False
 
     async def handle_respond(self, transcription: Transcription, conversation_id: str) -> bool:
@@ -389,27 +483,49 @@ class RespondAgent(BaseAgent[AgentConfigType]):
         assert self.transcript is not None
         try:
             agent_input = item.payload
+            speculative_responses = None
             if isinstance(agent_input, TranscriptionAgentInput):
                 transcription = typing.cast(TranscriptionAgentInput, agent_input).transcription
+                if (
+                    self.response_speculator is not None
+                    and self.agent_config.generate_responses
+                    and not self.is_muted
+                ):
+                    # claimed before the human message is added, matching the speculation context
+                    speculative_responses = self.response_speculator.claim(
+                        transcription.message,
+                        context=self.get_speculation_context(),
+                        bot_was_in_medias_res=transcription.bot_was_in_medias_res,
+                    )
                 self.transcript.add_human_message(
                     text=transcription.message,
                     conversation_id=agent_input.conversation_id,
                 )
             elif isinstance(agent_input, ActionResultAgentInput):
-                self.transcript.add_action_finish_log(
-                    action_input=agent_input.action_input,
-                    action_output=agent_input.action_output,
-                    conversation_id=agent_input.conversation_id,
-                )
-                if agent_input.is_quiet:
+                action_results = agent_input.get_action_results()
+                for action_result in action_results:
+                    self.transcript.add_action_finish_log(
+                        action_input=action_result.action_input,
+                        action_output=action_result.action_output,
+                        conversation_id=agent_input.conversation_id,
+                    )
+                action_results = [
+                    action_result for action_result in action_results if not action_result.is_quiet
+                ]
+                if not action_results:
                     # Do not generate a response to quiet actions
                     logger.debug("Action is quiet, skipping response generation")
                     return
-                if agent_input.action_output.canned_response is not None:
+                canned_response = (
+                    action_results[0].action_output.canned_response
+                    if len(action_results) == 1
+                    else None
+                )
+                if canned_response is not None:
                     self.agent_responses_consumer.consume_nonblocking(
                         self.interruptible_event_factory.create_interruptible_agent_response_event(
                             AgentResponseMessage(
-                                message=agent_input.action_output.canned_response,
+                                message=canned_response,
                                 is_sole_text_chunk=True,
                             ),
                             is_interruptible=True,
@@ -422,7 +538,16 @@ class RespondAgent(BaseAgent[AgentConfigType]):
                     )
                     return
                 transcription = Transcription(
-                    message=agent_input.action_output.response.json(),
+                    message=(
+                        action_results[0].action_output.response.json()
+                        if len(action_results) == 1
+                        else "[{}]".format(
+                            ", ".join(
+                                action_result.action_output.response.json()
+                                for action_result in action_results
+                            )
+                        )
+                    ),
                     confidence=1.0,
                     is_final=True,
                 )
@@ -449,7 +574,9 @@ class RespondAgent(BaseAgent[AgentConfigType]):
                         sentry_callable=sentry_sdk.start_span,
                         op=CustomSentrySpans.LANGUAGE_MODEL_TIME_TO_FIRST_TOKEN,
                     )
-                should_stop = await self.handle_generate_response(transcription, agent_input)
+                should_stop = await self.handle_generate_response(
+                    transcription, agent_input, speculative_responses=speculative_responses
+                )
             else:
                 should_stop = await self.handle_respond(transcription, agent_input.conversation_id)
 
@@ -475,11 +602,92 @@ class RespondAgent(BaseAgent[AgentConfigType]):
                 return action_config
         return None
 
+    def may_call_several_functions(self) -> bool:
+        """Whether a single response can call several functions, which are then called together,
+        as one batch, once the response has ended."""
+        return False
+
+    def _get_function_parameters_validator(self, function_name: str) -> Optional[SchemaValidator]:
+        if function_name not in self.function_parameters_validators:
+            action_config = self._get_action_config(function_name)
+            self.function_parameters_validators[function_name] = (
+                SchemaValidator(
+                    self.action_factory.create_action(action_config).get_parameters_schema()
+                )
+                if action_config is not None
+                else None
+            )
+        return self.function_parameters_validators[function_name]
+
+    def _can_call_function_early(self, function_call: FunctionCall) -> bool:
+        """Whether function_call can be called before the response ends: it has to be the only
+        call of the response, its arguments valid parameters of its action and its action
+        interruptible.
+
+        Calls with a user_message are left to the end of the response, since the message (and
+        its EndOfTurn) would otherwise be spoken in the middle of the response. The action has to
+        be interruptible so that it can be dropped with the response: an interruption of the
+        response interrupts it too, and _interrupt_early_function_calls drops it if the response
+        is cut short or ends the conversation."""
+        if self.agent_config.actions is None or self.may_call_several_functions():
+            return False
+        parameters_validator = self._get_function_parameters_validator(function_call.name)
+        if parameters_validator is None:
+            return False
+        params = json.loads(function_call.arguments)
+        if "user_message" in params:
+            return False
+        if not parameters_validator.is_valid(params):
+            logger.debug(f"Arguments of {function_call.name} don't match its parameters schema")
+            return False
+        action_config = self._get_action_config(function_call.name)
+        assert action_config is not None
+        return self.action_factory.create_action(action_config).is_interruptible
+
+    def _call_function_early(
+        self, function_call: FunctionCall, agent_input: AgentInput
+    ) -> Optional[InterruptibleEvent]:
+        action_and_input = self._create_function_call_action_input(function_call, agent_input)
+        if action_and_input is None:
+            return None
+        action, action_input = action_and_input
+        return self.enqueue_action_input(action, action_input, agent_input.conversation_id)
+
+    def _interrupt_early_function_calls(self, early_action_events: List[InterruptibleEvent]):
+        """Drops the actions started before a response that didn't complete: an action that
+        hasn't started is skipped, and the result of one that has isn't responded to."""
+        for early_action_event in early_action_events:
+            early_action_event.interrupt()
+
     async def call_function(self, function_call: FunctionCall, agent_input: AgentInput):
+        action_and_input = self._create_function_call_action_input(function_call, agent_input)
+        if action_and_input is not None:
+            action, action_input = action_and_input
+            self.enqueue_action_input(action, action_input, agent_input.conversation_id)
+
+    async def call_functions(self, function_calls: List[FunctionCall], agent_input: AgentInput):
+        """Calls the functions of a response; several are run concurrently, as one batch."""
+        if len(function_calls) == 1:
+            await self.call_function(function_calls[0], agent_input)
+            return
+        actions_and_inputs = []
+        for function_call in function_calls:
+            action_and_input = self._create_function_call_action_input(function_call, agent_input)
+            if action_and_input is not None:
+                actions_and_inputs.append(action_and_input)
+        if len(actions_and_inputs) == 1:
+            action, action_input = actions_and_inputs[0]
+            self.enqueue_action_input(action, action_input, agent_input.conversation_id)
+        elif actions_and_inputs:
+            self.enqueue_action_input_batch(actions_and_inputs, agent_input.conversation_id)
+
+    def _create_function_call_action_input(
+        self, function_call: FunctionCall, agent_input: AgentInput
+    ) -> Optional[Tuple[BaseAction, ActionInput]]:
         action_config = self._get_action_config(function_call.name)
         if action_config is None:
             logger.error(f"Function {function_call.name} not found in agent config, skipping")
-            return
+            return None
         action = self.action_factory.create_action(action_config)
         params = json.loads(function_call.arguments)
         user_message_tracker = None
@@ -502,7 +710,8 @@ class RespondAgent(BaseAgent[AgentConfigType]):
                 )
             )
         action_input = self.create_action_input(action, agent_input, params, user_message_tracker)
-        self.enqueue_action_input(action, action_input, agent_input.conversation_id)
+        action_input.tool_call_id = function_call.tool_call_id
+        return action, action_input
 
     def create_action_input(
         self,
@@ -545,10 +754,10 @@ class RespondAgent(BaseAgent[AgentConfigType]):
         action: BaseAction,
         action_input: ActionInput,
         conversation_id: str,
-    ):
+    ) -> Optional[InterruptibleEvent]:
         if self.actions_consumer is None:
             logger.warning("No actions consumer attached, skipping action")
-            return
+            return None
         event = self.interruptible_event_factory.create_interruptible_event(
             action_input,
             is_interruptible=action.is_interruptible,
@@ -559,6 +768,29 @@ class RespondAgent(BaseAgent[AgentConfigType]):
             conversation_id=conversation_id,
         )
         self.actions_consumer.consume_nonblocking(event)
+        return event
+
+    def enqueue_action_input_batch(
+        self,
+        actions_and_inputs: List[Tuple[BaseAction, ActionInput]],
+        conversation_id: str,
+    ):
+        if self.actions_consumer is None:
+            logger.warning("No actions consumer attached, skipping actions")
+            return
+        assert self.transcript is not None
+        for _, action_input in actions_and_inputs:
+            self.transcript.add_action_start_log(
+                action_input=action_input,
+                conversation_id=conversation_id,
+            )
+        event = self.interruptible_event_factory.create_interruptible_event(
+            ActionInputBatch(
+                action_inputs=[action_input for _, action_input in actions_and_inputs]
+            ),
+            is_interruptible=all(action.is_interruptible for action, _ in actions_and_inputs),
+        )
+        self.actions_consumer.consume_nonblocking(event)
 
     async def respond(
         self,
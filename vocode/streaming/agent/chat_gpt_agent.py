@@ -1,6 +1,20 @@
+import asyncio
+import functools
 import os
 import random
-from typing import Any, AsyncGenerator, Dict, List, Optional, TypeVar, Union
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import sentry_sdk
 from loguru import logger
@@ -11,51 +25,89 @@ from vocode import sentry_span_tags
 from vocode.streaming.action.abstract_factory import AbstractActionFactory
 from vocode.streaming.action.default_factory import DefaultActionFactory
 from vocode.streaming.agent.base_agent import GeneratedResponse, RespondAgent, StreamedResponse
+from vocode.streaming.agent.hedged_request import RequestHedger
+from vocode.streaming.agent.model_router import ModelRoute, ModelRouter
 from vocode.streaming.agent.openai_utils import (
-    format_openai_chat_messages_from_transcript,
+    OpenAIChatPromptBuilder,
     openai_get_tokens,
     vector_db_result_to_openai_chat_message,
 )
+from vocode.streaming.agent.response_cache import (
+    LLMResponseCache,
+    get_response_cache_key,
+    should_cache_response,
+)
+from vocode.streaming.agent.retrieval_prefetcher import RetrievalPrefetcher
+from vocode.streaming.agent.rolling_summary import (
+    BaseConversationSummarizer,
+    OpenAIConversationSummarizer,
+    RollingSummary,
+)
+from vocode.streaming.agent.speculative_response import ResponseSpeculator
 from vocode.streaming.agent.streaming_utils import collate_response_async, stream_response_async
-from vocode.streaming.models.actions import FunctionCallActionTrigger
+from vocode.streaming.models.actions import FunctionCallActionTrigger, FunctionFragment
 from vocode.streaming.models.agent import ChatGPTAgentConfig
 from vocode.streaming.models.events import Sender
 from vocode.streaming.models.message import BaseMessage, BotBackchannel, LLMToken
-from vocode.streaming.models.transcript import Message
+from vocode.streaming.models.transcriber import Transcription
+from vocode.streaming.models.transcript import Message, Transcript
+from vocode.streaming.utils.client_registry import ClientRegistry, create_openai_http_client
+from vocode.streaming.utils.create_task import asyncio_create_task
 from vocode.streaming.vector_db.factory import VectorDBFactory
 from vocode.utils.sentry_utils import CustomSentrySpans, sentry_create_span
 
+if TYPE_CHECKING:
+    from langchain.docstore.document import Document
+
+DocumentsWithScores = List[Tuple["Document", float]]
+
 ChatGPTAgentConfigType = TypeVar("ChatGPTAgentConfigType", bound=ChatGPTAgentConfig)
 
 
 def instantiate_openai_client(agent_config: ChatGPTAgentConfig, model_fallback: bool = False):
+    max_retries = 0 if model_fallback else OPENAI_DEFAULT_MAX_RETRIES
     if agent_config.azure_params:
-        return AsyncAzureOpenAI(
-            azure_endpoint=agent_config.azure_params.base_url,
-            api_key=agent_config.azure_params.api_key,
-            api_version=agent_config.azure_params.api_version,
-            max_retries=0 if model_fallback else OPENAI_DEFAULT_MAX_RETRIES,
+        azure_params = agent_config.azure_params
+        return ClientRegistry().get_client(
+            "azure_openai",
+            (azure_params.base_url, azure_params.api_key, azure_params.api_version, max_retries),
+            lambda: AsyncAzureOpenAI(
+                azure_endpoint=azure_params.base_url,
+                api_key=azure_params.api_key,
+                api_version=azure_params.api_version,
+                max_retries=max_retries,
+                http_client=create_openai_http_client(),
+            ),
         )
     else:
         if agent_config.openai_api_key is not None:
             logger.info("Using OpenAI API key override")
         if agent_config.base_url_override is not None:
             logger.info(f"Using OpenAI base URL override: {agent_config.base_url_override}")
-        return AsyncOpenAI(
-            api_key=agent_config.openai_api_key or os.environ["OPENAI_API_KEY"],
-            base_url=agent_config.base_url_override or "https://api.openai.com/v1",
-            max_retries=0 if model_fallback else OPENAI_DEFAULT_MAX_RETRIES,
+        api_key = agent_config.openai_api_key or os.environ["OPENAI_API_KEY"]
+        base_url = agent_config.base_url_override or "https://api.openai.com/v1"
+        return ClientRegistry().get_client(
+            "openai",
+            (base_url, api_key, max_retries),
+            lambda: AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=max_retries,
+                http_client=create_openai_http_client(),
+            ),
         )
 
 
 class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
     openai_client: Union[AsyncOpenAI, AsyncAzureOpenAI]
+    request_hedger: Optional[RequestHedger] = None
 
     def __init__(
         self,
         agent_config: ChatGPTAgentConfigType,
         action_factory: AbstractActionFactory = DefaultActionFactory(),
         vector_db_factory=VectorDBFactory(),
+        conversation_summarizer: Optional[BaseConversationSummarizer] = None,
         **kwargs,
     ):
         super().__init__(
@@ -69,9 +121,61 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
 
         if not self.openai_client.api_key:
             raise ValueError("OPENAI_API_KEY must be set in environment or passed in")
+        self.prompt_builder = OpenAIChatPromptBuilder()
+        if self.agent_config.llm_hedge is not None:
+            if self.agent_config.llm_fallback is None:
+                raise ValueError("llm_hedge requires an llm_fallback to hedge against")
+            if (
+                self.agent_config.llm_fallback.provider == "azure"
+                and self.agent_config.azure_params is None
+            ):
+                raise ValueError("llm_hedge against an azure llm_fallback requires azure_params")
+            self.request_hedger = RequestHedger(
+                latency_percentile=self.agent_config.llm_hedge.latency_percentile,
+                initial_delay_seconds=self.agent_config.llm_hedge.initial_delay_seconds,
+                min_delay_seconds=self.agent_config.llm_hedge.min_delay_seconds,
+                min_samples=self.agent_config.llm_hedge.min_samples,
+            )
+        if self.agent_config.speculative_response_stability_seconds is not None:
+            self.response_speculator = ResponseSpeculator(
+                self.generate_speculative_response,
+                stability_seconds=self.agent_config.speculative_response_stability_seconds,
+            )
 
         if self.agent_config.vector_db_config:
             self.vector_db = vector_db_factory.create_vector_db(self.agent_config.vector_db_config)
+        self.retrieval_prefetcher: Optional[RetrievalPrefetcher[DocumentsWithScores]] = None
+        if self.agent_config.retrieval_prefetch is not None:
+            if self.agent_config.vector_db_config is None:
+                raise ValueError("retrieval_prefetch requires a vector_db_config to retrieve from")
+            self.retrieval_prefetcher = RetrievalPrefetcher(
+                self._search_vector_db,
+                stability_seconds=self.agent_config.retrieval_prefetch.stability_seconds,
+                min_similarity=self.agent_config.retrieval_prefetch.min_similarity,
+                deadline_seconds=self.agent_config.retrieval_prefetch.deadline_seconds,
+            )
+        self.model_router: Optional[ModelRouter] = None
+        if self.agent_config.model_router is not None:
+            self.model_router = ModelRouter(
+                max_fast_words=self.agent_config.model_router.max_fast_words,
+                strong_keywords=self.agent_config.model_router.strong_keywords,
+                functions=self.functions,
+            )
+        self.rolling_summary: Optional[RollingSummary] = None
+        if self.agent_config.rolling_summary is not None:
+            self.rolling_summary = RollingSummary(
+                conversation_summarizer
+                or OpenAIConversationSummarizer(
+                    self.openai_client,
+                    model_name=self.agent_config.rolling_summary.model_name
+                    or self._get_model_name(),
+                    max_tokens=self.agent_config.rolling_summary.max_tokens,
+                ),
+                window_size=self.agent_config.rolling_summary.window_size,
+                min_messages_to_summarize=(
+                    self.agent_config.rolling_summary.min_messages_to_summarize
+                ),
+            )
 
     def get_functions(self):
         assert self.agent_config.actions
@@ -83,34 +187,49 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
             if isinstance(action_config.action_trigger, FunctionCallActionTrigger)
         ]
 
-    def get_chat_parameters(self, messages: Optional[List] = None, use_functions: bool = True):
-        assert self.transcript is not None
-        is_azure = self._is_azure_model()
+    def may_call_several_functions(self) -> bool:
+        return self.agent_config.parallel_tool_calls
 
-        messages = messages or format_openai_chat_messages_from_transcript(
-            self.transcript,
+    def _build_messages(self, transcript: Transcript) -> List[dict]:
+        return self.prompt_builder.build(
+            transcript,
             self.get_model_name_for_tokenizer(),
             self.functions,
             self.agent_config.prompt_preamble,
+            use_tool_calls=self.agent_config.parallel_tool_calls,
+            rolling_summary=self.rolling_summary,
         )
 
+    def get_chat_parameters(self, messages: Optional[List] = None, use_functions: bool = True):
+        assert self.transcript is not None
+
+        messages = messages or self._build_messages(self.transcript)
+
         parameters: Dict[str, Any] = {
             "messages": messages,
             "max_tokens": self.agent_config.max_tokens,
             "temperature": self.agent_config.temperature,
         }
 
-        if is_azure:
-            assert self.agent_config.azure_params is not None
-            parameters["model"] = self.agent_config.azure_params.deployment_name
-        else:
-            parameters["model"] = self.agent_config.model_name
+        parameters["model"] = self._get_model_name()
 
         if use_functions and self.functions:
-            parameters["functions"] = self.functions
+            if self.agent_config.parallel_tool_calls:
+                parameters["tools"] = [
+                    {"type": "function", "function": function} for function in self.functions
+                ]
+                parameters["parallel_tool_calls"] = True
+            else:
+                parameters["functions"] = self.functions
 
         return parameters
 
+    def _get_model_name(self) -> str:
+        if self._is_azure_model():
+            assert self.agent_config.azure_params is not None
+            return self.agent_config.azure_params.deployment_name
+        return self.agent_config.model_name
+
     def _is_azure_model(self) -> bool:
         return self.agent_config.azure_params is not None
 
@@ -153,13 +272,72 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
             stream = await self.openai_client.chat.completions.create(**chat_parameters)
         return stream
 
-    async def _create_openai_stream(self, chat_parameters: Dict[str, Any]) -> AsyncGenerator:
+    def _get_hedge_client(self) -> Union[AsyncOpenAI, AsyncAzureOpenAI]:
+        assert self.agent_config.llm_fallback is not None
+        if self.agent_config.llm_fallback.provider == "openai":
+            return instantiate_openai_client(
+                self.agent_config.copy(update={"azure_params": None}), model_fallback=True
+            )
+        # azure_params are checked in __init__
+        return instantiate_openai_client(self.agent_config, model_fallback=True)
+
+    async def _create_openai_stream(
+        self,
+        chat_parameters: Dict[str, Any],
+        on_hedge_win: Optional[Callable[[], None]] = None,
+    ) -> AsyncGenerator:
+        if self.request_hedger is not None:
+            assert self.agent_config.llm_fallback is not None
+            hedge_client = self._get_hedge_client()
+            hedge_chat_parameters = {
+                **chat_parameters,
+                "model": self.agent_config.llm_fallback.model_name,
+            }
+            # the same request, unless a model fallback has already been applied
+            if hedge_chat_parameters != chat_parameters:
+                return self.request_hedger.stream(
+                    lambda: self._create_primary_openai_stream(chat_parameters),
+                    lambda: hedge_client.chat.completions.create(**hedge_chat_parameters),
+                    on_secondary_win=on_hedge_win,
+                )
+        return await self._create_primary_openai_stream(chat_parameters)
+
+    async def _create_primary_openai_stream(self, chat_parameters: Dict[str, Any]):
         if self.agent_config.llm_fallback is not None and self.openai_client.max_retries == 0:
             stream = await self._create_openai_stream_with_fallback(chat_parameters)
         else:
             stream = await self.openai_client.chat.completions.create(**chat_parameters)
         return stream
 
+    def _get_response_cache_namespace(self) -> str:
+        if self.agent_config.azure_params is not None:
+            return f"azure:{self.agent_config.azure_params.base_url}"
+        return f"openai:{self.agent_config.base_url_override or 'https://api.openai.com/v1'}"
+
+    async def _stream_tokens(
+        self,
+        chat_parameters: Dict[str, Any],
+        on_hedge_win: Optional[Callable[[], None]] = None,
+    ) -> AsyncGenerator[Union[str, FunctionFragment], None]:
+        stream = await self._create_openai_stream(chat_parameters, on_hedge_win)
+        async for token in openai_get_tokens(stream):
+            yield token
+
+    async def _get_tokens(
+        self, chat_parameters: Dict[str, Any]
+    ) -> AsyncGenerator[Union[str, FunctionFragment], None]:
+        cache_config = self.agent_config.response_cache
+        if cache_config is not None and should_cache_response(cache_config, chat_parameters):
+            # a response from the hedge's llm_fallback model doesn't belong under this key
+            hedge_won = asyncio.Event()
+            return LLMResponseCache().stream(
+                get_response_cache_key(self._get_response_cache_namespace(), chat_parameters),
+                cache_config,
+                lambda: self._stream_tokens(chat_parameters, on_hedge_win=hedge_won.set),
+                should_cache=lambda: not hedge_won.is_set(),
+            )
+        return openai_get_tokens(await self._create_openai_stream(chat_parameters))
+
     def should_backchannel(self, human_input: str) -> bool:
         return (
             not self.is_first_response()
@@ -170,11 +348,7 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
     def choose_backchannel(self) -> Optional[BotBackchannel]:
         backchannel = None
         if self.transcript is not None:
-            last_bot_message: Optional[Message] = None
-            for event_log in self.transcript.event_logs[::-1]:
-                if isinstance(event_log, Message) and event_log.sender == Sender.BOT:
-                    last_bot_message = event_log
-                    break
+            last_bot_message = self.transcript.get_last_message(Sender.BOT)
             if last_bot_message and last_bot_message.text.strip().endswith("?"):
                 return BotBackchannel(text=self.post_question_bot_backchannel_randomizer())
         return backchannel
@@ -187,39 +361,102 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
         bot_was_in_medias_res: bool = False,
     ) -> AsyncGenerator[GeneratedResponse, None]:
         assert self.transcript is not None
+        async for response in self._generate_response_to_transcript(
+            self.transcript,
+            human_input,
+            conversation_id=conversation_id,
+            bot_was_in_medias_res=bot_was_in_medias_res,
+        ):
+            yield response
+
+    def generate_speculative_response(
+        self,
+        human_input: str,
+        conversation_id: str,
+        bot_was_in_medias_res: bool = False,
+    ) -> AsyncGenerator[GeneratedResponse, None]:
+        assert self.transcript is not None
+        # a shallow copy: the speculative human message must not leak into the transcript
+        transcript = self.transcript.copy(
+            update={
+                "event_logs": [
+                    *self.transcript.event_logs,
+                    Message(sender=Sender.HUMAN, text=human_input),
+                ]
+            }
+        )
+        return self._generate_response_to_transcript(
+            transcript,
+            human_input,
+            conversation_id=conversation_id,
+            bot_was_in_medias_res=bot_was_in_medias_res,
+        )
+
+    async def _search_vector_db(self, query: str) -> DocumentsWithScores:
+        return await self.vector_db.similarity_search_with_score(query)
 
+    async def _retrieve_documents(self, query: str) -> Optional[DocumentsWithScores]:
+        if self.retrieval_prefetcher is not None:
+            return await self.retrieval_prefetcher.retrieve(query)
+        try:
+            return await self._search_vector_db(query)
+        except Exception as e:
+            logger.error(f"Error while hitting vector db: {e}", exc_info=True)
+            return None
+
+    def _format_vector_db_result(self, docs_with_scores: DocumentsWithScores) -> str:
+        docs_with_scores_str = "\n\n".join(
+            [
+                "Document: "
+                + doc[0].metadata["source"]
+                + f" (Confidence: {doc[1]})\n"
+                + doc[0].lc_kwargs["page_content"].replace(r"\n", "\n")
+                for doc in docs_with_scores
+            ]
+        )
+        return f"Found {len(docs_with_scores)} similar documents:\n{docs_with_scores_str}"
+
+    def observe_interim_transcription(self, transcription: Transcription, conversation_id: str):
+        super().observe_interim_transcription(transcription, conversation_id)
+        if self.retrieval_prefetcher is not None and not self.is_muted:
+            self.retrieval_prefetcher.observe_interim(transcription.message)
+
+    async def _generate_response_to_transcript(
+        self,
+        transcript: Transcript,
+        human_input: str,
+        conversation_id: str,
+        bot_was_in_medias_res: bool = False,
+    ) -> AsyncGenerator[GeneratedResponse, None]:
         chat_parameters = {}
         if self.agent_config.vector_db_config:
+            # the lookup runs while the prompt is built
+            retrieval = asyncio_create_task(
+                self._retrieve_documents(transcript.get_last_user_message()[1])
+            )
+            await asyncio.sleep(0)  # lets the lookup send its request
             try:
-                docs_with_scores = await self.vector_db.similarity_search_with_score(
-                    self.transcript.get_last_user_message()[1]
-                )
-                docs_with_scores_str = "\n\n".join(
-                    [
-                        "Document: "
-                        + doc[0].metadata["source"]
-                        + f" (Confidence: {doc[1]})\n"
-                        + doc[0].lc_kwargs["page_content"].replace(r"\n", "\n")
-                        for doc in docs_with_scores
-                    ]
-                )
-                vector_db_result = (
-                    f"Found {len(docs_with_scores)} similar documents:\n{docs_with_scores_str}"
-                )
-                messages = format_openai_chat_messages_from_transcript(
-                    self.transcript,
-                    self.agent_config.model_name,
-                    self.functions,
-                    self.agent_config.prompt_preamble,
-                )
-                messages.insert(-1, vector_db_result_to_openai_chat_message(vector_db_result))
-                chat_parameters = self.get_chat_parameters(messages)
-            except Exception as e:
-                logger.error(f"Error while hitting vector db: {e}", exc_info=True)
-                chat_parameters = self.get_chat_parameters()
+                messages = self._build_messages(transcript)
+                docs_with_scores = await retrieval
+            finally:
+                retrieval.cancel()
+            if docs_with_scores is not None:
+                try:
+                    vector_db_result = self._format_vector_db_result(docs_with_scores)
+                    messages.insert(-1, vector_db_result_to_openai_chat_message(vector_db_result))
+                except Exception as e:
+                    logger.error(f"Error while formatting vector db results: {e}", exc_info=True)
+            chat_parameters = self.get_chat_parameters(messages)
         else:
-            chat_parameters = self.get_chat_parameters()
+            chat_parameters = self.get_chat_parameters(self._build_messages(transcript))
         chat_parameters["stream"] = True
+        route: Optional[ModelRoute] = None
+        if self.model_router is not None:
+            assert self.agent_config.model_router is not None
+            route = self.model_router.route(human_input, transcript)
+            logger.debug(f"Routing turn to the {route.value} model")
+            if route == ModelRoute.FAST:
+                chat_parameters["model"] = self.agent_config.model_router.fast_model_name
 
         openai_chat_messages: List = chat_parameters.get("messages", [])
 
@@ -257,19 +494,33 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
             sentry_callable=sentry_sdk.start_span, op=CustomSentrySpans.TIME_TO_FIRST_TOKEN
         )
 
-        stream = await self._create_openai_stream(chat_parameters)
+        started_at = time.monotonic()
+        tokens = await self._get_tokens(chat_parameters)
+        if route is not None:
+            assert self.model_router is not None
+            tokens = self.model_router.track(
+                route,
+                tokens,
+                started_at=started_at,
+                num_prompt_tokens=self.prompt_builder.num_prompt_tokens,
+            )
 
-        response_generator = collate_response_async
         using_input_streaming_synthesizer = (
             self.conversation_state_manager.using_input_streaming_synthesizer()
         )
         if using_input_streaming_synthesizer:
-            response_generator = stream_response_async
+            response_generator = functools.partial(
+                stream_response_async,
+                max_batch_delay_seconds=self.agent_config.streamed_token_batch_delay_seconds,
+            )
+        else:
+            response_generator = functools.partial(
+                collate_response_async,
+                first_chunk_min_words=self.agent_config.first_chunk_min_words,
+            )
         async for message in response_generator(
             conversation_id=conversation_id,
-            gen=openai_get_tokens(
-                stream,
-            ),
+            gen=tokens,
             get_functions=True,
             sentry_span=ttft_span,
         ):
@@ -282,7 +533,7 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
             MessageType = LLMToken if using_input_streaming_synthesizer else BaseMessage
             if isinstance(message, str):
                 yield ResponseClass(
-                    message=MessageType(text=message),
+                    message=MessageType.construct(text=message),  # a str, no need to validate
                     is_interruptible=True,
                 )
             else:
@@ -292,6 +543,68 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfigType]):
                 )
 
     async def terminate(self):
+        if self.response_speculator is not None:
+            self.response_speculator.cancel()
+            stats = self.response_speculator.stats
+            logger.info(
+                "Speculative responses: {} started, {} hits ({:.0%}), {:.3f}s saved on average".format(
+                    stats.num_started,
+                    stats.num_hits,
+                    stats.hit_rate,
+                    stats.mean_latency_saved_seconds,
+                )
+            )
+        if self.retrieval_prefetcher is not None:
+            self.retrieval_prefetcher.cancel()
+            stats = self.retrieval_prefetcher.stats
+            logger.info(
+                "Prefetched retrievals: {} started, {} hits ({:.0%}), {} past the deadline, "
+                "{:.3f}s saved on average".format(
+                    stats.num_prefetched,
+                    stats.num_hits,
+                    stats.hit_rate,
+                    stats.num_timeouts,
+                    stats.mean_latency_saved_seconds,
+                )
+            )
+        if self.model_router is not None:
+            for route, route_stats in self.model_router.stats.items():
+                logger.info(
+                    "{} model route: {} turns, {:.3f}s to first token and {:.3f}s in total on "
+                    "average, {:.0f} prompt and {:.0f} completion tokens on average".format(
+                        route.value.capitalize(),
+                        route_stats.num_turns,
+                        route_stats.mean_time_to_first_token_seconds,
+                        route_stats.mean_duration_seconds,
+                        route_stats.mean_prompt_tokens,
+                        route_stats.mean_completion_tokens,
+                    )
+                )
+        if self.rolling_summary is not None:
+            self.rolling_summary.cancel()
+            stats = self.rolling_summary.stats
+            logger.info(
+                "Rolling summary: {} summaries of {} chat messages, {} failed, "
+                "{:.3f}s on average".format(
+                    stats.num_summaries,
+                    stats.num_summarized_messages,
+                    stats.num_failures,
+                    stats.mean_summarize_seconds,
+                )
+            )
+        if self.request_hedger is not None:
+            self.request_hedger.cancel()
+            stats = self.request_hedger.stats
+            logger.info(
+                "Hedged LLM requests: {} of {} hedged ({:.0%}), {} won by the fallback, "
+                "{:.3f}s saved on average".format(
+                    stats.num_hedged,
+                    stats.num_requests,
+                    stats.hedge_rate,
+                    stats.num_secondary_wins,
+                    stats.mean_time_saved_seconds,
+                )
+            )
         if hasattr(self, "vector_db") and self.vector_db is not None:
             await self.vector_db.tear_down()
         return await super().terminate()
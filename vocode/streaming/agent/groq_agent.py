@@ -1,3 +1,4 @@
+import functools
 import os
 import random
 from typing import Any, AsyncGenerator, Dict, List, Optional, TypeVar, Union
@@ -21,7 +22,8 @@ from vocode.streaming.models.actions import FunctionCallActionTrigger
 from vocode.streaming.models.agent import GroqAgentConfig
 from vocode.streaming.models.events import Sender
 from vocode.streaming.models.message import BaseMessage, BotBackchannel, LLMToken
-from vocode.streaming.models.transcript import EventLog, Message, Transcript
+from vocode.streaming.models.transcript import EventLog, Transcript
+from vocode.streaming.utils.client_registry import ClientRegistry
 from vocode.streaming.vector_db.factory import VectorDBFactory
 from vocode.utils.sentry_utils import CustomSentrySpans, sentry_create_span
 
@@ -41,7 +43,10 @@ class GroqAgent(RespondAgent[GroqAgentConfig]):
             action_factory=action_factory,
             **kwargs,
         )
-        self.groq_client = AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"))
+        api_key = os.environ.get("GROQ_API_KEY")
+        self.groq_client = ClientRegistry().get_client(
+            "groq", api_key, lambda: AsyncGroq(api_key=api_key)
+        )
 
         if not self.groq_client.api_key:
             raise ValueError("GROQ_API_KEY must be set in environment or passed in")
@@ -116,11 +121,7 @@ class GroqAgent(RespondAgent[GroqAgentConfig]):
     def choose_backchannel(self) -> Optional[BotBackchannel]:
         backchannel = None
         if self.transcript is not None:
-            last_bot_message: Optional[Message] = None
-            for event_log in self.transcript.event_logs[::-1]:
-                if isinstance(event_log, Message) and event_log.sender == Sender.BOT:
-                    last_bot_message = event_log
-                    break
+            last_bot_message = self.transcript.get_last_message(Sender.BOT)
             if last_bot_message and last_bot_message.text.strip().endswith("?"):
                 return BotBackchannel(text=self.post_question_bot_backchannel_randomizer())
         return backchannel
@@ -203,12 +204,19 @@ class GroqAgent(RespondAgent[GroqAgentConfig]):
 
         stream = await self._create_groq_stream(chat_parameters)
 
-        response_generator = collate_response_async
         using_input_streaming_synthesizer = (
             self.conversation_state_manager.using_input_streaming_synthesizer()
         )
         if using_input_streaming_synthesizer:
-            response_generator = stream_response_async
+            response_generator = functools.partial(
+                stream_response_async,
+                max_batch_delay_seconds=self.agent_config.streamed_token_batch_delay_seconds,
+            )
+        else:
+            response_generator = functools.partial(
+                collate_response_async,
+                first_chunk_min_words=self.agent_config.first_chunk_min_words,
+            )
         async for message in response_generator(
             conversation_id=conversation_id,
             gen=openai_get_tokens(
@@ -226,7 +234,7 @@ class GroqAgent(RespondAgent[GroqAgentConfig]):
             MessageType = LLMToken if using_input_streaming_synthesizer else BaseMessage
             if isinstance(message, str):
                 yield ResponseClass(
-                    message=MessageType(text=message),
+                    message=MessageType.construct(text=message),  # a str, no need to validate
                     is_interruptible=True,
                 )
             else:
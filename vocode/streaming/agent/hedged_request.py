@@ -0,0 +1,211 @@
+import asyncio
+import inspect
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Generic,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+from loguru import logger
+
+from vocode.streaming.utils.create_task import asyncio_create_task
+
+ItemType = TypeVar("ItemType")
+
+# first-item latencies of the primary that the hedge deadline is computed from
+LATENCY_WINDOW_SIZE = 100
+# how long a losing primary is given to produce its first item, to measure the time saved
+LOSER_TIMEOUT_SECONDS = 5.0
+
+_END_OF_STREAM = object()
+
+
+class StartedStream(Generic[ItemType]):
+    def __init__(
+        self,
+        stream: AsyncIterator[ItemType],
+        iterator: AsyncIterator[ItemType],
+        first_item: Any,
+        first_item_at: float,
+    ):
+        self.stream = stream
+        self.iterator = iterator
+        self.first_item = first_item  # _END_OF_STREAM if the stream was empty
+        self.first_item_at = first_item_at
+
+
+class HedgeStats:
+    def __init__(self):
+        self.num_requests = 0
+        self.num_hedged = 0
+        self.num_secondary_wins = 0
+        self.total_time_saved_seconds = 0.0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.num_hedged / self.num_requests if self.num_requests else 0.0
+
+    @property
+    def mean_time_saved_seconds(self) -> float:
+        """Mean time to first item saved per hedged request."""
+        return self.total_time_saved_seconds / self.num_hedged if self.num_hedged else 0.0
+
+
+async def _start_stream(
+    create_stream: Callable[[], Awaitable[AsyncIterator[ItemType]]]
+) -> StartedStream[ItemType]:
+    stream = await create_stream()
+    iterator = stream.__aiter__()
+    try:
+        first_item: Any = await iterator.__anext__()
+    except StopAsyncIteration:
+        first_item = _END_OF_STREAM
+    return StartedStream(stream, iterator, first_item, time.monotonic())
+
+
+async def _close_stream(stream: AsyncIterator):
+    close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+    if close is None:
+        return
+    try:
+        result = close()
+        if inspect.isawaitable(result):
+            await result
+    except Exception:
+        logger.debug("Failed to close losing hedged stream", exc_info=True)
+
+
+class RequestHedger:
+    """Hedges streaming requests (e.g. LLM completions) against a secondary endpoint.
+
+    The primary request is started alone. If it hasn't produced its first item by the hedge
+    deadline - latency_percentile of its recent first-item latencies, or initial_delay_seconds
+    until min_samples have been observed - the same request is started against the secondary
+    and whichever stream produces an item first is used. A losing secondary is cancelled right
+    away; a losing primary is given until its first item (at most LOSER_TIMEOUT_SECONDS) so its
+    latency still counts towards the deadline and the time saved can be measured, and is then
+    closed.
+    """
+
+    def __init__(
+        self,
+        latency_percentile: float,
+        initial_delay_seconds: float,
+        min_delay_seconds: float,
+        min_samples: int,
+    ):
+        self.latency_percentile = latency_percentile
+        self.initial_delay_seconds = initial_delay_seconds
+        self.min_delay_seconds = min_delay_seconds
+        self.min_samples = min_samples
+        self.primary_latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW_SIZE)
+        self.stats = HedgeStats()
+        self.loser_tasks: Set[asyncio.Task] = set()
+
+    def get_hedge_delay(self) -> float:
+        if len(self.primary_latencies) < self.min_samples:
+            return self.initial_delay_seconds
+        latencies = sorted(self.primary_latencies)
+        index = min(int(self.latency_percentile * len(latencies)), len(latencies) - 1)
+        return max(latencies[index], self.min_delay_seconds)
+
+    async def stream(
+        self,
+        create_primary: Callable[[], Awaitable[AsyncIterator[ItemType]]],
+        create_secondary: Callable[[], Awaitable[AsyncIterator[ItemType]]],
+        on_secondary_win: Optional[Callable[[], None]] = None,
+    ) -> AsyncGenerator[ItemType, None]:
+        """Streams the items of whichever request produces one first; on_secondary_win is called
+        before the first item if that's the secondary."""
+        self.stats.num_requests += 1
+        started_at = time.monotonic()
+        primary = asyncio_create_task(_start_stream(create_primary))
+        secondary: Optional[asyncio.Task] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.get_hedge_delay())
+            if done:
+                winner = primary
+            else:
+                self.stats.num_hedged += 1
+                logger.debug("No first token from the primary LLM request yet, hedging")
+                secondary = asyncio_create_task(_start_stream(create_secondary))
+                winner = await self._race(primary, secondary)
+        except BaseException:
+            primary.cancel()
+            if secondary is not None:
+                secondary.cancel()
+            raise
+
+        if winner is secondary:
+            self.stats.num_secondary_wins += 1
+            if on_secondary_win is not None:
+                on_secondary_win()
+            self._in_background(
+                self._measure_losing_primary(primary, started_at, winner.result().first_item_at)
+            )
+        elif secondary is not None:
+            secondary.cancel()
+            self._in_background(self._close_losing_secondary(secondary))
+
+        started_stream: StartedStream[ItemType] = winner.result()  # raises if both failed
+        if winner is primary:
+            self.primary_latencies.append(started_stream.first_item_at - started_at)
+        if started_stream.first_item is _END_OF_STREAM:
+            return
+        yield started_stream.first_item
+        async for item in started_stream.iterator:
+            yield item
+
+    async def _race(self, primary: asyncio.Task, secondary: asyncio.Task) -> asyncio.Task:
+        pending = {primary, secondary}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in (primary, secondary):  # the primary wins ties
+                if task in done and task.exception() is None:
+                    return task
+        return primary  # both failed: surface the primary's error
+
+    def _in_background(self, coroutine: Awaitable):
+        task = asyncio_create_task(coroutine)
+        self.loser_tasks.add(task)
+        task.add_done_callback(self.loser_tasks.discard)
+
+    async def _close_losing_secondary(self, secondary: asyncio.Task):
+        # cancelled by now, unless it had already started streaming
+        try:
+            started_stream = await secondary
+        except (asyncio.CancelledError, Exception):
+            return
+        await _close_stream(started_stream.stream)
+
+    async def _measure_losing_primary(
+        self, primary: asyncio.Task, started_at: float, secondary_first_item_at: float
+    ):
+        try:
+            started_stream = await asyncio.wait_for(primary, timeout=LOSER_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # wait_for cancelled the primary: count its latency, and the time saved, so far
+            self.primary_latencies.append(time.monotonic() - started_at)
+            self.stats.total_time_saved_seconds += time.monotonic() - secondary_first_item_at
+            return
+        except Exception:
+            logger.debug("Losing primary request failed", exc_info=True)
+            return
+        self.primary_latencies.append(started_stream.first_item_at - started_at)
+        self.stats.total_time_saved_seconds += max(
+            started_stream.first_item_at - secondary_first_item_at, 0.0
+        )
+        await _close_stream(started_stream.stream)
+
+    def cancel(self):
+        for task in list(self.loser_tasks):
+            task.cancel()
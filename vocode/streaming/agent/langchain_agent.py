@@ -1,3 +1,4 @@
+import functools
 from typing import AsyncGenerator, AsyncIterator, Optional
 
 import sentry_sdk
@@ -110,13 +111,19 @@ class LangchainAgent(RespondAgent[LangchainAgentConfig]):
             )
             raise e
 
-        response_generator = collate_response_async
-
         using_input_streaming_synthesizer = (
             self.conversation_state_manager.using_input_streaming_synthesizer()
         )
         if using_input_streaming_synthesizer:
-            response_generator = stream_response_async
+            response_generator = functools.partial(
+                stream_response_async,
+                max_batch_delay_seconds=self.agent_config.streamed_token_batch_delay_seconds,
+            )
+        else:
+            response_generator = functools.partial(
+                collate_response_async,
+                first_chunk_min_words=self.agent_config.first_chunk_min_words,
+            )
         async for message in response_generator(
             conversation_id=conversation_id,
             gen=self.token_generator(
@@ -134,7 +141,7 @@ class LangchainAgent(RespondAgent[LangchainAgentConfig]):
 
             if isinstance(message, str):
                 yield ResponseClass(
-                    message=MessageType(text=message),
+                    message=MessageType.construct(text=message),  # a str, no need to validate
                     is_interruptible=True,
                 )
             else:
@@ -0,0 +1,116 @@
+import re
+import time
+from enum import Enum
+from typing import AsyncGenerator, Dict, Iterable, List, Optional, Set, TypeVar
+
+from vocode.streaming.agent.speculative_response import normalize_utterance
+from vocode.streaming.models.transcript import ActionFinish, Transcript
+
+TokenType = TypeVar("TokenType")
+
+# function name parts too generic to suggest that a turn calls the function
+GENERIC_FUNCTION_WORDS = {"get", "set", "send", "make", "call", "create", "update", "the", "for"}
+
+
+class ModelRoute(str, Enum):
+    FAST = "fast"
+    STRONG = "strong"
+
+
+def get_function_keywords(functions: Optional[List[Dict]]) -> Set[str]:
+    """The words of the function names, e.g. "book" and "table" for book_table."""
+    keywords = set()
+    for function in functions or []:
+        for word in re.split(r"[_\W]+|(?<=[a-z])(?=[A-Z])", function["name"]):
+            if len(word) > 2 and word.lower() not in GENERIC_FUNCTION_WORDS:
+                keywords.add(word.lower())
+    return keywords
+
+
+class RouteStats:
+    def __init__(self):
+        self.num_turns = 0
+        self.num_prompt_tokens = 0
+        self.num_completion_tokens = 0
+        self.total_time_to_first_token_seconds = 0.0
+        self.total_duration_seconds = 0.0
+
+    @property
+    def mean_time_to_first_token_seconds(self) -> float:
+        return self.total_time_to_first_token_seconds / self.num_turns if self.num_turns else 0.0
+
+    @property
+    def mean_duration_seconds(self) -> float:
+        return self.total_duration_seconds / self.num_turns if self.num_turns else 0.0
+
+    @property
+    def mean_prompt_tokens(self) -> float:
+        return self.num_prompt_tokens / self.num_turns if self.num_turns else 0.0
+
+    @property
+    def mean_completion_tokens(self) -> float:
+        return self.num_completion_tokens / self.num_turns if self.num_turns else 0.0
+
+
+class ModelRouter:
+    """
+    Routes each turn to a fast or a strong model with cheap local features of the turn.
+
+    A turn goes to the fast model if the human said at most `max_fast_words` words, none of which
+    is one of the `strong_keywords` or suggests a function call (a word of one of the agent's
+    function names); responses to action results always go to the strong model. `track` records
+    the time to first token, duration and token counts of each route's responses, to tune these
+    thresholds against.
+    """
+
+    def __init__(
+        self,
+        max_fast_words: int,
+        strong_keywords: Iterable[str] = (),
+        functions: Optional[List[Dict]] = None,
+    ):
+        self.max_fast_words = max_fast_words
+        self.strong_keywords = {normalize_utterance(keyword) for keyword in strong_keywords}
+        self.function_keywords = get_function_keywords(functions)
+        self.stats = {route: RouteStats() for route in ModelRoute}
+
+    def route(self, human_input: str, transcript: Transcript) -> ModelRoute:
+        if transcript.event_logs and isinstance(transcript.event_logs[-1], ActionFinish):
+            return ModelRoute.STRONG
+        utterance = normalize_utterance(human_input)
+        words = utterance.split()
+        if not words or len(words) > self.max_fast_words:
+            return ModelRoute.STRONG
+        if self.function_keywords.intersection(words):
+            return ModelRoute.STRONG
+        padded_utterance = f" {utterance} "
+        # keywords may be phrases
+        if any(f" {keyword} " in padded_utterance for keyword in self.strong_keywords):
+            return ModelRoute.STRONG
+        return ModelRoute.FAST
+
+    async def track(
+        self,
+        route: ModelRoute,
+        tokens: AsyncGenerator[TokenType, None],
+        started_at: float,
+        num_prompt_tokens: int,
+    ) -> AsyncGenerator[TokenType, None]:
+        """Passes tokens through, recording them in the stats of route once they're all out."""
+        time_to_first_token_seconds: Optional[float] = None
+        num_completion_tokens = 0
+        async for token in tokens:
+            if time_to_first_token_seconds is None:
+                time_to_first_token_seconds = time.monotonic() - started_at
+            num_completion_tokens += 1  # OpenAI streams about one token per chunk
+            yield token
+        stats = self.stats[route]
+        stats.num_turns += 1
+        stats.num_prompt_tokens += num_prompt_tokens
+        stats.num_completion_tokens += num_completion_tokens
+        stats.total_duration_seconds += time.monotonic() - started_at
+        stats.total_time_to_first_token_seconds += (
+            time_to_first_token_seconds
+            if time_to_first_token_seconds is not None
+            else time.monotonic() - started_at
+        )
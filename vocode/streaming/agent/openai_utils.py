@@ -1,13 +1,16 @@
-from copy import deepcopy
-from typing import Any, AsyncGenerator, Dict, List, Optional, Union
+import json
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple, Union
 
 from loguru import logger
 from openai.types.chat.chat_completion_chunk import ChatCompletionChunk
 
+from vocode.streaming.agent.rolling_summary import RollingSummary
 from vocode.streaming.agent.token_utils import (
+    TokenizerInfo,
     get_chat_gpt_max_tokens,
+    get_tokenizer_info,
     num_tokens_from_functions,
-    num_tokens_from_messages,
+    tokens_from_dict,
 )
 from vocode.streaming.models.actions import FunctionFragment, PhraseBasedActionTrigger
 from vocode.streaming.models.agent import LLM_AGENT_DEFAULT_MAX_TOKENS
@@ -37,12 +40,87 @@ def is_phrase_based_action_event_log(event_log: EventLog) -> bool:
     )
 
 
+def _get_function_call_message(action_start: ActionStart) -> Dict[str, Any]:
+    return {
+        "role": "assistant",
+        "content": None,
+        "function_call": {
+            "name": action_start.action_type,
+            "arguments": action_start.action_input.params.json(),
+        },
+    }
+
+
+def _get_function_result_message(action_finish: ActionFinish) -> Dict[str, Any]:
+    return {
+        "role": "function",
+        "name": action_finish.action_type,
+        "content": action_finish.to_string(include_header=False),
+    }
+
+
+def _get_tool_call_messages(
+    action_starts: List[ActionStart], tool_results: Dict[str, ActionFinish]
+) -> List[Dict[str, Any]]:
+    """One assistant message with the (finished) tool calls of a response, followed by their
+    results, which the API expects right after it."""
+    finished_action_starts = [
+        action_start
+        for action_start in action_starts
+        if action_start.action_input.tool_call_id in tool_results
+    ]
+    if not finished_action_starts:
+        return []
+    chat_messages: List[Dict[str, Any]] = [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": action_start.action_input.tool_call_id,
+                    "type": "function",
+                    "function": {
+                        "name": action_start.action_type,
+                        "arguments": action_start.action_input.params.json(),
+                    },
+                }
+                for action_start in finished_action_starts
+            ],
+        }
+    ]
+    for action_start in finished_action_starts:
+        tool_call_id = action_start.action_input.tool_call_id
+        assert tool_call_id is not None
+        chat_messages.append(
+            {
+                "role": "tool",
+                "tool_call_id": tool_call_id,
+                "content": tool_results[tool_call_id].to_string(include_header=False),
+            }
+        )
+    return chat_messages
+
+
 def get_openai_chat_messages_from_transcript(
     merged_event_logs: List[EventLog],
     prompt_preamble: str,
+    use_tool_calls: bool = False,
 ) -> List[dict]:
     chat_messages = [{"role": "system", "content": prompt_preamble}]
+    # with tool calls, results are placed right after the calls: logged in between (e.g. the
+    # user_message spoken while the actions ran) comes after them
+    tool_results: Dict[str, ActionFinish] = {}
+    if use_tool_calls:
+        for event_log in merged_event_logs:
+            if isinstance(event_log, ActionFinish) and event_log.action_input.tool_call_id:
+                tool_results[event_log.action_input.tool_call_id] = event_log
+    pending_tool_calls: List[ActionStart] = []
     for event_log in merged_event_logs:
+        if pending_tool_calls and not (
+            isinstance(event_log, ActionStart) and event_log.action_input.tool_call_id
+        ):
+            chat_messages.extend(_get_tool_call_messages(pending_tool_calls, tool_results))
+            pending_tool_calls = []
         if isinstance(event_log, Message):
             if len(event_log.text.strip()) == 0:
                 continue
@@ -54,30 +132,23 @@ def get_openai_chat_messages_from_transcript(
                     },
                 )
         elif isinstance(event_log, ActionStart):
-            action_message: Dict[str, Any]
             if is_phrase_based_action_event_log(event_log=event_log):
                 pass
+            elif use_tool_calls and event_log.action_input.tool_call_id:
+                pending_tool_calls.append(event_log)
             else:
-                action_message = {
-                    "role": "assistant",
-                    "content": None,
-                    "function_call": {
-                        "name": event_log.action_type,
-                        "arguments": event_log.action_input.params.json(),
-                    },
-                }
-                chat_messages.append(action_message)
+                chat_messages.append(_get_function_call_message(event_log))
         elif isinstance(event_log, ActionFinish):
-            action_message = {
-                "role": "function",
-                "name": event_log.action_type,
-                "content": event_log.to_string(include_header=False),
-            }
-            chat_messages.append(action_message)
+            if event_log.action_input.tool_call_id in tool_results:
+                pass  # placed after its tool call
+            else:
+                chat_messages.append(_get_function_result_message(event_log))
         elif isinstance(event_log, ConferenceEvent):
             chat_messages.append(
                 {"role": "user", "content": event_log.to_string(include_sender=False)},
             )
+    if pending_tool_calls:
+        chat_messages.extend(_get_tool_call_messages(pending_tool_calls, tool_results))
     return chat_messages
 
 
@@ -96,8 +167,10 @@ def merge_event_logs(event_logs: List[EventLog]) -> List[EventLog]:
             except IndexError:
                 break
         if bot_messages_buffer:
-            merged_bot_message = deepcopy(bot_messages_buffer[-1])
-            merged_bot_message.text = " ".join(event_log.text for event_log in bot_messages_buffer)
+            # Message fields are immutable values, so a shallow copy is enough
+            merged_bot_message = bot_messages_buffer[-1].copy(
+                update={"text": " ".join(event_log.text for event_log in bot_messages_buffer)}
+            )
             new_event_logs.append(merged_bot_message)
         else:
             new_event_logs.append(current_log)
@@ -106,48 +179,146 @@ def merge_event_logs(event_logs: List[EventLog]) -> List[EventLog]:
     return new_event_logs
 
 
+ChatMessageKey = Tuple[Optional[str], ...]
+
+
+def _get_chat_message_key(chat_message: Dict[str, Any]) -> ChatMessageKey:
+    function_call = chat_message.get("function_call") or {}
+    tool_calls = chat_message.get("tool_calls")
+    return (
+        chat_message["role"],
+        chat_message.get("name"),
+        chat_message.get("content"),
+        function_call.get("name"),
+        function_call.get("arguments"),
+        chat_message.get("tool_call_id"),
+        json.dumps(tool_calls) if tool_calls else None,
+    )
+
+
+class OpenAIChatPromptBuilder:
+    """
+    Builds the OpenAI chat messages for a conversation's transcript, turn after turn.
+
+    Token counts are cached per chat message, so each turn only tokenizes messages that are new
+    or whose text changed (e.g. a bot message cut off by an interruption); the cache only keeps
+    the messages of the latest prompt. Messages that don't fit in the context window are trimmed
+    from the start of the conversation with a running sum instead of recounting the prompt.
+    """
+
+    def __init__(self):
+        self.model_name: Optional[str] = None
+        self.tokenizer_info: Optional[TokenizerInfo] = None
+        self.token_counts: Dict[ChatMessageKey, int] = {}
+        # the token count of the latest prompt
+        self.num_prompt_tokens = 0
+
+    def _get_tokenizer_info(self, model_name: str) -> TokenizerInfo:
+        if model_name != self.model_name:
+            tokenizer_info = get_tokenizer_info(model_name)
+            if tokenizer_info is None:
+                raise NotImplementedError(
+                    f"Token counting is not implemented for model {model_name}"
+                )
+            self.model_name = model_name
+            self.tokenizer_info = tokenizer_info
+            self.token_counts = {}
+        assert self.tokenizer_info is not None
+        return self.tokenizer_info
+
+    def count_message_tokens(
+        self, chat_messages: List[Dict[str, Any]], model_name: str
+    ) -> List[int]:
+        tokenizer_info = self._get_tokenizer_info(model_name)
+        token_counts: Dict[ChatMessageKey, int] = {}
+        message_token_counts = []
+        for chat_message in chat_messages:
+            key = _get_chat_message_key(chat_message)
+            num_tokens = token_counts.get(key)
+            if num_tokens is None:
+                num_tokens = self.token_counts.get(key)
+            if num_tokens is None:
+                num_tokens = tokenizer_info.tokens_per_message + tokens_from_dict(
+                    encoding=tokenizer_info.encoding,
+                    d=chat_message,
+                    tokens_per_name=tokenizer_info.tokens_per_name,
+                )
+            token_counts[key] = num_tokens
+            message_token_counts.append(num_tokens)
+        self.token_counts = token_counts
+        return message_token_counts
+
+    def build(
+        self,
+        transcript: Transcript,
+        model_name: str,
+        functions: Optional[List[Dict]],
+        prompt_preamble: str,
+        use_tool_calls: bool = False,
+        rolling_summary: Optional[RollingSummary] = None,
+    ) -> List[dict]:
+        # merge consecutive bot messages
+        merged_event_logs: List[EventLog] = merge_event_logs(event_logs=transcript.event_logs)
+
+        chat_messages: List[Dict[str, Optional[Any]]]
+        chat_messages = get_openai_chat_messages_from_transcript(
+            merged_event_logs=merged_event_logs,
+            prompt_preamble=prompt_preamble,
+            use_tool_calls=use_tool_calls,
+        )
+        if rolling_summary is not None:
+            chat_messages = rolling_summary.apply(chat_messages)
+
+        message_token_counts = self.count_message_tokens(chat_messages, model_name)
+        # every reply is primed with <|start|>assistant<|message|>
+        context_size = (
+            sum(message_token_counts)
+            + 3
+            + num_tokens_from_functions(functions=functions, model=model_name)
+        )
+
+        # context limit includes the max tokens, and 50 for safety
+        max_context_size = get_chat_gpt_max_tokens(model_name) - LLM_AGENT_DEFAULT_MAX_TOKENS - 50
+        num_removed_messages = 0
+        while context_size > max_context_size:
+            if num_removed_messages + 1 >= len(chat_messages):
+                logger.error(
+                    f"Prompt is too long to fit in context window, num tokens {context_size}"
+                )
+                break
+            num_removed_messages += 1
+            context_size -= message_token_counts[num_removed_messages]
+
+        if num_removed_messages > 0:
+            logger.info(
+                "Removed %d messages from prompt to satisfy context limit",
+                num_removed_messages,
+            )
+            del chat_messages[1 : num_removed_messages + 1]
+            # tool results can't outlive the message with their tool calls
+            next_message_index = num_removed_messages + 1
+            while len(chat_messages) > 1 and chat_messages[1]["role"] == "tool":
+                del chat_messages[1]
+                context_size -= message_token_counts[next_message_index]
+                next_message_index += 1
+
+        self.num_prompt_tokens = context_size
+        return chat_messages
+
+
 def format_openai_chat_messages_from_transcript(
     transcript: Transcript,
     model_name: str,
     functions: Optional[List[Dict]],
     prompt_preamble: str,
 ) -> List[dict]:
-    # merge consecutive bot messages
-    merged_event_logs: List[EventLog] = merge_event_logs(event_logs=transcript.event_logs)
-
-    chat_messages: List[Dict[str, Optional[Any]]]
-    chat_messages = get_openai_chat_messages_from_transcript(
-        merged_event_logs=merged_event_logs,
+    return OpenAIChatPromptBuilder().build(
+        transcript=transcript,
+        model_name=model_name,
+        functions=functions,
         prompt_preamble=prompt_preamble,
     )
 
-    context_size = num_tokens_from_messages(
-        messages=chat_messages,
-        model=model_name,
-    ) + num_tokens_from_functions(functions=functions, model=model_name)
-
-    num_removed_messages = 0
-    while (
-        context_size > get_chat_gpt_max_tokens(model_name) - LLM_AGENT_DEFAULT_MAX_TOKENS - 50
-    ):  # context limit includes the max tokens, and 50 for safety
-        if len(chat_messages) <= 1:
-            logger.error(f"Prompt is too long to fit in context window, num tokens {context_size}")
-            break
-        num_removed_messages += 1
-        chat_messages.pop(1)
-        context_size = num_tokens_from_messages(
-            messages=chat_messages,
-            model=model_name,
-        ) + num_tokens_from_functions(functions=functions, model=model_name)
-
-    if num_removed_messages > 0:
-        logger.info(
-            "Removed %d messages from prompt to satisfy context limit",
-            num_removed_messages,
-        )
-
-    return chat_messages
-
 
 async def openai_get_tokens(
     gen: AsyncGenerator[ChatCompletionChunk, None],
@@ -177,3 +348,13 @@ async def openai_get_tokens(
                     else ""
                 ),
             )
+        elif delta.tool_calls:
+            for tool_call in delta.tool_calls:
+                if tool_call.function is None:
+                    continue
+                yield FunctionFragment(
+                    name=tool_call.function.name or "",
+                    arguments=tool_call.function.arguments or "",
+                    index=tool_call.index,
+                    tool_call_id=tool_call.id,
+                )
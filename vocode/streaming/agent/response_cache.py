@@ -0,0 +1,180 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Callable, Dict, List, Optional, Tuple, Union
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from vocode.streaming.models.actions import FunctionFragment
+from vocode.streaming.models.agent import LLMResponseCacheConfig
+from vocode.streaming.utils.redis import initialize_redis
+from vocode.streaming.utils.singleton import Singleton
+
+CachedToken = Union[str, FunctionFragment]
+
+MAX_MEMORY_ENTRIES = 1000
+REDIS_KEY_PREFIX = "llm_response_cache:"
+# chat parameters that don't change what the LLM responds with
+NON_SEMANTIC_PARAMETERS = {"stream"}
+
+
+def get_response_cache_key(namespace: str, chat_parameters: Dict[str, Any]) -> str:
+    """Hashes the chat parameters (independent of key order), e.g. the model, messages and
+    temperature, along with a namespace identifying the provider endpoint."""
+    normalized_parameters = {
+        key: value
+        for key, value in chat_parameters.items()
+        if key not in NON_SEMANTIC_PARAMETERS and value is not None
+    }
+    payload = json.dumps(
+        [namespace, normalized_parameters], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def should_cache_response(
+    cache_config: LLMResponseCacheConfig, chat_parameters: Dict[str, Any]
+) -> bool:
+    if chat_parameters.get("functions") or chat_parameters.get("tools"):
+        if not cache_config.cache_function_calls:
+            return False
+    if chat_parameters.get("temperature") and not cache_config.cache_nonzero_temperature:
+        return False
+    return True
+
+
+def _serialize_tokens(tokens: List[CachedToken]) -> str:
+    return json.dumps([token if isinstance(token, str) else token.dict() for token in tokens])
+
+
+def _deserialize_tokens(serialized: str) -> List[CachedToken]:
+    return [
+        token if isinstance(token, str) else FunctionFragment.parse_obj(token)
+        for token in json.loads(serialized)
+    ]
+
+
+class LLMResponseCacheStats:
+    def __init__(self):
+        self.num_memory_hits = 0
+        self.num_redis_hits = 0
+        self.num_misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        num_hits = self.num_memory_hits + self.num_redis_hits
+        num_lookups = num_hits + self.num_misses
+        return num_hits / num_lookups if num_lookups else 0.0
+
+
+class LLMResponseCache(Singleton):
+    """Process-wide cache of LLM responses (their token streams) for exact-match requests.
+
+    Responses are kept in an in-memory LRU of at most max_entries, and, for agents that set
+    use_redis, in Redis so that they're shared across processes. Only complete responses are
+    cached: a stream that is cut off (e.g. by an interruption) or fails is not.
+    """
+
+    def __init__(self, max_entries: int = MAX_MEMORY_ENTRIES):
+        self.max_entries = max_entries
+        # key -> (expires_at, tokens)
+        self.entries: "OrderedDict[str, Tuple[Optional[float], List[CachedToken]]]" = OrderedDict()
+        self.redis: Optional[Redis] = None
+        self.redis_disabled = False
+        self.stats = LLMResponseCacheStats()
+
+    def _get_redis(self) -> Optional[Redis]:
+        if self.redis_disabled:
+            return None
+        if self.redis is None:
+            self.redis = initialize_redis()
+        return self.redis
+
+    def _disable_redis(self):
+        logger.warning("Redis request failed, caching LLM responses in memory only")
+        self.redis_disabled = True
+
+    def _get_from_memory(self, key: str) -> Optional[List[CachedToken]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, tokens = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return tokens
+
+    def _set_in_memory(self, key: str, tokens: List[CachedToken], ttl_seconds: Optional[int]):
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds is not None else None
+        self.entries[key] = (expires_at, tokens)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    async def get(
+        self, key: str, use_redis: bool = False, ttl_seconds: Optional[int] = None
+    ) -> Optional[List[CachedToken]]:
+        tokens = self._get_from_memory(key)
+        if tokens is not None:
+            self.stats.num_memory_hits += 1
+            return tokens
+        redis = self._get_redis() if use_redis else None
+        if redis is not None:
+            try:
+                serialized = await redis.get(REDIS_KEY_PREFIX + key)
+            except Exception:
+                self._disable_redis()
+                serialized = None
+            if serialized is not None:
+                tokens = _deserialize_tokens(serialized)
+                self._set_in_memory(key, tokens, ttl_seconds)
+                self.stats.num_redis_hits += 1
+                return tokens
+        self.stats.num_misses += 1
+        return None
+
+    async def set(
+        self,
+        key: str,
+        tokens: List[CachedToken],
+        use_redis: bool = False,
+        ttl_seconds: Optional[int] = None,
+    ):
+        self._set_in_memory(key, tokens, ttl_seconds)
+        redis = self._get_redis() if use_redis else None
+        if redis is not None:
+            try:
+                await redis.set(REDIS_KEY_PREFIX + key, _serialize_tokens(tokens), ex=ttl_seconds)
+            except Exception:
+                self._disable_redis()
+
+    async def stream(
+        self,
+        key: str,
+        cache_config: LLMResponseCacheConfig,
+        create_tokens: Callable[[], AsyncGenerator[CachedToken, None]],
+        should_cache: Optional[Callable[[], bool]] = None,
+    ) -> AsyncGenerator[CachedToken, None]:
+        """Replays the cached response for key at full speed, or streams (and caches) a new one.
+
+        should_cache is checked once a new response is complete, e.g. to leave out one that didn't
+        come from the request the key was computed from.
+        """
+        cached_tokens = await self.get(
+            key, use_redis=cache_config.use_redis, ttl_seconds=cache_config.ttl_seconds
+        )
+        if cached_tokens is not None:
+            for token in cached_tokens:
+                yield token
+            return
+        tokens: List[CachedToken] = []
+        async for token in create_tokens():
+            tokens.append(token)
+            yield token
+        if tokens and (should_cache is None or should_cache()):
+            await self.set(
+                key, tokens, use_redis=cache_config.use_redis, ttl_seconds=cache_config.ttl_seconds
+            )
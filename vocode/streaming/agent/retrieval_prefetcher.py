@@ -0,0 +1,167 @@
+import asyncio
+import time
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from loguru import logger
+
+from vocode.streaming.agent.speculative_response import normalize_utterance
+from vocode.streaming.utils.create_task import asyncio_create_task
+
+ResultType = TypeVar("ResultType")
+
+# lookups kept for the (interim) utterances seen most recently
+MAX_CACHED_RETRIEVALS = 8
+
+
+class RetrievalPrefetcherStats:
+    def __init__(self):
+        self.num_prefetched = 0
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_timeouts = 0
+        self.total_latency_saved_seconds = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of retrievals that reused a prefetched lookup."""
+        num_retrievals = self.num_hits + self.num_misses
+        return self.num_hits / num_retrievals if num_retrievals else 0.0
+
+    @property
+    def mean_latency_saved_seconds(self) -> float:
+        return self.total_latency_saved_seconds / self.num_hits if self.num_hits else 0.0
+
+
+class Retrieval:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task):
+        self.finished_at = time.monotonic()
+        # failures are surfaced (and logged) by retrieve, if the lookup is used at all
+        if not task.cancelled():
+            task.exception()
+
+
+class RetrievalPrefetcher(Generic[ResultType]):
+    """
+    Starts a retrieval (e.g. a vector DB similarity search) for an interim transcription once it
+    has been stable for `stability_seconds`, so that the lookup overlaps with endpointing.
+
+    `retrieve` is called with the final transcription: it reuses the lookup of the most similar
+    recent utterance if the two match closely enough (`min_similarity`, the difflib ratio of
+    their normalized texts), and starts a new one otherwise. If the results aren't back within
+    `deadline_seconds`, it returns None so the caller can respond without them; the lookup keeps
+    running and is cached, e.g. for a speculative response to the same utterance.
+    """
+
+    def __init__(
+        self,
+        search: Callable[[str], Awaitable[ResultType]],
+        stability_seconds: float,
+        min_similarity: float,
+        deadline_seconds: Optional[float],
+    ):
+        self.search = search
+        self.stability_seconds = stability_seconds
+        self.min_similarity = min_similarity
+        self.deadline_seconds = deadline_seconds
+        # normalized utterance -> its lookup
+        self.retrievals: "OrderedDict[str, Retrieval]" = OrderedDict()
+        self.pending_text: Optional[str] = None
+        self.pending_task: Optional[asyncio.Task] = None
+        self.stats = RetrievalPrefetcherStats()
+
+    def observe_interim(self, text: str):
+        normalized_text = normalize_utterance(text)
+        if not normalized_text or normalized_text == self.pending_text:
+            return
+        self._cancel_pending()
+        if normalized_text in self.retrievals:
+            self.retrievals.move_to_end(normalized_text)
+            return
+        self.pending_text = normalized_text
+        self.pending_task = asyncio_create_task(self._prefetch_when_stable(text, normalized_text))
+
+    async def _prefetch_when_stable(self, text: str, normalized_text: str):
+        await asyncio.sleep(self.stability_seconds)
+        self.pending_text, self.pending_task = None, None
+        logger.debug(f"Prefetching retrieval for: {text}")
+        self.stats.num_prefetched += 1
+        self._start(text, normalized_text)
+
+    def _start(self, text: str, normalized_text: str) -> Retrieval:
+        retrieval = self.retrievals[normalized_text] = Retrieval(
+            asyncio_create_task(self.search(text))
+        )
+        while len(self.retrievals) > MAX_CACHED_RETRIEVALS:
+            _, evicted = self.retrievals.popitem(last=False)
+            evicted.task.cancel()
+        return retrieval
+
+    def _find(self, normalized_text: str) -> Optional[Retrieval]:
+        found_text: Optional[str] = None
+        if normalized_text in self.retrievals:
+            found_text = normalized_text
+        else:
+            best_similarity = 0.0
+            for retrieved_text in self.retrievals:
+                similarity = SequenceMatcher(None, normalized_text, retrieved_text).ratio()
+                if similarity >= best_similarity:
+                    best_similarity, found_text = similarity, retrieved_text
+            if best_similarity < self.min_similarity:
+                found_text = None
+        if found_text is None:
+            return None
+        # so that a lookup that's being waited on isn't the next one evicted
+        self.retrievals.move_to_end(found_text)
+        return self.retrievals[found_text]
+
+    async def retrieve(self, text: str) -> Optional[ResultType]:
+        """Returns the results for text, or None if they failed or missed the deadline."""
+        normalized_text = normalize_utterance(text)
+        retrieval = self._find(normalized_text)
+        if retrieval is not None:
+            self.stats.num_hits += 1
+            self.stats.total_latency_saved_seconds += (
+                retrieval.finished_at or time.monotonic()
+            ) - retrieval.started_at
+        else:
+            self.stats.num_misses += 1
+            retrieval = self._start(text, normalized_text)
+        try:
+            # shielded: a lookup that misses the deadline may still be reused
+            return await asyncio.wait_for(
+                asyncio.shield(retrieval.task), timeout=self.deadline_seconds
+            )
+        except asyncio.CancelledError:
+            if not retrieval.task.cancelled():
+                raise
+            # evicted, or the prefetcher was cancelled, while it was waited on
+            return None
+        except asyncio.TimeoutError:
+            self.stats.num_timeouts += 1
+            logger.debug(f"Retrieval not back within {self.deadline_seconds}s, skipping it")
+            return None
+        except Exception:
+            logger.error("Retrieval failed", exc_info=True)
+            for retrieved_text, cached_retrieval in list(self.retrievals.items()):
+                if cached_retrieval is retrieval:
+                    del self.retrievals[retrieved_text]
+            return None
+
+    def _cancel_pending(self):
+        if self.pending_task is not None:
+            self.pending_task.cancel()
+        self.pending_text, self.pending_task = None, None
+
+    def cancel(self):
+        self._cancel_pending()
+        for retrieval in self.retrievals.values():
+            retrieval.task.cancel()
+        self.retrievals.clear()
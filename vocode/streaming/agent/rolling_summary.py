@@ -0,0 +1,167 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Union
+
+from loguru import logger
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+
+from vocode.streaming.utils.create_task import asyncio_create_task
+
+SUMMARY_HEADER = "Summary of the conversation so far:"
+
+SUMMARIZER_INSTRUCTIONS = (
+    "You maintain a running summary of a conversation between a user and an AI assistant. "
+    "Update the summary with the new turns. Keep every fact, name, number, decision and "
+    "commitment the assistant may need later, and drop small talk. Reply with the summary only."
+)
+
+# chat message roles that can't be separated from the assistant message calling them
+RESULT_ROLES = {"tool", "function"}
+
+
+def format_chat_messages_for_summary(chat_messages: List[Dict[str, Any]]) -> str:
+    lines = []
+    for chat_message in chat_messages:
+        role, content = chat_message["role"], chat_message.get("content")
+        if role == "user":
+            lines.append(f"User: {content}")
+        elif role == "assistant":
+            if content:
+                lines.append(f"Assistant: {content}")
+            function_calls = [
+                tool_call["function"] for tool_call in chat_message.get("tool_calls") or []
+            ]
+            if chat_message.get("function_call"):
+                function_calls.append(chat_message["function_call"])
+            for function_call in function_calls:
+                lines.append(
+                    f"Assistant called {function_call['name']}({function_call['arguments']})"
+                )
+        elif role in RESULT_ROLES:
+            lines.append(f"Result: {content}")
+        else:
+            lines.append(f"{role.capitalize()}: {content}")
+    return "\n".join(lines)
+
+
+class BaseConversationSummarizer(ABC):
+    @abstractmethod
+    async def summarize(self, summary: Optional[str], chat_messages: List[Dict[str, Any]]) -> str:
+        """Returns summary (None for the first one) updated with the next chat_messages."""
+        pass
+
+
+class OpenAIConversationSummarizer(BaseConversationSummarizer):
+    def __init__(
+        self,
+        openai_client: Union[AsyncOpenAI, AsyncAzureOpenAI],
+        model_name: str,
+        max_tokens: int,
+    ):
+        self.openai_client = openai_client
+        self.model_name = model_name
+        self.max_tokens = max_tokens
+
+    async def summarize(self, summary: Optional[str], chat_messages: List[Dict[str, Any]]) -> str:
+        new_turns = format_chat_messages_for_summary(chat_messages)
+        content = f"Summary:\n{summary}\n\nNew turns:\n{new_turns}" if summary else new_turns
+        response = await self.openai_client.chat.completions.create(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": SUMMARIZER_INSTRUCTIONS},
+                {"role": "user", "content": content},
+            ],
+            max_tokens=self.max_tokens,
+            temperature=0,
+        )
+        return response.choices[0].message.content or ""
+
+
+class RollingSummaryStats:
+    def __init__(self):
+        self.num_summaries = 0
+        self.num_failures = 0
+        self.num_summarized_messages = 0
+        self.total_summarize_seconds = 0.0
+
+    @property
+    def mean_summarize_seconds(self) -> float:
+        return self.total_summarize_seconds / self.num_summaries if self.num_summaries else 0.0
+
+
+class RollingSummary:
+    """
+    Keeps the prompt of a long conversation bounded by summarizing its older chat messages.
+
+    `apply` is called with each turn's chat messages (the system preamble first): it replaces the
+    messages covered by the latest summary with that summary, appended to the preamble, and keeps
+    the rest verbatim. Once at least `min_messages_to_summarize` messages are older than the
+    latest `window_size` ones, it summarizes them in the background, so the summary is folded in
+    on a later turn and never delays a response. Messages are only summarized once: each summary
+    updates the previous one with the next messages.
+    """
+
+    def __init__(
+        self,
+        summarizer: BaseConversationSummarizer,
+        window_size: int,
+        min_messages_to_summarize: int,
+    ):
+        self.summarizer = summarizer
+        self.window_size = window_size
+        self.min_messages_to_summarize = min_messages_to_summarize
+        self.summary: Optional[str] = None
+        # the chat messages after the preamble that the summary covers
+        self.num_summarized_messages = 0
+        self.summarize_task: Optional[asyncio.Task] = None
+        self.stats = RollingSummaryStats()
+
+    def apply(self, chat_messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self._maybe_summarize(chat_messages)
+        if self.summary is None:
+            return chat_messages
+        preamble = chat_messages[0]["content"]
+        summary_content = f"{SUMMARY_HEADER}\n{self.summary}"
+        return [
+            {
+                "role": "system",
+                "content": f"{preamble}\n\n{summary_content}" if preamble else summary_content,
+            }
+        ] + chat_messages[1 + self.num_summarized_messages :]
+
+    def _maybe_summarize(self, chat_messages: List[Dict[str, Any]]):
+        if self.summarize_task is not None:
+            return
+        start = 1 + self.num_summarized_messages
+        end = len(chat_messages) - self.window_size
+        # tool results are summarized along with their calls
+        while 0 < end < len(chat_messages) and chat_messages[end]["role"] in RESULT_ROLES:
+            end += 1
+        if end - start < self.min_messages_to_summarize:
+            return
+        self.summarize_task = asyncio_create_task(
+            self._summarize(chat_messages[start:end], num_summarized_messages=end - 1)
+        )
+
+    async def _summarize(self, chat_messages: List[Dict[str, Any]], num_summarized_messages: int):
+        started_at = time.monotonic()
+        try:
+            summary = await self.summarizer.summarize(self.summary, chat_messages)
+        except Exception:
+            self.stats.num_failures += 1
+            logger.error("Failed to summarize the conversation", exc_info=True)
+            return
+        finally:
+            self.summarize_task = None
+        self.summary = summary
+        self.num_summarized_messages = num_summarized_messages
+        self.stats.num_summaries += 1
+        self.stats.num_summarized_messages += len(chat_messages)
+        self.stats.total_summarize_seconds += time.monotonic() - started_at
+        logger.debug(f"Summarized {num_summarized_messages} chat messages")
+
+    def cancel(self):
+        if self.summarize_task is not None:
+            self.summarize_task.cancel()
+            self.summarize_task = None
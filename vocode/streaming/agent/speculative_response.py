@@ -0,0 +1,195 @@
+import asyncio
+import re
+import time
+from typing import TYPE_CHECKING, AsyncGenerator, Callable, Hashable, Optional
+
+from loguru import logger
+
+from vocode.streaming.utils.create_task import asyncio_create_task
+
+if TYPE_CHECKING:
+    from vocode.streaming.agent.base_agent import GeneratedResponse
+
+GenerateSpeculativeResponse = Callable[
+    [str, str, bool], AsyncGenerator["GeneratedResponse", None]
+]  # (human_input, conversation_id, bot_was_in_medias_res)
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercases and strips punctuation so that e.g. "yes please" matches "Yes, please."."""
+    return " ".join(re.sub(r"[^\w\s']", " ", text).lower().split())
+
+
+class SpeculativeResponseStats:
+    def __init__(self):
+        self.num_started = 0
+        self.num_hits = 0
+        self.num_misses = 0
+        self.num_superseded = 0
+        self.num_not_ready = 0
+        self.total_latency_saved_seconds = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of started generations whose responses were used."""
+        return self.num_hits / self.num_started if self.num_started else 0.0
+
+    @property
+    def mean_latency_saved_seconds(self) -> float:
+        return self.total_latency_saved_seconds / self.num_hits if self.num_hits else 0.0
+
+
+class SpeculativeResponse:
+    def __init__(
+        self,
+        text: str,
+        context: Hashable,
+        bot_was_in_medias_res: bool,
+    ):
+        self.text = text
+        self.normalized_text = normalize_utterance(text)
+        self.context = context
+        self.bot_was_in_medias_res = bot_was_in_medias_res
+        self.responses: asyncio.Queue[Optional["GeneratedResponse"]] = asyncio.Queue()
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self.generation_started_at: Optional[float] = None
+        self.first_response_at: Optional[float] = None
+
+    def cancel(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+
+
+class ResponseSpeculator:
+    """
+    Starts generating a response to an interim transcription once it has been stable for
+    `stability_seconds`, so that the LLM's time to first token overlaps with endpointing.
+
+    When the final transcription arrives, `claim` hands back the buffered (and still streaming)
+    responses if the final text matches the speculated one after normalization and the
+    conversation context hasn't changed in the meantime; otherwise the speculation is cancelled
+    and the caller generates a response as usual.
+    """
+
+    def __init__(
+        self,
+        generate_response: GenerateSpeculativeResponse,
+        stability_seconds: float,
+    ):
+        self.generate_response = generate_response
+        self.stability_seconds = stability_seconds
+        self.current: Optional[SpeculativeResponse] = None
+        self.claimed: Optional[SpeculativeResponse] = None
+        self.stats = SpeculativeResponseStats()
+
+    def observe_interim(
+        self,
+        text: str,
+        conversation_id: str,
+        context: Hashable,
+        bot_was_in_medias_res: bool = False,
+    ):
+        normalized_text = normalize_utterance(text)
+        current = self.current
+        if (
+            current is not None
+            and current.normalized_text == normalized_text
+            and current.context == context
+            and current.bot_was_in_medias_res == bot_was_in_medias_res
+        ):
+            return
+        self._discard_current(superseded=True)
+        if not normalized_text:
+            return
+        speculation = SpeculativeResponse(
+            text=text,
+            context=context,
+            bot_was_in_medias_res=bot_was_in_medias_res,
+        )
+        speculation.task = asyncio_create_task(self._speculate(speculation, conversation_id))
+        self.current = speculation
+
+    async def _speculate(self, speculation: SpeculativeResponse, conversation_id: str):
+        await asyncio.sleep(self.stability_seconds)
+        speculation.generation_started_at = time.monotonic()
+        self.stats.num_started += 1
+        logger.debug(f"Speculatively generating a response to: {speculation.text}")
+        try:
+            async for response in self.generate_response(
+                speculation.text, conversation_id, speculation.bot_was_in_medias_res
+            ):
+                if speculation.first_response_at is None:
+                    speculation.first_response_at = time.monotonic()
+                speculation.responses.put_nowait(response)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            speculation.error = e
+        speculation.responses.put_nowait(None)
+
+    def claim(
+        self,
+        text: str,
+        context: Hashable,
+        bot_was_in_medias_res: bool = False,
+    ) -> Optional[AsyncGenerator["GeneratedResponse", None]]:
+        """Returns the responses to the final transcription `text` if they were speculated."""
+        if self.claimed is not None:
+            # the previous turn's responses are no longer being consumed
+            self.claimed.cancel()
+            self.claimed = None
+        speculation, self.current = self.current, None
+        if speculation is None:
+            return None
+        if speculation.generation_started_at is None:
+            speculation.cancel()
+            self.stats.num_not_ready += 1
+            return None
+        if (
+            speculation.normalized_text != normalize_utterance(text)
+            or speculation.context != context
+            or speculation.bot_was_in_medias_res != bot_was_in_medias_res
+        ):
+            speculation.cancel()
+            self.stats.num_misses += 1
+            logger.debug(f"Speculative response missed: {speculation.text!r} vs {text!r}")
+            return None
+
+        claimed_at = time.monotonic()
+        latency_saved = (speculation.first_response_at or claimed_at) - (
+            speculation.generation_started_at
+        )
+        self.stats.num_hits += 1
+        self.stats.total_latency_saved_seconds += latency_saved
+        logger.debug(f"Using speculative response, saved {latency_saved:.3f}s")
+        self.claimed = speculation
+        return self._replay(speculation)
+
+    async def _replay(
+        self, speculation: SpeculativeResponse
+    ) -> AsyncGenerator["GeneratedResponse", None]:
+        try:
+            while True:
+                response = await speculation.responses.get()
+                if response is None:
+                    break
+                yield response
+            if speculation.error is not None:
+                raise speculation.error
+        finally:
+            speculation.cancel()
+
+    def _discard_current(self, superseded: bool = False):
+        if self.current is None:
+            return
+        if superseded and self.current.generation_started_at is not None:
+            self.stats.num_superseded += 1
+        self.current.cancel()
+        self.current = None
+
+    def cancel(self):
+        self._discard_current()
+        if self.claimed is not None:
+            self.claimed.cancel()
+            self.claimed = None
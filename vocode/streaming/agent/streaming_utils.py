@@ -1,5 +1,17 @@
+import asyncio
+import json
 import re
-from typing import AsyncGenerator, AsyncIterable, List, Literal, Optional, Union
+from typing import (
+    AsyncGenerator,
+    AsyncIterable,
+    Collection,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Set,
+    Union,
+)
 
 from sentry_sdk.tracing import Span
 
@@ -7,6 +19,12 @@ from vocode.streaming.models.actions import FunctionCall, FunctionFragment
 
 TOKENS_TO_GENERATE_PAST_PERIOD = 3
 SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN = r"[?!\n\t\r]"
+SENTENCE_ENDINGS_EXCEPT_PERIOD = ("?", "!", "\n", "\t", "\r")
+SENTENCE_ENDINGS_EXCEPT_PERIOD_REGEX = re.compile(SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN)
+JSON_STRUCTURE_REGEX = re.compile(r'["\\{}\[\]]')
+CLAUSE_ENDINGS = (", ", ": ", "; ")
+BATCH_FLUSH_PUNCTUATION = (".", ",", "?", "!", ";", ":", "—")
+STREAMING_SPLITTERS = (".", ",", "?", "!", ";", ":", "—", "-", "(", ")", "[", "]", "}", " ")
 
 
 SHORT_SENTENCE_CUTOFF = 3
@@ -37,20 +55,265 @@ def split_sentences(text: str) -> List[str]:
     return [sentence for sentence in final_split if sentence]
 
 
+class SentenceSegmenter:
+    """
+    Splits streamed LLM tokens into speakable chunks, incrementally.
+
+    Yields the same chunks as rescanning the whole buffer on every token would: nothing is
+    split off until the buffer holds SHORT_SENTENCE_CUTOFF words, a chunk ends at the last
+    ?, !, newline, tab or carriage return of a token, and TOKENS_TO_GENERATE_PAST_PERIOD tokens
+    after a period the buffer is split into sentences with `split_sentences`. Word counts and
+    ". " boundaries are tracked as tokens arrive, so each token costs time proportional to its
+    own length rather than the buffer's.
+
+    Pieces ending in one of `abbreviations` (e.g. "Dr", "e.g", compared case-insensitively)
+    are merged into the next sentence like the numbers of a numbered list; there are none by
+    default.
+
+    If `first_chunk_min_words` is set, the first chunk is cut early at a clause boundary (a
+    comma, colon or semicolon followed by a space) once it holds that many words, so that the
+    synthesizer can start on a long opening sentence; the rest are sentence-level as usual.
+    """
+
+    def __init__(
+        self,
+        abbreviations: Collection[str] = (),
+        first_chunk_min_words: Optional[int] = None,
+    ):
+        self.abbreviations = frozenset(abbreviation.lower() for abbreviation in abbreviations)
+        self.first_chunk_min_words = first_chunk_min_words
+        self.num_chunks = 0
+        self.buffer = ""
+        self.num_words = 0
+        # indices in the buffer of every ". " (sentence boundary candidates)
+        self.boundaries: List[int] = []
+        self.is_post_period = False
+        self.tokens_since_period = 0
+
+    def push(self, token: str) -> List[str]:
+        """Adds a token, returning the chunks that are now complete."""
+        chunks: List[str] = []
+        previous_length = len(self.buffer)
+        self._append(token)
+        if self.num_words < SHORT_SENTENCE_CUTOFF:
+            return chunks
+
+        if SENTENCE_ENDINGS_EXCEPT_PERIOD_REGEX.search(token):
+            last_ending = max(token.rfind(ending) for ending in SENTENCE_ENDINGS_EXCEPT_PERIOD)
+            split_point = previous_length + last_ending + 1
+            to_return = self.buffer[:split_point].strip()
+            if to_return:
+                chunks.append(to_return)
+            self._reset_buffer(self.buffer[split_point:])
+        else:
+            if self.first_chunk_min_words is not None and self.num_chunks == 0:
+                self._maybe_cut_first_clause(previous_length, chunks)
+            if "." in token:
+                self.is_post_period = True
+                self.tokens_since_period = 0
+
+        if self.is_post_period and self.tokens_since_period > TOKENS_TO_GENERATE_PAST_PERIOD:
+            sentences = self._split_sentences()
+            if len(sentences) > 1:
+                chunks.append(" ".join(sentences[:-1]))
+                self._reset_buffer(sentences[-1])
+            self.is_post_period = False
+            self.tokens_since_period = 0
+        else:
+            self.tokens_since_period += 1
+        self.num_chunks += len(chunks)
+        return chunks
+
+    def _maybe_cut_first_clause(self, previous_length: int, chunks: List[str]):
+        # a clause ending spans at most the last character before this token
+        search_start = max(previous_length - 1, 0)
+        clause_end = max(self.buffer.rfind(ending, search_start) for ending in CLAUSE_ENDINGS)
+        if clause_end == -1:
+            return
+        split_point = clause_end + 1
+        first_clause = self.buffer[:split_point].strip()
+        assert self.first_chunk_min_words is not None
+        if len(first_clause.split()) >= self.first_chunk_min_words:
+            chunks.append(first_clause)
+            self._reset_buffer(self.buffer[split_point:])
+
+    def flush(self) -> Optional[str]:
+        to_return = self.buffer.strip()
+        self._reset_buffer("")
+        return to_return or None
+
+    def _append(self, token: str):
+        buffer = self.buffer
+        if self.num_words < SHORT_SENTENCE_CUTOFF:
+            # appending never removes words, so they only need counting up to the cutoff
+            num_token_words = len(token.split())
+            if num_token_words and buffer and not buffer[-1].isspace() and not token[0].isspace():
+                num_token_words -= 1  # the token continues the buffer's last word
+            self.num_words += num_token_words
+
+        start = len(buffer)
+        self.buffer = buffer = buffer + token
+        if ". " in token or (token[:1] == " " and buffer[start - 1 : start] == "."):
+            boundary = buffer.find(". ", max(start - 1, 0))
+            while boundary != -1:
+                self.boundaries.append(boundary)
+                boundary = buffer.find(". ", boundary + 2)
+
+    def _reset_buffer(self, buffer: str):
+        self.buffer = ""
+        self.num_words = 0
+        self.boundaries = []
+        self._append(buffer)
+
+    def _continues_sentence(self, piece: str) -> bool:
+        piece = piece.strip()
+        if piece.isdecimal():
+            return True
+        if not self.abbreviations or not piece:
+            return False
+        return piece.split()[-1].lower() in self.abbreviations
+
+    def _split_sentences(self) -> List[str]:
+        """`split_sentences(self.buffer)`, using the tracked boundaries."""
+        buffer = self.buffer
+        sentences: List[str] = []
+        sentence_start = 0
+        piece_start = 0
+        for boundary in self.boundaries:
+            if not self._continues_sentence(buffer[piece_start:boundary]):
+                sentence = buffer[sentence_start : boundary + 2].strip()
+                if sentence:
+                    sentences.append(sentence)
+                sentence_start = boundary + 2
+            piece_start = boundary + 2
+        sentence = buffer[sentence_start:].strip()
+        if sentence:
+            sentences.append(sentence)
+        return sentences
+
+
+class JSONObjectScanner:
+    """Tracks whether streamed text has formed a complete JSON object, fragment by fragment.
+
+    Only the characters that change the nesting (braces, brackets, quotes and escapes) are
+    looked at, so each fragment costs time proportional to its own length. The scanner doesn't
+    validate the JSON: once the object is closed, `end` is the length of the text it spans.
+    """
+
+    def __init__(self):
+        self.length = 0
+        self.depth = 0
+        self.is_started = False
+        self.is_in_string = False
+        self.is_escaped = False
+        self.is_invalid = False
+        self.end: Optional[int] = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.end is not None
+
+    def push(self, text: str) -> bool:
+        """Adds a fragment, returning whether the object is now complete."""
+        offset = self.length
+        self.length += len(text)
+        if self.is_complete or self.is_invalid:
+            return self.is_complete
+        if not self.is_started:
+            stripped = text.lstrip()
+            if not stripped:
+                return False
+            if stripped[0] != "{":
+                self.is_invalid = True  # e.g. an action without parameters called with ""
+                return False
+            self.is_started = True
+        next_index = 1 if self.is_escaped else 0  # an escaped character ended the last fragment
+        self.is_escaped = False
+        for match in JSON_STRUCTURE_REGEX.finditer(text):
+            index = match.start()
+            if index < next_index:
+                continue
+            character = match.group()
+            if self.is_in_string:
+                if character == "\\":
+                    next_index = index + 2
+                    self.is_escaped = next_index > len(text)
+                elif character == '"':
+                    self.is_in_string = False
+            elif character == '"':
+                self.is_in_string = True
+            elif character in "{[":
+                self.depth += 1
+            elif character in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = offset + index + 1
+                    return True
+        return False
+
+
+class FunctionCallBuffer:
+    """Assembles the FunctionFragments of a response into FunctionCalls, one per tool call.
+
+    `push` returns a function call as soon as its arguments form a complete JSON object, so
+    that it can be started while the rest of the response streams in; `get_function_calls`
+    returns the rest (e.g. calls whose arguments never parsed) once the response has ended.
+    """
+
+    def __init__(self):
+        self.names: Dict[int, str] = {}
+        self.arguments: Dict[int, str] = {}
+        self.tool_call_ids: Dict[int, str] = {}
+        self.scanners: Dict[int, JSONObjectScanner] = {}
+        self.returned_indices: Set[int] = set()
+
+    def push(self, fragment: FunctionFragment) -> Optional[FunctionCall]:
+        index = fragment.index
+        self.names[index] = self.names.get(index, "") + fragment.name
+        self.arguments[index] = self.arguments.get(index, "") + fragment.arguments
+        if fragment.tool_call_id:
+            self.tool_call_ids[index] = fragment.tool_call_id
+        scanner = self.scanners.setdefault(index, JSONObjectScanner())
+        if index in self.returned_indices or not scanner.push(fragment.arguments):
+            return None
+        assert scanner.end is not None
+        arguments = self.arguments[index][: scanner.end]
+        try:
+            json.loads(arguments)
+        except ValueError:
+            return None
+        if not self.names[index]:
+            return None
+        self.returned_indices.add(index)
+        return self._get_function_call(index, arguments)
+
+    def _get_function_call(self, index: int, arguments: str) -> FunctionCall:
+        return FunctionCall(
+            name=self.names[index],
+            arguments=arguments,
+            tool_call_id=self.tool_call_ids.get(index),
+        )
+
+    def get_function_calls(self) -> List[FunctionCall]:
+        return [
+            self._get_function_call(index, self.arguments[index])
+            for index, name in sorted(self.names.items())
+            if name and index not in self.returned_indices
+        ]
+
+
 async def collate_response_async(
     conversation_id: str,
     gen: AsyncIterable[Union[str, FunctionFragment]],
     get_functions: Literal[True, False] = False,
     sentry_span: Optional[Span] = None,
+    first_chunk_min_words: Optional[int] = None,
 ) -> AsyncGenerator[
     Union[str, FunctionCall],
     None,
 ]:  # tuple of message to send and whether it's the final message
-    buffer = ""
-    function_name_buffer = ""
-    function_args_buffer = ""
-    is_post_period = False
-    tokens_since_period = 0
+    segmenter = SentenceSegmenter(first_chunk_min_words=first_chunk_min_words)
+    function_calls = FunctionCallBuffer()
     is_first = True
     async for token in gen:
         if is_first:
@@ -60,42 +323,23 @@ async def collate_response_async(
         if not token:
             continue
         if isinstance(token, str):
-            buffer += token
-            if len(buffer.strip().split()) < SHORT_SENTENCE_CUTOFF:
-                continue
-            if re.search(SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN, token):
-                # split on last occurrence of sentence ending
-                matches = [
-                    match for match in re.finditer(SENTENCE_ENDINGS_EXCEPT_PERIOD_PATTERN, buffer)
-                ]
-                last_match = matches[-1]
-                split_point = last_match.start() + 1
-                to_keep, to_return = buffer[split_point:], buffer[:split_point]
-                if to_return.strip():
-                    yield to_return.strip()
-                buffer = to_keep
-            elif "." in token:
-                is_post_period = True
-                tokens_since_period = 0
-
-            if is_post_period and tokens_since_period > TOKENS_TO_GENERATE_PAST_PERIOD:
-                sentences = split_sentences(buffer)
-                if len(sentences) > 1:
-                    yield " ".join(sentences[:-1])
-                    buffer = sentences[-1]
-                is_post_period = False
-                tokens_since_period = 0
-            else:
-                tokens_since_period += 1
+            for chunk in segmenter.push(token):
+                yield chunk
 
         elif isinstance(token, FunctionFragment):
-            function_name_buffer += token.name
-            function_args_buffer += token.arguments
-    to_return = buffer.strip()
+            function_call = function_calls.push(token)
+            if function_call is not None and get_functions:
+                # the text of a response comes before its function calls, so flush it first
+                to_return = segmenter.flush()
+                if to_return:
+                    yield to_return
+                yield function_call
+    to_return = segmenter.flush()
     if to_return:
         yield to_return
-    if function_name_buffer and get_functions:
-        yield FunctionCall(name=function_name_buffer, arguments=function_args_buffer)
+    if get_functions:
+        for function_call in function_calls.get_function_calls():
+            yield function_call
 
 
 async def stream_response_async(
@@ -103,14 +347,21 @@ async def stream_response_async(
     gen: AsyncIterable[Union[str, FunctionFragment]],
     get_functions: Literal[True, False] = False,
     sentry_span: Optional[Span] = None,
+    max_batch_delay_seconds: Optional[float] = None,
 ) -> AsyncGenerator[
     Union[str, FunctionCall],
     None,
 ]:  # tuple of message to send and whether it's the final message
-    splitters = (".", ",", "?", "!", ";", ":", "—", "-", "(", ")", "[", "]", "}", " ")
+    if max_batch_delay_seconds is not None:
+        async for batch in batch_streamed_words_async(
+            stream_response_async(conversation_id, gen, get_functions, sentry_span),
+            max_batch_delay_seconds=max_batch_delay_seconds,
+        ):
+            yield batch
+        return
+    splitters = STREAMING_SPLITTERS
     buffer = ""
-    function_name_buffer = ""
-    function_args_buffer = ""
+    function_calls = FunctionCallBuffer()
     is_first = True
     async for token in gen:
         if is_first:
@@ -131,9 +382,66 @@ async def stream_response_async(
                 buffer += token
 
         elif isinstance(token, FunctionFragment):
-            function_name_buffer += token.name
-            function_args_buffer += token.arguments
+            function_call = function_calls.push(token)
+            if function_call is not None and get_functions:
+                if buffer != "":
+                    yield buffer + " "
+                    buffer = ""
+                yield function_call
     if buffer != "":
         yield buffer + " "
-    if function_name_buffer and get_functions:
-        yield FunctionCall(name=function_name_buffer, arguments=function_args_buffer)
+    if get_functions:
+        for function_call in function_calls.get_function_calls():
+            yield function_call
+
+
+async def batch_streamed_words_async(
+    gen: AsyncIterable[Union[str, FunctionCall]],
+    max_batch_delay_seconds: float,
+) -> AsyncGenerator[Union[str, FunctionCall], None]:
+    """Joins the words streamed by stream_response_async into fewer, larger chunks.
+
+    The first word is passed through immediately; after that, words are held until one ends
+    in punctuation or the oldest held word has waited `max_batch_delay_seconds`. This cuts the
+    number of agent responses (and queue hops to the synthesizer) per turn without delaying
+    the start of speech.
+    """
+    loop = asyncio.get_running_loop()
+    iterator = gen.__aiter__()
+    batch = ""
+    deadline: Optional[float] = None
+    is_first = True
+    next_item: Optional[asyncio.Future] = None
+    try:
+        while True:
+            if next_item is None:
+                next_item = asyncio.ensure_future(iterator.__anext__())
+            timeout = None if deadline is None else max(deadline - loop.time(), 0.0)
+            done, _ = await asyncio.wait({next_item}, timeout=timeout)
+            if not done:
+                yield batch
+                batch, deadline = "", None
+                continue
+            item_future, next_item = next_item, None
+            try:
+                item = item_future.result()
+            except StopAsyncIteration:
+                break
+            if isinstance(item, str):
+                batch += item
+                if (is_first and item.strip()) or item.rstrip().endswith(BATCH_FLUSH_PUNCTUATION):
+                    yield batch
+                    batch, deadline = "", None
+                    is_first = False
+                elif deadline is None:
+                    deadline = loop.time() + max_batch_delay_seconds
+            else:
+                if batch:
+                    yield batch
+                    batch, deadline = "", None
+                yield item
+        if batch:
+            yield batch
+    finally:
+        if next_item is not None:
+            next_item.cancel()
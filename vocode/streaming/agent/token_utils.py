@@ -2,6 +2,7 @@
 
 import json
 import textwrap
+from functools import lru_cache
 from typing import Any, Dict, List, NamedTuple, Optional
 
 import tiktoken
@@ -33,6 +34,9 @@ from loguru import logger
 # SOFTWARE.
 
 
+# function definitions whose token counts are kept, across conversations
+MAX_CACHED_FUNCTION_TOKEN_COUNTS = 1024
+
 # Used to count the amount of tokens Actions add to the billable cost
 _FUNCTION_OVERHEAD_STR = """# Tools
 
@@ -81,6 +85,18 @@ TokenizerInfo = NamedTuple(
 )
 
 
+@lru_cache(maxsize=None)
+def get_encoding_for_model(model: str) -> tiktoken.Encoding:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.warning(f"Warning: model not found. Using cl100k_base encoding for {model}.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
+# memoized per model: resolving the encoding and the model's message overheads is repeated on
+# every turn otherwise
+@lru_cache(maxsize=None)
 def get_tokenizer_info(model: str) -> Optional[TokenizerInfo]:
     if "gpt-35-turbo" in model:
         model = "gpt-3.5-turbo"
@@ -88,11 +104,7 @@ def get_tokenizer_info(model: str) -> Optional[TokenizerInfo]:
         model = "gpt-4o"
     elif "gpt4" in model or "gpt-4" in model:
         model = "gpt-4"
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.warning(f"Warning: model not found. Using cl100k_base encoding for {model}.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    encoding = get_encoding_for_model(model)
     if model in {
         "gpt-3.5-turbo-0613",
         "gpt-3.5-turbo-16k-0613",
@@ -172,26 +184,40 @@ def tokens_from_dict(encoding: tiktoken.Encoding, d: Dict[str, Any], tokens_per_
             num_tokens += tokens_from_dict(
                 encoding=encoding, d=value, tokens_per_name=tokens_per_name
             )
+        elif isinstance(value, list):  # e.g. tool_calls
+            for item in value:
+                if isinstance(item, dict):
+                    num_tokens += tokens_from_dict(
+                        encoding=encoding, d=item, tokens_per_name=tokens_per_name
+                    )
 
     return num_tokens
 
 
 def num_tokens_from_functions(functions: List[dict] | None, model="gpt-3.5-turbo-0613") -> int:
-    """Return the number of tokens used by a list of functions."""
+    """
+    Return the number of tokens used by a list of functions.
+
+    Token counts are cached per function definition (and model), so the actions of an agent are
+    only formatted and tokenized once rather than on every turn.
+    """
     if not functions:
         return 0
 
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-    except KeyError:
-        logger.warning("Warning: model not found. Using cl100k_base encoding.")
-        encoding = tiktoken.get_encoding("cl100k_base")
+    return _num_function_overhead_tokens(model) + sum(
+        _num_tokens_from_function(json.dumps(f, sort_keys=True), model) for f in functions
+    )
 
-    function_overhead = 3 + len(encoding.encode(_FUNCTION_OVERHEAD_STR))
 
-    return function_overhead + sum(
-        len(encoding.encode(_format_func_into_prompt_str(func=f))) for f in functions
-    )
+@lru_cache(maxsize=None)
+def _num_function_overhead_tokens(model: str) -> int:
+    return 3 + len(get_encoding_for_model(model).encode(_FUNCTION_OVERHEAD_STR))
+
+
+@lru_cache(maxsize=MAX_CACHED_FUNCTION_TOKEN_COUNTS)
+def _num_tokens_from_function(function_json: str, model: str) -> int:
+    encoding = get_encoding_for_model(model)
+    return len(encoding.encode(_format_func_into_prompt_str(func=json.loads(function_json))))
 
 
 # Calculates the amount of tokens added to a given OpenAI prompt for functions
@@ -90,19 +90,31 @@ class ActionInput(BaseModel, Generic[ParametersType]):
     conversation_id: str
     params: ParametersType
     user_message_tracker: Optional[asyncio.Event] = None
+    # the id of the LLM tool call that triggered the action, if it was made as a tool call
+    tool_call_id: Optional[str] = None
 
     class Config:
         arbitrary_types_allowed = True
 
 
+class ActionInputBatch(BaseModel):
+    """The inputs of actions triggered by the same LLM response, which are run concurrently."""
+
+    action_inputs: List[ActionInput]
+
+
 class FunctionFragment(BaseModel):
     name: str
     arguments: str
+    # which of the response's (parallel) tool calls the fragment belongs to
+    index: int = 0
+    tool_call_id: Optional[str] = None
 
 
 class FunctionCall(BaseModel):
     name: str
     arguments: str
+    tool_call_id: Optional[str] = None
 
 
 class EndOfTurn(BaseModel):
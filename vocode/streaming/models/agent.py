@@ -104,6 +104,12 @@ class AgentConfig(TypedModel, type=AgentType.BASE.value):  # type: ignore
     goodbye_phrases: Optional[List[str]] = None
     interrupt_sensitivity: InterruptSensitivity = "low"
     cut_off_response: Optional[CutOffResponse] = None
+    # cut the first chunk of each response at a comma/colon once it has this many words
+    first_chunk_min_words: Optional[int] = None
+    # with input streaming synthesizers, send words in batches at punctuation or after this long
+    streamed_token_batch_delay_seconds: Optional[float] = None
+    # how many of the actions triggered by one response run at the same time
+    max_concurrent_actions: int = 4
 
 
 class LLMAgentConfig(AgentConfig, type=AgentType.LLM.value):  # type: ignore
@@ -118,6 +124,53 @@ class LLMFallback(BaseModel):
     model_name: str
 
 
+class LLMHedgeConfig(BaseModel):
+    # start the request against the llm_fallback if the first token is later than this
+    # percentile of recent first token latencies...
+    latency_percentile: float = 0.95
+    # ...or, until min_samples latencies have been observed, later than this
+    initial_delay_seconds: float = 1.5
+    min_delay_seconds: float = 0.3
+    min_samples: int = 20
+
+
+class LLMResponseCacheConfig(BaseModel):
+    # also share cached responses between processes through Redis
+    use_redis: bool = False
+    ttl_seconds: Optional[int] = 24 * 60 * 60
+    # by default, only deterministic requests are cached: temperature 0 and no functions
+    cache_function_calls: bool = False
+    cache_nonzero_temperature: bool = False
+
+
+class RetrievalPrefetchConfig(BaseModel):
+    # start the vector DB lookup once an interim transcription is unchanged for this long
+    stability_seconds: float = 0.2
+    # reuse the lookup for a final transcription this similar (difflib ratio, after normalizing)
+    min_similarity: float = 0.9
+    # respond without the documents if they aren't back this long after the final transcription
+    deadline_seconds: Optional[float] = 0.5
+
+
+class RollingSummaryConfig(BaseModel):
+    # the latest chat messages, always kept verbatim in the prompt
+    window_size: int = 20
+    # summarize the messages before the window once there are at least this many
+    min_messages_to_summarize: int = 10
+    # defaults to the agent's model
+    model_name: Optional[str] = None
+    max_tokens: int = 400
+
+
+class ModelRouterConfig(BaseModel):
+    # the model (or Azure deployment) for simple turns; others go to the agent's model
+    fast_model_name: str = "gpt-4o-mini"
+    # turns with more words than this go to the agent's model
+    max_fast_words: int = 6
+    # turns mentioning any of these words or phrases go to the agent's model
+    strong_keywords: List[str] = []
+
+
 class ChatGPTAgentConfig(AgentConfig, type=AgentType.CHAT_GPT.value):  # type: ignore
     openai_api_key: Optional[str] = None
     prompt_preamble: str
@@ -132,6 +185,20 @@ class ChatGPTAgentConfig(AgentConfig, type=AgentType.CHAT_GPT.value):  # type: i
     backchannel_probability: float = 0.7
     first_response_filler_message: Optional[str] = None
     llm_fallback: Optional[LLMFallback] = None
+    # hedge slow requests against the llm_fallback (opt-in)
+    llm_hedge: Optional[LLMHedgeConfig] = None
+    # start generating once an interim transcription is unchanged for this long (opt-in)
+    speculative_response_stability_seconds: Optional[float] = None
+    # replay responses to byte-identical requests (opt-in)
+    response_cache: Optional[LLMResponseCacheConfig] = None
+    # offer actions as tools, so one response can call several of them at once
+    parallel_tool_calls: bool = False
+    # look up vector_db_config documents while the human is still speaking (opt-in)
+    retrieval_prefetch: Optional[RetrievalPrefetchConfig] = None
+    # summarize older turns in the background to bound the prompt of long calls (opt-in)
+    rolling_summary: Optional[RollingSummaryConfig] = None
+    # send simple turns to a faster model (opt-in)
+    model_router: Optional[ModelRouterConfig] = None
 
 
 class AnthropicAgentConfig(AgentConfig, type=AgentType.ANTHROPIC.value):  # type: ignore
@@ -139,6 +206,8 @@ class AnthropicAgentConfig(AgentConfig, type=AgentType.ANTHROPIC.value):  # type
     model_name: str = CHAT_ANTHROPIC_DEFAULT_MODEL_NAME
     max_tokens: int = LLM_AGENT_DEFAULT_MAX_TOKENS
     temperature: float = LLM_AGENT_DEFAULT_TEMPERATURE
+    # replay responses to byte-identical requests (opt-in)
+    response_cache: Optional[LLMResponseCacheConfig] = None
 
 
 class LangchainAgentConfig(AgentConfig, type=AgentType.LANGCHAIN.value):  # type: ignore
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import List, Optional
 
-from pydantic.v1 import validator
+from pydantic.v1 import Field, validator
 
 import vocode.streaming.livekit.constants as LiveKitConstants
 from vocode.streaming.input_device.base_input_device import BaseInputDevice
@@ -51,6 +51,25 @@ class PunctuationEndpointingConfig(
     time_cutoff_seconds: float = 0.4
 
 
+class TimeSilentConfig(BaseModel):
+    time_cutoff_seconds: float = 1
+    post_punctuation_time_seconds: float = 0.5
+
+
+class InternalPunctuationEndpointingConfig(  # type: ignore
+    EndpointingConfig, type="internal_punctuation_based"
+):
+    time_silent_config: TimeSilentConfig = Field(default_factory=TimeSilentConfig)
+    use_single_utterance_endpointing_for_first_utterance: bool = False
+
+
+class DeepgramEndpointingConfig(EndpointingConfig, type="deepgram"):  # type: ignore
+    vad_threshold_ms: int = 500
+    utterance_cutoff_ms: int = 1000
+    time_silent_config: Optional[TimeSilentConfig] = Field(default_factory=TimeSilentConfig)
+    use_single_utterance_endpointing_for_first_utterance: bool = False
+
+
 class TranscriberConfig(TypedModel, type=TranscriberType.BASE.value):  # type: ignore
     sampling_rate: int
     audio_encoding: AudioEncoding
@@ -152,9 +171,13 @@ class AssemblyAITranscriberConfig(
 class WhisperCPPTranscriberConfig(
     TranscriberConfig, type=TranscriberType.WHISPER_CPP.value  # type: ignore
 ):
+    # how often (in seconds of audio) an interim transcription of the current utterance is produced
     buffer_size_seconds: float = 1
     libname: str
     fname_model: str
+    max_window_seconds: float = 15
+    vad_energy_threshold: float = 0.01
+    vad_pause_seconds: float = 0.6
 
 
 class RevAITranscriberConfig(TranscriberConfig, type=TranscriberType.REV_AI.value):  # type: ignore
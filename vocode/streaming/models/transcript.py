@@ -1,8 +1,9 @@
 import time
+from collections import Counter
 from datetime import datetime
-from typing import List, Literal, Optional
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Literal, Optional, Tuple, Type
 
-from pydantic.v1 import BaseModel, Field
+from pydantic.v1 import BaseModel, Field, PrivateAttr
 
 from vocode.streaming.models.actions import ActionInput, ActionOutput
 from vocode.streaming.models.events import ActionEvent, Event, EventType, Sender
@@ -116,14 +117,208 @@ class TranscriptEvent(Event, type=EventType.TRANSCRIPT):  # type: ignore
         return f"{self.sender.name}: {self.text}"
 
 
+# an event log model, its field names and the fields that were set
+EventLogLayout = Tuple[Type[EventLog], Tuple[str, ...], FrozenSet[str]]
+
+# shared by the compacted event logs of every transcript
+_event_log_layouts: Dict[EventLogLayout, EventLogLayout] = {}
+
+
+class CompactEventLog:
+    """An event log stored as a slotted record of its field values."""
+
+    __slots__ = ("layout", "values")
+
+    def __init__(self, layout: EventLogLayout, values: Tuple[Any, ...]):
+        self.layout = layout
+        self.values = values
+
+    def materialize(self) -> EventLog:
+        event_log_type, field_names, fields_set = self.layout
+        # what BaseModel.construct does, without applying the defaults again
+        event_log = event_log_type.__new__(event_log_type)
+        object.__setattr__(event_log, "__dict__", dict(zip(field_names, self.values)))
+        object.__setattr__(event_log, "__fields_set__", set(fields_set))
+        if event_log_type.__private_attributes__:
+            event_log._init_private_attributes()
+        return event_log
+
+
+def _materialize(event_log: Any) -> Any:
+    return event_log.materialize() if isinstance(event_log, CompactEventLog) else event_log
+
+
+class CompactEventLogs(list):
+    """
+    A list of event logs that stores the ones that are settled (see `compact`) as
+    CompactEventLogs, and materializes them as new pydantic models whenever they are read.
+
+    A compacted event log takes a fraction of the memory of its model: its field values are kept
+    in a tuple, its layout is shared with every event log of the same shape, and the action inputs
+    of its action logs (copies of each other, sharing their fields) are stored once.
+    Materialized event logs are copies, so changes to them aren't kept.
+    """
+
+    def __init__(self, event_logs: Iterable[Any] = ()):
+        super().__init__(event_logs)
+        self.num_compacted_event_logs = 0
+        self.action_inputs: Dict[Tuple[Any, ...], ActionInput] = {}
+
+    def compact(self, stop: int):
+        """Compacts the event logs before stop, which won't be changed anymore."""
+        for position in range(min(self.num_compacted_event_logs, len(self)), stop):
+            event_log = list.__getitem__(self, position)
+            if isinstance(event_log, EventLog):
+                list.__setitem__(self, position, self._compact(event_log))
+        self.num_compacted_event_logs = max(self.num_compacted_event_logs, stop)
+
+    def _compact(self, event_log: EventLog) -> CompactEventLog:
+        layout = (
+            type(event_log),
+            tuple(event_log.__dict__),
+            frozenset(event_log.__fields_set__),
+        )
+        return CompactEventLog(
+            _event_log_layouts.setdefault(layout, layout),
+            tuple(self._intern_action_input(value) for value in event_log.__dict__.values()),
+        )
+
+    def _intern_action_input(self, value: Any) -> Any:
+        if not isinstance(value, ActionInput):
+            return value
+        # pydantic copies action inputs shallowly, e.g. for an action's start and finish logs
+        key = (type(value), *map(id, value.__dict__.values()))
+        return self.action_inputs.setdefault(key, value)
+
+    def __getitem__(self, index):  # type: ignore
+        if isinstance(index, slice):
+            return [_materialize(event_log) for event_log in super().__getitem__(index)]
+        return _materialize(super().__getitem__(index))
+
+    def __iter__(self) -> Iterator[Any]:
+        return map(_materialize, super().__iter__())
+
+    def __reversed__(self) -> Iterator[Any]:
+        return map(_materialize, super().__reversed__())
+
+    def __contains__(self, value: Any) -> bool:
+        return any(event_log == value for event_log in self)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, list) and list(self) == list(other)
+
+    def __ne__(self, other: Any) -> bool:
+        return not self == other
+
+    def __add__(self, other: Any) -> List[Any]:  # type: ignore
+        return list(self) + list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def copy(self) -> List[Any]:  # type: ignore
+        return list(self)
+
+    def count(self, value: Any) -> int:
+        return list(self).count(value)
+
+    def index(self, value: Any, *args) -> int:  # type: ignore
+        return list(self).index(value, *args)
+
+    def pop(self, index=-1):  # type: ignore
+        return _materialize(super().pop(index))
+
+
+class TranscriptIndex:
+    """
+    The positions of the latest messages in a list of event logs, and the number of messages per
+    sender. `update` indexes the event logs appended since the last update.
+    """
+
+    def __init__(self, event_logs: List[EventLog]):
+        self.event_logs = event_logs
+        self.num_indexed_event_logs = 0
+        self.num_messages: Dict[Sender, int] = Counter()
+        # (sender, or None for any sender; whether backchannels count) -> position
+        self.last_message_positions: Dict[Tuple[Optional[Sender], bool], int] = {}
+        self.second_to_last_message_position: Optional[int] = None
+
+    def update(self):
+        for position in range(self.num_indexed_event_logs, len(self.event_logs)):
+            event_log = self.event_logs[position]
+            if not isinstance(event_log, Message):
+                continue
+            self.num_messages[event_log.sender] += 1
+            self.second_to_last_message_position = self.last_message_positions.get((None, True))
+            keys = [(None, True), (event_log.sender, True)]
+            if not event_log.is_backchannel:
+                keys += [(None, False), (event_log.sender, False)]
+            for key in keys:
+                self.last_message_positions[key] = position
+        self.num_indexed_event_logs = len(self.event_logs)
+
+
 class Transcript(BaseModel):
     event_logs: List[EventLog] = []
     start_time: float = Field(default_factory=time.time)
     events_manager: Optional[EventsManager] = None
+    _index: Optional[TranscriptIndex] = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
 
+    def _get_index(self) -> TranscriptIndex:
+        # event_logs are appended to directly, or replaced (e.g. by copy(update=...)); logs
+        # replaced in place aren't picked up
+        index = self._index
+        if (
+            index is None
+            or index.event_logs is not self.event_logs
+            or index.num_indexed_event_logs > len(self.event_logs)
+        ):
+            index = self._index = TranscriptIndex(self.event_logs)
+        index.update()
+        return index
+
+    def enable_event_log_compaction(self):
+        """
+        Stores settled event logs compactly from now on (see CompactEventLogs). A log is settled
+        once a bot message follows it; the latest bot message is still being spoken, and may be
+        cut off. The event logs are materialized as models when they're read, e.g. by the agent
+        or for the TranscriptCompleteEvent, so long conversations take a fraction of the memory
+        at the cost of rebuilding the models.
+        """
+        if not isinstance(self.event_logs, CompactEventLogs):
+            self.event_logs = CompactEventLogs(self.event_logs)
+        self._compact_settled_event_logs()
+
+    def _compact_settled_event_logs(self):
+        if isinstance(self.event_logs, CompactEventLogs):
+            last_bot_message_position = self._get_index().last_message_positions.get(
+                (Sender.BOT, True)
+            )
+            if last_bot_message_position is not None:
+                self.event_logs.compact(stop=last_bot_message_position)
+
+    def _append_event_log(self, event_log: EventLog):
+        self.event_logs.append(event_log)
+        if isinstance(event_log, Message) and event_log.sender == Sender.BOT:
+            self._compact_settled_event_logs()
+
+    def get_last_message(
+        self, sender: Optional[Sender] = None, include_backchannels: bool = True
+    ) -> Optional[Message]:
+        """The latest message, from sender if given."""
+        position = self._get_index().last_message_positions.get((sender, include_backchannels))
+        return None if position is None else self.event_logs[position]  # type: ignore
+
+    def get_second_to_last_message(self) -> Optional[Message]:
+        position = self._get_index().second_to_last_message_position
+        return None if position is None else self.event_logs[position]  # type: ignore
+
+    def get_num_messages(self, sender: Sender) -> int:
+        return self._get_index().num_messages[sender]
+
     def to_string(
         self, include_timestamps: bool = False, mark_human_backchannels_with_brackets: bool = False
     ) -> str:
@@ -174,7 +369,7 @@ class Transcript(BaseModel):
             is_final=is_final,
             is_backchannel=is_backchannel,
         )
-        self.event_logs.append(message)
+        self._append_event_log(message)
         if publish_to_events_manager:
             self.maybe_publish_transcript_event_from_message(
                 message=message, conversation_id=conversation_id
@@ -186,7 +381,7 @@ class Transcript(BaseModel):
         conversation_id: str,
         publish_to_events_manager: bool = True,
     ):
-        self.event_logs.append(message)
+        self._append_event_log(message)
         if publish_to_events_manager:
             self.maybe_publish_transcript_event_from_message(
                 message=message, conversation_id=conversation_id
@@ -209,13 +404,13 @@ class Transcript(BaseModel):
         )
 
     def get_last_user_message(self):
-        for idx, message in enumerate(self.event_logs[::-1]):
-            if message.sender == Sender.HUMAN:
-                return -1 * (idx + 1), message.to_string()
+        position = self._get_index().last_message_positions.get((Sender.HUMAN, True))
+        if position is not None:
+            return position - len(self.event_logs), self.event_logs[position].to_string()
 
     def add_action_start_log(self, action_input: ActionInput, conversation_id: str):
         timestamp = time.time()
-        self.event_logs.append(
+        self._append_event_log(
             ActionStart(
                 action_input=action_input,
                 action_type=action_input.action_config.type,
@@ -237,7 +432,7 @@ class Transcript(BaseModel):
         conversation_id: str,
     ):
         timestamp = time.time()
-        self.event_logs.append(
+        self._append_event_log(
             ActionFinish(
                 action_input=action_input,
                 action_output=action_output,
@@ -256,19 +451,13 @@ class Transcript(BaseModel):
 
     def update_last_bot_message_on_cut_off(self, text: str):
         # TODO: figure out what to do for the event
-        for event_log in reversed(self.event_logs):
-            if isinstance(event_log, Message) and event_log.sender == Sender.BOT:
-                event_log.text = text
-                break
+        last_bot_message = self.get_last_message(Sender.BOT)
+        if last_bot_message is not None:
+            last_bot_message.text = text
 
     def was_last_message_interrupted(self):
-        bot_messages = [
-            message
-            for message in self.event_logs
-            if isinstance(message, Message) and message.sender == Sender.BOT
-        ]
-        if len(bot_messages) > 0:
-            last_bot_message = bot_messages[-1]
+        last_bot_message = self.get_last_message(Sender.BOT)
+        if last_bot_message is not None:
             return not last_bot_message.is_final or not last_bot_message.is_end_of_turn
         return False
 
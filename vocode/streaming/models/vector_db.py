@@ -4,15 +4,23 @@ from typing import Optional
 from .model import TypedModel
 
 DEFAULT_EMBEDDINGS_MODEL = "text-embedding-ada-002"
+DEFAULT_EMBEDDINGS_BATCH_SIZE = 100
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+# Pinecone recommends upserting at most 100 vectors per request
+DEFAULT_UPSERT_BATCH_SIZE = 100
 
 
 class VectorDBType(str, Enum):
     BASE = "vector_db_base"
     PINECONE = "vector_db_pinecone"
+    LOCAL = "vector_db_local"
 
 
 class VectorDBConfig(TypedModel, type=VectorDBType.BASE.value):  # type: ignore
     embeddings_model: str = DEFAULT_EMBEDDINGS_MODEL
+    embeddings_batch_size: int = DEFAULT_EMBEDDINGS_BATCH_SIZE
+    # per call, for embedding (and upserting) batches
+    max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS
 
 
 class PineconeConfig(VectorDBConfig, type=VectorDBType.PINECONE.value):  # type: ignore
@@ -20,3 +28,23 @@ class PineconeConfig(VectorDBConfig, type=VectorDBType.PINECONE.value):  # type:
     api_key: Optional[str]
     api_environment: Optional[str]
     top_k: int = 3
+    upsert_batch_size: int = DEFAULT_UPSERT_BATCH_SIZE
+
+
+class LocalVectorIndexType(str, Enum):
+    FLAT = "flat"
+    IVF = "ivf"
+
+
+class LocalVectorDBConfig(VectorDBConfig, type=VectorDBType.LOCAL.value):  # type: ignore
+    # directory the index is loaded from (if it exists) and saved to
+    path: Optional[str] = None
+    index_type: LocalVectorIndexType = LocalVectorIndexType.FLAT
+    # IVF only: number of lists (defaults to the square root of the number of vectors) and number
+    # of lists searched per query
+    num_lists: Optional[int] = None
+    num_probes: int = 16
+    # IVF only: the index is (re)trained once it has this many vectors, searched flat until then
+    min_vectors_to_train: int = 10_000
+    memory_map: bool = False
+    top_k: int = 3
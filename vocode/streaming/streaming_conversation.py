@@ -7,18 +7,7 @@ import re
 import threading
 import time
 import typing
-from typing import (
-    Any,
-    Awaitable,
-    Callable,
-    Generic,
-    Iterator,
-    List,
-    Optional,
-    Tuple,
-    TypeVar,
-    Union,
-)
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar, Union
 
 import sentry_sdk
 from loguru import logger
@@ -56,7 +45,6 @@ from vocode.streaming.synthesizer.base_synthesizer import (
 )
 from vocode.streaming.synthesizer.input_streaming_synthesizer import InputStreamingSynthesizer
 from vocode.streaming.transcriber.base_transcriber import BaseTranscriber
-from vocode.streaming.transcriber.deepgram_transcriber import DeepgramTranscriber
 from vocode.streaming.utils import (
     create_conversation_id,
     enumerate_async_iter,
@@ -65,6 +53,7 @@ from vocode.streaming.utils import (
 from vocode.streaming.utils.audio_pipeline import AudioPipeline, OutputDeviceType
 from vocode.streaming.utils.create_task import asyncio_create_task
 from vocode.streaming.utils.events_manager import EventsManager
+from vocode.streaming.utils.interim_coalescing_queue import InterimCoalescingQueue
 from vocode.streaming.utils.speed_manager import SpeedManager
 from vocode.streaming.utils.state_manager import ConversationStateManager
 from vocode.streaming.utils.worker import (
@@ -152,12 +141,12 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
             interruptible_event_factory: InterruptibleEventFactory,
         ):
             super().__init__()
+            # stale interims are collapsed while a transcription is being processed
+            self._input_queue: InterimCoalescingQueue = InterimCoalescingQueue()
             self.conversation = conversation
             self.interruptible_event_factory = interruptible_event_factory
             self.in_interrupt_endpointing_config = False
-            self.deepgram_transcriber: Optional[DeepgramTranscriber] = None
-            if isinstance(self.conversation.transcriber, DeepgramTranscriber):
-                self.deepgram_transcriber = self.conversation.transcriber
+            self.endpointer = self.conversation.transcriber.endpointer
             self.has_associated_ignored_utterance: bool = False
             self.has_associated_unignored_utterance: bool = False
             self.human_backchannels_buffer: List[Transcription] = []
@@ -188,15 +177,8 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
             cleaned = re.sub("[^\w\s]", "", transcription.message).strip().lower()
             return any(re.fullmatch(regex, cleaned) for regex in BACKCHANNEL_PATTERNS)
 
-        def _most_recent_transcript_messages(self) -> Iterator[Message]:
-            return (
-                event_log
-                for event_log in reversed(self.conversation.transcript.event_logs)
-                if isinstance(event_log, Message)
-            )
-
         def get_maybe_last_transcript_event_log(self) -> Optional[Message]:
-            return next(self._most_recent_transcript_messages(), None)
+            return self.conversation.transcript.get_last_message()
 
         def is_bot_in_medias_res(self):
             last_message = self.get_maybe_last_transcript_event_log()
@@ -209,10 +191,8 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
             )
 
         def is_bot_still_speaking(self):  # in_medias_res OR bot has more utterances
-            transcript_messages_iter = self._most_recent_transcript_messages()
-            last_message, second_to_last_message = next(transcript_messages_iter, None), next(
-                transcript_messages_iter, None
-            )
+            last_message = self.conversation.transcript.get_last_message()
+            second_to_last_message = self.conversation.transcript.get_second_to_last_message()
 
             is_first_bot_message = (
                 second_to_last_message is None or second_to_last_message.sender == Sender.HUMAN
@@ -252,14 +232,11 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
                 self.ignore_next_message = False
                 return
             if transcription.is_final:
-                if (
-                    self.deepgram_transcriber is not None
-                    and self.deepgram_transcriber.is_first_transcription
-                ):
+                if self.endpointer is not None and self.endpointer.is_first_utterance:
                     logger.debug(
                         "Switching to non-first transcription endpointing config if configured"
                     )
-                    self.deepgram_transcriber.is_first_transcription = False
+                    self.endpointer.is_first_utterance = False
                 logger.debug(
                     "Got transcription: {}, confidence: {}, wpm: {}".format(
                         transcription.message,
@@ -317,6 +294,13 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
                     ),
                 )
                 self.consumer.consume_nonblocking(event)
+            else:
+                if transcription.is_interrupt:
+                    transcription.bot_was_in_medias_res = self.is_bot_in_medias_res()
+                # lets the agent start on a response before the human's turn has ended
+                self.conversation.agent.observe_interim_transcription(
+                    transcription, conversation_id=self.conversation.id
+                )
 
     class FillerAudioWorker(InterruptibleWorker[InterruptibleAgentResponseEvent[FillerAudio]]):
         """
@@ -594,6 +578,7 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
         speed_coefficient: float = 1.0,
         conversation_id: Optional[str] = None,
         events_manager: Optional[EventsManager] = None,
+        compact_transcript: bool = False,
     ):
         self.id = conversation_id or create_conversation_id()
         ctx_conversation_id.set(self.id)
@@ -638,6 +623,7 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
             self.actions_worker = ActionsWorker(
                 action_factory=self.agent.action_factory,
                 interruptible_event_factory=self.interruptible_event_factory,
+                max_concurrent_actions=self.agent.get_agent_config().max_concurrent_actions,
             )
             self.actions_worker.attach_conversation_state_manager(self.state_manager)
             self.actions_worker.consumer = self.agent
@@ -664,6 +650,9 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
         self.events_task: Optional[asyncio.Task] = None
         self.transcript = Transcript()
         self.transcript.attach_events_manager(self.events_manager)
+        if compact_transcript:
+            # trades rebuilding event logs on every turn for memory, for long conversations
+            self.transcript.enable_event_log_compaction()
 
         self.is_human_speaking = False
         self.is_terminated = asyncio.Event()
@@ -691,7 +680,8 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
         return ConversationStateManager(conversation=self)
 
     async def start(self, mark_ready: Optional[Callable[[], Awaitable[None]]] = None):
-        self.transcriber.start()
+        if self.transcriber.worker_task is None:  # pre-warmed transcribers are already running
+            self.transcriber.start()
         self.transcriber.streaming_conversation = self
         self.transcriptions_worker.start()
         self.agent_responses_worker.start()
@@ -1027,7 +1017,13 @@ class StreamingConversation(AudioPipeline[OutputDeviceType]):
         await self.output_device.terminate()
         logger.debug("Terminating speech transcriber")
         await self.transcriber.terminate()
-        logger.debug("Terminating transcriptions worker")
+        logger.debug(
+            "Terminating transcriptions worker ({} interims, {} collapsed, {} finals)".format(
+                self.transcriptions_worker._input_queue.num_interims,
+                self.transcriptions_worker._input_queue.num_coalesced,
+                self.transcriptions_worker._input_queue.num_finals,
+            )
+        )
         await self.transcriptions_worker.terminate()
         logger.debug("Terminating final transcriptions worker")
         await self.agent_responses_worker.terminate()
@@ -17,6 +17,7 @@ from vocode.streaming.streaming_conversation import StreamingConversation
 from vocode.streaming.synthesizer.abstract_factory import AbstractSynthesizerFactory
 from vocode.streaming.telephony.config_manager.base_config_manager import BaseConfigManager
 from vocode.streaming.transcriber.abstract_factory import AbstractTranscriberFactory
+from vocode.streaming.transcriber.base_transcriber import BaseTranscriber
 from vocode.streaming.utils import create_conversation_id
 from vocode.streaming.utils.events_manager import EventsManager
 
@@ -49,6 +50,7 @@ class AbstractPhoneConversation(StreamingConversation[TelephonyOutputDeviceType]
         conversation_id: Optional[str] = None,
         events_manager: Optional[EventsManager] = None,
         speed_coefficient: float = 1.0,
+        transcriber: Optional[BaseTranscriber[TranscriberConfig]] = None,
     ):
         conversation_id = conversation_id or create_conversation_id()
         ctx_conversation_id.set(conversation_id)
@@ -59,7 +61,7 @@ class AbstractPhoneConversation(StreamingConversation[TelephonyOutputDeviceType]
         self.base_url = base_url
         super().__init__(
             output_device,
-            transcriber_factory.create_transcriber(transcriber_config),
+            transcriber or transcriber_factory.create_transcriber(transcriber_config),
             agent_factory.create_agent(agent_config),
             synthesizer_factory.create_synthesizer(synthesizer_config),
             conversation_id=conversation_id,
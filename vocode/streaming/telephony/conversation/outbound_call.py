@@ -16,6 +16,7 @@ from vocode.streaming.telephony.client.abstract_telephony_client import Abstract
 from vocode.streaming.telephony.client.twilio_client import TwilioClient
 from vocode.streaming.telephony.client.vonage_client import VonageClient
 from vocode.streaming.telephony.config_manager.base_config_manager import BaseConfigManager
+from vocode.streaming.transcriber.warm_pool import TranscriberWarmPool
 from vocode.streaming.utils import create_conversation_id
 
 
@@ -37,6 +38,7 @@ class OutboundCall:
             str
         ] = None,  # Keys to press when the call connects, see send_digits https://www.twilio.com/docs/voice/api/call-resource#create-a-call-resource
         output_to_speaker: bool = False,
+        transcriber_warm_pool: Optional[TranscriberWarmPool] = None,
     ):
         self.base_url = base_url
         self.to_phone = to_phone
@@ -52,6 +54,7 @@ class OutboundCall:
         self.output_to_speaker = output_to_speaker
         self.sentry_tags = sentry_tags
         self.digits = digits
+        self.transcriber_warm_pool = transcriber_warm_pool
 
     def create_telephony_client(self) -> AbstractTelephonyClient:
         if isinstance(self.telephony_config, TwilioConfig):
@@ -123,6 +126,8 @@ class OutboundCall:
         else:
             raise ValueError("Unknown telephony client")
         await self.config_manager.save_config(self.conversation_id, call_config)
+        if self.transcriber_warm_pool is not None:
+            self.transcriber_warm_pool.prewarm(self.conversation_id, self.transcriber_config)
 
     async def end(self):
         return await self.telephony_client.end_call(self.telephony_id)
@@ -24,6 +24,7 @@ from vocode.streaming.telephony.conversation.abstract_phone_conversation import
     AbstractPhoneConversation,
 )
 from vocode.streaming.transcriber.abstract_factory import AbstractTranscriberFactory
+from vocode.streaming.transcriber.base_transcriber import BaseTranscriber
 from vocode.streaming.utils.events_manager import EventsManager
 from vocode.streaming.utils.state_manager import TwilioPhoneConversationStateManager
 
@@ -55,6 +56,7 @@ class TwilioPhoneConversation(AbstractPhoneConversation[TwilioOutputDevice]):
         record_call: bool = False,
         speed_coefficient: float = 1.0,
         noise_suppression: bool = False,  # is currently a no-op
+        transcriber: Optional[BaseTranscriber[TranscriberConfig]] = None,
     ):
         super().__init__(
             direction=direction,
@@ -71,6 +73,7 @@ class TwilioPhoneConversation(AbstractPhoneConversation[TwilioOutputDevice]):
             transcriber_factory=transcriber_factory,
             agent_factory=agent_factory,
             synthesizer_factory=synthesizer_factory,
+            transcriber=transcriber,
             speed_coefficient=speed_coefficient,
         )
         self.config_manager = config_manager
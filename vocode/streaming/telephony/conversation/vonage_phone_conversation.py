@@ -19,6 +19,7 @@ from vocode.streaming.telephony.conversation.abstract_phone_conversation import
     AbstractPhoneConversation,
 )
 from vocode.streaming.transcriber.abstract_factory import AbstractTranscriberFactory
+from vocode.streaming.transcriber.base_transcriber import BaseTranscriber
 from vocode.streaming.utils.events_manager import EventsManager
 from vocode.streaming.utils.state_manager import VonagePhoneConversationStateManager
 
@@ -48,6 +49,7 @@ class VonagePhoneConversation(AbstractPhoneConversation[VonageOutputDevice]):
         output_to_speaker: bool = False,
         speed_coefficient: float = 1.0,
         noise_suppression: bool = False,
+        transcriber: Optional[BaseTranscriber[TranscriberConfig]] = None,
     ):
         self.speed_coefficient = speed_coefficient
         super().__init__(
@@ -66,6 +68,7 @@ class VonagePhoneConversation(AbstractPhoneConversation[VonageOutputDevice]):
             transcriber_factory=transcriber_factory,
             agent_factory=agent_factory,
             synthesizer_factory=synthesizer_factory,
+            transcriber=transcriber,
         )
         self.vonage_config = vonage_config
         self.telephony_client = VonageClient(
@@ -28,6 +28,7 @@ from vocode.streaming.telephony.server.router.calls import CallsRouter
 from vocode.streaming.telephony.templater import get_connection_twiml
 from vocode.streaming.transcriber.abstract_factory import AbstractTranscriberFactory
 from vocode.streaming.transcriber.default_factory import DefaultTranscriberFactory
+from vocode.streaming.transcriber.warm_pool import TranscriberWarmPool
 from vocode.streaming.utils import create_conversation_id
 from vocode.streaming.utils.events_manager import EventsManager
 
@@ -63,11 +64,13 @@ class TelephonyServer:
         agent_factory: AbstractAgentFactory = DefaultAgentFactory(),
         synthesizer_factory: AbstractSynthesizerFactory = DefaultSynthesizerFactory(),
         events_manager: Optional[EventsManager] = None,
+        transcriber_warm_pool: Optional[TranscriberWarmPool] = None,
     ):
         self.base_url = base_url
         self.router = APIRouter()
         self.config_manager = config_manager
         self.events_manager = events_manager
+        self.transcriber_warm_pool = transcriber_warm_pool
         self.router.include_router(
             CallsRouter(
                 base_url=base_url,
@@ -76,6 +79,7 @@ class TelephonyServer:
                 agent_factory=agent_factory,
                 synthesizer_factory=synthesizer_factory,
                 events_manager=self.events_manager,
+                transcriber_warm_pool=self.transcriber_warm_pool,
             ).get_router()
         )
         for config in inbound_call_configs:
@@ -131,6 +135,8 @@ class TelephonyServer:
 
             conversation_id = create_conversation_id()
             await self.config_manager.save_config(conversation_id, call_config)
+            if self.transcriber_warm_pool is not None:
+                self.transcriber_warm_pool.prewarm(conversation_id, call_config.transcriber_config)
             return get_connection_twiml(base_url=self.base_url, call_id=conversation_id)
 
         async def vonage_route(vonage_config: VonageConfig, request: Request):
@@ -149,6 +155,8 @@ class TelephonyServer:
             )
             conversation_id = create_conversation_id()
             await self.config_manager.save_config(conversation_id, call_config)
+            if self.transcriber_warm_pool is not None:
+                self.transcriber_warm_pool.prewarm(conversation_id, call_config.transcriber_config)
             vonage_client = VonageClient(
                 base_url=self.base_url,
                 maybe_vonage_config=vonage_config,
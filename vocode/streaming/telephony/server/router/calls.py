@@ -8,6 +8,7 @@ from vocode import sentry_transaction
 from vocode.streaming.agent.abstract_factory import AbstractAgentFactory
 from vocode.streaming.agent.default_factory import DefaultAgentFactory
 from vocode.streaming.models.telephony import BaseCallConfig, TwilioCallConfig, VonageCallConfig
+from vocode.streaming.models.transcriber import TranscriberConfig
 from vocode.streaming.synthesizer.abstract_factory import AbstractSynthesizerFactory
 from vocode.streaming.synthesizer.default_factory import DefaultSynthesizerFactory
 from vocode.streaming.telephony.config_manager.base_config_manager import BaseConfigManager
@@ -21,7 +22,9 @@ from vocode.streaming.telephony.conversation.vonage_phone_conversation import (
     VonagePhoneConversation,
 )
 from vocode.streaming.transcriber.abstract_factory import AbstractTranscriberFactory
+from vocode.streaming.transcriber.base_transcriber import BaseTranscriber
 from vocode.streaming.transcriber.default_factory import DefaultTranscriberFactory
+from vocode.streaming.transcriber.warm_pool import TranscriberWarmPool
 from vocode.streaming.utils.base_router import BaseRouter
 from vocode.streaming.utils.events_manager import EventsManager
 
@@ -35,6 +38,7 @@ class CallsRouter(BaseRouter):
         agent_factory: AbstractAgentFactory = DefaultAgentFactory(),
         synthesizer_factory: AbstractSynthesizerFactory = DefaultSynthesizerFactory(),
         events_manager: Optional[EventsManager] = None,
+        transcriber_warm_pool: Optional[TranscriberWarmPool] = None,
     ):
         super().__init__()
         self.base_url = base_url
@@ -43,6 +47,7 @@ class CallsRouter(BaseRouter):
         self.agent_factory = agent_factory
         self.synthesizer_factory = synthesizer_factory
         self.events_manager = events_manager
+        self.transcriber_warm_pool = transcriber_warm_pool
         self.router = APIRouter()
         self.router.websocket("/connect_call/{id}")(self.connect_call)
 
@@ -56,6 +61,7 @@ class CallsRouter(BaseRouter):
         agent_factory: AbstractAgentFactory = DefaultAgentFactory(),
         synthesizer_factory: AbstractSynthesizerFactory = DefaultSynthesizerFactory(),
         events_manager: Optional[EventsManager] = None,
+        transcriber: Optional[BaseTranscriber[TranscriberConfig]] = None,
     ) -> AbstractPhoneConversation:
         if isinstance(call_config, TwilioCallConfig):
             return TwilioPhoneConversation(
@@ -74,6 +80,7 @@ class CallsRouter(BaseRouter):
                 synthesizer_factory=synthesizer_factory,
                 events_manager=events_manager,
                 direction=call_config.direction,
+                transcriber=transcriber,
             )
         elif isinstance(call_config, VonageCallConfig):
             return VonagePhoneConversation(
@@ -93,6 +100,7 @@ class CallsRouter(BaseRouter):
                 events_manager=events_manager,
                 output_to_speaker=call_config.output_to_speaker,
                 direction=call_config.direction,
+                transcriber=transcriber,
             )
         else:
             raise ValueError(f"Unknown call config type {call_config.type}")
@@ -106,6 +114,10 @@ class CallsRouter(BaseRouter):
             if not call_config:
                 raise HTTPException(status_code=400, detail="No active phone call")
 
+            transcriber = None
+            if self.transcriber_warm_pool is not None:
+                transcriber = self.transcriber_warm_pool.adopt(id, call_config.transcriber_config)
+
             phone_conversation = self._from_call_config(
                 base_url=self.base_url,
                 call_config=call_config,
@@ -115,6 +127,7 @@ class CallsRouter(BaseRouter):
                 agent_factory=self.agent_factory,
                 synthesizer_factory=self.synthesizer_factory,
                 events_manager=self.events_manager,
+                transcriber=transcriber,
             )
 
             await phone_conversation.attach_ws_and_start(websocket)
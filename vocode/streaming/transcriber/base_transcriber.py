@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, Generic, Optional, TypeVar, Union
 
 from vocode.streaming.models.audio import AudioEncoding
 from vocode.streaming.models.transcriber import TranscriberConfig, Transcription
+from vocode.streaming.transcriber.endpointer import Endpointer
 from vocode.streaming.utils.speed_manager import SpeedManager
 from vocode.streaming.utils.worker import AbstractWorker, AsyncWorker, ThreadAsyncWorker
 
@@ -25,9 +26,13 @@ class AbstractTranscriber(Generic[TranscriberConfigType], AbstractWorker[bytes])
         self.transcriber_config = transcriber_config
         self.is_muted = False
         self.speed_manager: Optional[SpeedManager] = None
+        # set by transcribers that decide end of turn locally rather than in the provider
+        self.endpointer: Optional[Endpointer] = None
 
     def attach_speed_manager(self, speed_manager: SpeedManager):
         self.speed_manager = speed_manager
+        if self.endpointer is not None:
+            self.endpointer.speed_manager = speed_manager
 
     def mute(self):
         self.is_muted = True
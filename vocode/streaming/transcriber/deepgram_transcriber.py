@@ -7,23 +7,28 @@ from urllib.parse import urlencode
 import sentry_sdk
 import websockets
 from loguru import logger
-from pydantic.v1 import BaseModel, Field
+from pydantic.v1 import BaseModel
 from websockets.asyncio.client import ClientConnection
 
 from vocode import getenv
 from vocode.streaming.models.audio import AudioEncoding
 from vocode.streaming.models.transcriber import (
     DEEPGRAM_API_WS_URL,
+    DeepgramEndpointingConfig,
     DeepgramTranscriberConfig,
-    EndpointingConfig,
+    InternalPunctuationEndpointingConfig,
     PunctuationEndpointingConfig,
-    TimeEndpointingConfig,
+    TimeSilentConfig,
     Transcription,
 )
 from vocode.streaming.transcriber.base_transcriber import BaseAsyncTranscriber
+from vocode.streaming.transcriber.endpointer import (
+    PUNCTUATION_TERMINATORS,
+    Endpointer,
+    EndpointingSignal,
+)
 from vocode.utils.sentry_utils import CustomSentrySpans, sentry_configured, sentry_create_span
 
-PUNCTUATION_TERMINATORS = [".", "!", "?"]
 NUM_RESTARTS = 5
 NUM_AUDIO_CHANNELS = 1
 
@@ -32,25 +37,6 @@ def now():
     return datetime.now(tz=timezone.utc)
 
 
-class TimeSilentConfig(BaseModel):
-    time_cutoff_seconds: float = 1
-    post_punctuation_time_seconds: float = 0.5
-
-
-class InternalPunctuationEndpointingConfig(  # type: ignore
-    EndpointingConfig, type="internal_punctuation_based"
-):
-    time_silent_config: TimeSilentConfig = Field(default_factory=TimeSilentConfig)
-    use_single_utterance_endpointing_for_first_utterance: bool = False
-
-
-class DeepgramEndpointingConfig(EndpointingConfig, type="deepgram"):  # type: ignore
-    vad_threshold_ms: int = 500
-    utterance_cutoff_ms: int = 1000
-    time_silent_config: Optional[TimeSilentConfig] = Field(default_factory=TimeSilentConfig)
-    use_single_utterance_endpointing_for_first_utterance: bool = False
-
-
 class DeepgramUtteranceEnd(BaseModel):
     pass
 
@@ -104,7 +90,17 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
         self.start_sending_ts: Optional[datetime] = None
         self.start_receiving_ts: Optional[datetime] = None
 
-        self.is_first_transcription = True
+        if self.transcriber_config.endpointing_config:
+            self.endpointer = Endpointer(self.transcriber_config.endpointing_config)
+
+    @property
+    def is_first_transcription(self) -> bool:
+        return self.endpointer is not None and self.endpointer.is_first_utterance
+
+    @is_first_transcription.setter
+    def is_first_transcription(self, is_first_transcription: bool):
+        if self.endpointer is not None:
+            self.endpointer.is_first_utterance = is_first_transcription
 
     def _get_speed_coefficient(self):
         return self.speed_manager.get_speed_coefficient() if self.speed_manager else 1.0
@@ -208,177 +204,26 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
         sample_rate = self.transcriber_config.sampling_rate
         return sample_width * sample_rate * NUM_AUDIO_CHANNELS
 
-    def is_endpoint(
-        self,
-        current_buffer: str,
-        deepgram_response: Union[DeepgramUtteranceEnd, DeepgramTranscriptionResult],
-        time_silent: float,
-    ):
-        is_endpoint, log_params = self._compute_is_endpoint_and_log_params(
-            current_buffer, deepgram_response, time_silent
-        )
-        if is_endpoint:
-            logger.info("Endpoint detected", extra=log_params)
-        return is_endpoint
-
-    @staticmethod
-    def _satisfies_time_cutoff(
-        *,
-        seconds: float,
-        deepgram_response: Union[DeepgramUtteranceEnd, DeepgramTranscriptionResult],
-        current_buffer: str,
-        time_silent: float,
-    ):
-        return (
-            isinstance(deepgram_response, DeepgramTranscriptionResult)
-            and not deepgram_response.top_choice.transcript
-            and len(current_buffer) > 0
-            and (time_silent + deepgram_response.duration) > seconds
+    def get_endpointing_signal(
+        self, deepgram_response: Union[DeepgramUtteranceEnd, DeepgramTranscriptionResult]
+    ) -> EndpointingSignal:
+        if isinstance(deepgram_response, DeepgramUtteranceEnd):
+            return EndpointingSignal(utterance_end=True)
+        return EndpointingSignal(
+            transcript=deepgram_response.top_choice.transcript,
+            confidence=deepgram_response.top_choice.confidence,
+            is_final=deepgram_response.is_final,
+            speech_final=deepgram_response.speech_final,
+            duration=deepgram_response.duration,
+            trailing_silence_seconds=self.calculate_time_silent(deepgram_response),
         )
 
-    def _compute_is_endpoint_and_update_log_params_based_on_time_silent(
-        self,
-        current_buffer: str,
-        deepgram_response: DeepgramTranscriptionResult,
-        time_silent: float,
-        time_silent_config: TimeSilentConfig,
-        existing_log_params: dict,
-    ) -> bool:
-        if current_buffer.strip():
-            if current_buffer.strip()[
-                -1
-            ] in PUNCTUATION_TERMINATORS and self._satisfies_time_cutoff(
-                seconds=time_silent_config.post_punctuation_time_seconds
-                * (1.0 / self._get_speed_coefficient()),
-                deepgram_response=deepgram_response,
-                current_buffer=current_buffer,
-                time_silent=time_silent,
-            ):
-                existing_log_params["source"] = "punctuation"
-                return True
-            elif self._satisfies_time_cutoff(
-                seconds=time_silent_config.time_cutoff_seconds
-                * (1.0 / self._get_speed_coefficient()),
-                deepgram_response=deepgram_response,
-                current_buffer=current_buffer,
-                time_silent=time_silent,
-            ):
-                existing_log_params["source"] = "time_cutoff"
-                return True
-        return False
-
-    def _compute_is_endpoint_and_log_params(
-        self,
-        current_buffer: str,
-        deepgram_response: Union[DeepgramUtteranceEnd, DeepgramTranscriptionResult],
-        time_silent: float,
-    ) -> Tuple[bool, dict]:
-        endpointing_config = self.transcriber_config.endpointing_config
-        assert endpointing_config is not None
-
-        log_params = {"endpointing_type": endpointing_config.type}
-
-        if isinstance(
-            endpointing_config,
-            TimeEndpointingConfig,
-        ):
-            # if it is time based, then return true if there is no transcript
-            # and there is some speech to send
-            # and the time_silent is greater than the cutoff
-            return (
-                self._satisfies_time_cutoff(
-                    seconds=endpointing_config.time_cutoff_seconds,
-                    deepgram_response=deepgram_response,
-                    current_buffer=current_buffer,
-                    time_silent=time_silent,
-                ),
-                log_params,
-            )
-        elif isinstance(
-            endpointing_config,
-            DeepgramEndpointingConfig,
-        ):
-            if (
-                isinstance(deepgram_response, DeepgramTranscriptionResult)
-                and self.is_first_transcription
-                and endpointing_config.use_single_utterance_endpointing_for_first_utterance
-            ):
-                if (
-                    deepgram_response.top_choice.transcript
-                    and deepgram_response.top_choice.transcript.strip()[-1]
-                    in PUNCTUATION_TERMINATORS
-                ):
-                    log_params["source"] = "is_final"
-                    return True, log_params
-            if isinstance(deepgram_response, DeepgramUtteranceEnd):
-                log_params["source"] = "utterance_end"
-                return True, log_params
-            elif isinstance(deepgram_response, DeepgramTranscriptionResult):
-                if deepgram_response.top_choice.transcript and deepgram_response.speech_final:
-                    log_params["source"] = "speech_final"
-                    return True, log_params
-                elif (
-                    endpointing_config.time_silent_config is not None
-                    and self._compute_is_endpoint_and_update_log_params_based_on_time_silent(
-                        current_buffer,
-                        deepgram_response,
-                        time_silent,
-                        endpointing_config.time_silent_config,
-                        log_params,
-                    )
-                ):
-                    return True, log_params
-            return False, log_params
-
-        if isinstance(deepgram_response, DeepgramTranscriptionResult):
-            if isinstance(
-                endpointing_config,
-                PunctuationEndpointingConfig,
-            ):
-                if (
-                    deepgram_response.top_choice.transcript
-                    and deepgram_response.speech_final
-                    and deepgram_response.top_choice.transcript.strip()[-1]
-                    in PUNCTUATION_TERMINATORS
-                ):
-                    log_params["source"] = "punctuation"
-                    return True, log_params
-                elif self._satisfies_time_cutoff(
-                    seconds=endpointing_config.time_cutoff_seconds
-                    * (1.0 / self._get_speed_coefficient()),
-                    deepgram_response=deepgram_response,
-                    current_buffer=current_buffer,
-                    time_silent=time_silent,
-                ):
-                    log_params["source"] = "time_cutoff"
-                    return True, log_params
-            elif isinstance(
-                endpointing_config,
-                InternalPunctuationEndpointingConfig,
-            ):
-                if (
-                    self.is_first_transcription
-                    and endpointing_config.use_single_utterance_endpointing_for_first_utterance
-                ):
-                    if deepgram_response.top_choice.transcript and deepgram_response.speech_final:
-                        log_params["source"] = "speech_final"
-                        return True, log_params
-                if self._compute_is_endpoint_and_update_log_params_based_on_time_silent(
-                    current_buffer,
-                    deepgram_response,
-                    time_silent,
-                    endpointing_config.time_silent_config,
-                    log_params,
-                ):
-                    return True, log_params
-        return False, log_params
-
     def calculate_time_silent(self, deepgram_transcription_result: DeepgramTranscriptionResult):
-        end = deepgram_transcription_result.start + deepgram_transcription_result.duration
-        words = deepgram_transcription_result.top_choice.words
-        if words:
-            return end - words[-1]["end"]
-        return deepgram_transcription_result.duration
+        return EndpointingSignal.trailing_silence_from_words(
+            deepgram_transcription_result.start,
+            deepgram_transcription_result.duration,
+            deepgram_transcription_result.top_choice.words,
+        )
 
     def calculate_duration(self, words: List[dict]) -> float:
         if len(words) == 0:
@@ -423,9 +268,13 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
                     buffer = ""
                     buffer_avg_confidence = 0.0
                     num_buffer_utterances = 1
-                    time_silent = 0.0
                     words_buffer = []
                     is_final_ts: Optional[datetime] = None
+                    endpointer = self.endpointer
+                    assert (
+                        endpointer is not None
+                    ), "DeepgramTranscriber requires an endpointing_config"
+                    endpointer.reset()
 
                     while not self._ended:
                         try:
@@ -481,7 +330,8 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
 
                             is_final_ts = now()
 
-                        if buffer and self.is_endpoint(buffer, deepgram_response, time_silent):
+                        endpointing_signal = self.get_endpointing_signal(deepgram_response)
+                        if buffer and endpointer.is_endpoint(buffer, endpointing_signal):
                             output_ts = now()
                             self._track_latency_of_conversation(
                                 is_final_ts=is_final_ts,
@@ -498,7 +348,7 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
                             buffer = ""
                             buffer_avg_confidence = 0.0
                             num_buffer_utterances = 1
-                            time_silent = 0.0
+                            endpointer.reset()
                             words_buffer = []
                             is_final_ts = None
 
@@ -522,9 +372,7 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
                                         is_final=False,
                                     )
                                 )
-                                time_silent = self.calculate_time_silent(deepgram_response)
-                            else:
-                                time_silent += deepgram_response.duration
+                            endpointer.observe(endpointing_signal)
 
                     logger.debug("Terminating Deepgram transcriber receiver")
 
@@ -0,0 +1,259 @@
+import time
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from loguru import logger
+
+from vocode.streaming.models.model import BaseModel
+from vocode.streaming.models.transcriber import (
+    DeepgramEndpointingConfig,
+    EndpointingConfig,
+    InternalPunctuationEndpointingConfig,
+    PunctuationEndpointingConfig,
+    TimeEndpointingConfig,
+    TimeSilentConfig,
+)
+from vocode.streaming.utils.speed_manager import SpeedManager
+
+PUNCTUATION_TERMINATORS = [".", "!", "?"]
+
+
+class EndpointingSignal(BaseModel):
+    """One update from a transcriber, normalized for the Endpointer.
+
+    `trailing_silence_seconds` is the silence at the end of this update's audio, from word
+    timings or a local VAD; if unset, an update with a transcript counts as all silence
+    (matching Deepgram results without word timings).
+    """
+
+    transcript: str = ""
+    confidence: float = 1.0
+    is_final: bool = False
+    speech_final: bool = False
+    utterance_end: bool = False
+    duration: float = 0.0
+    trailing_silence_seconds: Optional[float] = None
+
+    @staticmethod
+    def trailing_silence_from_words(start: float, duration: float, words: List[dict]) -> float:
+        if words:
+            return start + duration - words[-1]["end"]
+        return duration
+
+
+class EndpointerStats:
+    def __init__(self):
+        self.num_decisions = 0
+        self.num_endpoints = 0
+        self.endpoints_by_source: Counter = Counter()
+        self.total_decision_seconds = 0.0
+        self.max_decision_seconds = 0.0
+        self.total_silence_at_endpoint_seconds = 0.0
+
+    @property
+    def mean_decision_seconds(self) -> float:
+        return self.total_decision_seconds / self.num_decisions if self.num_decisions else 0.0
+
+    @property
+    def mean_silence_at_endpoint_seconds(self) -> float:
+        """How long, on average, the caller was silent before their turn was ended."""
+        if not self.num_endpoints:
+            return 0.0
+        return self.total_silence_at_endpoint_seconds / self.num_endpoints
+
+
+class Endpointer:
+    """
+    Decides when the human's turn has ended, independently of the transcription provider.
+
+    Transcribers feed it an EndpointingSignal per update together with the text buffered since
+    the last endpoint, then call `observe` so that it can track how long the caller has been
+    silent. Supports TimeEndpointingConfig, PunctuationEndpointingConfig,
+    InternalPunctuationEndpointingConfig and DeepgramEndpointingConfig; the provider-specific
+    `speech_final` / `utterance_end` signals are only set by transcribers that receive them.
+
+    Used by DeepgramTranscriber and the whisper.cpp transcribers. AssemblyAI, Gladia and Azure
+    endpoint server-side: their final results already end the turn, and their endpointing
+    configs (where supported) are translated into provider settings instead.
+    """
+
+    def __init__(
+        self,
+        endpointing_config: EndpointingConfig,
+        speed_manager: Optional[SpeedManager] = None,
+    ):
+        self.endpointing_config = endpointing_config
+        self.speed_manager = speed_manager
+        self.is_first_utterance = True
+        self.time_silent = 0.0
+        self.stats = EndpointerStats()
+
+    def _get_speed_coefficient(self) -> float:
+        return self.speed_manager.get_speed_coefficient() if self.speed_manager else 1.0
+
+    def is_endpoint(self, current_buffer: str, signal: EndpointingSignal) -> bool:
+        return self.decide(current_buffer, signal) is not None
+
+    def decide(self, current_buffer: str, signal: EndpointingSignal) -> Optional[str]:
+        """Like `get_endpoint_source`, but records stats and logs endpoints."""
+        start = time.perf_counter()
+        source = self.get_endpoint_source(current_buffer, signal)
+        decision_seconds = time.perf_counter() - start
+
+        self.stats.num_decisions += 1
+        self.stats.total_decision_seconds += decision_seconds
+        self.stats.max_decision_seconds = max(self.stats.max_decision_seconds, decision_seconds)
+        if source is None:
+            return None
+
+        silence_at_endpoint = self.time_silent + signal.duration
+        self.stats.num_endpoints += 1
+        self.stats.endpoints_by_source[source] += 1
+        self.stats.total_silence_at_endpoint_seconds += silence_at_endpoint
+        logger.info(
+            "Endpoint detected",
+            extra={
+                "endpointing_type": self.endpointing_config.type,
+                "source": source,
+                "silence_at_endpoint_seconds": silence_at_endpoint,
+            },
+        )
+        return source
+
+    def observe(self, signal: EndpointingSignal):
+        """Updates the time the caller has been silent; call after `is_endpoint`."""
+        if signal.transcript and signal.confidence > 0.0:
+            self.time_silent = (
+                signal.trailing_silence_seconds
+                if signal.trailing_silence_seconds is not None
+                else signal.duration
+            )
+        else:
+            self.time_silent += signal.duration
+
+    def reset(self):
+        self.time_silent = 0.0
+
+    def _satisfies_time_cutoff(
+        self, seconds: float, current_buffer: str, signal: EndpointingSignal
+    ) -> bool:
+        return (
+            not signal.utterance_end
+            and not signal.transcript
+            and len(current_buffer) > 0
+            and (self.time_silent + signal.duration) > seconds
+        )
+
+    def _get_time_silent_source(
+        self,
+        current_buffer: str,
+        signal: EndpointingSignal,
+        time_silent_config: TimeSilentConfig,
+    ) -> Optional[str]:
+        if current_buffer.strip():
+            if current_buffer.strip()[-1] in PUNCTUATION_TERMINATORS and (
+                self._satisfies_time_cutoff(
+                    time_silent_config.post_punctuation_time_seconds
+                    * (1.0 / self._get_speed_coefficient()),
+                    current_buffer,
+                    signal,
+                )
+            ):
+                return "punctuation"
+            elif self._satisfies_time_cutoff(
+                time_silent_config.time_cutoff_seconds * (1.0 / self._get_speed_coefficient()),
+                current_buffer,
+                signal,
+            ):
+                return "time_cutoff"
+        return None
+
+    def get_endpoint_source(self, current_buffer: str, signal: EndpointingSignal) -> Optional[str]:
+        """Returns what ended the turn (e.g. "punctuation", "time_cutoff"), or None."""
+        endpointing_config = self.endpointing_config
+
+        if isinstance(endpointing_config, TimeEndpointingConfig):
+            # if it is time based, then return true if there is no transcript
+            # and there is some speech to send
+            # and the time_silent is greater than the cutoff
+            if self._satisfies_time_cutoff(
+                endpointing_config.time_cutoff_seconds, current_buffer, signal
+            ):
+                return "time_cutoff"
+            return None
+        elif isinstance(endpointing_config, DeepgramEndpointingConfig):
+            if (
+                not signal.utterance_end
+                and self.is_first_utterance
+                and endpointing_config.use_single_utterance_endpointing_for_first_utterance
+                and signal.transcript
+                and signal.transcript.strip()[-1] in PUNCTUATION_TERMINATORS
+            ):
+                return "is_final"
+            if signal.utterance_end:
+                return "utterance_end"
+            if signal.transcript and signal.speech_final:
+                return "speech_final"
+            if endpointing_config.time_silent_config is not None:
+                return self._get_time_silent_source(
+                    current_buffer, signal, endpointing_config.time_silent_config
+                )
+            return None
+
+        if signal.utterance_end:
+            return None
+        if isinstance(endpointing_config, PunctuationEndpointingConfig):
+            if (
+                signal.transcript
+                and signal.speech_final
+                and signal.transcript.strip()[-1] in PUNCTUATION_TERMINATORS
+            ):
+                return "punctuation"
+            elif self._satisfies_time_cutoff(
+                endpointing_config.time_cutoff_seconds * (1.0 / self._get_speed_coefficient()),
+                current_buffer,
+                signal,
+            ):
+                return "time_cutoff"
+        elif isinstance(endpointing_config, InternalPunctuationEndpointingConfig):
+            if (
+                self.is_first_utterance
+                and endpointing_config.use_single_utterance_endpointing_for_first_utterance
+                and signal.transcript
+                and signal.speech_final
+            ):
+                return "speech_final"
+            return self._get_time_silent_source(
+                current_buffer, signal, endpointing_config.time_silent_config
+            )
+        return None
+
+
+class ReplayedEndpoint(BaseModel):
+    message: str
+    source: str
+    signal_index: int
+
+
+def replay_endpointing(
+    endpointer: Endpointer, signals: Iterable[EndpointingSignal]
+) -> List[ReplayedEndpoint]:
+    """Replays recorded transcriber updates through an Endpointer, buffering final transcripts
+    the way the streaming transcribers do, and returns the turns it would have ended.
+
+    Useful for tuning endpointing configs offline against recorded calls."""
+    endpoints: List[ReplayedEndpoint] = []
+    buffer = ""
+    for signal_index, signal in enumerate(signals):
+        if signal.transcript and signal.confidence > 0.0 and signal.is_final:
+            buffer = f"{buffer} {signal.transcript}"
+        source = endpointer.decide(buffer, signal) if buffer else None
+        if source is not None:
+            endpoints.append(
+                ReplayedEndpoint(message=buffer.strip(), source=source, signal_index=signal_index)
+            )
+            buffer = ""
+            endpointer.reset()
+            endpointer.is_first_utterance = False
+        endpointer.observe(signal)
+    return endpoints
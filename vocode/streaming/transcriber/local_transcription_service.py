@@ -0,0 +1,223 @@
+import asyncio
+import math
+import multiprocessing
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from vocode.streaming.utils.create_task import asyncio_create_task
+from vocode.utils.whisper_cpp.helpers import (
+    WHISPER_CPP_SAMPLING_RATE,
+    load_whisper,
+    transcribe_samples,
+)
+
+DEFAULT_MAX_BATCH_SIZE = 8
+DEFAULT_MAX_BATCH_DELAY_SECONDS = 0.01
+
+TranscriptionResult = Tuple[str, float]
+
+
+class LocalTranscriptionModel(ABC):
+    """A speech-to-text model loaded once in each worker process of a LocalTranscriptionService."""
+
+    @abstractmethod
+    def transcribe_batch(self, windows: List[np.ndarray]) -> List[TranscriptionResult]:
+        """Transcribes float32 16kHz windows, returning a (message, confidence) per window."""
+        pass
+
+
+class WhisperCPPModel(LocalTranscriptionModel):
+    def __init__(self, libname: str, fname_model: str):
+        self.whisper, self.ctx, self.params = load_whisper(libname, fname_model)
+
+    def transcribe_batch(self, windows: List[np.ndarray]) -> List[TranscriptionResult]:
+        # the whisper.cpp C API decodes one input per whisper_full call, so a batch shares the
+        # worker's context and a single IPC round trip rather than a single forward pass
+        return [
+            transcribe_samples(self.whisper, self.params, self.ctx, window) for window in windows
+        ]
+
+
+_worker_model: Optional[LocalTranscriptionModel] = None
+
+
+def _initialize_worker(model_factory: Callable[[], LocalTranscriptionModel]):
+    global _worker_model
+    _worker_model = model_factory()
+
+
+def _transcribe_batch_in_worker(windows: List[np.ndarray]) -> List[TranscriptionResult]:
+    assert _worker_model is not None, "worker was not initialized"
+    return _worker_model.transcribe_batch(windows)
+
+
+class TranscriptionRequest:
+    def __init__(
+        self,
+        stream_id: str,
+        samples: np.ndarray,
+        is_final: bool,
+        future: "asyncio.Future[Optional[TranscriptionResult]]",
+    ):
+        self.stream_id = stream_id
+        self.samples = samples
+        self.is_final = is_final
+        self.future = future
+
+
+class LocalTranscriptionServiceStats:
+    def __init__(self):
+        self.num_batches = 0
+        self.num_windows = 0
+        self.num_superseded_interims = 0
+        self.audio_seconds = 0.0
+        self.processing_seconds = 0.0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.num_windows / self.num_batches if self.num_batches else 0.0
+
+    @property
+    def real_time_factor(self) -> float:
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+
+class LocalTranscriptionService:
+    """
+    Shares a pool of local transcription models across many conversations.
+
+    Each of the `num_workers` processes loads the model once, instead of once per conversation.
+    Windows submitted by transcribers are collected for up to `max_batch_delay_seconds` (or
+    until `max_batch_size` are pending) and sent to a free worker as one batch; results are
+    routed back to the submitting transcriber, which forwards them to its TranscriptionsWorker.
+
+    An interim window that is still waiting for a worker is superseded by a newer window from
+    the same stream (its result resolves to None); final windows are never dropped.
+    """
+
+    def __init__(
+        self,
+        model_factory: Callable[[], LocalTranscriptionModel],
+        num_workers: Optional[int] = None,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_batch_delay_seconds: float = DEFAULT_MAX_BATCH_DELAY_SECONDS,
+    ):
+        self.model_factory = model_factory
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay_seconds = max_batch_delay_seconds
+        self.pending_requests: List[TranscriptionRequest] = []
+        self.pending_interims: Dict[str, TranscriptionRequest] = {}
+        self.stats = LocalTranscriptionServiceStats()
+        self.executor: Optional[Executor] = None
+        self.dispatch_task: Optional[asyncio.Task] = None
+        self.has_pending_requests = asyncio.Event()
+        self.free_workers = asyncio.Semaphore(self.num_workers)
+        self.num_busy_workers = 0
+
+    def create_executor(self) -> Executor:
+        # spawn rather than fork: the parent runs an event loop and other threads
+        return ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_initialize_worker,
+            initargs=(self.model_factory,),
+        )
+
+    def start(self):
+        self.executor = self.create_executor()
+        self.dispatch_task = asyncio_create_task(self._dispatch_loop())
+
+    def submit(
+        self, stream_id: str, samples: np.ndarray, is_final: bool
+    ) -> "asyncio.Future[Optional[TranscriptionResult]]":
+        future: asyncio.Future[Optional[TranscriptionResult]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        superseded = self.pending_interims.pop(stream_id, None)
+        if superseded is not None:
+            self.pending_requests.remove(superseded)
+            superseded.future.set_result(None)
+            self.stats.num_superseded_interims += 1
+
+        # copy: transcribers pass views into their ring buffers, which keep changing
+        request = TranscriptionRequest(stream_id, samples.copy(), is_final, future)
+        self.pending_requests.append(request)
+        if not is_final:
+            self.pending_interims[stream_id] = request
+        self.has_pending_requests.set()
+        return future
+
+    async def transcribe(
+        self, stream_id: str, samples: np.ndarray, is_final: bool
+    ) -> Optional[TranscriptionResult]:
+        return await self.submit(stream_id, samples, is_final)
+
+    async def _dispatch_loop(self):
+        while True:
+            await self.has_pending_requests.wait()
+            await self.free_workers.acquire()
+            if len(self.pending_requests) < self.max_batch_size:
+                await asyncio.sleep(self.max_batch_delay_seconds)
+            # spread pending windows over idle workers before growing batches: a batch runs
+            # sequentially in one worker, so it only pays off once every worker is busy
+            num_idle_workers = self.num_workers - self.num_busy_workers
+            batch_size = min(
+                self.max_batch_size, math.ceil(len(self.pending_requests) / num_idle_workers)
+            )
+            batch = self.pending_requests[:batch_size]
+            self.pending_requests = self.pending_requests[batch_size:]
+            for request in batch:
+                if self.pending_interims.get(request.stream_id) is request:
+                    del self.pending_interims[request.stream_id]
+            if not self.pending_requests:
+                self.has_pending_requests.clear()
+            if not batch:
+                self.free_workers.release()
+                continue
+            self.num_busy_workers += 1
+            asyncio_create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[TranscriptionRequest]):
+        assert self.executor is not None, "service was not started"
+        start = time.perf_counter()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                _transcribe_batch_in_worker,
+                [request.samples for request in batch],
+            )
+        except Exception as e:
+            logger.error(f"Local transcription batch failed: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        finally:
+            self.num_busy_workers -= 1
+            self.free_workers.release()
+        self.stats.num_batches += 1
+        self.stats.num_windows += len(batch)
+        self.stats.audio_seconds += (
+            sum(len(request.samples) for request in batch) / WHISPER_CPP_SAMPLING_RATE
+        )
+        self.stats.processing_seconds += time.perf_counter() - start
+        for request, result in zip(batch, results):
+            if not request.future.done():
+                request.future.set_result(result)
+
+    async def terminate(self):
+        if self.dispatch_task is not None:
+            self.dispatch_task.cancel()
+        for request in self.pending_requests:
+            request.future.cancel()
+        self.pending_requests = []
+        self.pending_interims = {}
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,109 @@
+import audioop
+from typing import Any, Optional, Tuple
+
+import numpy as np
+
+from vocode.streaming.models.audio import AudioEncoding
+from vocode.streaming.models.transcriber import WhisperCPPTranscriberConfig
+from vocode.streaming.transcriber.endpointer import Endpointer, EndpointingSignal
+from vocode.streaming.utils.audio_ring_buffer import AudioRingBuffer
+from vocode.streaming.utils.vad import EnergyVAD
+from vocode.utils.whisper_cpp.helpers import WHISPER_CPP_SAMPLING_RATE
+
+# audio kept ahead of the first speech chunk so that the onset of the utterance isn't clipped
+PRE_ROLL_SECONDS = 0.3
+
+
+class UtteranceWindow:
+    """
+    Accumulates the current utterance for local (whisper.cpp) transcription.
+
+    Chunks are decoded into a float32 ring buffer at 16kHz. `push` reports when the window is due
+    for an interim transcription (every `buffer_size_seconds` of speech) or a final one (after a
+    VAD-detected pause of `vad_pause_seconds`, or once the window reaches `max_window_seconds`).
+    If an Endpointer is given, it decides instead of the VAD pause rule: it is fed the VAD's
+    silent chunks and the latest interim transcript, so e.g. InternalPunctuationEndpointingConfig
+    can end the turn sooner after a sentence terminator. Until an interim transcript has words,
+    the VAD pause rule applies.
+    """
+
+    def __init__(
+        self,
+        transcriber_config: WhisperCPPTranscriberConfig,
+        endpointer: Optional[Endpointer] = None,
+    ):
+        self.transcriber_config = transcriber_config
+        self.endpointer = endpointer
+        self.step_size = round(WHISPER_CPP_SAMPLING_RATE * transcriber_config.buffer_size_seconds)
+        self.ring_buffer = AudioRingBuffer(
+            round(WHISPER_CPP_SAMPLING_RATE * transcriber_config.max_window_seconds)
+        )
+        self.pre_roll_size = round(WHISPER_CPP_SAMPLING_RATE * PRE_ROLL_SECONDS)
+        self.vad = EnergyVAD(
+            sampling_rate=WHISPER_CPP_SAMPLING_RATE,
+            energy_threshold=transcriber_config.vad_energy_threshold,
+            pause_seconds=transcriber_config.vad_pause_seconds,
+        )
+        self.samples_since_last_transcription = 0
+        self.ratecv_state: Optional[Tuple[Any, ...]] = None
+
+    def decode_chunk(self, chunk: bytes) -> np.ndarray:
+        if self.transcriber_config.audio_encoding == AudioEncoding.MULAW:
+            chunk = audioop.ulaw2lin(chunk, 2)
+        if self.transcriber_config.sampling_rate != WHISPER_CPP_SAMPLING_RATE:
+            chunk, self.ratecv_state = audioop.ratecv(
+                chunk,
+                2,
+                1,
+                self.transcriber_config.sampling_rate,
+                WHISPER_CPP_SAMPLING_RATE,
+                self.ratecv_state,
+            )
+        return np.frombuffer(chunk, dtype=np.int16).astype(np.float32) / 32768.0
+
+    def push(self, chunk: bytes, current_transcript: str = "") -> Optional[bool]:
+        """Adds a chunk of audio. Returns None if nothing needs to be transcribed yet, otherwise
+        whether the window should be transcribed as a final transcription."""
+        samples = self.decode_chunk(chunk)
+        self.ring_buffer.write(samples)
+        is_speech = self.vad.process(samples)
+        if not self.vad.speech_detected:
+            self.ring_buffer.keep_last(self.pre_roll_size)
+            return None
+
+        self.samples_since_last_transcription += len(samples)
+        if self.ring_buffer.is_full() or self._is_endpoint(
+            is_speech, len(samples) / WHISPER_CPP_SAMPLING_RATE, current_transcript
+        ):
+            return True
+        if self.samples_since_last_transcription >= self.step_size:
+            return False
+        return None
+
+    def _is_endpoint(self, is_speech: bool, chunk_seconds: float, current_transcript: str) -> bool:
+        if self.endpointer is None:
+            return self.vad.is_pause()
+        if is_speech:
+            self.endpointer.reset()
+            return False
+        signal = EndpointingSignal(duration=chunk_seconds)
+        if not current_transcript.strip():
+            # whisper hasn't transcribed any words for the endpointer to end the turn on (e.g. it
+            # returned empty interims), so end it on the VAD pause rather than the window limit
+            self.endpointer.observe(signal)
+            return self.vad.is_pause()
+        if self.endpointer.is_endpoint(current_transcript, signal):
+            return True
+        self.endpointer.observe(signal)
+        return False
+
+    def window(self) -> np.ndarray:
+        self.samples_since_last_transcription = 0
+        return self.ring_buffer.window()
+
+    def reset(self):
+        self.ring_buffer.clear()
+        self.vad.reset()
+        self.samples_since_last_transcription = 0
+        if self.endpointer is not None:
+            self.endpointer.reset()
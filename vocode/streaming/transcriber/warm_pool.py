@@ -0,0 +1,125 @@
+import asyncio
+from typing import Dict, Optional
+
+from loguru import logger
+
+from vocode.streaming.models.transcriber import TranscriberConfig
+from vocode.streaming.transcriber.abstract_factory import AbstractTranscriberFactory
+from vocode.streaming.transcriber.base_transcriber import BaseTranscriber
+from vocode.streaming.transcriber.default_factory import DefaultTranscriberFactory
+from vocode.streaming.utils.create_task import asyncio_create_task
+from vocode.streaming.utils.worker import QueueConsumer
+
+DEFAULT_IDLE_TIMEOUT_SECONDS = 60.0
+DEFAULT_KEEPALIVE_INTERVAL_SECONDS = 1.0
+
+
+class WarmTranscriber:
+    def __init__(
+        self,
+        transcriber: BaseTranscriber[TranscriberConfig],
+        transcriber_config: TranscriberConfig,
+    ):
+        self.transcriber = transcriber
+        self.transcriber_config = transcriber_config
+        self.keep_warm_task: Optional[asyncio.Task] = None
+
+
+class TranscriberWarmPool:
+    """Opens transcriber connections while a phone call is still ringing.
+
+    Transcribers are keyed by conversation ID: the inbound route / OutboundCall pre-warms one
+    as soon as the call config is saved, and CallsRouter.connect_call adopts it once the
+    media websocket connects, taking the connection handshake off the first turn's critical path.
+
+    While warm, the transcriber is fed silence every `keepalive_interval_seconds` so that
+    providers which close idle sockets (e.g. Deepgram) keep the connection open. Transcribers
+    that are not adopted within `idle_timeout_seconds` are terminated.
+    """
+
+    def __init__(
+        self,
+        transcriber_factory: AbstractTranscriberFactory = DefaultTranscriberFactory(),
+        idle_timeout_seconds: float = DEFAULT_IDLE_TIMEOUT_SECONDS,
+        keepalive_interval_seconds: Optional[float] = DEFAULT_KEEPALIVE_INTERVAL_SECONDS,
+    ):
+        self.transcriber_factory = transcriber_factory
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.keepalive_interval_seconds = keepalive_interval_seconds
+        self.warm_transcribers: Dict[str, WarmTranscriber] = {}
+
+    def prewarm(
+        self,
+        conversation_id: str,
+        transcriber_config: TranscriberConfig,
+    ) -> BaseTranscriber[TranscriberConfig]:
+        if conversation_id in self.warm_transcribers:
+            return self.warm_transcribers[conversation_id].transcriber
+
+        logger.debug(f"Pre-warming transcriber for conversation {conversation_id}")
+        transcriber = self.transcriber_factory.create_transcriber(transcriber_config)
+        # anything transcribed before the call connects is discarded on adoption
+        transcriber.consumer = QueueConsumer()
+        transcriber.start()
+
+        warm_transcriber = WarmTranscriber(
+            transcriber=transcriber,
+            transcriber_config=transcriber_config,
+        )
+        warm_transcriber.keep_warm_task = asyncio_create_task(
+            self._keep_warm(conversation_id, warm_transcriber),
+        )
+        self.warm_transcribers[conversation_id] = warm_transcriber
+        return transcriber
+
+    def adopt(
+        self,
+        conversation_id: str,
+        transcriber_config: TranscriberConfig,
+    ) -> Optional[BaseTranscriber[TranscriberConfig]]:
+        """Hands over the pre-warmed transcriber for a conversation, if one exists and was created
+        with the same config. The caller takes ownership and is responsible for terminating it."""
+        warm_transcriber = self.warm_transcribers.pop(conversation_id, None)
+        if warm_transcriber is None:
+            logger.debug(f"No pre-warmed transcriber for conversation {conversation_id}")
+            return None
+        if warm_transcriber.keep_warm_task is not None:
+            warm_transcriber.keep_warm_task.cancel()
+        if warm_transcriber.transcriber_config != transcriber_config:
+            logger.warning(
+                f"Pre-warmed transcriber config does not match for conversation {conversation_id}, discarding"
+            )
+            asyncio_create_task(warm_transcriber.transcriber.terminate())
+            return None
+        logger.debug(f"Adopting pre-warmed transcriber for conversation {conversation_id}")
+        return warm_transcriber.transcriber
+
+    async def release(self, conversation_id: str):
+        warm_transcriber = self.warm_transcribers.pop(conversation_id, None)
+        if warm_transcriber is None:
+            return
+        if warm_transcriber.keep_warm_task is not None:
+            warm_transcriber.keep_warm_task.cancel()
+        await warm_transcriber.transcriber.terminate()
+
+    async def terminate(self):
+        for conversation_id in list(self.warm_transcribers.keys()):
+            await self.release(conversation_id)
+
+    async def _keep_warm(self, conversation_id: str, warm_transcriber: WarmTranscriber):
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + self.idle_timeout_seconds
+        silent_chunk = warm_transcriber.transcriber.create_silent_chunk(
+            warm_transcriber.transcriber_config.chunk_size
+        )
+        try:
+            while (time_left := expires_at - loop.time()) > 0:
+                await asyncio.sleep(min(self.keepalive_interval_seconds or time_left, time_left))
+                if self.keepalive_interval_seconds is not None and silent_chunk is not None:
+                    warm_transcriber.transcriber.send_audio(silent_chunk)
+        except asyncio.CancelledError:
+            return
+        if self.warm_transcribers.get(conversation_id) is warm_transcriber:
+            logger.debug(f"Expiring idle pre-warmed transcriber for conversation {conversation_id}")
+            del self.warm_transcribers[conversation_id]
+            await warm_transcriber.transcriber.terminate()
@@ -1,82 +1,155 @@
-import ctypes
-import io
-import pathlib
-import wave
+import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
-import numpy as np
-from pydub import AudioSegment
+from loguru import logger
 
-from vocode.streaming.constants import SENTENCE_ENDINGS
 from vocode.streaming.models.transcriber import Transcription, WhisperCPPTranscriberConfig
-from vocode.streaming.transcriber.base_transcriber import BaseThreadAsyncTranscriber
-from vocode.utils.whisper_cpp.helpers import transcribe
-from vocode.utils.whisper_cpp.whisper_params import WhisperFullParams
-
-WHISPER_CPP_SAMPLING_RATE = 16000
+from vocode.streaming.transcriber.base_transcriber import (
+    BaseAsyncTranscriber,
+    BaseThreadAsyncTranscriber,
+)
+from vocode.streaming.transcriber.endpointer import Endpointer
+from vocode.streaming.transcriber.local_transcription_service import (
+    LocalTranscriptionService,
+    TranscriptionResult,
+)
+from vocode.streaming.transcriber.utterance_window import UtteranceWindow
+from vocode.streaming.utils import create_conversation_id
+from vocode.streaming.utils.create_task import asyncio_create_task
+from vocode.utils.whisper_cpp.helpers import load_whisper, transcribe_samples
 
 
 class WhisperCPPTranscriber(BaseThreadAsyncTranscriber[WhisperCPPTranscriberConfig]):
+    """
+    Streams audio into a float32 ring buffer at whisper.cpp's sampling rate and transcribes the
+    current utterance in place, without intermediate WAV/pydub conversions.
+
+    Every `buffer_size_seconds` of speech, the utterance so far is transcribed and sent as an
+    interim result; when the energy VAD detects a pause of `vad_pause_seconds` (or the window
+    reaches `max_window_seconds`), the utterance is transcribed one last time and sent as final.
+    If an endpointing_config is set, an Endpointer decides when the pause ends the turn instead.
+    """
+
     def __init__(
         self,
         transcriber_config: WhisperCPPTranscriberConfig,
     ):
         super().__init__(transcriber_config)
         self._ended = False
-        self.buffer_size = round(
-            transcriber_config.sampling_rate * transcriber_config.buffer_size_seconds
-        )
-        self.buffer = np.empty(self.buffer_size, dtype=np.int16)
-        self.buffer_index = 0
-
-        # whisper cpp
-        # load library and model
-        libname = pathlib.Path().absolute() / self.transcriber_config.libname
-        self.whisper = ctypes.CDLL(libname)  # type: ignore
-
-        # tell Python what are the return types of the functions
-        self.whisper.whisper_init_from_file.restype = ctypes.c_void_p
-        self.whisper.whisper_full_default_params.restype = WhisperFullParams
-        self.whisper.whisper_full_get_segment_text.restype = ctypes.c_char_p
-
-        # initialize whisper.cpp context
-        self.ctx = self.whisper.whisper_init_from_file(
-            self.transcriber_config.fname_model.encode("utf-8")
-        )
+        if transcriber_config.endpointing_config:
+            self.endpointer = Endpointer(transcriber_config.endpointing_config)
+        self.utterance_window = UtteranceWindow(transcriber_config, endpointer=self.endpointer)
+        self.last_interim_message = ""
 
-        # get default whisper parameters and adjust as needed
-        self.params = self.whisper.whisper_full_default_params()
-        self.params.print_realtime = False
-        self.params.print_progress = False
-        self.params.single_segment = True
+        self.whisper, self.ctx, self.params = load_whisper(
+            self.transcriber_config.libname, self.transcriber_config.fname_model
+        )
         self.thread_pool_executor = ThreadPoolExecutor(max_workers=1)
 
-    def create_new_buffer(self):
-        buffer = io.BytesIO()
-        wav = wave.open(buffer, "wb")
-        wav.setnchannels(1)
-        wav.setsampwidth(2)
-        wav.setframerate(self.transcriber_config.sampling_rate)
-        return wav, buffer
+    def _transcribe_window(self, is_final: bool) -> Optional[Transcription]:
+        message, confidence = transcribe_samples(
+            self.whisper, self.params, self.ctx, self.utterance_window.window()
+        )
+        message = message.strip()
+        if is_final:
+            self.utterance_window.reset()
+            self.last_interim_message = ""
+        elif message == self.last_interim_message:
+            return None
+        else:
+            self.last_interim_message = message
+        if not message:
+            return None
+        return Transcription(message=message, confidence=confidence, is_final=is_final)
+
+    def process_chunk(self, chunk: bytes) -> Optional[Transcription]:
+        is_final = self.utterance_window.push(chunk, self.last_interim_message)
+        if is_final is None:
+            return None
+        return self._transcribe_window(is_final=is_final)
 
     def _run_loop(self):
-        in_memory_wav, audio_buffer = self.create_new_buffer()
-        message_buffer = ""
         while not self._ended:
             chunk = self.input_janus_queue.sync_q.get()
-            in_memory_wav.writeframes(chunk)
-            if audio_buffer.tell() >= self.buffer_size * 2:
-                audio_buffer.seek(0)
-                audio_segment = AudioSegment.from_wav(audio_buffer)
-                message, confidence = transcribe(self.whisper, self.params, self.ctx, audio_segment)
-                message_buffer += message
-                is_final = any(message_buffer.endswith(ending) for ending in SENTENCE_ENDINGS)
-                in_memory_wav, audio_buffer = self.create_new_buffer()
+            transcription = self.process_chunk(chunk)
+            if transcription is not None:
+                self.produce_nonblocking(transcription)
+
+    async def terminate(self):
+        pass
+
+
+class BatchedWhisperCPPTranscriber(BaseAsyncTranscriber[WhisperCPPTranscriberConfig]):
+    """
+    Windows audio like WhisperCPPTranscriber, but transcribes through a LocalTranscriptionService
+    shared by every conversation on the host, so the model is loaded once per worker process
+    rather than once per call, and windows from concurrent calls are batched together.
+
+    Audio keeps flowing into the window while a transcription is in flight; results are
+    forwarded to the consumer in the order their windows were submitted. A window whose batch
+    fails is logged and skipped.
+    """
+
+    def __init__(
+        self,
+        transcriber_config: WhisperCPPTranscriberConfig,
+        transcription_service: LocalTranscriptionService,
+    ):
+        super().__init__(transcriber_config)
+        self.transcription_service = transcription_service
+        self.stream_id = create_conversation_id()
+        if transcriber_config.endpointing_config:
+            self.endpointer = Endpointer(transcriber_config.endpointing_config)
+        self.utterance_window = UtteranceWindow(transcriber_config, endpointer=self.endpointer)
+        self.last_interim_message = ""
+        self.pending_results: asyncio.Queue[
+            Tuple[asyncio.Future[Optional[TranscriptionResult]], bool]
+        ] = asyncio.Queue()
+        self.results_task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        self.results_task = asyncio_create_task(self._forward_results())
+        return super().start()
+
+    async def _run_loop(self):
+        while True:
+            chunk = await self._input_queue.get()
+            is_final = self.utterance_window.push(chunk, self.last_interim_message)
+            if is_final is None:
+                continue
+            future = self.transcription_service.submit(
+                self.stream_id, self.utterance_window.window(), is_final
+            )
+            if is_final:
+                self.utterance_window.reset()
+            self.pending_results.put_nowait((future, is_final))
+
+    async def _forward_results(self):
+        while True:
+            future, is_final = await self.pending_results.get()
+            try:
+                result = await future
+            except Exception as e:
+                # the service already logged the failed batch; keep forwarding later windows
+                logger.error(f"Dropping a window whose transcription failed: {e}")
+                continue
+            if result is None:  # superseded by a newer interim window
+                continue
+            message, confidence = result
+            message = message.strip()
+            if is_final:
+                self.last_interim_message = ""
+            elif message == self.last_interim_message:
+                continue
+            else:
+                self.last_interim_message = message
+            if message:
                 self.produce_nonblocking(
-                    Transcription(message=message_buffer, confidence=confidence, is_final=is_final)
+                    Transcription(message=message, confidence=confidence, is_final=is_final)
                 )
-                if is_final:
-                    message_buffer = ""
 
     async def terminate(self):
-        pass
+        if self.results_task is not None:
+            self.results_task.cancel()
+        await super().terminate()
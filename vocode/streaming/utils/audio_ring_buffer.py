@@ -0,0 +1,57 @@
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity float32 ring buffer whose most recent samples are always readable as a single
+    contiguous array.
+
+    Every sample is written twice, at `i` and `i + capacity`, so the window that ends at the write
+    head never wraps around. `window()` returns a view into the buffer rather than a copy, which
+    can be passed straight to native code (e.g. whisper.cpp) via `ndarray.ctypes`.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=np.float32)
+        self._head = 0
+        self.num_samples = 0
+
+    def write(self, samples: np.ndarray):
+        num_new_samples = len(samples)
+        if num_new_samples >= self.capacity:
+            samples = samples[-self.capacity :]
+            self._data[: self.capacity] = samples
+            self._data[self.capacity :] = samples
+            self._head = 0
+            self.num_samples = self.capacity
+            return
+
+        first_part = min(num_new_samples, self.capacity - self._head)
+        self._data[self._head : self._head + first_part] = samples[:first_part]
+        self._data[self._head + self.capacity : self._head + self.capacity + first_part] = samples[
+            :first_part
+        ]
+        second_part = num_new_samples - first_part
+        if second_part > 0:
+            self._data[:second_part] = samples[first_part:]
+            self._data[self.capacity : self.capacity + second_part] = samples[first_part:]
+
+        self._head = (self._head + num_new_samples) % self.capacity
+        self.num_samples = min(self.capacity, self.num_samples + num_new_samples)
+
+    def window(self) -> np.ndarray:
+        """Returns a contiguous view of the buffered samples, oldest first."""
+        end = self._head + self.capacity
+        return self._data[end - self.num_samples : end]
+
+    def keep_last(self, num_samples: int):
+        self.num_samples = min(self.num_samples, num_samples)
+
+    def clear(self):
+        self.num_samples = 0
+
+    def is_full(self) -> bool:
+        return self.num_samples == self.capacity
@@ -0,0 +1,134 @@
+import asyncio
+import importlib.util
+import time
+import weakref
+from collections import Counter
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+
+import httpx
+from loguru import logger
+from openai import DefaultAsyncHttpxClient
+
+from vocode.streaming.utils.singleton import Singleton
+
+# HTTP/2 lets concurrent requests to the same provider share a single connection, but httpx only
+# supports it when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# httpx drops idle connections after 5s by default, which is shorter than a typical pause between
+# conversation turns
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+POOL_LIMITS = httpx.Limits(
+    max_connections=1000,
+    max_keepalive_connections=100,
+    keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+)
+
+ClientType = TypeVar("ClientType")
+
+
+def create_openai_http_client() -> httpx.AsyncClient:
+    """httpx client for (Azure) OpenAI clients: OpenAI's defaults, with longer keep-alive and HTTP/2
+    when available."""
+    return DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, limits=POOL_LIMITS)
+
+
+class CachedAuthToken:
+    def __init__(self, token: str, expires_at: float):
+        self.token = token
+        self.expires_at = expires_at
+
+
+class ClientRegistryStats:
+    def __init__(self):
+        self.clients_created: Counter = Counter()
+        self.clients_reused: Counter = Counter()
+        self.auth_tokens_generated: Counter = Counter()
+        self.auth_tokens_reused: Counter = Counter()
+
+    def to_dict(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "clients_created": dict(self.clients_created),
+            "clients_reused": dict(self.clients_reused),
+            "auth_tokens_generated": dict(self.auth_tokens_generated),
+            "auth_tokens_reused": dict(self.auth_tokens_reused),
+        }
+
+
+class ClientRegistry(Singleton):
+    """Process-wide registry of provider API clients and short-lived auth tokens.
+
+    Clients are keyed by provider and by whatever identifies their credentials and endpoint
+    (API key, base URL, ...), so every conversation using the same provider shares one
+    keep-alive connection pool instead of opening (and TLS-handshaking) its own.
+
+    Pooled connections are bound to the event loop that opened them, so clients are only shared
+    within the running event loop; callers outside of one get a fresh, unshared client.
+    """
+
+    def __init__(self):
+        # event loop -> (kind, key) -> client
+        self.clients_by_loop: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.auth_tokens: Dict[Tuple[str, Hashable], CachedAuthToken] = {}
+        self.stats = ClientRegistryStats()
+
+    def get_client(
+        self,
+        kind: str,
+        key: Hashable,
+        create_client: Callable[[], ClientType],
+    ) -> ClientType:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.stats.clients_created[kind] += 1
+            return create_client()
+        clients = self.clients_by_loop.setdefault(loop, {})
+        client = clients.get((kind, key))
+        if client is None:
+            client = clients[(kind, key)] = create_client()
+            self.stats.clients_created[kind] += 1
+            logger.debug(f"Created pooled {kind} client")
+        else:
+            self.stats.clients_reused[kind] += 1
+        return client
+
+    def get_auth_token(
+        self,
+        kind: str,
+        key: Hashable,
+        generate_token: Callable[[], str],
+        ttl_seconds: float,
+    ) -> str:
+        """Returns a cached token for (kind, key), generating a new one once it is ttl_seconds old.
+
+        ttl_seconds should leave a margin before the token actually expires.
+        """
+        now = time.monotonic()
+        cached_token = self.auth_tokens.get((kind, key))
+        if cached_token is not None and cached_token.expires_at > now:
+            self.stats.auth_tokens_reused[kind] += 1
+            return cached_token.token
+        token = generate_token()
+        self.auth_tokens[(kind, key)] = CachedAuthToken(token=token, expires_at=now + ttl_seconds)
+        self.stats.auth_tokens_generated[kind] += 1
+        return token
+
+    def get_num_clients(self) -> Dict[str, int]:
+        num_clients: Counter = Counter()
+        for clients in self.clients_by_loop.values():
+            for kind, _ in clients:
+                num_clients[kind] += 1
+        return dict(num_clients)
+
+    async def close_clients(self):
+        """Closes the clients shared in the running event loop, e.g. on server shutdown."""
+        clients = self.clients_by_loop.pop(asyncio.get_running_loop(), {})
+        for (kind, _), client in clients.items():
+            try:
+                # httpx clients close with aclose(), provider SDK clients with close()
+                close = getattr(client, "aclose", None) or client.close
+                await close()
+            except Exception:
+                logger.exception(f"Failed to close pooled {kind} client")
+        logger.debug(f"Closed {len(clients)} pooled clients, stats: {self.stats.to_dict()}")
@@ -0,0 +1,32 @@
+import asyncio
+
+from vocode.streaming.models.transcriber import Transcription
+
+
+class InterimCoalescingQueue(asyncio.Queue[Transcription]):
+    """
+    A queue of transcriptions in which a waiting interim result is replaced by a newer one.
+
+    Each interim result is a snapshot of the current utterance, so once the consumer falls
+    behind only the newest one is worth processing. An interim at the back of the queue is
+    overwritten by the next interim (latest wins); final transcriptions are always enqueued,
+    and interims are never merged across a final.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.num_interims = 0
+        self.num_finals = 0
+        self.num_coalesced = 0
+
+    def put_nowait(self, item: Transcription):
+        if item.is_final:
+            self.num_finals += 1
+        else:
+            self.num_interims += 1
+            queue = self._queue  # type: ignore[attr-defined]
+            if queue and not queue[-1].is_final:
+                queue[-1] = item
+                self.num_coalesced += 1
+                return
+        super().put_nowait(item)
@@ -0,0 +1,45 @@
+import numpy as np
+
+DEFAULT_ENERGY_THRESHOLD = 0.01
+DEFAULT_PAUSE_SECONDS = 0.6
+
+
+class EnergyVAD:
+    """
+    Minimal energy-based voice activity detector for transcribers that run locally.
+
+    Each chunk of float32 samples (in [-1, 1]) is classified as speech if its RMS exceeds
+    `energy_threshold`. Once speech has been heard, `is_pause()` becomes true after
+    `pause_seconds` of consecutive non-speech audio.
+    """
+
+    def __init__(
+        self,
+        sampling_rate: int,
+        energy_threshold: float = DEFAULT_ENERGY_THRESHOLD,
+        pause_seconds: float = DEFAULT_PAUSE_SECONDS,
+    ):
+        self.sampling_rate = sampling_rate
+        self.energy_threshold = energy_threshold
+        self.pause_seconds = pause_seconds
+        self.reset()
+
+    def reset(self):
+        self.speech_detected = False
+        self.silence_seconds = 0.0
+
+    def process(self, samples: np.ndarray) -> bool:
+        """Updates the detector with a chunk of audio and returns whether the chunk is speech."""
+        if len(samples) == 0:
+            return False
+        rms = float(np.sqrt(np.dot(samples, samples) / len(samples)))
+        is_speech = rms >= self.energy_threshold
+        if is_speech:
+            self.speech_detected = True
+            self.silence_seconds = 0.0
+        else:
+            self.silence_seconds += len(samples) / self.sampling_rate
+        return is_speech
+
+    def is_pause(self) -> bool:
+        return self.speech_detected and self.silence_seconds >= self.pause_seconds
@@ -1,15 +1,23 @@
+import asyncio
 import os
-from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union, cast
 
 import aiohttp
 from openai import AsyncAzureOpenAI, AsyncOpenAI
 
 from vocode.streaming.models.agent import AZURE_OPENAI_DEFAULT_API_VERSION
+from vocode.streaming.models.vector_db import (
+    DEFAULT_EMBEDDINGS_BATCH_SIZE,
+    DEFAULT_EMBEDDINGS_MODEL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+)
+from vocode.streaming.utils.client_registry import ClientRegistry, create_openai_http_client
+from vocode.streaming.vector_db.embedding_cache import EmbeddingCache, normalize_text
 
 if TYPE_CHECKING:
     from langchain.docstore.document import Document
 
-DEFAULT_OPENAI_EMBEDDING_MODEL = "text-embedding-ada-002"
+DEFAULT_OPENAI_EMBEDDING_MODEL = DEFAULT_EMBEDDINGS_MODEL
 
 
 class VectorDB:
@@ -31,26 +39,90 @@ class VectorDB:
         if self.engine:
             azure_base = os.getenv("AZURE_OPENAI_API_BASE_EAST_US")
             azure_base = azure_base if azure_base is not None else ""
-            self.openai_client = AsyncAzureOpenAI(
-                azure_endpoint=azure_base,
-                api_key=os.getenv("AZURE_OPENAI_API_KEY_EAST_US"),
-                api_version=AZURE_OPENAI_DEFAULT_API_VERSION,
+            azure_api_key = os.getenv("AZURE_OPENAI_API_KEY_EAST_US")
+            self.openai_client = ClientRegistry().get_client(
+                "azure_openai",
+                (azure_base, azure_api_key, AZURE_OPENAI_DEFAULT_API_VERSION, None),
+                lambda: AsyncAzureOpenAI(
+                    azure_endpoint=azure_base,
+                    api_key=azure_api_key,
+                    api_version=AZURE_OPENAI_DEFAULT_API_VERSION,
+                    http_client=create_openai_http_client(),
+                ),
             )
         else:
-            self.openai_client = AsyncOpenAI(
-                api_key=os.getenv("OPENAI_API_KEY"),
+            api_key = os.getenv("OPENAI_API_KEY")
+            self.openai_client = ClientRegistry().get_client(
+                "openai",
+                (None, api_key, None),
+                lambda: AsyncOpenAI(api_key=api_key, http_client=create_openai_http_client()),
             )
 
+    def _get_embedding_model(self, model: str) -> str:
+        return self.engine if self.engine else model
+
     async def create_openai_embedding(
         self, text, model=DEFAULT_OPENAI_EMBEDDING_MODEL
     ) -> List[float]:
-        params = {
-            "input": text,
-        }
+        return (await self.create_openai_embeddings([text], model=model))[0]
+
+    async def create_openai_embeddings(
+        self,
+        texts: List[str],
+        model=DEFAULT_OPENAI_EMBEDDING_MODEL,
+        batch_size: int = DEFAULT_EMBEDDINGS_BATCH_SIZE,
+        max_concurrent_requests: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        use_cache: bool = True,
+    ) -> List[List[float]]:
+        """Embeds texts, in the same order, with as few requests as possible.
+
+        Texts that were embedded before are looked up in the EmbeddingCache. The rest are
+        deduplicated and embedded batch_size at a time, with at most max_concurrent_requests
+        requests in flight. Texts are embedded as given: normalization only decides which texts
+        share a cache entry. Pass use_cache=False for bulk ingestion, whose texts would otherwise
+        evict the cached query embeddings.
+        """
+        model = self._get_embedding_model(model)
+        embedding_cache = EmbeddingCache() if use_cache else None
+
+        def get_key(text: str) -> str:
+            return normalize_text(text) if embedding_cache is not None else text
+
+        embeddings: List[Optional[List[float]]] = [
+            embedding_cache.get(model, text) if embedding_cache is not None else None
+            for text in texts
+        ]
+        # key -> the first of the texts with that key, which is the one embedded
+        texts_to_embed: Dict[str, str] = {}
+        for text, embedding in zip(texts, embeddings):
+            if embedding is None:
+                texts_to_embed.setdefault(get_key(text), text)
+        if texts_to_embed:
+            semaphore = asyncio.Semaphore(max_concurrent_requests)
 
-        params["model"] = self.engine if self.engine else model
+            async def embed_batch(batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    response = await self.openai_client.embeddings.create(input=batch, model=model)
+                return [data.embedding for data in sorted(response.data, key=lambda d: d.index)]
 
-        return (await self.openai_client.embeddings.create(**params)).data[0].embedding
+            keys = list(texts_to_embed)
+            batches = [keys[i : i + batch_size] for i in range(0, len(keys), batch_size)]
+            new_embeddings: Dict[str, List[float]] = {}
+            for batch, batch_embeddings in zip(
+                batches,
+                await asyncio.gather(
+                    *(embed_batch([texts_to_embed[key] for key in batch]) for batch in batches)
+                ),
+            ):
+                for key, embedding in zip(batch, batch_embeddings):
+                    new_embeddings[key] = embedding
+                    if embedding_cache is not None:
+                        embedding_cache.set(model, key, embedding)
+            embeddings = [
+                embedding if embedding is not None else new_embeddings[get_key(text)]
+                for text, embedding in zip(texts, embeddings)
+            ]
+        return cast(List[List[float]], embeddings)
 
     async def add_texts(
         self,
@@ -0,0 +1,49 @@
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from vocode.streaming.utils.singleton import Singleton
+
+MAX_CACHED_EMBEDDINGS = 1000
+
+
+def normalize_text(text: str) -> str:
+    """Collapses whitespace, so that e.g. transcriptions differing only in spacing share an
+    embedding."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache(Singleton):
+    """Process-wide LRU cache of embeddings, keyed by model and normalized text.
+
+    Embeddings are stored as arrays of doubles rather than lists of floats, which takes about a
+    quarter of the memory (~12KB per 1536-dimensional embedding).
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_EMBEDDINGS):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str], array]" = OrderedDict()
+        self.num_hits = 0
+        self.num_misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        num_lookups = self.num_hits + self.num_misses
+        return self.num_hits / num_lookups if num_lookups else 0.0
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        key = (model, normalize_text(text))
+        embedding = self.entries.get(key)
+        if embedding is None:
+            self.num_misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.num_hits += 1
+        return embedding.tolist()
+
+    def set(self, model: str, text: str, embedding: List[float]):
+        key = (model, normalize_text(text))
+        self.entries[key] = array("d", embedding)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import os
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.docstore.document import Document
+
+from vocode.streaming.models.vector_db import LocalVectorDBConfig, LocalVectorIndexType
+from vocode.streaming.vector_db.base_vector_db import VectorDB
+from vocode.streaming.vector_db.vector_index import VectorIndex
+
+NAMESPACES_FILE = "namespaces.json"
+DOCUMENTS_FILE = "documents.jsonl"
+# an IVF index is retrained once it has grown by this factor since it was last trained
+RETRAIN_GROWTH_FACTOR = 2
+
+
+class LocalNamespace:
+    def __init__(self, index: VectorIndex, documents: List[dict]):
+        self.index = index
+        # one {"id", "text", "metadata"} per row of the index
+        self.documents = documents
+        self.num_vectors_at_training = len(index) if index.is_trained else 0
+        # serializes adds and training: training replaces the lists with its snapshot's rows,
+        # so vectors added meanwhile would be in no list
+        self.lock = asyncio.Lock()
+
+
+class LocalVectorDB(VectorDB):
+    """In-process vector store, for knowledge bases of up to a few hundred thousand chunks.
+
+    Saves the network round trip to a hosted vector DB on every retrieval: only the query is
+    embedded remotely (and cached), the search itself is a NumPy matrix product, run in a thread
+    so that the event loop isn't blocked. See VectorIndex for the flat and IVF index types.
+    Concurrent add_texts calls to a namespace wait for each other, including for any training
+    they trigger; searches don't wait.
+
+    If config.path points at a saved store, it is loaded (memory-mapped if config.memory_map);
+    save() writes the store back there. Filters match metadata values exactly, e.g.
+    {"source": "faq"}.
+    """
+
+    def __init__(self, config: LocalVectorDBConfig, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.config = config
+        self.namespaces: Dict[str, LocalNamespace] = {}
+        if config.path is not None and os.path.exists(os.path.join(config.path, NAMESPACES_FILE)):
+            self.load(config.path)
+
+    def _create_index(self, dimensions: int) -> VectorIndex:
+        return VectorIndex(
+            dimensions=dimensions,
+            index_type=self.config.index_type.value,
+            num_lists=self.config.num_lists,
+            num_probes=self.config.num_probes,
+        )
+
+    async def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+        namespace: Optional[str] = None,
+    ) -> List[str]:
+        texts = list(texts)
+        ids = ids or [str(uuid.uuid4()) for _ in texts]
+        if not texts:
+            return ids
+        embeddings = await self.create_openai_embeddings(
+            texts,
+            model=self.config.embeddings_model,
+            batch_size=self.config.embeddings_batch_size,
+            max_concurrent_requests=self.config.max_concurrent_requests,
+            use_cache=False,  # keep the cache for query embeddings
+        )
+        local_namespace = self.namespaces.get(namespace or "")
+        if local_namespace is None:
+            local_namespace = self.namespaces[namespace or ""] = LocalNamespace(
+                index=self._create_index(len(embeddings[0])), documents=[]
+            )
+        async with local_namespace.lock:
+            local_namespace.index.add(np.array(embeddings, dtype=np.float32))
+            local_namespace.documents.extend(
+                {"id": id, "text": text, "metadata": metadatas[i] if metadatas else {}}
+                for i, (id, text) in enumerate(zip(ids, texts))
+            )
+            if self._should_train(local_namespace):
+                await asyncio.to_thread(local_namespace.index.train, self.config.num_lists)
+                local_namespace.num_vectors_at_training = len(local_namespace.index)
+        return ids
+
+    def _should_train(self, local_namespace: LocalNamespace) -> bool:
+        num_vectors = len(local_namespace.index)
+        if (
+            self.config.index_type != LocalVectorIndexType.IVF
+            or num_vectors < self.config.min_vectors_to_train
+        ):
+            return False
+        if not local_namespace.index.is_trained:
+            return True
+        return num_vectors >= local_namespace.num_vectors_at_training * RETRAIN_GROWTH_FACTOR
+
+    async def similarity_search_with_score(
+        self,
+        query: str,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+    ) -> List[Tuple[Document, float]]:
+        local_namespace = self.namespaces.get(namespace or "")
+        if local_namespace is None:
+            return []
+        query_embedding = await self.create_openai_embedding(
+            query, model=self.config.embeddings_model
+        )
+        rows = None
+        if filter:
+            rows = np.array(
+                [
+                    row
+                    for row, document in enumerate(local_namespace.documents)
+                    if all(document["metadata"].get(key) == value for key, value in filter.items())
+                ],
+                dtype=np.int64,
+            )
+        results = await asyncio.to_thread(
+            local_namespace.index.search,
+            np.array(query_embedding, dtype=np.float32),
+            self.config.top_k,
+            rows,
+        )
+        return [
+            (
+                Document(
+                    page_content=local_namespace.documents[row]["text"],
+                    metadata=dict(local_namespace.documents[row]["metadata"]),
+                ),
+                score,
+            )
+            for row, score in results
+        ]
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.config.path
+        if path is None:
+            raise ValueError("No path to save the local vector DB to")
+        directories = {}
+        for i, (namespace, local_namespace) in enumerate(self.namespaces.items()):
+            directory = directories[namespace] = str(i)
+            local_namespace.index.save(os.path.join(path, directory))
+            with open(os.path.join(path, directory, DOCUMENTS_FILE), "w") as documents_file:
+                for document in local_namespace.documents:
+                    documents_file.write(json.dumps(document) + "\n")
+        with open(os.path.join(path, NAMESPACES_FILE), "w") as namespaces_file:
+            json.dump(directories, namespaces_file)
+
+    def load(self, path: str):
+        with open(os.path.join(path, NAMESPACES_FILE)) as namespaces_file:
+            directories: Dict[str, str] = json.load(namespaces_file)
+        self.namespaces = {}
+        for namespace, directory in directories.items():
+            index = VectorIndex.load(
+                os.path.join(path, directory), memory_map=self.config.memory_map
+            )
+            with open(os.path.join(path, directory, DOCUMENTS_FILE)) as documents_file:
+                documents = [json.loads(line) for line in documents_file]
+            self.namespaces[namespace] = LocalNamespace(index=index, documents=documents)
@@ -1,3 +1,4 @@
+import asyncio
 import uuid
 from typing import Any, Iterable, List, Optional, Tuple, TypeGuard
 
@@ -49,25 +50,44 @@ class PineconeDB(VectorDB):
         if namespace is None:
             namespace = ""
         # Embed and create the documents
-        docs = []
+        texts = list(texts)
         ids = ids or [str(uuid.uuid4()) for _ in texts]
-        for i, text in enumerate(texts):
-            embedding = await self.create_openai_embedding(text)
+        embeddings = await self.create_openai_embeddings(
+            texts,
+            model=self.config.embeddings_model,
+            batch_size=self.config.embeddings_batch_size,
+            max_concurrent_requests=self.config.max_concurrent_requests,
+            use_cache=False,  # keep the cache for query embeddings
+        )
+        docs = []
+        for i, (text, embedding) in enumerate(zip(texts, embeddings)):
             metadata = metadatas[i] if metadatas else {}
             metadata[self._text_key] = text
             docs.append({"id": ids[i], "values": embedding, "metadata": metadata})
-        # upsert to Pinecone
-        async with self.aiohttp_session.post(
-            f"{self.pinecone_url}/vectors/upsert",
-            headers={"Api-Key": self.pinecone_api_key},
-            json={
-                "vectors": docs,
-                "namespace": namespace,
-            },
-        ) as response:
-            response_json = await response.json()
-            if "message" in response_json:
-                logger.error(f"Error upserting vectors: {response_json}")
+        # upsert to Pinecone, in chunks
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+
+        async def upsert(vectors: List[dict]):
+            async with semaphore:
+                async with self.aiohttp_session.post(
+                    f"{self.pinecone_url}/vectors/upsert",
+                    headers={"Api-Key": self.pinecone_api_key},
+                    json={
+                        "vectors": vectors,
+                        "namespace": namespace,
+                    },
+                ) as response:
+                    response_json = await response.json()
+                    if "message" in response_json:
+                        logger.error(f"Error upserting vectors: {response_json}")
+
+        upsert_batch_size = self.config.upsert_batch_size
+        await asyncio.gather(
+            *(
+                upsert(docs[i : i + upsert_batch_size])
+                for i in range(0, len(docs), upsert_batch_size)
+            )
+        )
 
         return ids
 
@@ -90,7 +110,7 @@ class PineconeDB(VectorDB):
         # Adapted from: langchain/vectorstores/pinecone.py. Made langchain implementation async.
         if namespace is None:
             namespace = ""
-        query_obj = await self.create_openai_embedding(query)
+        query_obj = await self.create_openai_embedding(query, model=self.config.embeddings_model)
         docs = []
         async with self.aiohttp_session.post(
             f"{self.pinecone_url}/query",
@@ -0,0 +1,217 @@
+import json
+import math
+import os
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_NUM_PROBES = 16
+# vectors sampled per list to train the IVF centroids
+TRAINING_SAMPLES_PER_LIST = 32
+NUM_TRAINING_ITERATIONS = 10
+# rows scored at a time when assigning vectors to lists, to bound the memory used
+ASSIGNMENT_CHUNK_SIZE = 65536
+
+INDEX_FILE = "index.json"
+VECTORS_FILE = "vectors.npy"
+CENTROIDS_FILE = "centroids.npy"
+LIST_ROWS_FILE = "list_rows.npy"
+LIST_OFFSETS_FILE = "list_offsets.npy"
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def _save_array(path: str, file_name: str, array: np.ndarray):
+    # written next to the file and renamed over it, so that the old file - which may be memory
+    # mapped, e.g. by the index being saved - is never truncated while it's read
+    with tempfile.NamedTemporaryFile(dir=path, suffix=".tmp", delete=False) as temp_file:
+        try:
+            np.save(temp_file, array)
+        except BaseException:
+            temp_file.close()
+            os.remove(temp_file.name)
+            raise
+    os.replace(temp_file.name, os.path.join(path, file_name))
+
+
+class VectorIndex:
+    """Cosine similarity search over a float32 matrix of (normalized) vectors.
+
+    A "flat" index scores every vector with a single matrix-vector product. An "ivf" index, once
+    trained, clusters the vectors into num_lists lists (sqrt of the number of vectors by default)
+    with spherical k-means and only scores the vectors in the num_probes lists whose centroids
+    are closest to the query, trading some recall for a search time that grows with sqrt(n).
+
+    Indexes are saved as .npy files, so that they can be loaded memory-mapped: the OS then pages
+    vectors in as they are searched instead of the whole matrix being read up front. Adding
+    vectors to a memory-mapped index copies it into memory; saving one (e.g. back over the files
+    it was loaded from) maps the saved vectors.
+    """
+
+    def __init__(
+        self,
+        dimensions: int,
+        index_type: str = "flat",
+        num_lists: Optional[int] = None,
+        num_probes: int = DEFAULT_NUM_PROBES,
+    ):
+        if index_type not in ("flat", "ivf"):
+            raise ValueError(f"Unknown vector index type {index_type}")
+        self.dimensions = dimensions
+        self.index_type = index_type
+        self.num_lists = num_lists
+        self.num_probes = num_probes
+        # rows beyond num_vectors are spare capacity, so that adding is amortized O(1) per vector
+        self._vectors = np.empty((0, dimensions), dtype=np.float32)
+        self.num_vectors = 0
+        self.centroids: Optional[np.ndarray] = None
+        # for each list, the rows of the vectors in it
+        self.lists: List[np.ndarray] = []
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[: self.num_vectors]
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return self.num_vectors
+
+    def add(self, vectors: np.ndarray) -> np.ndarray:
+        """Adds vectors, returning their rows. Once trained, they are added to their nearest
+        lists; the centroids themselves aren't updated until the index is trained again."""
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions))
+        start = self.num_vectors
+        end = start + len(vectors)
+        if end > len(self._vectors) or not self._vectors.flags.writeable:
+            grown = np.empty((max(end, 2 * len(self._vectors)), self.dimensions), dtype=np.float32)
+            grown[:start] = self._vectors[:start]
+            self._vectors = grown
+        self._vectors[start:end] = vectors
+        self.num_vectors = end
+        rows = np.arange(start, end)
+        if self.centroids is not None:
+            assignments = self._assign(vectors, self.centroids)
+            for list_index in np.unique(assignments):
+                self.lists[list_index] = np.concatenate(
+                    [self.lists[list_index], rows[assignments == list_index]]
+                )
+        return rows
+
+    def train(self, num_lists: Optional[int] = None, seed: int = 0):
+        """Clusters the vectors into lists (a no-op for flat indexes)."""
+        if self.index_type != "ivf" or self.num_vectors == 0:
+            return
+        num_lists = min(
+            num_lists or self.num_lists or max(int(math.sqrt(self.num_vectors)), 1),
+            self.num_vectors,
+        )
+        random = np.random.default_rng(seed)
+        vectors = self.vectors
+        sample_size = min(self.num_vectors, num_lists * TRAINING_SAMPLES_PER_LIST)
+        sample = vectors[np.sort(random.choice(self.num_vectors, sample_size, replace=False))]
+        centroids = sample[random.choice(sample_size, num_lists, replace=False)]
+        for _ in range(NUM_TRAINING_ITERATIONS):
+            assignments = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            is_empty = np.bincount(assignments, minlength=num_lists) == 0
+            # empty lists keep their centroid
+            centroids = _normalize(np.where(is_empty[:, None], centroids, sums))
+        assignments = self._assign(vectors, centroids)
+        rows_by_list = np.argsort(assignments, kind="stable")
+        offsets = np.searchsorted(assignments[rows_by_list], np.arange(num_lists + 1))
+        # the lists are swapped in before the centroids, which searches check first
+        self.lists = [rows_by_list[offsets[i] : offsets[i + 1]] for i in range(num_lists)]
+        self.centroids = centroids
+        self.num_lists = num_lists
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), ASSIGNMENT_CHUNK_SIZE):
+            chunk = vectors[start : start + ASSIGNMENT_CHUNK_SIZE]
+            assignments[start : start + len(chunk)] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignments
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        rows: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        """Returns the rows and scores of the top_k vectors most similar to query, best first.
+
+        If rows is given, only those vectors are searched, exhaustively (e.g. the vectors whose
+        documents match a filter).
+        """
+        query = _normalize(np.asarray(query, dtype=np.float32).reshape(self.dimensions))
+        centroids = self.centroids
+        if rows is None and centroids is not None:
+            num_probes = min(self.num_probes, len(centroids))
+            probes = np.argpartition(-(centroids @ query), num_probes - 1)[:num_probes]
+            # sorted, so that memory-mapped vectors are read front to back
+            rows = np.sort(np.concatenate([self.lists[probe] for probe in probes]))
+        if rows is None:
+            scores = self.vectors @ query
+        else:
+            scores = self.vectors[rows] @ query
+        top_k = min(top_k, len(scores))
+        if top_k <= 0:
+            return []
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        best_rows = best if rows is None else rows[best]
+        return [(int(row), float(score)) for row, score in zip(best_rows, scores[best])]
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        _save_array(path, VECTORS_FILE, self.vectors)
+        if isinstance(self._vectors, np.memmap):
+            # rather than keep the replaced file mapped
+            self._vectors = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+        if self.centroids is not None:
+            _save_array(path, CENTROIDS_FILE, self.centroids)
+            _save_array(path, LIST_ROWS_FILE, np.concatenate(self.lists))
+            _save_array(
+                path,
+                LIST_OFFSETS_FILE,
+                np.cumsum([0] + [len(list_rows) for list_rows in self.lists]),
+            )
+        with open(os.path.join(path, INDEX_FILE), "w") as index_file:
+            json.dump(
+                {
+                    "dimensions": self.dimensions,
+                    "index_type": self.index_type,
+                    "num_lists": self.num_lists,
+                    "num_probes": self.num_probes,
+                    "is_trained": self.centroids is not None,
+                },
+                index_file,
+            )
+
+    @classmethod
+    def load(cls, path: str, memory_map: bool = False) -> "VectorIndex":
+        with open(os.path.join(path, INDEX_FILE)) as index_file:
+            index_info = json.load(index_file)
+        index = cls(
+            dimensions=index_info["dimensions"],
+            index_type=index_info["index_type"],
+            num_lists=index_info["num_lists"],
+            num_probes=index_info["num_probes"],
+        )
+        index._vectors = np.load(
+            os.path.join(path, VECTORS_FILE), mmap_mode="r" if memory_map else None
+        )
+        index.num_vectors = len(index._vectors)
+        if index_info["is_trained"]:
+            list_rows = np.load(os.path.join(path, LIST_ROWS_FILE))
+            offsets = np.load(os.path.join(path, LIST_OFFSETS_FILE))
+            index.lists = [list_rows[offsets[i] : offsets[i + 1]] for i in range(len(offsets) - 1)]
+            index.centroids = np.load(os.path.join(path, CENTROIDS_FILE))
+        return index
@@ -1,26 +1,60 @@
 import ctypes
+import pathlib
 import re
 from typing import Tuple
 
 import numpy as np
 from pydub import AudioSegment
 
+from vocode.utils.whisper_cpp.whisper_params import WhisperFullParams
+
+WHISPER_CPP_SAMPLING_RATE = 16000
+MIN_AUDIO_SECONDS = 0.1
+
+
+def load_whisper(libname: str, fname_model: str):
+    """Loads the whisper.cpp library and model, returning (whisper, ctx, params)."""
+    whisper = ctypes.CDLL(pathlib.Path().absolute() / libname)  # type: ignore
+
+    # tell Python what are the return types of the functions
+    whisper.whisper_init_from_file.restype = ctypes.c_void_p
+    whisper.whisper_full_default_params.restype = WhisperFullParams
+    whisper.whisper_full_get_segment_text.restype = ctypes.c_char_p
+
+    # initialize whisper.cpp context
+    ctx = whisper.whisper_init_from_file(fname_model.encode("utf-8"))
+
+    # get default whisper parameters and adjust as needed
+    params = whisper.whisper_full_default_params()
+    params.print_realtime = False
+    params.print_progress = False
+    params.single_segment = True
+    return whisper, ctx, params
+
 
 def transcribe(whisper, params, ctx, audio_segment: AudioSegment) -> Tuple[str, float]:
-    if len(audio_segment) <= 100:
+    if len(audio_segment) <= MIN_AUDIO_SECONDS * 1000:
         return "", 0.0
     normalized = (
-        np.frombuffer(audio_segment.set_frame_rate(16000).raw_data, dtype=np.int16).astype(
-            "float32"
-        )
+        np.frombuffer(
+            audio_segment.set_frame_rate(WHISPER_CPP_SAMPLING_RATE).raw_data, dtype=np.int16
+        ).astype("float32")
         / 32768.0
     )
+    return transcribe_samples(whisper, params, ctx, normalized)
+
+
+def transcribe_samples(whisper, params, ctx, samples: np.ndarray) -> Tuple[str, float]:
+    """Runs whisper.cpp on contiguous float32 samples at 16kHz without copying them."""
+    if len(samples) <= MIN_AUDIO_SECONDS * WHISPER_CPP_SAMPLING_RATE:
+        return "", 0.0
+    assert samples.dtype == np.float32 and samples.flags["C_CONTIGUOUS"]
 
     result = whisper.whisper_full(
         ctypes.c_void_p(ctx),
         params,
-        normalized.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
-        len(normalized),
+        samples.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+        len(samples),
     )
     if result != 0:
         print("Error: {}".format(result))